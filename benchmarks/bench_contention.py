@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# bench_contention.py
+"""Typing latency while a full-buffer lint and search run on worker threads.
+
+Mirrors the editor's locking: every keystroke edits the buffer under the
+editor lock (``_state_lock``), while two workers loop over the whole document
+– a "lint" that joins it into one string and a "search" that scans every
+line.  Workers get their view of the document either
+
+    • copy     – the former way: ``list(text)`` / ``os.linesep.join(text)``
+                 while holding the lock;
+    • snapshot – ``text.snapshot()`` under the lock (O(1) for the piece
+                 tables), the join / scan after releasing it;
+
+and an "idle" run without workers gives the baseline.  Reported per
+scenario: keystroke latency (GIL and lock wait + edit, counted from the moment
+the key was due) p50 / p99 / max in ms and the
+number of full-buffer passes the workers completed.
+
+Usage:
+    python benchmarks/bench_contention.py --lines 1000000 --seconds 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+from text_buffer import BUFFER_BACKENDS, create_buffer  # noqa: E402
+
+LINE = "2024-05-01 12:00:{n:02d} INFO request id={n} path=/api/v1/items user=jürgen status=200"
+
+
+def lint_worker(text, lock, mode: str, stop: threading.Event, passes: list) -> None:
+    while not stop.is_set():
+        if mode == "copy":
+            with lock:
+                code = os.linesep.join(text)
+        else:
+            with lock:
+                snapshot = text.snapshot()
+            code = os.linesep.join(snapshot)
+        passes[0] += len(code) > 0
+
+
+def search_worker(text, lock, mode: str, stop: threading.Event, passes: list) -> None:
+    while not stop.is_set():
+        if mode == "copy":
+            with lock:
+                lines = list(text)
+        else:
+            with lock:
+                lines = text.snapshot()
+        hits = sum(1 for line in lines if "id=42 " in line)
+        passes[1] += hits >= 0
+
+
+def run_scenario(backend: str, n_lines: int, mode: str, seconds: float, interval: float):
+    text = create_buffer([LINE.format(n=i % 60) for i in range(n_lines)], backend)
+    lock = threading.RLock()
+    stop = threading.Event()
+    passes = [0, 0]
+    workers = []
+    if mode != "idle":
+        workers = [threading.Thread(target=fn, args=(text, lock, mode, stop, passes), daemon=True)
+                   for fn in (lint_worker, search_worker)]
+        for worker in workers:
+            worker.start()
+
+    rnd = random.Random(1)
+    row = n_lines // 2
+    latencies = []
+    due = time.perf_counter()
+    deadline = due + seconds
+    while due < deadline:
+        with lock:
+            text[row] = text[row] + chr(rnd.randrange(97, 123))
+        # Measured from the moment the key was due, so waiting for the GIL counts too.
+        latencies.append(time.perf_counter() - due)
+        due = max(due + interval, time.perf_counter())
+        time.sleep(max(0.0, due - time.perf_counter()))
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies) * 1e3, p99 * 1e3, latencies[-1] * 1e3, passes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each scenario")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between keystrokes (s)")
+    parser.add_argument("--backends", nargs="+", default=["piece_table", "compact", "list"],
+                        choices=list(BUFFER_BACKENDS))
+    args = parser.parse_args()
+
+    print(f"{args.lines} lines, {args.seconds:.0f} s per scenario, keystroke every {args.interval * 1e3:.0f} ms")
+    print(f"{'backend':<13}{'mode':<10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'lint':>7}{'search':>8}")
+    for backend in args.backends:
+        for mode in ("idle", "copy", "snapshot"):
+            p50, p99, worst, (lints, searches) = run_scenario(backend, args.lines, mode,
+                                                              args.seconds, args.interval)
+            print(f"{backend:<13}{mode:<10}{p50:>9.3f}{p99:>9.2f}{worst:>9.2f}{lints:>7}{searches:>8}")
+
+
+if __name__ == "__main__":
+    main()
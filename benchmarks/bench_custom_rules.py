@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# bench_custom_rules.py
+"""Custom syntax rules: per-character painting vs. ``RuleHighlighter``.
+
+Highlights lines with the ``[syntax_highlighting.<lang>]`` rules of the
+shipped config.toml, the way ``apply_custom_highlighting`` used to (a colour
+per character, segments rebuilt by string concatenation) and with
+``syntax_rules.RuleHighlighter``, and checks that both give the same
+segments.  Corpora: Python source (sway.py itself), and single lines of
+minified JavaScript and CSS of --width characters – the lines that used to
+dominate frame time.
+
+Usage:
+    python benchmarks/bench_custom_rules.py --lines 2000 --width 10000 --repeat 5
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import toml
+
+SWAY_PAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad")
+sys.path.insert(0, SWAY_PAD)
+
+from syntax_rules import RuleHighlighter  # noqa: E402
+
+COLORS = {"default": 0, "keyword": 1, "string": 2, "comment": 3, "literal": 4, "decorator": 5, "type": 6,
+          "builtins": 7, "selector": 8, "property": 9}
+
+
+def legacy(rules, line):
+    """The former `apply_custom_highlighting`."""
+    line_len = len(line)
+    char_colors = [COLORS.get("default")] * line_len
+    for pattern, color_name in rules:
+        color_attr = COLORS.get(color_name, COLORS["default"])
+        for match in pattern.finditer(line):
+            start, end = match.span()
+            for i in range(start, end):
+                if i < line_len:
+                    char_colors[i] = color_attr
+    if not line:
+        return [("", COLORS["default"])]
+    segments = []
+    current_segment_text = line[0]
+    current_segment_color = char_colors[0]
+    for i in range(1, line_len):
+        if char_colors[i] == current_segment_color:
+            current_segment_text += line[i]
+        else:
+            segments.append((current_segment_text, current_segment_color))
+            current_segment_text = line[i]
+            current_segment_color = char_colors[i]
+    segments.append((current_segment_text, current_segment_color))
+    return segments
+
+
+def minified(language: str, width: int) -> str:
+    if language == "javascript":
+        unit = 'function f(a){var s="x"+a;if(a>10){return `v${a}`}return null};/*c*/'
+    else:
+        unit = ".btn-primary{color:#fff;margin:0 auto!important;}/* c */a:hover{top:1.5em;}"
+    return (unit * (width // len(unit) + 1))[:width]
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="lines of the Python corpus")
+    parser.add_argument("--width", type=int, default=10000, help="characters of a minified line")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    with open(os.path.join(SWAY_PAD, "config.toml"), encoding="utf-8") as f:
+        languages = toml.load(f)["syntax_highlighting"]
+    with open(os.path.join(SWAY_PAD, "sway.py"), encoding="utf-8") as f:
+        python_lines = f.read().splitlines()[:args.lines]
+    corpora = [
+        ("python", f"{len(python_lines)} lines", python_lines),
+        ("javascript", f"1 x {args.width} chars", [minified("javascript", args.width)]),
+        ("css", f"1 x {args.width} chars", [minified("css", args.width)]),
+    ]
+
+    print(f"{'':<32}{'before':>12}{'after':>12}  (ms)")
+    for language, label, lines in corpora:
+        rules = [(re.compile(rule["pattern"]), rule["color"]) for rule in languages[language]["patterns"]]
+        highlighter = RuleHighlighter(rules, COLORS, COLORS["default"])
+        assert [legacy(rules, line) for line in lines] == [highlighter.highlight(line) for line in lines]
+        before = best_of(args.repeat, lambda: [legacy(rules, line) for line in lines])
+        after = best_of(args.repeat, lambda: [highlighter.highlight(line) for line in lines])
+        print(f"{language:<11}{label:<21}{before * 1e3:>12.2f}{after * 1e3:>12.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
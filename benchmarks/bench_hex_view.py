@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# bench_hex_view.py
+"""Hex view benchmark: open time, first screen and a full search on a large binary file.
+
+Creates a sparse file of --size-gb (cached in --workdir; it takes no disk
+space) with a header and a marker near the end, then times:
+
+    • open   – ``HexFileView(path)`` (one ``mmap`` call);
+    • screen – formatting the first 60 rows, as one redraw does;
+    • seek   – formatting 60 rows in the middle of the file;
+    • search – ``find("de ad be ef")``, which has to scan to the marker.
+
+Peak RSS is reported after each step: it stays flat because rows are
+formatted on demand and the search releases every chunk it has scanned.
+
+Usage:
+    python benchmarks/bench_hex_view.py --size-gb 4 --workdir /tmp/sway-bench
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+from hex_view import HexFileView  # noqa: E402
+
+MARKER = b"\xde\xad\xbe\xef"
+
+
+def make_file(workdir: str, size_gb: int) -> str:
+    path = os.path.join(workdir, f"hex_{size_gb}gb.bin")
+    size = size_gb * 1024 ** 3
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        return path
+    with open(path, "wb") as f:
+        f.write(b"\x7fELF\x02\x01\x01\x00" + bytes(range(256)))
+        f.truncate(size)
+        f.seek(size - 4096)
+        f.write(MARKER)
+    return path
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-gb", type=int, default=4)
+    parser.add_argument("--workdir", default="/tmp/sway-bench")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = make_file(args.workdir, args.size_gb)
+    print(f"{os.path.basename(path)}: {os.path.getsize(path):,} bytes")
+    print(f"{'':>8}{'ms':>10}{'peak RSS MB':>14}")
+
+    def report(step: str, started: float) -> None:
+        print(f"{step:>8}{(time.perf_counter() - started) * 1000:>10.1f}{peak_rss_mb():>14.1f}")
+
+    started = time.perf_counter()
+    view = HexFileView(path)
+    report("open", started)
+
+    started = time.perf_counter()
+    list(view.iter_range(0, 60))
+    report("screen", started)
+
+    started = time.perf_counter()
+    middle = view.line_count() // 2
+    list(view.iter_range(middle, middle + 60))
+    report("seek", started)
+
+    started = time.perf_counter()
+    found = view.find(MARKER.hex(" "))
+    report("search", started)
+    assert found is not None and found[0] == view.row_of_offset(view.size - 4096)
+    view.close()
+
+
+if __name__ == "__main__":
+    main()
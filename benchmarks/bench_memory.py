@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# bench_memory.py
+"""Resident memory of a loaded document per buffer backend (tracemalloc).
+
+Loads a generated log file the way the editor's background loader does –
+``BackgroundLoad`` batches appended to the buffer – and reports, per backend
+("list" is the former ``list[str]`` storage):
+
+    • current – bytes still allocated once the document is loaded;
+    • peak    – the high-water mark while loading;
+    • load s  – wall time of an untraced load;
+    • read µs – mean cost of reading one random line (decode for "compact").
+
+Each backend runs in its own process, so one measurement cannot inflate the
+next.
+
+Usage:
+    python benchmarks/bench_memory.py --size 1024 --workdir /tmp/sway-bench
+"""
+
+import argparse
+import gc
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+from bench_open import make_file  # noqa: E402
+from file_loader import BackgroundLoad  # noqa: E402
+from text_buffer import BUFFER_BACKENDS, create_buffer  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def load(path: str, backend: str):
+    buffer = create_buffer([], backend)
+    job = BackgroundLoad(lambda: open(path, "rb"), total_bytes=os.path.getsize(path)).start()
+    finished = False
+    while not finished:
+        lines, finished = job.drain()
+        buffer.extend(lines)
+        time.sleep(0.001)
+    return buffer
+
+
+def measure(path: str, backend: str) -> str:
+    # Timed without tracing: tracemalloc slows every allocation down.
+    start = time.perf_counter()
+    load(path, backend)
+    load_s = time.perf_counter() - start
+    gc.collect()
+
+    tracemalloc.start()
+    buffer = load(path, backend)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines = len(buffer)
+    rows = [random.randrange(lines) for _ in range(100_000)]
+    start = time.perf_counter()
+    for row in rows:
+        buffer[row]
+    read_us = (time.perf_counter() - start) / len(rows) * 1e6
+    return f"{backend} {lines} {current} {peak} {load_s:.2f} {read_us:.2f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100, help="file size in MB")
+    parser.add_argument("--backends", nargs="+", default=["compact", "piece_table", "list"],
+                        choices=list(BUFFER_BACKENDS))
+    parser.add_argument("--workdir", default="/tmp/sway-bench")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)  # child process: "path:backend"
+    args = parser.parse_args()
+
+    if args.measure:
+        path, backend = args.measure.rsplit(":", 1)
+        print(measure(path, backend))
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = make_file(args.workdir, "utf-8", args.size)
+    print(f"{os.path.basename(path)}: {os.path.getsize(path) / MB:.0f} MB")
+    print(f"{'backend':<13}{'lines':>10}{'current MB':>12}{'peak MB':>10}{'x file':>8}{'load s':>8}{'read µs':>9}")
+    for backend in args.backends:
+        out = subprocess.run([sys.executable, __file__, "--measure", f"{path}:{backend}"],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{backend:<13}failed: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        name, lines, current, peak, load_s, read_us = out.stdout.split()
+        ratio = int(current) / os.path.getsize(path)
+        print(f"{name:<13}{int(lines):>10}{int(current) / MB:>12.0f}{int(peak) / MB:>10.0f}"
+              f"{ratio:>7.2f}x{float(load_s):>8.2f}{float(read_us):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
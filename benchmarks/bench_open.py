@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# bench_open.py
+"""Open-time benchmark: single-pass streaming loader vs. the old sample + re-read loop.
+
+Generates test files of the requested sizes in UTF-8, latin-1 and cp1251
+(cached in --workdir) and times:
+
+    • legacy  – 20 KB chardet sample, then ``f.read().splitlines()`` per
+                candidate encoding until one decodes (the former open_file);
+    • stream  – ``file_loader.load_text_file`` (one pass, fast UTF-8 path).
+
+Usage:
+    python benchmarks/bench_open.py --sizes 10 100 1024 --workdir /tmp/sway-bench
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+import chardet  # noqa: E402
+
+from file_loader import load_text_file  # noqa: E402
+
+SAMPLE_LINES = {
+    "utf-8": "2024-05-01 12:00:{n:02d} INFO request id={n} path=/api/v1/items user=jürgen status=200\n",
+    "latin-1": "2024-05-01 12:00:{n:02d} INFO requête id={n} chemin=/api/v1/élément client=françois\n",
+    "cp1251": "2024-05-01 12:00:{n:02d} INFO запрос id={n} путь=/api/v1/items пользователь=иван\n",
+}
+
+
+def make_file(workdir: str, encoding: str, size_mb: int) -> str:
+    path = os.path.join(workdir, f"open_{encoding}_{size_mb}mb.txt")
+    target = size_mb * 1024 * 1024
+    if os.path.exists(path) and os.path.getsize(path) >= target:
+        return path
+    block = "".join(SAMPLE_LINES[encoding].format(n=i % 60) for i in range(1000)).encode(encoding)
+    # Keep the first 64 KB pure ASCII, as in real logs/sources with a licence header.
+    header = (b"# " + b"x" * 76 + b"\n") * (64 * 1024 // 80)
+    with open(path, "wb") as f:
+        f.write(header)
+        written = len(header)
+        while written < target:
+            f.write(block)
+            written += len(block)
+    return path
+
+
+def legacy_open(path: str):
+    """The pre-streaming open_file algorithm (sample + re-read per candidate)."""
+    with open(path, "rb") as f:
+        sample = f.read(20 * 1024)
+    guess = chardet.detect(sample)
+    encoding, confidence = guess.get("encoding"), guess.get("confidence", 0.0)
+    candidates = []
+    if encoding and confidence >= 0.75:
+        candidates.append((encoding, "strict"))
+    elif encoding:
+        candidates.append((encoding, "replace"))
+    candidates += [("utf-8", "strict"), ("latin-1", "strict")]
+    for enc, errors in candidates:
+        try:
+            with open(path, "r", encoding=enc, errors=errors) as f:
+                return f.read().splitlines(), enc
+        except (UnicodeDecodeError, LookupError):
+            continue
+    raise RuntimeError("undecodable")
+
+
+def stream_open(path: str):
+    result = load_text_file(path)
+    return result.lines, result.encoding
+
+
+def timed(fn, path: str, repeat: int):
+    best = float("inf")
+    info = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        lines, encoding = fn(path)
+        best = min(best, time.perf_counter() - start)
+        info = (len(lines), encoding)
+        del lines
+    return best, info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="file sizes in MB")
+    parser.add_argument("--encodings", nargs="+", default=list(SAMPLE_LINES), choices=list(SAMPLE_LINES))
+    parser.add_argument("--workdir", default="/tmp/sway-bench")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the streaming loader")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    print(f"{'file':<24}{'legacy s':>10}{'stream s':>10}{'speedup':>9}  encoding (legacy / stream)")
+    for size in args.sizes:
+        for encoding in args.encodings:
+            path = make_file(args.workdir, encoding, size)
+            t_stream, (n_stream, enc_stream) = timed(stream_open, path, args.repeat)
+            if args.skip_legacy:
+                print(f"{os.path.basename(path):<24}{'-':>10}{t_stream:>10.2f}{'-':>9}  - / {enc_stream}")
+                continue
+            t_legacy, (n_legacy, enc_legacy) = timed(legacy_open, path, args.repeat)
+            if n_legacy != n_stream:
+                print(f"  ! line count differs: legacy {n_legacy}, stream {n_stream}")
+            print(f"{os.path.basename(path):<24}{t_legacy:>10.2f}{t_stream:>10.2f}"
+                  f"{t_legacy / t_stream:>8.1f}x  {enc_legacy} / {enc_stream}")
+
+
+if __name__ == "__main__":
+    main()
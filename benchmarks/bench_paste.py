@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# bench_paste.py
+"""Pasting a large block near the top of a large buffer.
+
+Replays what ``insert_text_at_position`` does to the buffer for a paste of
+``--paste`` lines at row 1 of a ``--lines`` document, with the editor's edit
+event bus attached (one synchronous and one batched subscriber, like the
+search highlights and the journal):
+
+    • loop   – the former way: rewrite the cursor line, then one
+               ``text.insert(row + offset, line)`` per pasted line;
+    • splice – one slice assignment over the cursor line (``_splice_text``).
+
+Reported per backend: paste and undo (removing the block again) in ms, and
+the number of edit events the paste published.
+
+Usage:
+    python benchmarks/bench_paste.py --lines 200000 --paste 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+from edit_events import EditEventBus  # noqa: E402
+from text_buffer import BUFFER_BACKENDS, create_buffer  # noqa: E402
+
+LINE = "    def method_{n}(self, value: int) -> int:  # generated line"
+
+
+def paste_loop(text, row: int, col: int, lines) -> None:
+    prefix, suffix = text[row][:col], text[row][col:]
+    text[row] = prefix + lines[0]
+    for offset, line in enumerate(lines[1:-1], start=1):
+        text.insert(row + offset, line)
+    text.insert(row + len(lines) - 1, lines[-1] + suffix)
+
+
+def paste_splice(text, row: int, col: int, lines) -> None:
+    new_lines = list(lines)
+    new_lines[0] = text[row][:col] + new_lines[0]
+    new_lines[-1] += text[row][col:]
+    text[row:row + 1] = new_lines
+
+
+def run(backend: str, n_lines: int, n_paste: int, mode: str):
+    text = create_buffer([LINE.format(n=i) for i in range(n_lines)], backend)
+    bus = EditEventBus()
+    events = []
+    bus.subscribe(lambda event: events.append(event.version))
+    bus.subscribe(lambda batch: None, batched=True)
+    bus.attach(text)
+    lines = [f"pasted {i}" for i in range(n_paste)] + [""]  # the clipboard ends with a newline
+    paste = paste_loop if mode == "loop" else paste_splice
+
+    start = time.perf_counter()
+    paste(text, 1, 0, lines)
+    bus.flush()
+    paste_ms = (time.perf_counter() - start) * 1e3
+    published = len(events)
+
+    # Undo of the paste: rejoin the first line with the tail, one splice in both modes.
+    start = time.perf_counter()
+    last = len(lines)  # row 1 + len(lines) - 1
+    text[1:last + 1] = [text[last][len(lines[-1]):]]  # pasted at col 0: nothing before it
+    bus.flush()
+    undo_ms = (time.perf_counter() - start) * 1e3
+
+    assert len(text) == n_lines and text[1] == LINE.format(n=1)
+    return paste_ms, undo_ms, published
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--paste", type=int, default=50_000, help="lines in the pasted block")
+    parser.add_argument("--backends", nargs="+", default=["piece_table", "compact", "list"],
+                        choices=list(BUFFER_BACKENDS))
+    args = parser.parse_args()
+
+    print(f"paste of {args.paste} lines at row 1 of {args.lines} lines")
+    print(f"{'backend':<13}{'mode':<8}{'paste ms':>11}{'undo ms':>10}{'events':>9}")
+    for backend in args.backends:
+        for mode in ("loop", "splice"):
+            paste_ms, undo_ms, published = run(backend, args.lines, args.paste, mode)
+            print(f"{backend:<13}{mode:<8}{paste_ms:>11.1f}{undo_ms:>10.1f}{published:>9}")
+
+
+if __name__ == "__main__":
+    main()
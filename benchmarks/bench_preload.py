@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# bench_preload.py
+"""Opening many files at once: one after another vs. the preload thread pool.
+
+Generates a Helm-chart-like directory of YAML templates plus one larger
+values file (cached in --workdir) and times reading, decoding and
+language-detecting all of them:
+
+    • serial – ``file_preload.preload_file`` for each file in turn (what
+               opening them one by one costs);
+    • pool   – ``FilePreloader`` with --workers threads, until every file
+               has been polled (what ``sway-pad chart/**/*.yaml`` waits for).
+
+"largest" is the serial time of the largest file alone – the lower bound
+the pool should approach.  Decoding holds the GIL, so the gain comes from
+overlapping file I/O, decompression and the Pygments content guess; run with
+--drop-caches (root) for cold-cache numbers.
+
+Usage:
+    python benchmarks/bench_preload.py --files 200 --largest-mb 8 --workdir /tmp/sway-bench
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad"))
+
+from file_preload import FilePreloader, preload_file  # noqa: E402
+
+TEMPLATE = """apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: {{{{ include "chart.fullname" . }}}}-{n}
+  labels:
+    app: service-{n}
+spec:
+  replicas: {{{{ .Values.replicaCount }}}}
+  template:
+    spec:
+      containers:
+        - name: app-{n}
+          image: "{{{{ .Values.image.repository }}}}:{{{{ .Values.image.tag }}}}"
+          ports:
+            - containerPort: 80{n:02d}
+"""
+
+
+def make_chart(workdir: str, files: int, largest_mb: int) -> list:
+    chart = os.path.join(workdir, f"chart_{files}_{largest_mb}mb")
+    os.makedirs(os.path.join(chart, "templates"), exist_ok=True)
+    paths = []
+    for n in range(files):
+        path = os.path.join(chart, "templates", f"deployment-{n:03d}.yaml")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TEMPLATE.format(n=n % 100) * 20)
+        paths.append(path)
+    values = os.path.join(chart, "values.yaml")
+    if not os.path.exists(values) or os.path.getsize(values) < largest_mb * 1024 * 1024:
+        with open(values, "w", encoding="utf-8") as f:
+            block = "".join(f"service{i}:\n  enabled: true\n  port: {8000 + i % 1000}\n" for i in range(2000))
+            while f.tell() < largest_mb * 1024 * 1024:
+                f.write(block)
+    return [values] + paths
+
+
+def drop_caches() -> None:
+    subprocess.run(["sync"], check=False)
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def serial(paths: list) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        assert preload_file(path).error is None
+    return time.perf_counter() - start
+
+
+def pool(paths: list, workers: int) -> float:
+    start = time.perf_counter()
+    preloader = FilePreloader(max_workers=workers)
+    for path in paths:
+        preloader.submit(path)
+    while preloader.pending:
+        for result in preloader.poll():
+            assert result.error is None
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    preloader.shutdown()
+    return elapsed
+
+
+def best_of(fn, repeat: int, cold: bool) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        if cold:
+            drop_caches()
+        best = min(best, fn())
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200, help="number of small templates")
+    parser.add_argument("--largest-mb", type=int, default=8, help="size of the one large file in MB")
+    parser.add_argument("--workers", type=int, default=0, help="pool size (0 = ThreadPoolExecutor default)")
+    parser.add_argument("--workdir", default="/tmp/sway-bench")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--drop-caches", action="store_true", help="drop the page cache before each run (root)")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    paths = make_chart(args.workdir, args.files, args.largest_mb)
+    total_mb = sum(os.path.getsize(p) for p in paths) / (1024 * 1024)
+    t_largest = best_of(lambda: serial(paths[:1]), args.repeat, args.drop_caches)
+    t_serial = best_of(lambda: serial(paths), args.repeat, args.drop_caches)
+    t_pool = best_of(lambda: pool(paths, args.workers), args.repeat, args.drop_caches)
+    print(f"{len(paths)} files, {total_mb:.1f} MB ({'cold' if args.drop_caches else 'warm'} cache)")
+    print(f"{'largest s':>10}{'serial s':>10}{'pool s':>10}{'speedup':>9}")
+    print(f"{t_largest:>10.3f}{t_serial:>10.3f}{t_pool:>10.3f}{t_serial / t_pool:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# bench_session.py
+"""Cold vs. warm start: opening files with and without the remembered session state.
+
+Generates files whose detection is expensive (cached in --workdir): legacy
+cp1251 text (the UTF-8 fast path fails, the charset detector runs), scripts
+without a file name extension (``guess_lexer`` runs every Pygments analyser)
+and ordinary YAML.  Each variant runs in a fresh interpreter, as a launch
+would, and times reading, decoding and language detection up to the point
+the editor can paint:
+
+    • cold – nothing remembered: ``read_stream`` detects the encoding,
+             ``detect_lexer`` the language;
+    • warm – ``session_state`` remembers both for the unchanged files:
+             ``read_stream(encoding=...)`` and ``get_lexer_by_name``.
+
+"first" is the time until the first file is ready (what the first paint
+waits for), "all" until every file is.  The editor logs its own time to
+first paint ("First paint ... ms after start") in editor.log.
+
+Usage:
+    python benchmarks/bench_session.py --files 30 --workdir /tmp/sway-bench
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SWAY_PAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad")
+sys.path.insert(0, SWAY_PAD)
+
+
+def make_files(workdir: str, files: int) -> list:
+    directory = os.path.join(workdir, f"session_{files}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for n in range(files):
+        kind = n % 3
+        path = os.path.join(directory, ("legacy-{:03d}.txt", "tool-{:03d}", "values-{:03d}.yaml")[kind].format(n))
+        if not os.path.exists(path):
+            if kind == 0:
+                data = ("Отчёт о работе сервиса: всё в порядке, ошибок нет.\n" * 4000).encode("cp1251")
+            elif kind == 1:
+                data = ("#!/usr/bin/env python3\nimport sys\n\n"
+                        + "".join(f"def step_{i}(argv):\n    return len(argv) + {i}\n\n" for i in range(2000))).encode()
+            else:
+                data = "".join(f"service{i}:\n  enabled: true\n  port: {8000 + i}\n" for i in range(2000)).encode()
+            with open(path, "wb") as f:
+                f.write(data)
+        paths.append(path)
+    return paths
+
+
+def child(mode: str, paths: list, session_file: str) -> None:
+    """One launch: prints the seconds until the first and until all files are ready."""
+    start = time.perf_counter()
+    from file_loader import read_stream
+    from file_preload import detect_lexer
+    from pygments.lexers import get_lexer_by_name
+    from session_state import load_session
+
+    session = load_session(session_file) if mode == "warm" else None
+    first = None
+    for path in paths:
+        remembered = session.lookup(path) if session else None
+        encoding = lexer = None
+        if remembered is not None and remembered.unchanged():
+            encoding = remembered.encoding
+            lexer = get_lexer_by_name(remembered.lexer, stripall=True)
+        with open(path, "rb") as f:
+            decoded = read_stream(f, encoding=encoding)
+        lexer = lexer or detect_lexer(path, decoded.lines)
+        if first is None:
+            first = time.perf_counter() - start
+    print(json.dumps({"first": first, "all": time.perf_counter() - start}))
+
+
+def write_session(paths: list, session_file: str) -> None:
+    from file_loader import read_stream
+    from file_preload import detect_lexer
+    from file_watcher import fingerprint
+    from session_state import FileState, Session, save_session
+
+    states = []
+    for path in paths:
+        with open(path, "rb") as f:
+            decoded = read_stream(f)
+        lexer = detect_lexer(path, decoded.lines)
+        states.append(FileState(os.path.realpath(path), encoding=decoded.encoding, lexer=lexer.aliases[0],
+                                disk=fingerprint(path)))
+    save_session(Session(files=states), session_file)
+
+
+def run(mode: str, paths: list, session_file: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, "--session-file", session_file] + paths,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--workdir", default="/tmp/sway-bench")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    parser.add_argument("--session-file", help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.paths, args.session_file)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    paths = make_files(args.workdir, args.files)
+    session_file = os.path.join(args.workdir, "session.json")
+    write_session(paths, session_file)
+    print(f"{len(paths)} files, {sum(os.path.getsize(p) for p in paths) / (1024 * 1024):.1f} MB, "
+          f"median of {args.repeat} launches")
+    print(f"{'':>6}{'first ms':>10}{'all ms':>10}")
+    for mode in ("cold", "warm"):
+        runs = [run(mode, paths, session_file) for _ in range(args.repeat)]
+        first = statistics.median(r["first"] for r in runs) * 1000
+        total = statistics.median(r["all"] for r in runs) * 1000
+        print(f"{mode:>6}{first:>10.1f}{total:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# bench_tokenize.py
+"""Lines tokenized per second: colouring tokens by a per-line map vs. the resolved table.
+
+Before, every highlighted line rebuilt the ~60-entry ``token_color_map``
+(calling ``curses.color_pair`` for each entry) and walked the ``parent``
+chain of each token to find its colour.  ``TokenColorTable`` resolves every
+token type the lexer can emit once per lexer and theme; a token is then a
+single dict lookup.
+
+Two corpora: Python (sway.py itself, or --python) and generated Helm-style
+YAML.  For each, "colour" times colouring already lexed tokens only, "lex +
+colour" the whole of highlighting a line (``lexer.get_tokens`` and
+colouring), in lines per second.  ``curses.color_pair`` is replaced by a
+plain function so no terminal is needed; both variants produce identical
+segments (checked).
+
+Usage:
+    python benchmarks/bench_tokenize.py --lines 5000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+SWAY_PAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sway_pad")
+sys.path.insert(0, SWAY_PAD)
+
+from pygments.lexers import PythonLexer, YamlLexer  # noqa: E402
+
+from token_colors import TokenColorTable, lexer_token_types, token_color_map  # noqa: E402
+
+COLORS = {"default": 0, "keyword": 2, "string": 3, "comment": 1, "number": 4, "function": 3}
+
+
+def color_pair(n: int) -> int:
+    return n << 8
+
+
+def yaml_corpus(lines: int) -> list:
+    out = []
+    n = 0
+    while len(out) < lines:
+        out += [f"# release {n}", f"service{n}:", "  image:", f"    repository: registry.local/app-{n}",
+                f"    tag: \"1.{n}.0\"", f"  replicas: {n % 5 + 1}", "  resources:",
+                f"    limits: {{cpu: {n % 4 + 1}00m, memory: {n % 8 + 1}Gi}}",
+                "  env:", f"    - name: MODE_{n}", "      value: 'production'  # default",
+                f"  enabled: {'true' if n % 2 else 'false'}"]
+        n += 1
+    return out[:lines]
+
+
+def legacy_colorize(raw_tokens):
+    """The old `_colorize_tokens`: the map rebuilt per line, a parent walk per token."""
+    color_map = token_color_map(COLORS, color_pair)
+    default_color = COLORS.get("default", 0)
+    segments = []
+    for token_type, text_value in raw_tokens:
+        color_attr = default_color
+        current_type = token_type
+        while current_type:
+            if current_type in color_map:
+                color_attr = color_map[current_type]
+                break
+            current_type = current_type.parent
+        segments.append((text_value, color_attr or default_color))
+    return segments
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(name: str, lexer, lines: list, repeat: int) -> None:
+    raw = [list(lexer.get_tokens(line)) for line in lines]
+    table = TokenColorTable(token_color_map(COLORS, color_pair), COLORS["default"], lexer_token_types(lexer))
+    assert [legacy_colorize(r) for r in raw] == [table.colorize(r) for r in raw]
+    rows = [
+        ("colour", lambda: [legacy_colorize(r) for r in raw], lambda: [table.colorize(r) for r in raw]),
+        ("lex + colour", lambda: [legacy_colorize(lexer.get_tokens(line)) for line in lines],
+         lambda: [table.colorize(list(lexer.get_tokens(line))) for line in lines]),
+    ]
+    for label, before, after in rows:
+        t_before, t_after = best_of(repeat, before), best_of(repeat, after)
+        print(f"{name:<7}{label:<14}{len(lines) / t_before:>12,.0f}{len(lines) / t_after:>12,.0f}"
+              f"{t_before / t_after:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000, help="lines per corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant (best is reported)")
+    parser.add_argument("--python", default=os.path.join(SWAY_PAD, "sway.py"), help="Python corpus")
+    args = parser.parse_args()
+
+    with open(args.python, encoding="utf-8") as f:
+        python_lines = f.read().splitlines()[:args.lines]
+    print(f"{'':<21}{'before':>12}{'after':>12}  (lines/s)")
+    run("python", PythonLexer(), python_lines, args.repeat)
+    run("yaml", YamlLexer(), yaml_corpus(args.lines), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
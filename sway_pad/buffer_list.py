@@ -0,0 +1,207 @@
+# buffer_list.py
+"""buffer_list.py – several open documents, one of them shown by the editor.
+
+The editor keeps the document it shows in its own attributes (``text``,
+``cursor_y``, ``history`` …); every edit path uses them directly.  A
+``BufferState`` holds the same attributes for a document that is not shown.
+Switching buffers copies the active document out into its state and the
+target's state in, so nothing is re-read, re-decoded or re-highlighted: each
+buffer keeps its text, caret and scroll position, undo history, lexer, its
+per-line lexer states (see incremental_lexer.py) and highlighted lines
+(token_cache.py), crash-recovery journal and search results.
+
+``BufferList`` is the ordered list of states plus the index of the one the
+editor shows.  Under a memory cap (``trim``), the least recently used
+inactive buffers that are unmodified copies of a file release their text; it
+is read again when they are shown.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from typing import Any, Iterator, List, Optional
+
+from file_watcher import Fingerprint, fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Editor attributes that belong to a document rather than to the editor.
+BUFFER_FIELDS = (
+    "text", "filename", "modified", "encoding", "compression", "large_file",
+    "cursor_x", "cursor_y", "scroll_top", "scroll_left", "history",
+    "_lexer", "_highlighter", "_token_cache", "current_language",
+    "custom_syntax_patterns", "_custom_rules",
+    "_saved_state", "_journal", "_disk_state", "_disk_base",
+    "selection_start", "selection_end", "is_selecting",
+    "search_term", "search_matches", "current_match_idx", "highlighted_matches",
+)
+
+# Lines measured by estimate_text_bytes() to extrapolate the size of a document.
+_SAMPLE_LINES = 512
+
+
+def estimate_text_bytes(text: Any) -> int:
+    """
+    Approximate heap size of a document, from a sample of its lines.
+
+    Read-only file views are mapped, not copied, and count as 0; a compact
+    buffer reports its byte store exactly.
+    """
+    if text is None or getattr(text, "read_only", False):
+        return 0
+    count = len(text)
+    if not count:
+        return 0
+    if hasattr(text, "memory_bytes") and text.memory_bytes():
+        return text.memory_bytes()
+    step = max(1, count // _SAMPLE_LINES)
+    sample = [sys.getsizeof(text[i]) for i in range(0, count, step)]
+    return (sum(sample) // len(sample) + 8) * count  # + one pointer per line
+
+
+class BufferState:
+    """The document attributes (``BUFFER_FIELDS``) of one buffer, while it is not shown."""
+
+    __slots__ = BUFFER_FIELDS + ("last_used", "unloaded_from")
+
+    def __init__(self, **fields: Any):
+        for name in BUFFER_FIELDS:
+            setattr(self, name, fields.get(name))
+        self.last_used = 0
+        # fingerprint() of the file when the text was released by unload(); None
+        # while ``text`` is None for a file that has not been read yet (a preload placeholder).
+        self.unloaded_from: Optional[Fingerprint] = None
+
+    def capture(self, source: Any) -> None:
+        """Copies the document attributes of ``source`` (the editor) into this state."""
+        for name in BUFFER_FIELDS:
+            setattr(self, name, getattr(source, name))
+
+    def apply_to(self, target: Any) -> None:
+        """Copies this state into ``target``, except ``text`` (the editor adopts it itself)."""
+        for name in BUFFER_FIELDS:
+            if name != "text":
+                setattr(target, name, getattr(self, name))
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.filename) if self.filename else "[No Name]"
+
+    @property
+    def unloaded(self) -> bool:
+        return self.text is None
+
+    def can_unload(self) -> bool:
+        """Only an unmodified, editable copy of a file can be read back from disk."""
+        return (self.text is not None and not self.modified and bool(self.filename)
+                and not self.text.read_only)
+
+    def unload(self) -> bool:
+        """Releases the text (and the journal, which has nothing to recover). Returns False if not allowed."""
+        if not self.can_unload():
+            return False
+        stamp = fingerprint(self.filename)
+        if stamp is None:
+            return False
+        if self._journal is not None:
+            self._journal.close(discard=True)
+            self._journal = None
+        self.text.close()
+        self.text = None
+        self._highlighter = self._token_cache = None  # lexer states and highlighted lines of the released text
+        self.unloaded_from = stamp
+        self.search_matches, self.highlighted_matches, self.current_match_idx = [], [], -1
+        logger.info("Released the text of inactive buffer '%s'.", self.filename)
+        return True
+
+    def changed_on_disk(self) -> bool:
+        """For an unloaded buffer: True if its file is no longer the one that was released."""
+        return fingerprint(self.filename) != self.unloaded_from
+
+
+class BufferList:
+    """Ordered buffers; ``active`` is the index of the one the editor shows."""
+
+    def __init__(self):
+        self._states: List[BufferState] = [BufferState()]
+        self.active = 0
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __getitem__(self, index: int) -> BufferState:
+        return self._states[index]
+
+    def __iter__(self) -> Iterator[BufferState]:
+        return iter(self._states)
+
+    @property
+    def active_state(self) -> BufferState:
+        return self._states[self.active]
+
+    def find(self, path: str) -> Optional[int]:
+        """Index of the buffer showing ``path`` (compared by real path), or None."""
+        target = os.path.realpath(path)
+        for index, state in enumerate(self._states):
+            if state.filename and os.path.realpath(state.filename) == target:
+                return index
+        return None
+
+    def index_of_text(self, text: Any) -> Optional[int]:
+        """Index of the buffer whose document is the object ``text``, or None."""
+        for index, state in enumerate(self._states):
+            if state.text is text:
+                return index
+        return None
+
+    def index_of(self, state: BufferState) -> Optional[int]:
+        """Index of ``state`` in the list, or None once its buffer was closed."""
+        for index, candidate in enumerate(self._states):
+            if candidate is state:
+                return index
+        return None
+
+    def add(self, state: BufferState) -> int:
+        """Inserts ``state`` after the active buffer and returns its index (it is not activated)."""
+        self._states.insert(self.active + 1, state)
+        return self.active + 1
+
+    def remove(self, index: int) -> BufferState:
+        """
+        Drops a buffer (never the last one). If it was the active one, the buffer
+        before it becomes active; otherwise ``active`` keeps pointing at the same buffer.
+        """
+        if len(self._states) == 1:
+            raise ValueError("cannot remove the last buffer")
+        state = self._states.pop(index)
+        if index < self.active or (index == self.active and self.active > 0):
+            self.active -= 1
+        return state
+
+    def touch(self, index: int) -> None:
+        """Marks a buffer as used now (for the LRU order of ``trim``)."""
+        self._clock += 1
+        self._states[index].last_used = self._clock
+
+    def trim(self, cap_bytes: int) -> List[BufferState]:
+        """
+        Unloads the least recently used inactive buffers until the inactive ones
+        fit in ``cap_bytes`` (0 = no cap). Returns the states that were unloaded.
+        """
+        if cap_bytes <= 0:
+            return []
+        inactive = [s for i, s in enumerate(self._states) if i != self.active and not s.unloaded]
+        sizes = {id(s): estimate_text_bytes(s.text) for s in inactive}
+        total = sum(sizes.values())
+        unloaded = []
+        for state in sorted(inactive, key=lambda s: s.last_used):
+            if total <= cap_bytes:
+                break
+            size = sizes[id(state)]
+            if state.unload():
+                total -= size
+                unloaded.append(state)
+        return unloaded
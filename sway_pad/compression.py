@@ -0,0 +1,104 @@
+# compression.py
+"""compression.py – transparent gzip / bzip2 / xz files (standard library only).
+
+Rotated logs and dumps are usually compressed.  This module lets the editor
+open and save them like plain text files:
+
+    • ``detect_compression`` recognises a codec by the magic bytes at the
+      start of the file (not by its name, so ``syslog.1`` works too);
+    • ``open_decompressed`` returns a binary stream that inflates the file
+      chunk by chunk as it is read – it feeds the normal streaming decode
+      path (``file_loader``), and neither the compressed nor the decompressed
+      file is ever held in memory as a whole;
+    • ``compressing_writer`` wraps the temporary file of an atomic save so
+      the document is written back with the codec it was read with.
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import logging
+import lzma
+import os
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+GZIP, BZ2, XZ = "gzip", "bz2", "xz"
+CODECS = (GZIP, BZ2, XZ)
+
+# Longest magic sequence below.
+_MAGIC_BYTES = 6
+
+# File name suffix per codec: used for Save As and to find the lexer of "config.yaml.gz".
+_SUFFIXES = {".gz": GZIP, ".bz2": BZ2, ".xz": XZ}
+
+# gzip's own default; compresslevel 9 (the module default) is several times slower.
+GZIP_LEVEL = 6
+
+
+def _codec_for_magic(head: bytes) -> Optional[str]:
+    if head[:3] == b"\x1f\x8b\x08":  # gzip, deflate method
+        return GZIP
+    if head[:3] == b"BZh" and head[3:4].isdigit() and head[3:4] != b"0":  # bzip2, block size 1-9
+        return BZ2
+    if head[:6] == b"\xfd7zXZ\x00":
+        return XZ
+    return None
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Returns the codec ("gzip", "bz2", "xz") ``path`` is compressed with, or None."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_MAGIC_BYTES)
+    except OSError as e:
+        logger.debug("Cannot sniff compression of '%s': %s", path, e)
+        return None
+    return _codec_for_magic(head)
+
+
+def compression_for_name(path: str) -> Optional[str]:
+    """Codec implied by the file name suffix (".gz", ".bz2", ".xz"), or None."""
+    return _SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def strip_compression_suffix(path: str) -> str:
+    """Drops a compression suffix ("app.yaml.gz" -> "app.yaml"); other names are returned unchanged."""
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in _SUFFIXES else path
+
+
+def open_decompressed(path: str, codec: str) -> BinaryIO:
+    """
+    Opens ``path`` for streaming decompression.
+
+    ``read(n)`` returns up to ``n`` decompressed bytes; the codec keeps only
+    its window and one input block in memory.  Concatenated gzip members and
+    xz streams are read as one document.
+    """
+    if codec == GZIP:
+        return gzip.open(path, "rb")
+    if codec == BZ2:
+        return bz2.open(path, "rb")
+    if codec == XZ:
+        return lzma.open(path, "rb", format=lzma.FORMAT_XZ)
+    raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+def compressing_writer(fileobj: BinaryIO, codec: str, name: str = "") -> BinaryIO:
+    """
+    Wraps the open binary file ``fileobj`` so that everything written is compressed.
+
+    Closing the wrapper writes the codec trailer but leaves ``fileobj`` open
+    (the caller still flushes, fsyncs and closes it).  ``name`` is stored in
+    the gzip header, as ``gzip`` does.
+    """
+    if codec == GZIP:
+        return gzip.GzipFile(filename=name, mode="wb", compresslevel=GZIP_LEVEL, fileobj=fileobj)
+    if codec == BZ2:
+        return bz2.BZ2File(fileobj, "wb")
+    if codec == XZ:
+        return lzma.LZMAFile(fileobj, "wb", format=lzma.FORMAT_XZ)
+    raise ValueError(f"Unknown compression codec: {codec!r}")
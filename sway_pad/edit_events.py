@@ -0,0 +1,135 @@
+# edit_events.py
+"""edit_events.py – structured change notifications for the editor document.
+
+Every mutation of the document – typing, deletes, paste, undo/redo, search &
+replace, comment toggling, a background load appending lines, a reload that
+replaces the whole buffer – ends up as one ``splice`` on the ``TextBuffer``.
+``EditEventBus`` listens to the buffer and turns each splice into an
+``EditEvent``:
+
+    start    – (row, col) where the replaced text begins;
+    old_end  – (row, col) where it ended, in pre-edit coordinates;
+    new_end  – (row, col) where the inserted text ends, in post-edit coordinates;
+    inserted_text – the text that now lies between ``start`` and ``new_end``.
+
+Positions use the line-terminated model of a splice: every line is followed
+by a newline, ``(row, 0)`` is the beginning of ``row`` and ``(line_count, 0)``
+the end of the document.  Events are therefore line-granular – a keystroke
+is reported as "line ``row`` was rewritten" – which is what line-based
+caches (tokens, search highlights, journals) need.
+
+Subscribers are called either synchronously, right after the change and
+before the next edit, or batched: ``flush()`` – called once per frame from the
+editor's main loop – hands them every event since the previous frame.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Position = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class EditEvent:
+    """One change of the document (see module docstring for the coordinates)."""
+
+    start: Position
+    old_end: Position
+    new_end: Position
+    lines: Sequence[str]  # the inserted lines (``inserted_text`` without the newlines)
+    version: int          # buffer version after the change
+
+    @classmethod
+    def from_splice(cls, start: int, end: int, lines: Sequence[str], version: int) -> "EditEvent":
+        """Event for "lines ``[start, end)`` were replaced by ``lines``"."""
+        return cls((start, 0), (end, 0), (start + len(lines), 0), lines, version)
+
+    @property
+    def inserted_text(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+    @property
+    def line_delta(self) -> int:
+        """Change of the line count caused by this event."""
+        return self.new_end[0] - self.old_end[0]
+
+
+EditCallback = Callable[[EditEvent], None]
+BatchCallback = Callable[[List[EditEvent]], None]
+
+
+class EditEventBus:
+    """Publishes the changes of the attached buffer to its subscribers."""
+
+    def __init__(self):
+        self._buffer = None
+        self._sync: Tuple[EditCallback, ...] = ()
+        self._batched: Tuple[BatchCallback, ...] = ()
+        self._pending: List[EditEvent] = []
+
+    # ───────────────────── Subscriptions ─────────────────────
+    def subscribe(self, callback: Callable, batched: bool = False) -> None:
+        """
+        Registers ``callback``.
+
+        Synchronous subscribers get each ``EditEvent`` as it happens; batched
+        ones get the list of events since the last frame from ``flush()``.
+        """
+        if batched:
+            self._batched = self._batched + (callback,)
+        else:
+            self._sync = self._sync + (callback,)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        self._sync = tuple(cb for cb in self._sync if cb != callback)
+        self._batched = tuple(cb for cb in self._batched if cb != callback)
+
+    # ───────────────────── Buffer ─────────────────────
+    def attach(self, buffer, replaced: Optional[Sequence[str]] = None) -> None:
+        """
+        Follows ``buffer`` from now on.
+
+        If it replaces the document ``replaced``, a single event describing
+        the replacement of every line is published; its ``lines`` are an O(1)
+        snapshot of the new buffer.
+        """
+        self.detach()
+        self._buffer = buffer
+        buffer.add_listener(self._on_splice)
+        if replaced is not None:
+            self.emit(EditEvent.from_splice(0, len(replaced), buffer.snapshot(), buffer.version))
+
+    def detach(self) -> None:
+        if self._buffer is not None:
+            self._buffer.remove_listener(self._on_splice)
+            self._buffer = None
+
+    def _on_splice(self, start: int, end: int, lines: List[str]) -> None:
+        self.emit(EditEvent.from_splice(start, end, lines, self._buffer.version))
+
+    # ───────────────────── Delivery ─────────────────────
+    def emit(self, event: EditEvent) -> None:
+        for callback in self._sync:
+            try:
+                callback(event)
+            except Exception:  # a broken subscriber must not break editing
+                logger.exception("Edit event subscriber %r failed.", callback)
+        if self._batched:
+            self._pending.append(event)
+
+    def flush(self) -> bool:
+        """Delivers the queued events to the batched subscribers. Returns True if there were any."""
+        if not self._pending:
+            return False
+        events, self._pending = self._pending, []
+        for callback in self._batched:
+            try:
+                callback(events)
+            except Exception:
+                logger.exception("Batched edit event subscriber %r failed.", callback)
+        return True
@@ -0,0 +1,375 @@
+# file_loader.py
+"""file_loader.py – single-pass, streaming text file loading.
+
+The editor used to sniff a 20 KB sample with ``chardet`` and then re-read the
+whole file once per candidate encoding until one decoded.  This module reads
+the file exactly once, in chunks:
+
+    1. A byte-order mark, if present, selects the codec outright.
+    2. Otherwise chunks are decoded as strict UTF-8 while they are read
+       (the common case – no detector runs at all).
+    3. On the first invalid UTF-8 sequence, an incremental
+       ``chardet.UniversalDetector`` is fed from the very chunk that failed,
+       and decoding continues with the detected codec.  No earlier chunk has
+       to be read again: everything decoded before the failure was ASCII,
+       which every supported (ASCII-compatible) codec decodes identically.
+
+Lines are split while decoding, with ``str.splitlines()`` semantics.
+``BackgroundLoad`` runs the same pipeline on a worker thread and publishes
+line batches as they are decoded, for progressive, cancellable opening.
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+try:
+    from chardet import UniversalDetector
+except ImportError:  # chardet < 7
+    from chardet.universaldetector import UniversalDetector
+
+logger = logging.getLogger(__name__)
+
+# Bytes read (and decoded) per step.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# First read of a background load – small, so the first screen appears at once.
+FIRST_CHUNK_SIZE = 64 * 1024
+# Upper bound of data handed to the detector after a UTF-8 failure.
+DETECTOR_MAX_BYTES = 64 * 1024
+DETECTOR_FEED_SIZE = 16 * 1024
+# Detector results below this confidence are decoded with errors="replace".
+MIN_DETECTOR_CONFIDENCE = 0.75
+
+# Characters str.splitlines() treats as line boundaries ("\r" is handled separately).
+_LINE_BREAKS = "\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+@dataclass
+class DecodedText:
+    """Result of loading a text file."""
+    lines: List[str]
+    encoding: str
+    errors: str = "strict"
+    bytes_read: int = 0
+    detector_used: bool = False
+    warnings: List[str] = field(default_factory=list)
+
+
+def _is_ascii_compatible(encoding: str) -> bool:
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    return not name.startswith(("utf-16", "utf-32"))
+
+
+class StreamingTextDecoder:
+    """
+    Incrementally decodes a byte stream into lines.
+
+    Feed raw chunks with ``feed`` (each call returns the lines completed by that
+    chunk) and call ``finish`` once at EOF.  ``encoding`` / ``errors`` describe
+    the codec in effect; they may change once, on the first invalid UTF-8 input.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding: Optional[str] = encoding
+        self.errors = "strict"
+        self.detector_used = False
+        self.warnings: List[str] = []
+        self._decoder = None
+        self._seen_non_ascii = False
+        self._carry = ""
+        self._skip_leading_lf = False
+        self._first_chunk = True
+        self._detector: Optional[UniversalDetector] = None
+        self._detector_buf = bytearray()
+        self._detector_fed = 0
+        if encoding:
+            self._decoder = codecs.getincrementaldecoder(encoding)("strict")
+
+    # ───────────────────── Public API ─────────────────────
+    def feed(self, data: bytes) -> List[str]:
+        if not data:
+            return []
+        if self._first_chunk:
+            self._first_chunk = False
+            if self._decoder is None:
+                self._select_initial_codec(data)
+        return self._split(self._decode(data, final=False))
+
+    def finish(self) -> List[str]:
+        if self._decoder is None:  # empty input
+            self.encoding = self.encoding or "utf-8"
+            self._decoder = codecs.getincrementaldecoder(self.encoding)("strict")
+        lines = self._split(self._decode(b"", final=True))
+        if self._carry:
+            lines.append(self._carry)
+            self._carry = ""
+        return lines
+
+    # ───────────────────── Codec selection ─────────────────────
+    def _select_initial_codec(self, data: bytes) -> None:
+        for bom, encoding in _BOMS:
+            if data.startswith(bom):
+                self.encoding = encoding
+                break
+        else:
+            self.encoding = "utf-8"
+        self._decoder = codecs.getincrementaldecoder(self.encoding)("strict")
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        if self._detector is not None:
+            return self._feed_detector(data, final)
+        try:
+            pending = self._decoder.getstate()[0]
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            return self._recover(pending + data, e, final)
+        if not self._seen_non_ascii and not text.isascii():
+            self._seen_non_ascii = True
+        return text
+
+    def _recover(self, data: bytes, error: UnicodeDecodeError, final: bool) -> str:
+        """Handles a decode error on `data` (the whole input of the failed decode call)."""
+        if self.encoding == "utf-8" and not self._seen_non_ascii:
+            # Everything emitted so far was ASCII: start the detector at the failure
+            # (the ASCII prefix carries no signal) and hold input back until it decides.
+            self.detector_used = True
+            self._detector = UniversalDetector()
+            self._detector_buf = bytearray()
+            self._detector_fed = 0
+            return self._feed_detector(data, final, skip=max(0, error.start - 1024))
+
+        # Either the detected codec failed as well, or valid non-ASCII UTF-8 was
+        # already decoded – keep the codec and substitute the bad bytes.
+        message = f"Invalid {self.encoding} byte sequence in input; bytes replaced."
+        self.warnings.append(message)
+        logger.warning(message)
+        return self._switch_codec(self.encoding, "replace", data, final)
+
+    def _feed_detector(self, data: bytes, final: bool, skip: int = 0) -> str:
+        """Buffers input for the detector until it is confident (or has seen enough)."""
+        self._detector_buf += data
+        view = memoryview(data)[skip:]
+        while view and not self._detector.done and self._detector_fed < DETECTOR_MAX_BYTES:
+            self._detector.feed(bytes(view[:DETECTOR_FEED_SIZE]))
+            self._detector_fed += min(len(view), DETECTOR_FEED_SIZE)
+            view = view[DETECTOR_FEED_SIZE:]
+        if not (final or self._detector.done or self._detector_fed >= DETECTOR_MAX_BYTES):
+            return ""
+
+        self._detector.close()
+        result = self._detector.result or {}
+        encoding, confidence = result.get("encoding"), result.get("confidence") or 0.0
+        if encoding and _is_ascii_compatible(encoding):
+            errors = "strict" if confidence >= MIN_DETECTOR_CONFIDENCE else "replace"
+        else:
+            encoding, errors = "latin-1", "strict"
+        logger.info("Input is not UTF-8; detected %s (confidence %.2f), decoding with errors=%s.",
+                    encoding, confidence, errors)
+        buffered = bytes(self._detector_buf)
+        self._detector = None
+        self._detector_buf = bytearray()
+        return self._switch_codec(encoding, errors, buffered, final)
+
+    def _switch_codec(self, encoding: str, errors: str, data: bytes, final: bool) -> str:
+        self.encoding, self.errors = codecs.lookup(encoding).name, errors
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors)
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            return self._recover(data, e, final)
+
+    # ───────────────────── Line splitting ─────────────────────
+    def _split(self, text: str) -> List[str]:
+        if self._skip_leading_lf and text:
+            self._skip_leading_lf = False
+            if text[0] == "\n":
+                text = text[1:]
+        if not text:
+            return []
+        buf = self._carry + text if self._carry else text
+        last = buf[-1]
+        if last == "\r":
+            # "\r" may be the first half of "\r\n" split across chunks: it ends
+            # the line either way, and a "\n" starting the next chunk is dropped.
+            self._skip_leading_lf = True
+        if last == "\r" or last in _LINE_BREAKS:
+            self._carry = ""
+            return buf.splitlines()
+        lines = buf.splitlines()
+        self._carry = lines.pop()
+        return lines
+
+
+def _decode_chunks(stream: BinaryIO, decoder: StreamingTextDecoder, chunk_size: int,
+                   on_batch: Callable[[List[str], int], None],
+                   first_chunk_size: Optional[int] = None,
+                   cancel: Optional[threading.Event] = None) -> int:
+    """Core read/decode loop shared by `read_stream` and `BackgroundLoad`. Returns bytes read."""
+    total = 0
+    size = first_chunk_size or chunk_size
+    while True:
+        if cancel is not None and cancel.is_set():
+            return total  # abandoned: no final flush of a partial last line
+        chunk = stream.read(size)
+        size = chunk_size
+        if not chunk:
+            break
+        total += len(chunk)
+        batch = decoder.feed(chunk)
+        if batch:
+            on_batch(batch, total)
+    tail = decoder.finish()
+    if tail:
+        on_batch(tail, total)
+    return total
+
+
+def read_stream(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                on_lines: Optional[Callable[[List[str], int], None]] = None,
+                encoding: Optional[str] = None) -> DecodedText:
+    """
+    Reads and decodes a binary stream in one pass.
+
+    Args:
+        stream: Any object with a ``read(n)`` method returning bytes.
+        chunk_size: Bytes read per step.
+        on_lines: Optional callback receiving each batch of completed lines and
+            the total number of bytes read so far.
+        encoding: Forces a codec instead of detecting one.
+
+    Returns:
+        DecodedText: All lines plus the codec that was used.
+    """
+    decoder = StreamingTextDecoder(encoding)
+    lines: List[str] = []
+
+    def _collect(batch: List[str], total: int) -> None:
+        lines.extend(batch)
+        if on_lines:
+            on_lines(batch, total)
+
+    total = _decode_chunks(stream, decoder, chunk_size, _collect)
+    if not lines:
+        lines = [""]
+    return DecodedText(lines=lines, encoding=decoder.encoding or "utf-8", errors=decoder.errors,
+                       bytes_read=total, detector_used=decoder.detector_used, warnings=decoder.warnings)
+
+
+class BackgroundLoad:
+    """
+    Reads and decodes a stream on a worker thread, publishing line batches.
+
+    The first read is small (``first_chunk_size``) so the first screenful of
+    lines is available almost immediately; the UI thread collects published
+    lines with ``drain()`` and may ``cancel()`` at any time.  The stream is
+    opened by ``open_stream`` on the worker thread, so a slow (e.g. NFS) open
+    does not block the caller either.
+    """
+
+    def __init__(self, open_stream: Callable[[], BinaryIO], total_bytes: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, first_chunk_size: int = FIRST_CHUNK_SIZE,
+                 encoding: Optional[str] = None, name: str = ""):
+        self.name = name
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.lines_published = 0
+        self.longest_line = 0  # in characters, over everything published so far
+        self.result: Optional[DecodedText] = None
+        self.error: Optional[BaseException] = None
+        self._open_stream = open_stream
+        self._chunk_size = chunk_size
+        self._first_chunk_size = first_chunk_size
+        self._decoder = StreamingTextDecoder(encoding)
+        self._batches: "queue.Queue[Optional[List[str]]]" = queue.Queue()
+        self._cancel = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FileLoadThread")
+
+    @property
+    def encoding(self) -> str:
+        return self._decoder.encoding or "utf-8"
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction loaded (0.0–1.0), or None when the total size is unknown."""
+        if not self.total_bytes:
+            return None
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def start(self) -> "BackgroundLoad":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Asks the worker to stop after the current chunk; already published lines stay valid."""
+        self._cancel.set()
+
+    def _publish(self, batch: List[str], total: int) -> None:
+        self.bytes_read = total
+        if batch:
+            self.longest_line = max(self.longest_line, max(map(len, batch)))
+        self._batches.put(batch)
+
+    def _run(self) -> None:
+        try:
+            with self._open_stream() as stream:
+                total = _decode_chunks(stream, self._decoder, self._chunk_size, self._publish,
+                                       first_chunk_size=self._first_chunk_size, cancel=self._cancel)
+            self.bytes_read = total
+            if not self._cancel.is_set():
+                d = self._decoder
+                self.result = DecodedText(lines=[], encoding=self.encoding, errors=d.errors, bytes_read=total,
+                                          detector_used=d.detector_used, warnings=d.warnings)
+        except Exception as e:  # reported to the UI thread through `error`
+            logger.error("Background load of '%s' failed: %s", self.name, e, exc_info=True)
+            self.error = e
+        finally:
+            self._batches.put(None)  # end-of-stream marker
+
+    def drain(self, max_lines: Optional[int] = None) -> Tuple[List[str], bool]:
+        """
+        Collects the lines published since the last call (non-blocking).
+
+        Returns:
+            Tuple[List[str], bool]: The new lines and whether the worker has
+            finished (successfully, with an error, or cancelled).
+        """
+        lines: List[str] = []
+        while not self._finished and (max_lines is None or len(lines) < max_lines):
+            try:
+                batch = self._batches.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self._finished = True
+            else:
+                lines.extend(batch)
+        self.lines_published += len(lines)
+        return lines, self._finished
+
+
+def load_text_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   encoding: Optional[str] = None) -> DecodedText:
+    """Reads ``path`` once, detecting its encoding on the fly (see module docstring)."""
+    with open(path, "rb") as f:
+        return read_stream(f, chunk_size=chunk_size, encoding=encoding)
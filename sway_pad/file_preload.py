@@ -0,0 +1,155 @@
+# file_preload.py
+"""file_preload.py – reading several files at once on a thread pool.
+
+``sway-pad a.yaml b.yaml templates/*.yaml`` hands every file after the first
+to a ``FilePreloader``.  Each worker does the whole per-file job off the UI
+thread – stat, decompression, the single-pass decode of ``file_loader`` and
+language detection (``guess_lexer`` runs every Pygments analyser and is the
+slowest step for small files) – and queues a ``PreloadedFile``.  The main
+loop collects finished files with ``poll()`` in completion order, so opening
+a chart directory takes about as long as its largest file, not the sum.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pygments.lexers import TextLexer, get_lexer_for_filename, guess_lexer
+
+from compression import detect_compression, open_decompressed, strip_compression_suffix
+from file_loader import DecodedText, read_stream
+from file_watcher import Fingerprint, fingerprint
+from large_file import evaluate as evaluate_large_file
+
+logger = logging.getLogger(__name__)
+
+# Characters of the first lines shown to guess_lexer() when the file name is not enough.
+_GUESS_LINES = 200
+_GUESS_CHARS = 10_000
+
+
+def detect_lexer(path: Optional[str], lines: Any, content_guess: bool = True) -> Any:
+    """
+    Pygments lexer for a document: by file name ("app.yaml.gz" counts as YAML),
+    else guessed from its first lines, else ``TextLexer``.
+
+    ``content_guess=False`` skips the guess (the large-file profile does).
+    Safe to call from any thread.
+    """
+    if path and path != "noname":
+        try:
+            lexer = get_lexer_for_filename(strip_compression_suffix(path), stripall=True)
+            logger.debug("Pygments: Detected '%s' using filename '%s'.", lexer.name, path)
+            return lexer
+        except Exception:  # Pygments raises ClassNotFound, a subclass of Exception.
+            logger.debug("Pygments: No lexer for filename '%s'. Falling back to content guess.", path)
+    if not content_guess:
+        logger.debug("Pygments: Large-file profile, no content guess. Using TextLexer.")
+        return TextLexer()
+    sample = "\n".join(lines[:_GUESS_LINES])[:_GUESS_CHARS]
+    if not sample.strip():
+        logger.debug("Pygments: No content to guess from. Using TextLexer.")
+        return TextLexer()
+    try:
+        lexer = guess_lexer(sample, stripall=True)
+        logger.debug("Pygments: Guessed language by content: '%s'.", lexer.name)
+        return lexer
+    except Exception:
+        logger.debug("Pygments: Content guess failed. Using TextLexer as fallback.")
+        return TextLexer()
+
+
+@dataclass
+class PreloadedFile:
+    """A file read by a preload worker, or the error that stopped it."""
+    path: str
+    decoded: Optional[DecodedText] = None
+    compression: Optional[str] = None
+    size: int = 0  # bytes on disk
+    disk_state: Optional[Fingerprint] = None  # taken before reading (see file_watcher)
+    longest_line: int = 0
+    lexer: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+    warnings: List[str] = field(default_factory=list)
+
+
+def preload_file(path: str, large_file_settings: Optional[Dict[str, Any]] = None,
+                 encoding: Optional[str] = None, lexer: Any = None) -> PreloadedFile:
+    """
+    Reads, decodes and detects the language of ``path`` (see ``FilePreloader``).
+
+    ``large_file_settings`` (``large_file.settings_for``) decides whether the
+    content-based language guess is skipped, as the editor would. ``encoding``
+    and ``lexer``, if given (remembered from an earlier session), are used
+    instead of detecting them. Errors are returned in ``PreloadedFile.error``,
+    never raised.
+    """
+    started = time.monotonic()
+    result = PreloadedFile(path)
+    try:
+        result.disk_state = fingerprint(path)
+        result.size = os.path.getsize(path)
+        result.compression = detect_compression(path)
+        stream = open_decompressed(path, result.compression) if result.compression else open(path, "rb")
+        with stream:
+            decoded = read_stream(stream, encoding=encoding)
+        result.decoded = decoded
+        result.warnings = decoded.warnings
+        result.longest_line = max(map(len, decoded.lines), default=0)
+        profile = evaluate_large_file(large_file_settings or {}, decoded.bytes_read, len(decoded.lines),
+                                      result.longest_line)
+        content_guess = profile is None or profile.highlighting == "full"
+        result.lexer = lexer or detect_lexer(path, decoded.lines, content_guess)
+    except Exception as e:  # reported to the UI thread through `error`
+        logger.warning("Preloading '%s' failed: %s", path, e)
+        result.error = e
+    result.seconds = time.monotonic() - started
+    return result
+
+
+class FilePreloader:
+    """
+    Runs ``preload_file`` for many paths on a thread pool.
+
+    ``submit`` returns at once; ``poll`` (non-blocking) returns the files that
+    finished since the last call, in completion order. ``pending`` counts the
+    submitted files not handed out by ``poll`` yet, ``submitted`` all of them.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or None, thread_name_prefix="FilePreload")
+        self._done: "queue.Queue[PreloadedFile]" = queue.Queue()
+        self.pending = 0
+        self.submitted = 0
+
+    def submit(self, path: str, large_file_settings: Optional[Dict[str, Any]] = None,
+               encoding: Optional[str] = None, lexer: Any = None) -> None:
+        self.pending += 1
+        self.submitted += 1
+        future = self._executor.submit(preload_file, path, large_file_settings, encoding, lexer)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future) -> None:
+        if not future.cancelled():
+            self._done.put(future.result())
+
+    def poll(self) -> List[PreloadedFile]:
+        finished: List[PreloadedFile] = []
+        while True:
+            try:
+                finished.append(self._done.get_nowait())
+            except queue.Empty:
+                break
+        self.pending -= len(finished)
+        return finished
+
+    def shutdown(self) -> None:
+        """Drops files not started yet; running workers finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
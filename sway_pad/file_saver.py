@@ -0,0 +1,227 @@
+# file_saver.py
+"""file_saver.py – atomic, streaming file writes.
+
+``atomic_write`` never builds the whole document as one string and never
+truncates the target in place:
+
+    1. the lines are encoded and written in chunks to a temporary file
+       created next to the target (same directory, hence same filesystem);
+    2. the temporary file gets the target's permission bits and, where the
+       process is allowed to, its owner and group;
+    3. it is flushed and ``fsync``-ed, then ``os.replace``-d over the target
+       and the directory entry is ``fsync``-ed as well.
+
+A crash or error at any point leaves either the old or the new file on disk,
+never a truncated mix.  With ``compression`` set, the encoded lines pass
+through a streaming compressor (``compression.compressing_writer``) on their
+way to the temporary file.  ``BackgroundSave`` runs the same write on a worker
+thread and exposes its progress to the UI thread.
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import os
+import stat
+import tempfile
+import threading
+from itertools import islice
+from typing import Callable, Optional, Sequence
+
+from compression import compressing_writer
+
+logger = logging.getLogger(__name__)
+
+# Lines joined and encoded per write() call.
+SAVE_BATCH_LINES = 16384
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once: os.umask() can only be queried by setting it, which is not thread-safe.
+_UMASK = _current_umask()
+
+
+class SaveCancelled(Exception):
+    """Raised inside ``atomic_write`` when the write was cancelled (the target is untouched)."""
+
+
+def _copy_metadata(src_stat: Optional[os.stat_result], tmp_fd: int, tmp_path: str) -> None:
+    """Gives the temporary file the mode/ownership of the file it is going to replace."""
+    if src_stat is None:
+        # A new file gets the mode open(path, "w") would have created it with.
+        os.fchmod(tmp_fd, 0o666 & ~_UMASK)
+        return
+    os.fchmod(tmp_fd, stat.S_IMODE(src_stat.st_mode))
+    if hasattr(os, "fchown"):
+        try:
+            os.fchown(tmp_fd, src_stat.st_uid, src_stat.st_gid)
+        except PermissionError:
+            # Not root: we may still keep the group if we are a member of it.
+            try:
+                os.fchown(tmp_fd, -1, src_stat.st_gid)
+            except PermissionError:
+                logger.warning("Cannot preserve owner/group of '%s'.", tmp_path)
+
+
+def _fsync_directory(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows: directories cannot be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, lines: Sequence[str], encoding: str = "utf-8", errors: str = "replace",
+                 newline: str = os.linesep, on_progress: Optional[Callable[[int, int], None]] = None,
+                 cancel: Optional[threading.Event] = None, compression: Optional[str] = None) -> int:
+    """
+    Writes ``lines`` joined by ``newline`` to ``path`` atomically (see module docstring).
+
+    If ``path`` is a symlink, the file it points to is replaced and the link
+    is kept.
+
+    Args:
+        path: Target file.
+        lines: The document; it must not change while it is written (pass a snapshot).
+        encoding: Codec used for the file; ``errors`` is its error policy.
+        newline: Separator written between lines (no trailing separator is added).
+        on_progress: Called with ``(lines_written, total_lines)`` after every chunk.
+        cancel: When set, the write stops before the rename and the target is untouched.
+        compression: Codec ("gzip", "bz2", "xz") the file is compressed with, or None.
+
+    Returns:
+        int: Number of (uncompressed) bytes written.
+
+    Raises:
+        SaveCancelled: If ``cancel`` was set.
+        OSError, LookupError: On I/O or codec errors (the temporary file is removed).
+    """
+    target = os.path.realpath(path)
+    directory = os.path.dirname(target) or "."
+    try:
+        src_stat: Optional[os.stat_result] = os.stat(target)
+    except FileNotFoundError:
+        src_stat = None
+
+    encoder = codecs.getincrementalencoder(encoding)(errors)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=directory)
+    total = len(lines)
+    written_bytes = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _copy_metadata(src_stat, f.fileno(), tmp_path)
+            out = compressing_writer(f, compression, os.path.basename(target)) if compression else f
+            done = 0
+            it = iter(lines)
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise SaveCancelled(path)
+                batch = list(islice(it, SAVE_BATCH_LINES))
+                if not batch:
+                    break
+                chunk = newline.join(batch)
+                if done:
+                    chunk = newline + chunk
+                data = encoder.encode(chunk)
+                out.write(data)
+                written_bytes += len(data)
+                done += len(batch)
+                if on_progress:
+                    on_progress(done, total)
+            tail = encoder.encode("", final=True)
+            out.write(tail)
+            written_bytes += len(tail)
+            if out is not f:
+                out.close()  # writes the codec trailer; `f` stays open
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+    logger.debug("atomic_write: %d lines, %d bytes -> '%s'.", total, written_bytes, target)
+    return written_bytes
+
+
+class BackgroundSave:
+    """
+    Runs ``atomic_write`` on a worker thread.
+
+    The UI thread polls ``done`` / ``progress`` and inspects ``error`` once the
+    worker has finished; ``wait()`` turns the save into a blocking one.
+    """
+
+    def __init__(self, path: str, lines: Sequence[str], encoding: str = "utf-8",
+                 errors: str = "replace", newline: str = os.linesep, compression: Optional[str] = None):
+        self.path = path
+        self.encoding = encoding
+        self.compression = compression
+        self.total_lines = len(lines)
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.error: Optional[BaseException] = None
+        self._lines = lines
+        self._errors = errors
+        self._newline = newline
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FileSaveThread")
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the lines written so far (0.0–1.0)."""
+        return 1.0 if not self.total_lines else min(1.0, self.lines_written / self.total_lines)
+
+    @property
+    def cancelled(self) -> bool:
+        return isinstance(self.error, SaveCancelled)
+
+    def start(self) -> "BackgroundSave":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Stops the save before the rename; the file on disk keeps its previous content."""
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the worker has finished. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def _on_progress(self, done: int, _total: int) -> None:
+        self.lines_written = done
+
+    def _run(self) -> None:
+        try:
+            self.bytes_written = atomic_write(self.path, self._lines, self.encoding, self._errors,
+                                              self._newline, self._on_progress, self._cancel,
+                                              self.compression)
+        except SaveCancelled as e:
+            logger.info("Save of '%s' cancelled.", self.path)
+            self.error = e
+        except Exception as e:  # reported to the UI thread through `error`
+            logger.error("Background save of '%s' failed: %s", self.path, e, exc_info=True)
+            self.error = e
+        finally:
+            self._lines = ()  # drop the snapshot
+            self._done.set()
+
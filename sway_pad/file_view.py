@@ -0,0 +1,224 @@
+# file_view.py
+"""file_view.py – read-only, memory-mapped view of (very) large files.
+
+``MmapFileView`` exposes a file through the ``TextBuffer`` API without ever
+reading it into memory as a whole: the file is ``mmap``-ed, line-start byte
+offsets are kept in a ``LineIndex`` (built for the first screen up front and
+completed in the background), and only the lines requested by the renderer
+(the viewport) are sliced out of the mapping and decoded.
+
+Search works directly on the mapped bytes, so ``find`` over a multi-gigabyte
+log never materialises the decoded text either.
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import mmap
+import os
+import re
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import chardet
+
+from line_index import LineIndex
+from text_buffer import ReadOnlyBufferError, TextBuffer
+
+logger = logging.getLogger(__name__)
+
+# Size of the prefix handed to chardet when no encoding is given.
+ENCODING_SAMPLE_SIZE = 20 * 1024
+# Bytes indexed synchronously on open – comfortably more than one screen.
+FIRST_SCREEN_BYTES = 1024 * 1024
+
+
+def detect_view_encoding(sample: bytes) -> str:
+    """
+    Picks an encoding for a file view from a byte sample.
+
+    The view locates lines by scanning for ``b"\\n"``, which is only valid for
+    ASCII-compatible encodings; UTF-16/32 guesses therefore fall back to
+    UTF-8 (decoded with ``errors="replace"``).
+    """
+    if not sample:
+        return "utf-8"
+    try:
+        sample.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    guess = chardet.detect(sample)
+    encoding = guess.get("encoding")
+    if not encoding or guess.get("confidence", 0.0) < 0.5:
+        return "utf-8"
+    try:
+        codec_name = codecs.lookup(encoding).name
+    except LookupError:
+        return "utf-8"
+    if codec_name.startswith(("utf-16", "utf-32")):
+        logger.warning("File view: %s is not ASCII-compatible, falling back to utf-8.", codec_name)
+        return "utf-8"
+    return codec_name
+
+
+class MmapFileView(TextBuffer):
+    """
+    A read-only ``TextBuffer`` backed by a memory-mapped file.
+
+    Line semantics match ``str.splitlines()`` for ``\\n`` / ``\\r\\n`` files:
+    a trailing newline does not produce an extra empty line, and an empty
+    file is presented as a single empty line.
+
+    With ``index_in_background=True`` only the first ``FIRST_SCREEN_BYTES`` are
+    indexed before the constructor returns; ``start_indexing`` completes the
+    rest on a worker thread and ``line_count`` grows as it progresses.
+    """
+
+    backend_name = "mmap_view"
+    read_only = True
+
+    def __init__(self, path: str, encoding: Optional[str] = None, index_in_background: bool = False):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm: Optional[mmap.mmap] = None
+        self._map()
+        self.encoding = encoding or detect_view_encoding(self._read_bytes(0, ENCODING_SAMPLE_SIZE))
+        self.line_index = LineIndex(path)
+        self.line_index.size = self.size  # index exactly what is mapped
+        self.line_index.build(until_bytes=FIRST_SCREEN_BYTES if index_in_background else None)
+
+    def _map(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self.size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # ───────────────────── Index ─────────────────────
+    def start_indexing(self, on_progress: Optional[Callable[[LineIndex], None]] = None,
+                       on_complete: Optional[Callable[[LineIndex], None]] = None) -> None:
+        """Completes the line index on a background thread."""
+        self.line_index.start_background(on_progress=on_progress, on_complete=on_complete)
+
+    def offset_of_line(self, index: int) -> int:
+        """Returns the byte offset where line ``index`` starts."""
+        return self.line_index.offset_of_line(index)
+
+    def line_of_offset(self, offset: int) -> int:
+        """Returns the index of the line containing byte ``offset``."""
+        return self.line_index.line_of_offset(offset)
+
+    def refresh(self) -> Optional[int]:
+        """
+        Re-maps the file if it grew on disk and indexes the appended lines.
+
+        Returns:
+            Optional[int]: The number of new lines (0 if the file did not change),
+            or None while a running background index is still catching up.
+        """
+        new_size = os.fstat(self._file.fileno()).st_size
+        if new_size == self.size:
+            return 0
+        self.size = new_size
+        self._map()
+        added = self.line_index.extend()
+        if added is None:
+            logger.info("File view: '%s' changed on disk, now %d bytes (indexing in background).",
+                        self.path, new_size)
+        else:
+            logger.info("File view: '%s' changed on disk, now %d bytes (+%d lines).", self.path, new_size, added)
+        return added
+
+    # ───────────────────── Buffer API ─────────────────────
+    def line_count(self) -> int:
+        return self.line_index.line_count
+
+    def _line_bounds(self, index: int) -> Tuple[int, int]:
+        return self.line_index.line_bounds(index)
+
+    def _read_bytes(self, start: int, end: int) -> bytes:
+        if not self._mm:
+            return b""
+        return self._mm[start:end]
+
+    def get_line(self, index: int) -> str:
+        start, end = self._line_bounds(index)
+        raw = self._read_bytes(start, end)
+        if raw.endswith(b"\n"):
+            raw = raw[:-1]
+            if raw.endswith(b"\r"):
+                raw = raw[:-1]
+        return raw.decode(self.encoding, errors="replace")
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        line_count = self.line_count()
+        if end is None or end > line_count:
+            end = line_count
+        for i in range(max(0, start), end):
+            yield self.get_line(i)
+
+    def splice(self, start: int, end: int, lines: Iterable[str]) -> None:
+        raise ReadOnlyBufferError(f"'{os.path.basename(self.path)}' is opened as a read-only view")
+
+    def snapshot(self) -> "MmapFileView":
+        """The view never changes, so it is its own snapshot (no copy of the file)."""
+        return self
+
+    # ───────────────────── Search ─────────────────────
+    def find(self, term: str, from_line: int = 0, from_col: int = 0,
+             ignore_case: bool = True) -> Optional[Tuple[int, int, int]]:
+        """
+        Finds the next occurrence of ``term`` at or after (``from_line``, ``from_col``).
+
+        The search runs on the mapped bytes and wraps around to the start of
+        the file. ``ignore_case`` folds ASCII letters only.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: ``(row, col_start, col_end)`` of the
+            match in character columns, or ``None`` if the term does not occur.
+        """
+        if not term or not self._mm:
+            return None
+        try:
+            needle = term.encode(self.encoding)
+        except UnicodeEncodeError:
+            return None
+        pattern = re.compile(re.escape(needle), re.IGNORECASE if ignore_case else 0)
+
+        from_line = max(0, min(from_line, self.line_count() - 1))
+        line_start, line_end = self._line_bounds(from_line)
+        prefix = self.get_line(from_line)[:from_col].encode(self.encoding, errors="replace")
+        start_offset = min(line_start + len(prefix), line_end)
+
+        match = pattern.search(self._mm, start_offset)
+        if match is None and start_offset > 0:
+            match = pattern.search(self._mm, 0, start_offset + len(needle))
+        if match is None:
+            return None
+
+        if not self.line_index.covers_offset(match.start()):
+            # Match lies beyond the background scan: index up to it first
+            # (alongside a running background scan, one chunk at a time).
+            self.line_index.build(until_bytes=match.end())
+        row = self.line_of_offset(match.start())
+        row_start = self.offset_of_line(row)
+        col_start = len(self._read_bytes(row_start, match.start()).decode(self.encoding, errors="replace"))
+        col_end = col_start + len(match.group(0).decode(self.encoding, errors="replace"))
+        return row, col_start, col_end
+
+    # ───────────────────── Lifecycle ─────────────────────
+    def close(self) -> None:
+        self.line_index.cancel()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except (BufferError, ValueError):
+                logger.debug("File view: mmap for '%s' still referenced, leaving it to GC.", self.path)
+            self._mm = None
+        if not self._file.closed:
+            self._file.close()
+
+    def __repr__(self) -> str:
+        return f"<MmapFileView path={self.path!r} lines={self.line_count()} size={self.size}>"
@@ -0,0 +1,221 @@
+# file_watcher.py
+"""file_watcher.py – noticing that an open file was changed by another program.
+
+Two interchangeable watchers report paths that *may* have changed; the
+editor confirms a change by comparing ``fingerprint()`` (size, mtime, inode)
+with the one it recorded when it last read or wrote the file, so its own
+saves are never mistaken for external edits.
+
+    • ``InotifyWatcher`` – Linux inotify through ``ctypes``, no extra
+      dependency and no polling: ``poll()`` is one non-blocking ``read()``.
+      It watches the file's *directory*, because tools such as
+      ``terraform fmt``, ``git checkout`` or an editor's atomic save replace
+      the file (write a new one, rename it over the old), which an inode
+      watch on the old file would never see.
+    • ``StatWatcher`` – ``os.stat()`` of every watched file at most once per
+      ``interval`` seconds, driven by the editor's main loop.
+
+``create_watcher("auto")`` picks inotify where it is available.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+import time
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "inotify", "poll", "off")
+
+# inotify(7)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Completed writes and renames, not IN_MODIFY / IN_CREATE: those fire while the writer is still busy.
+_DIR_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+             | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len – followed by len bytes of name
+
+Fingerprint = Tuple[int, int, int]
+# Recorded for a watched file that was deleted, so that a re-created file counts as changed.
+MISSING: Fingerprint = (-1, -1, -1)
+
+
+def fingerprint(path: str) -> Optional[Fingerprint]:
+    """(size, mtime_ns, inode) of ``path``, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class StatWatcher:
+    """Reports watched files whose fingerprint changed, checking at most every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._stamps: Dict[str, Optional[Fingerprint]] = {}
+        self._last_poll = 0.0
+
+    def watch(self, path: str) -> None:
+        path = os.path.abspath(path)
+        if path not in self._stamps:
+            self._stamps[path] = fingerprint(path)
+
+    def unwatch(self, path: str) -> None:
+        self._stamps.pop(os.path.abspath(path), None)
+
+    def poll(self) -> Set[str]:
+        now = time.monotonic()
+        if now - self._last_poll < self.interval:
+            return set()
+        self._last_poll = now
+        changed = set()
+        for path, stamp in self._stamps.items():
+            current = fingerprint(path)
+            if current != stamp:
+                self._stamps[path] = current
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        self._stamps.clear()
+
+
+class InotifyWatcher:
+    """Reports watched files touched in their directory, using Linux inotify (see module docstring)."""
+
+    _libc = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            except (OSError, AttributeError):
+                return False
+            cls._libc = libc
+        return True
+
+    def __init__(self):
+        if not self.available():
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, str] = {}           # watch descriptor -> directory
+        self._wds: Dict[str, int] = {}            # directory -> watch descriptor
+        self._names: Dict[str, Set[str]] = {}     # directory -> watched file names
+
+    def watch(self, path: str) -> None:
+        directory, name = os.path.split(os.path.abspath(path))
+        if directory not in self._wds:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _DIR_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                logger.warning("inotify: cannot watch '%s': %s", directory, os.strerror(err))
+                return
+            self._wds[directory], self._dirs[wd] = wd, directory
+        self._names.setdefault(directory, set()).add(name)
+
+    def unwatch(self, path: str) -> None:
+        directory, name = os.path.split(os.path.abspath(path))
+        names = self._names.get(directory)
+        if names is None:
+            return
+        names.discard(name)
+        if not names:
+            del self._names[directory]
+            wd = self._wds.pop(directory)
+            self._dirs.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _all_paths(self) -> Set[str]:
+        return {os.path.join(d, n) for d, names in self._names.items() for n in names}
+
+    def poll(self) -> Set[str]:
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                logger.warning("inotify read failed: %s", e)
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    changed |= self._all_paths()  # events were lost: let the caller check every file
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    changed |= {os.path.join(directory, n) for n in self._names.get(directory, ())}
+                    if mask & IN_IGNORED:  # the kernel dropped the watch (directory removed)
+                        self._dirs.pop(wd, None)
+                        self._wds.pop(directory, None)
+                        self._names.pop(directory, None)
+                    continue
+                name = os.fsdecode(raw_name)
+                if name in self._names.get(directory, ()):
+                    changed.add(os.path.join(directory, name))
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._dirs.clear()
+        self._wds.clear()
+        self._names.clear()
+
+
+def create_watcher(backend: str = "auto", interval: float = 2.0):
+    """
+    A watcher for ``backend`` ("auto", "inotify", "poll"), or None for "off".
+    "inotify" falls back to polling where inotify cannot be used.
+    """
+    backend = str(backend).lower()
+    if backend == "off":
+        return None
+    if backend not in BACKENDS:
+        logger.warning("Unknown file watcher backend %r; using 'auto'.", backend)
+        backend = "auto"
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher()
+        except OSError as e:
+            logger.info("inotify unavailable (%s); watching files by polling every %.1f s.", e, interval)
+    return StatWatcher(interval)
+
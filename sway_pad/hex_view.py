@@ -0,0 +1,211 @@
+# hex_view.py
+"""hex_view.py – read-only hex dump of binary files, straight from a memory map.
+
+Decoding a core dump, a container layer or an SQLite database as text turns
+it into millions of junk lines.  ``HexFileView`` instead presents the mapped
+bytes through the ``TextBuffer`` API as fixed-width rows of ``BYTES_PER_ROW``
+bytes:
+
+    00000000  53 51 4c 69 74 65 20 66  6f 72 6d 61 74 20 33 00  |SQLite format 3.|
+
+Row ``i`` starts at byte ``i * BYTES_PER_ROW``, so no line index is needed:
+opening is one ``mmap`` call whatever the file size, and only the rows the
+renderer asks for (the viewport) are formatted.  Memory use is constant.
+
+``find`` accepts hex bytes (``"de ad be ef"``, ``"0xdeadbeef"``) or text and
+scans the mapping in ``SEARCH_CHUNK`` steps without copying it, releasing
+each chunk's pages afterwards so a search through a 4 GB file does not grow
+the process by 4 GB.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import re
+from typing import Iterable, Iterator, Optional, Tuple
+
+from text_buffer import ReadOnlyBufferError, TextBuffer
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_ROW = 16
+# Bytes looked at by looks_binary().
+SNIFF_SIZE = 8192
+# Bytes of the mapping handed to one regex search.
+SEARCH_CHUNK = 16 * 1024 * 1024
+
+_HEX_WIDTH = BYTES_PER_ROW * 3  # "hh " per byte, one extra space between the halves, no trailing space
+_PRINTABLE = bytes(b if 0x20 <= b < 0x7F else ord(".") for b in range(256))
+_UNICODE_BOMS = (b"\xff\xfe", b"\xfe\xff")  # UTF-16/32 text is full of NUL bytes
+_HEX_PAIRS = re.compile(r"[0-9a-fA-F]{2}(\s+[0-9a-fA-F]{2})+")
+
+
+def looks_binary(path: str) -> bool:
+    """True if the first ``SNIFF_SIZE`` bytes of ``path`` contain a NUL byte (and no UTF-16/32 BOM)."""
+    try:
+        with open(path, "rb") as f:
+            sample = f.read(SNIFF_SIZE)
+    except OSError:
+        return False
+    return b"\0" in sample and not sample.startswith(_UNICODE_BOMS)
+
+
+def parse_byte_pattern(term: str) -> bytes:
+    """
+    The bytes a search term stands for: ``0x`` followed by hex digits, or hex
+    pairs separated by spaces, are bytes; anything else is UTF-8 text.
+
+    Raises:
+        ValueError: For ``0x`` followed by an odd number of (or non-) hex digits.
+    """
+    stripped = term.strip()
+    if stripped[:2].lower() == "0x":
+        return bytes.fromhex(stripped[2:].replace(" ", ""))
+    if _HEX_PAIRS.fullmatch(stripped):
+        return bytes.fromhex(stripped)
+    return term.encode("utf-8")
+
+
+class HexFileView(TextBuffer):
+    """A read-only ``TextBuffer`` showing a memory-mapped file as hex dump rows."""
+
+    backend_name = "hex_view"
+    read_only = True
+    encoding = "binary"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm: Optional[mmap.mmap] = None
+        if self.size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offset_width = max(8, len(f"{max(self.size - 1, 0):x}"))
+
+    # ───────────────────── Layout ─────────────────────
+    def offset_of_row(self, row: int) -> int:
+        return row * BYTES_PER_ROW
+
+    def row_of_offset(self, offset: int) -> int:
+        return offset // BYTES_PER_ROW
+
+    def column_of_byte(self, index: int) -> int:
+        """Column of the hex digits of byte ``index`` (0-based within its row)."""
+        return self.offset_width + 2 + 3 * index + (1 if index >= BYTES_PER_ROW // 2 else 0)
+
+    def offset_at(self, row: int, col: int) -> int:
+        """The byte under column ``col`` of ``row`` (hex or character column), clamped to the file."""
+        hex_start = self.offset_width + 2
+        ascii_start = hex_start + _HEX_WIDTH + 3  # after "  |"
+        if col >= ascii_start:
+            index = col - ascii_start
+        else:
+            rel = max(0, col - hex_start)
+            index = rel // 3 if rel < 3 * (BYTES_PER_ROW // 2) else (rel - 1) // 3
+        index = min(index, BYTES_PER_ROW - 1)
+        return max(0, min(self.offset_of_row(row) + index, self.size - 1))
+
+    # ───────────────────── Buffer API ─────────────────────
+    def line_count(self) -> int:
+        return max(1, -(-self.size // BYTES_PER_ROW))
+
+    def get_line(self, index: int) -> str:
+        if index < 0:
+            index += self.line_count()
+        if not 0 <= index < self.line_count():
+            raise IndexError("hex view row out of range")
+        offset = self.offset_of_row(index)
+        chunk = self._mm[offset:offset + BYTES_PER_ROW] if self._mm else b""
+        half = BYTES_PER_ROW // 2
+        hex_part = f"{chunk[:half].hex(' ')}  {chunk[half:].hex(' ')}" if len(chunk) > half else chunk.hex(" ")
+        return (f"{offset:0{self.offset_width}x}  {hex_part:<{_HEX_WIDTH}}  "
+                f"|{chunk.translate(_PRINTABLE).decode('ascii')}|")
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        line_count = self.line_count()
+        if end is None or end > line_count:
+            end = line_count
+        for i in range(max(0, start), end):
+            yield self.get_line(i)
+
+    def splice(self, start: int, end: int, lines: Iterable[str]) -> None:
+        raise ReadOnlyBufferError(f"'{os.path.basename(self.path)}' is opened as a read-only hex view")
+
+    def snapshot(self) -> "HexFileView":
+        """The view never changes, so it is its own snapshot."""
+        return self
+
+    # ───────────────────── Search ─────────────────────
+    def find_bytes(self, needle: bytes, start: int = 0, ignore_case: bool = False) -> Optional[int]:
+        """
+        Offset of the next occurrence of ``needle`` at or after ``start``, wrapping
+        around to the beginning; None if it does not occur. The mapping is searched
+        ``SEARCH_CHUNK`` bytes at a time (overlapping by ``len(needle) - 1``), so no
+        part of the file is copied.
+        """
+        if not needle or not self._mm:
+            return None
+        pattern = re.compile(re.escape(needle), re.IGNORECASE if ignore_case else 0)
+        start = max(0, min(start, self.size))
+        for lo, hi in ((start, self.size), (0, min(self.size, start + len(needle) - 1))):
+            pos = lo
+            while pos < hi:
+                end = min(hi, pos + SEARCH_CHUNK + len(needle) - 1)
+                match = pattern.search(self._mm, pos, end)
+                self._release(pos, end)
+                if match is not None:
+                    return match.start()
+                pos += SEARCH_CHUNK
+        return None
+
+    def _release(self, start: int, end: int) -> None:
+        """Drops the pages of ``[start, end)`` from this process (they stay in the page cache)."""
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        start -= start % mmap.PAGESIZE
+        try:
+            self._mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+        except (OSError, ValueError):
+            pass
+
+    def find(self, term: str, from_line: int = 0, from_col: int = 0,
+             ignore_case: bool = True) -> Optional[Tuple[int, int, int]]:
+        """
+        Finds the next occurrence of ``term`` (see ``parse_byte_pattern``) at or after
+        the byte under (``from_line``, ``from_col``). ``ignore_case`` applies to text
+        terms (ASCII letters) only.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: ``(row, col_start, col_end)`` of the match's
+            hex digits in its first row, or ``None``.
+        """
+        try:
+            needle = parse_byte_pattern(term)
+        except ValueError:
+            return None
+        is_text = needle == term.encode("utf-8")
+        start = self.offset_at(from_line, from_col) if from_col else self.offset_of_row(from_line)
+        if from_col and self.column_of_byte(start % BYTES_PER_ROW) < from_col <= self.offset_width + 2 + _HEX_WIDTH:
+            start += 1  # the caret is past the first digit of this byte: continue after it
+        offset = self.find_bytes(needle, start, ignore_case=ignore_case and is_text)
+        if offset is None:
+            return None
+        row, index = divmod(offset, BYTES_PER_ROW)
+        last = min(index + len(needle), BYTES_PER_ROW) - 1
+        return row, self.column_of_byte(index), self.column_of_byte(last) + 2
+
+    # ───────────────────── Lifecycle ─────────────────────
+    def close(self) -> None:
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except (BufferError, ValueError):
+                logger.debug("Hex view: mmap for '%s' still referenced, leaving it to GC.", self.path)
+            self._mm = None
+        if not self._file.closed:
+            self._file.close()
+
+    def __repr__(self) -> str:
+        return f"<HexFileView path={self.path!r} rows={self.line_count()} size={self.size}>"
@@ -0,0 +1,158 @@
+# highlight_worker.py
+"""highlight_worker.py – lexing the lines around the viewport on a background thread.
+
+Lexing a screenful of lines the editor has not seen yet – after a jump or a
+page down, or after an edit that changes the state of everything below it –
+costs from a few to tens of milliseconds, and the draw used to wait for it.
+Now the draw only looks lines up: ``IncrementalHighlighter.highlight`` with a
+small ``budget`` (enough for the line being typed in) returns the lines that
+are not cached yet plain.  The editor submits a ``TokenizeJob`` for the
+viewport plus ``AHEAD_PAGES`` above and below it – ``SCROLL_AHEAD_PAGES`` in
+the direction of rapid scrolling, so the next page is lexed before it is
+shown – and ``TokenizeWorker`` lexes it on a copy of those lines.  ``poll``
+hands the results to the main thread in batches (the visible lines in the
+first one); ``IncrementalHighlighter.apply`` stores them and the screen is
+redrawn.
+
+Only the newest job matters: ``submit`` replaces one that has not started,
+and a running job stops at the next line once a newer one arrives.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from incremental_lexer import IncrementalHighlighter, LexResult, LexState
+
+logger = logging.getLogger(__name__)
+
+# Lines the draw may lex itself: the line being typed in, a short paste.
+DRAW_LEX_BUDGET = 8
+# Screens lexed above and below the viewport; in the scroll direction while paging.
+AHEAD_PAGES = 1
+SCROLL_AHEAD_PAGES = 4
+# Results handed to the main thread at once.
+BATCH_LINES = 256
+
+
+@dataclass
+class TokenizeJob:
+    """Lines ``start .. start + len(lines) - 1`` of a document, to lex from ``state``."""
+    highlighter: IncrementalHighlighter
+    lines: List[str]
+    start: int
+    state: LexState
+    keep_from: int  # lines above only need their state, not segments
+    flush_at: int  # last visible line: its batch is published at once
+
+
+def ahead_range(first: int, count: int, line_count: int, scrolled: int) -> Tuple[int, int]:
+    """
+    Lines ``[lo, hi)`` to have lexed for a viewport of ``count`` lines at
+    ``first``; ``scrolled`` is how far it moved since the last draw.
+    """
+    above = below = AHEAD_PAGES * count
+    if scrolled and abs(scrolled) >= max(1, count // 2):  # paging
+        if scrolled > 0:
+            below = SCROLL_AHEAD_PAGES * count
+        else:
+            above = SCROLL_AHEAD_PAGES * count
+    return max(0, first - above), min(line_count, first + count + below)
+
+
+def make_job(highlighter: IncrementalHighlighter, lines: Sequence[str], first: int, count: int,
+             scrolled: int = 0) -> TokenizeJob:
+    """The job for a viewport (see ``ahead_range``), starting where ``highlighter.job_start`` says."""
+    lo, hi = ahead_range(first, count, len(lines), scrolled)
+    start, state = highlighter.job_start(lo)
+    return TokenizeJob(highlighter, list(lines[start:hi]), start, state, keep_from=lo,
+                       flush_at=min(first + count, hi) - 1)
+
+
+class TokenizeWorker:
+    """
+    One daemon thread running the newest ``TokenizeJob`` (started by the first ``submit``).
+
+    ``poll`` (non-blocking) returns ``(highlighter, results)`` batches in the
+    order they were lexed, for ``highlighter.apply``. ``busy`` is True while a
+    job is queued or running.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._job: Optional[TokenizeJob] = None
+        self._generation = 0
+        self._running = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._done: "queue.Queue[Tuple[IncrementalHighlighter, List[LexResult]]]" = queue.Queue()
+
+    def submit(self, job: TokenizeJob) -> None:
+        with self._cond:
+            if self._stopped:
+                return
+            self._job = job
+            self._generation += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="TokenizeWorker", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._job is not None or self._running
+
+    def poll(self) -> List[Tuple[IncrementalHighlighter, List[LexResult]]]:
+        batches = []
+        while True:
+            try:
+                batches.append(self._done.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._job = None
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._job is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job, self._job = self._job, None
+                generation = self._generation
+                self._running = True
+            try:
+                self._lex(job, generation)
+            except Exception:
+                logger.exception("Background tokenization failed.")
+            finally:
+                with self._cond:
+                    self._running = False
+
+    def _lex(self, job: TokenizeJob, generation: int) -> None:
+        highlighter, state = job.highlighter, job.state
+        batch: List[LexResult] = []
+        for offset, line in enumerate(job.lines):
+            if self._generation != generation:
+                break  # superseded; what is lexed so far is still worth keeping
+            index = job.start + offset
+            segments, end_state = highlighter.lex_detached(line, state, keep=index >= job.keep_from)
+            batch.append((index, line, state, segments, end_state))
+            state = end_state
+            if len(batch) >= BATCH_LINES or index == job.flush_at:
+                self._done.put((highlighter, batch))
+                batch = []
+        if batch:
+            self._done.put((highlighter, batch))
@@ -0,0 +1,541 @@
+# incremental_lexer.py
+"""incremental_lexer.py – line-by-line Pygments lexing that carries state across lines.
+
+Lexing every line on its own loses multi-line constructs: the middle of a
+Python triple-quoted string or of a YAML block scalar comes out as code.
+Lexing the whole file on every keystroke is far too slow.
+
+Pygments' ``RegexLexer`` is a state machine whose whole state is its state
+stack (plus the context object of an ``ExtendedRegexLexer``, e.g. YAML's
+indentation).  ``lex_line`` runs one line from a given state and returns
+the state at the end of it, so
+
+    state[0] = initial_state(lexer)
+    tokens[i], state[i + 1] = lex_line(lexer, line[i], state[i])
+
+and ``IncrementalHighlighter`` keeps ``state[i]`` for every line of a
+document.  After an edit of lines ``[start, end)`` the states up to
+``start`` are still exact; the old states behind the edit are kept,
+shifted, as a guess.  Re-lexing resumes at ``start`` and stops as soon as a
+computed state equals the guess again ("converges") – typing inside a
+function re-lexes one line, opening a ``\"\"\"`` re-lexes up to the
+closing one.
+
+Lexers that are not resumable (plain ``Lexer`` subclasses such as JSON, or
+lexers that override ``get_tokens_unprocessed`` such as C) are lexed per line
+with no state, as before.  Constructs that a lexer matches with one regex
+spanning several lines – C block comments, shell heredocs, the
+``String.Doc`` rule for Python docstrings – are not recognised across lines:
+that would make a line's tokens depend on the lines after it.
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from pygments.lexer import ExtendedRegexLexer, LexerContext, RegexLexer
+from pygments.token import Error, Text, Whitespace, _TokenType
+
+from token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+# Lines lexed synchronously to reach the viewport; farther down, states are
+# approximated from SYNC_LINES lines above it (see IncrementalHighlighter.highlight).
+MAX_CATCHUP_LINES = 2000
+SYNC_LINES = 200
+# Guesses kept for lines far behind the exact part (see IncrementalHighlighter.far).
+MAX_FAR_STATES = 2 * MAX_CATCHUP_LINES
+
+LexState = Hashable
+RawToken = Tuple[_TokenType, str]
+Segment = Tuple[str, int]
+Colorize = Callable[[List[RawToken]], List[Segment]]
+# (line index, line, state, segments or None, state after the line), as lexed by the worker
+LexResult = Tuple[int, str, LexState, Optional[List[Segment]], LexState]
+
+_STATELESS = None  # the "state" of lexers that cannot resume mid-text
+
+
+# ───────────────────── Single lines ─────────────────────
+def _context_class(lexer: Any) -> type:
+    """The context an ``ExtendedRegexLexer`` creates for itself (YAML tracks indentation in it)."""
+    try:
+        from pygments.lexers.data import YamlLexer, YamlLexerContext
+        if isinstance(lexer, YamlLexer):
+            return YamlLexerContext
+    except ImportError:  # pragma: no cover - very old Pygments
+        pass
+    return LexerContext
+
+
+def is_resumable(lexer: Any) -> bool:
+    """True if ``lex_line`` can carry the state of ``lexer`` from one line to the next."""
+    if isinstance(lexer, ExtendedRegexLexer):
+        return True
+    return isinstance(lexer, RegexLexer) and type(lexer).get_tokens_unprocessed is RegexLexer.get_tokens_unprocessed
+
+
+def initial_state(lexer: Any) -> LexState:
+    """The state at the beginning of a document."""
+    if isinstance(lexer, ExtendedRegexLexer):
+        return _freeze_context(_context_class(lexer)("", 0))
+    if is_resumable(lexer):
+        return ("root",)
+    return _STATELESS
+
+
+def _freeze_context(ctx: LexerContext) -> LexState:
+    return tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                        for name, value in vars(ctx).items() if name not in ("text", "pos", "end")))
+
+
+def _thaw_context(lexer: Any, state: LexState, text: str) -> LexerContext:
+    ctx = _context_class(lexer)(text, 0)
+    for name, value in state:
+        setattr(ctx, name, list(value) if isinstance(value, tuple) else value)
+    ctx.end = len(text)
+    return ctx
+
+
+def _apply_transition(new_state: Any, stack: List[str]) -> None:
+    """Applies a rule's state change to ``stack`` (as ``RegexLexer`` does)."""
+    if isinstance(new_state, tuple):
+        for state in new_state:
+            if state == "#pop":
+                if len(stack) > 1:
+                    stack.pop()
+            elif state == "#push":
+                stack.append(stack[-1])
+            else:
+                stack.append(state)
+    elif isinstance(new_state, int):
+        if abs(new_state) >= len(stack):
+            del stack[1:]
+        else:
+            del stack[new_state:]
+    elif new_state == "#push":
+        stack.append(stack[-1])
+
+
+def _run_regex_lexer(lexer: RegexLexer, text: str, stack: List[str]) -> Iterator[Tuple[int, Any, str]]:
+    """
+    ``RegexLexer.get_tokens_unprocessed`` with the state stack owned by the caller.
+
+    Unlike Pygments it stops at the end of ``text`` instead of trying the rules
+    once more there: zero-width rules (``$``, lookaheads) must see the next line,
+    as they would in the whole document, not the end of this one.
+    """
+    tokendefs = lexer._tokens
+    statetokens = tokendefs[stack[-1]]
+    pos, end = 0, len(text)
+    while pos < end:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is not None:
+                    if type(action) is _TokenType:
+                        yield pos, action, m.group()
+                    else:
+                        yield from action(lexer, m)
+                pos = m.end()
+                if new_state is not None:
+                    _apply_transition(new_state, stack)
+                    statetokens = tokendefs[stack[-1]]
+                break
+        else:
+            if text[pos] == "\n":
+                stack[:] = ["root"]
+                statetokens = tokendefs["root"]
+                yield pos, Whitespace, "\n"
+            else:
+                yield pos, Error, text[pos]
+            pos += 1
+
+
+def _run_extended_lexer(lexer: ExtendedRegexLexer, ctx: LexerContext) -> Iterator[Tuple[int, Any, str]]:
+    """``ExtendedRegexLexer.get_tokens_unprocessed`` for ``ctx``, stopping at its end (see ``_run_regex_lexer``)."""
+    tokendefs = lexer._tokens
+    statetokens = tokendefs[ctx.stack[-1]]
+    text = ctx.text
+    while ctx.pos < ctx.end:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, ctx.pos, ctx.end)
+            if m:
+                if action is not None:
+                    if type(action) is _TokenType:
+                        yield ctx.pos, action, m.group()
+                        ctx.pos = m.end()
+                    else:
+                        yield from action(lexer, m, ctx)  # callbacks move ctx.pos themselves
+                        if not new_state:
+                            statetokens = tokendefs[ctx.stack[-1]]
+                if new_state is not None:
+                    _apply_transition(new_state, ctx.stack)
+                    statetokens = tokendefs[ctx.stack[-1]]
+                break
+        else:
+            if text[ctx.pos] == "\n":
+                ctx.stack = ["root"]
+                statetokens = tokendefs["root"]
+                yield ctx.pos, Text, "\n"
+            else:
+                yield ctx.pos, Error, text[ctx.pos]
+            ctx.pos += 1
+
+
+def lex_line(lexer: Any, line: str, state: LexState) -> Tuple[List[RawToken], LexState]:
+    """
+    Lexes one line (without its newline) starting in ``state``.
+
+    Returns:
+        Tuple[List[RawToken], LexState]: The ``(token_type, text)`` pairs, whose
+        texts add up to ``line``, and the state at the start of the next line.
+    """
+    text = line + "\n"
+    if state is _STATELESS:
+        tokens = [(token_type, value) for _pos, token_type, value in lexer.get_tokens_unprocessed(text) if value]
+        end_state = _STATELESS
+    elif isinstance(lexer, ExtendedRegexLexer):
+        ctx = _thaw_context(lexer, state, text)
+        tokens = [(token_type, value) for _pos, token_type, value in _run_extended_lexer(lexer, ctx) if value]
+        end_state = _freeze_context(ctx)
+    else:
+        stack = list(state)
+        tokens = [(token_type, value) for _pos, token_type, value in _run_regex_lexer(lexer, text, stack) if value]
+        end_state = tuple(stack)
+
+    # Drop the newline that was added: it ends the last token.
+    if tokens:
+        token_type, value = tokens[-1]
+        if value.endswith("\n"):
+            if len(value) > 1:
+                tokens[-1] = (token_type, value[:-1])
+            else:
+                tokens.pop()
+    return tokens, end_state
+
+
+# ───────────────────── Documents ─────────────────────
+class IncrementalHighlighter:
+    """
+    Highlighted lines of one document, lexed incrementally (see module docstring).
+
+    ``states[i]`` is the state at the start of line ``i``. ``states[0..valid]``
+    are exact; entries behind ``valid`` are guesses left by edits or by lines
+    lexed ahead of the exact part (None where nothing is known). Guesses more
+    than ``MAX_CATCHUP_LINES`` behind the exact part – a viewport far down a
+    huge file – go to the sparse ``far`` instead, at most ``MAX_FAR_STATES``
+    of them around the last lines lexed, so ``states`` never grows by the
+    lines in between. ``dirty``
+    holds the lines behind ``valid`` whose text changed since their guess was
+    made, or whose guess does not follow from the one above: a guess is only
+    trusted up to the next dirty line.
+
+    ``on_edit`` must be called for every change of the document (the editor
+    forwards its ``EditEvent``s); ``lines_lexed`` counts the lines lexed, for
+    tests and diagnostics. Highlighted lines are kept in ``cache``, the
+    ``TokenCache`` of the document (shared with the highlighter of its
+    previous lexer), under ``lexer_key`` (the lexer class unless given; it
+    must change with anything else ``colorize`` depends on).
+    """
+
+    def __init__(self, lexer: Any, colorize: Colorize, max_line_length: int = 0,
+                 cache: Optional[TokenCache] = None, lexer_key: Any = None):
+        self.lexer = lexer
+        self.colorize = colorize
+        # Longer lines are drawn plain and leave the state unchanged (large-file profile); 0 = no limit.
+        self.max_line_length = max_line_length
+        self.resumable = is_resumable(lexer)
+        self._initial = initial_state(lexer)
+        self._interned: Dict[LexState, LexState] = {self._initial: self._initial}
+        self.states: List[Optional[LexState]] = [self._initial]
+        self.far: Dict[int, LexState] = {}
+        self.valid = 0
+        self.dirty: List[int] = []
+        self.cache = cache if cache is not None else TokenCache()
+        self.lexer_key = type(lexer) if lexer_key is None else lexer_key
+        self.lines_lexed = 0
+        self.missing = 0  # lines the last highlight(budget=...) returned plain
+        # Opaque token of the owner, to notice edits that were not reported (see SwayEditor._line_highlighter).
+        self.synced: Any = None
+
+    def reset(self) -> None:
+        """Forgets every state (the document was replaced)."""
+        self.states = [self._initial]
+        self.far = {}
+        self.valid = 0
+        self.dirty = []
+
+    # ───────────────────── Edits ─────────────────────
+    def on_edit(self, start: int, end: int, new_count: int) -> None:
+        """Lines ``[start, end)`` were replaced by ``new_count`` lines."""
+        if not self.resumable:
+            return
+        delta = new_count - (end - start)
+        if self.far:
+            # As in `states` below: the guess at old line `end` moves to `start + new_count`.
+            far: Dict[int, LexState] = {}
+            for line, state in self.far.items():
+                if line <= start:
+                    far[line] = state
+                if line > end or (line == end and new_count):
+                    far[line + delta] = state
+            self.far = far
+        states = self.states
+        if start >= len(states):
+            return
+        # states[k] for k <= start do not depend on the edited lines. The state at the start
+        # of old line `end` – the first line after the edit – becomes a guess for new line
+        # `start + new_count`; when lines are only deleted, that is `start`, whose state is exact.
+        if new_count:
+            states[start + 1:end + 1] = [None] * (new_count - 1) + states[end:end + 1]
+        else:
+            del states[start + 1:end + 1]
+        shifted = [line if line < start else line + delta for line in self.dirty if not start <= line < end]
+        # New lines are dirty; after a pure deletion, line `start` now follows a different line.
+        shifted.extend(range(start, start + max(new_count, 1)))
+        self.dirty = sorted(line for line in set(shifted) if line >= min(self.valid, start))
+        self.valid = min(self.valid, start)
+
+    # ───────────────────── States ─────────────────────
+    def _known(self, index: int) -> Optional[LexState]:
+        """The exact state or the guess at the start of line ``index`` (None if there is neither)."""
+        state = self.states[index] if index < len(self.states) else None
+        return self.far.get(index) if state is None else state
+
+    def _mark_dirty(self, line: int) -> None:
+        pos = bisect_left(self.dirty, line)
+        if pos == len(self.dirty) or self.dirty[pos] != line:
+            self.dirty.insert(pos, line)
+
+    def _mark_clean(self, line: int) -> None:
+        pos = bisect_left(self.dirty, line)
+        if pos < len(self.dirty) and self.dirty[pos] == line:
+            del self.dirty[pos]
+
+    def _store(self, index: int, state: LexState, end_state: LexState, line_count: int) -> None:
+        """
+        Records that line ``index``, lexed from ``state``, ends in ``end_state``.
+
+        At the end of the exact part this extends it (as far as the guesses
+        behind converge); farther down the pair replaces the guesses, which
+        keeps them consistent for the lines lexed ahead of the exact part.
+        """
+        states = self.states
+        if index < self.valid:
+            return
+        if index == self.valid:
+            if states[index] != state:
+                return
+            self._mark_clean(index)
+            if index + 1 < len(states):
+                if states[index + 1] == end_state:
+                    # Every guess up to the next changed line is right: lines index+1 .. next-1 are
+                    # as they were when the guesses were computed from an equal state.
+                    limit = self.dirty[0] if self.dirty else len(states) - 1
+                    self.valid = max(index + 1, min(limit, line_count))
+                    return
+                # The guess behind this one was computed from the old value: until line index+1
+                # is lexed again, it is as untrustworthy as behind an edited line.
+                states[index + 1] = end_state
+                self._mark_dirty(index + 1)
+            else:
+                states.append(end_state)
+                self.far.pop(index + 1, None)  # now exact
+            self.valid = index + 1
+            return
+        if index >= len(states) and index > self.valid + MAX_CATCHUP_LINES:
+            self.far[index] = state
+            self.far[index + 1] = end_state
+            return
+        if index >= len(states):
+            self._mark_dirty(len(states) - 1)  # the lines in between have no guess
+            states.extend([None] * (index + 1 - len(states)))
+        if states[index] != state:
+            states[index] = state
+            self._mark_dirty(index - 1)
+        self._mark_clean(index)
+        if index + 1 < len(states):
+            if states[index + 1] != end_state:
+                states[index + 1] = end_state
+                self._mark_dirty(index + 1)
+        else:
+            states.append(end_state)
+
+    def _trim_far(self, around: int) -> None:
+        """Keeps at most ``MAX_FAR_STATES`` far guesses, those nearest line ``around`` (the one just lexed)."""
+        if len(self.far) > MAX_FAR_STATES:
+            self.far = {line: state for line, state in self.far.items()
+                        if abs(line - around) <= MAX_FAR_STATES // 2}
+
+    # ───────────────────── Lexing ─────────────────────
+    def _intern(self, state: LexState) -> LexState:
+        return self._interned.setdefault(state, state)
+
+    def _cached(self, line: str, state: LexState, keep: bool,
+                touch: bool = True) -> Optional[Tuple[Optional[List[Segment]], LexState]]:
+        """The cached result of ``_lex``, or None if the line has to be lexed."""
+        if self.max_line_length and len(line) > self.max_line_length:
+            return (self.colorize([(Text, line)]) if keep else None), state
+        if touch:
+            return self.cache.get(line, self.lexer_key, state, need_segments=keep)
+        return self.cache.peek(line, self.lexer_key, state, need_segments=keep)
+
+    def _tokenize(self, line: str, state: LexState, keep: bool) -> Tuple[Optional[List[Segment]], LexState]:
+        try:
+            tokens, end_state = lex_line(self.lexer, line, state)
+        except Exception as e:
+            logger.error("Pygments tokenization error for line '%s...': %s", line[:70], e)
+            tokens, end_state = [(Error, line)], state
+        return (self.colorize(tokens) if keep else None), end_state
+
+    def _remember(self, line: str, state: LexState,
+                  result: Tuple[Optional[List[Segment]], LexState]) -> Tuple[Optional[List[Segment]], LexState]:
+        return self.cache.put(line, self.lexer_key, state, result[0], self._intern(result[1]))
+
+    def _lex(self, line: str, state: LexState, keep: bool) -> Tuple[Optional[List[Segment]], LexState]:
+        """
+        Highlighted segments of ``line`` and the state after it, cached. With
+        ``keep=False`` only the state is needed and the segments may be None.
+        """
+        cached = self._cached(line, state, keep)
+        if cached is not None:
+            return cached
+        self.lines_lexed += 1
+        return self._remember(line, state, self._tokenize(line, state, keep))
+
+    def lex_detached(self, line: str, state: LexState, keep: bool) -> Tuple[Optional[List[Segment]], LexState]:
+        """
+        ``_lex`` for the tokenize worker (see highlight_worker.py): it reads the
+        cache but changes nothing, so it may run on another thread while the
+        editor uses the highlighter. The result is stored by ``apply``.
+        """
+        cached = self._cached(line, state, keep, touch=False)
+        return cached if cached is not None else self._tokenize(line, state, keep)
+
+    def _advance(self, lines: Sequence[str], target: int, keep_from: Optional[int] = None) -> None:
+        """Makes ``states[0..target]`` exact; lines from ``keep_from`` on are highlighted and cached on the way."""
+        keep_from = target if keep_from is None else keep_from
+        while self.valid < target:
+            i = self.valid
+            state = self.states[i]
+            _segments, end_state = self._lex(lines[i], state, keep=i >= keep_from)
+            self._store(i, state, end_state, len(lines))
+
+    def state_at(self, lines: Sequence[str], index: int) -> LexState:
+        """The exact state at the start of line ``index`` (lexes up to it if needed)."""
+        if not self.resumable:
+            return _STATELESS
+        self._advance(lines, index)
+        return self.states[index]
+
+    def highlight(self, lines: Sequence[str], first: int, count: int,
+                  budget: Optional[int] = None) -> List[List[Segment]]:
+        """
+        Segments of lines ``first .. first + count - 1`` of ``lines`` (the whole document).
+
+        Reaching the viewport lexes every line above it once. If it lies more than
+        ``MAX_CATCHUP_LINES`` below the exact part, the lexer instead starts in the
+        initial state ``SYNC_LINES`` above it – right for nearly all code – and
+        the exact states are left to be filled in later.
+
+        With a ``budget``, at most that many lines are lexed: the others are
+        taken from the cache, or returned plain and counted in ``missing`` –
+        the tokenize worker lexes them (see ``job_start`` and ``apply``).
+        """
+        end = min(first + count, len(lines))
+        self.missing = 0
+        if first >= end:
+            return []
+        if budget is not None:
+            return self._highlight_cached(lines, first, end, budget)
+        if not self.resumable:
+            return [self._lex(lines[i], _STATELESS, keep=True)[0] for i in range(first, end)]
+        if first - self.valid > MAX_CATCHUP_LINES:
+            state = self._initial
+            for i in range(max(self.valid, first - SYNC_LINES), first):
+                state = self._lex(lines[i], state, keep=False)[1]
+            result = []
+            for i in range(first, end):
+                segments, state = self._lex(lines[i], state, keep=True)
+                result.append(segments)
+            return result
+        self._advance(lines, end, keep_from=first)
+        return [self._lex(lines[i], self.states[i], keep=True)[0] for i in range(first, end)]
+
+    def _highlight_cached(self, lines: Sequence[str], first: int, end: int, budget: int) -> List[List[Segment]]:
+        known, state = True, _STATELESS
+        if self.resumable:
+            if first > self.valid and first - self.valid <= budget:
+                budget -= first - self.valid
+                self._advance(lines, first)
+            state = self._known(first)
+            known = state is not None
+        rows = []
+        for i in range(first, end):
+            line = lines[i]
+            result = self._cached(line, state, keep=True) if known else None
+            if result is None and known and budget > 0:
+                budget -= 1
+                result = self._lex(line, state, keep=True)
+            if result is None:
+                self.missing += 1
+                rows.append(self.colorize([(Text, line)]))
+                if self.resumable:  # go on from the guess behind, if there is one
+                    state = self._known(i + 1)
+                    known = state is not None
+                continue
+            segments, end_state = result
+            if self.resumable:
+                self._store(i, state, end_state, len(lines))
+            rows.append(segments)
+            state = end_state
+        self._trim_far(end - 1)
+        return rows
+
+    # ───────────────────── Background lexing ─────────────────────
+    def job_start(self, first: int) -> Tuple[int, LexState]:
+        """
+        ``(line, state)`` to lex from, on the worker, to reach line ``first``:
+        the end of the exact part if it is at most ``MAX_CATCHUP_LINES`` above,
+        else ``SYNC_LINES`` above ``first`` in the state guessed there (or the
+        initial state), as ``highlight`` would approximate it.
+        """
+        if not self.resumable:
+            return first, _STATELESS
+        if first <= self.valid:
+            return first, self.states[first]
+        if first - self.valid <= MAX_CATCHUP_LINES:
+            return self.valid, self.states[self.valid]
+        start = first - SYNC_LINES
+        state = self._known(start)
+        return start, self._initial if state is None else state
+
+    def apply(self, results: Sequence[LexResult], lines: Optional[Sequence[str]] = None) -> bool:
+        """
+        Stores ``(index, line, state, segments, end_state)`` results of the tokenize worker.
+
+        A result only says how a line text lexes from a state, so it is cached
+        even if the document changed in the meantime. The lexer states are
+        updated from it where line ``index`` of ``lines`` (the document now;
+        None for a document that is not shown) is still that text.
+
+        Returns:
+            bool: True if a line got segments or a state it did not have.
+        """
+        changed = False
+        for index, line, state, segments, end_state in results:
+            state, end_state = self._intern(state), self._intern(end_state)
+            if self.cache.peek(line, self.lexer_key, state, need_segments=segments is not None) is None:
+                self._remember(line, state, (segments, end_state))
+                changed = True
+            if (self.resumable and lines is not None and index < len(lines) and index >= self.valid
+                    and lines[index] == line):
+                changed |= self._known(index + 1) != end_state
+                self._store(index, state, end_state, len(lines))
+        if results:
+            self._trim_far(results[-1][0])
+        return changed
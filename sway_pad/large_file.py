@@ -0,0 +1,137 @@
+# large_file.py
+"""large_file.py – the ``[large_file]`` profile for files too big for every feature.
+
+A few editor features cost time proportional to the whole file or to the
+length of a line: content-based language guessing, lexing a 200 000-character
+minified line, scanning the buffer for a matching bracket, linting the file
+after every save, auto-saving it every few minutes.  Once a file crosses any
+of the configured thresholds (size, line count, longest line) the editor
+switches to a cheaper profile for it:
+
+    • ``highlighting`` – "full", "lightweight" (no content guess, lines longer
+      than ``highlight_line_length`` are drawn plain) or "plain";
+    • ``bracket_matching`` – "full", "viewport" (the partner is only searched
+      on screen) or "off";
+    • ``lint`` – "auto" (after saving) or "manual" (only when asked for);
+    • ``auto_save`` – whether the auto-save timer writes this file.
+
+Thresholds and features can be overridden for individual files with tables
+keyed by a glob pattern, matched against the full path and the file name::
+
+    [large_file.overrides."*.min.js"]
+    line_length = 0            # never switch because of long lines
+    [large_file.overrides."/var/log/*"]
+    highlighting = "plain"
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHTING_MODES = ("full", "lightweight", "plain")
+BRACKET_MATCHING_MODES = ("full", "viewport", "off")
+LINT_MODES = ("auto", "manual")
+
+DEFAULTS: Dict[str, Any] = {
+    "enabled": True,
+    "size_mb": 32,
+    "lines": 500_000,
+    "line_length": 20_000,
+    "highlighting": "lightweight",
+    "highlight_line_length": 2_000,
+    "bracket_matching": "viewport",
+    "lint": "manual",
+    "auto_save": False,
+}
+
+_CHOICES = {
+    "highlighting": HIGHLIGHTING_MODES,
+    "bracket_matching": BRACKET_MATCHING_MODES,
+    "lint": LINT_MODES,
+}
+
+
+@dataclass(frozen=True)
+class LargeFileProfile:
+    """The degraded feature set chosen for one file, and why it was chosen."""
+    reasons: Tuple[str, ...]
+    highlighting: str = DEFAULTS["highlighting"]
+    highlight_line_length: int = DEFAULTS["highlight_line_length"]
+    bracket_matching: str = DEFAULTS["bracket_matching"]
+    lint: str = DEFAULTS["lint"]
+    auto_save: bool = DEFAULTS["auto_save"]
+
+
+def settings_for(config: Dict[str, Any], path: Optional[str]) -> Dict[str, Any]:
+    """
+    Returns the ``[large_file]`` settings that apply to ``path``.
+
+    Defaults are overlaid with the section itself, then with every override
+    whose pattern matches ``path`` (in the order they appear in the file).
+    """
+    section = config.get("large_file", {}) or {}
+    settings = dict(DEFAULTS)
+    settings.update({k: v for k, v in section.items() if k != "overrides"})
+    if path:
+        name = os.path.basename(path)
+        for pattern, values in (section.get("overrides") or {}).items():
+            if isinstance(values, dict) and (fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern)):
+                settings.update(values)
+    return settings
+
+
+def _number(settings: Dict[str, Any], key: str) -> float:
+    try:
+        return max(0.0, float(settings.get(key, DEFAULTS[key])))
+    except (TypeError, ValueError):
+        logger.warning("large_file.%s = %r is not a number; using %r.", key, settings.get(key), DEFAULTS[key])
+        return float(DEFAULTS[key])
+
+
+def _choice(settings: Dict[str, Any], key: str) -> str:
+    value = str(settings.get(key, DEFAULTS[key])).lower()
+    if value not in _CHOICES[key]:
+        logger.warning("large_file.%s = %r is not one of %s; using %r.", key, value, _CHOICES[key], DEFAULTS[key])
+        return DEFAULTS[key]
+    return value
+
+
+def evaluate(settings: Dict[str, Any], size_bytes: Optional[int] = None, line_count: Optional[int] = None,
+             longest_line: Optional[int] = None) -> Optional[LargeFileProfile]:
+    """
+    Checks a file against the thresholds in ``settings`` (see ``settings_for``).
+
+    Measurements that are not known yet (e.g. the line count while a file is
+    still loading) are passed as None and skipped; a threshold of 0 disables
+    that check.
+
+    Returns:
+        Optional[LargeFileProfile]: The profile to use, or None if the file may
+        use every feature.
+    """
+    if not settings.get("enabled", True):
+        return None
+    size_mb, max_lines, max_line_length = (_number(settings, k) for k in ("size_mb", "lines", "line_length"))
+    reasons = []
+    if size_mb and size_bytes is not None and size_bytes >= size_mb * 1024 * 1024:
+        reasons.append(f"{size_bytes / (1024 * 1024):.1f} MB")
+    if max_lines and line_count is not None and line_count >= max_lines:
+        reasons.append(f"{line_count} lines")
+    if max_line_length and longest_line is not None and longest_line >= max_line_length:
+        reasons.append(f"a {longest_line}-character line")
+    if not reasons:
+        return None
+    return LargeFileProfile(
+        reasons=tuple(reasons),
+        highlighting=_choice(settings, "highlighting"),
+        highlight_line_length=int(_number(settings, "highlight_line_length")),
+        bracket_matching=_choice(settings, "bracket_matching"),
+        lint=_choice(settings, "lint"),
+        auto_save=bool(settings.get("auto_save", DEFAULTS["auto_save"])),
+    )
@@ -0,0 +1,111 @@
+# line_diff.py
+"""line_diff.py – line-level diffs and three-way merges of documents.
+
+Used when a file changes on disk while it is open: instead of replacing the
+whole buffer, only the differing line ranges (``Hunk``) are spliced in, so
+the caret, undo history and every per-line cache outside them survive.
+
+``diff_hunks`` strips the common prefix and suffix first (an external tool
+usually touches a few places of a file) and runs ``difflib.SequenceMatcher``
+on what remains; a remainder too large for its quadratic worst case is
+reported as a single replaced range.  ``merge3`` combines two edited
+versions of a common base, marking overlapping edits git-style.
+"""
+
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Sequence, Tuple
+
+# Above this many lines on either side of the differing middle, no fine diff is attempted.
+MAX_MATCHED_LINES = 50_000
+
+
+class Hunk(NamedTuple):
+    """Lines ``a[i1:i2]`` are replaced by ``b[j1:j2]``."""
+    i1: int
+    i2: int
+    j1: int
+    j2: int
+
+
+def diff_hunks(a: Sequence[str], b: Sequence[str]) -> List[Hunk]:
+    """The ranges in which ``a`` and ``b`` differ, in ascending order."""
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+    a_mid, b_mid = a[prefix:n - suffix], b[prefix:m - suffix]
+    if not a_mid and not b_mid:
+        return []
+    if len(a_mid) > MAX_MATCHED_LINES or len(b_mid) > MAX_MATCHED_LINES or not a_mid or not b_mid:
+        return [Hunk(prefix, n - suffix, prefix, m - suffix)]
+    matcher = SequenceMatcher(None, list(a_mid), list(b_mid), autojunk=False)
+    return [Hunk(prefix + i1, prefix + i2, prefix + j1, prefix + j2)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def map_line(hunks: Sequence[Hunk], row: int) -> int:
+    """Where line ``row`` of ``a`` ends up in ``b`` (a replaced line maps to the start of its replacement)."""
+    for hunk in reversed(hunks):
+        if row >= hunk.i2:
+            return row + hunk.j2 - hunk.i2
+        if row >= hunk.i1:
+            return hunk.j1 + min(row - hunk.i1, max(0, hunk.j2 - hunk.j1 - 1))
+    return row
+
+
+def _side_range(hunks: Sequence[Hunk], lo: int, hi: int) -> Tuple[int, int]:
+    """Range of one side that corresponds to base lines ``[lo, hi)``, given its hunks inside them."""
+    return hunks[0].j1 - (hunks[0].i1 - lo), hunks[-1].j2 + (hi - hunks[-1].i2)
+
+
+def merge3(base: Sequence[str], mine: Sequence[str], theirs: Sequence[str],
+           labels: Tuple[str, str] = ("buffer", "disk")) -> Tuple[List[str], int]:
+    """
+    Three-way merge of ``mine`` and ``theirs``, both edited from ``base``.
+
+    Changes made on one side only are taken; overlapping (or adjacent) changes
+    that differ are kept as a conflict block between ``<<<<<<<``, ``=======``
+    and ``>>>>>>>`` lines.
+
+    Returns:
+        Tuple[List[str], int]: The merged lines and the number of conflicts.
+    """
+    changes = sorted([(h, 0) for h in diff_hunks(base, mine)] + [(h, 1) for h in diff_hunks(base, theirs)],
+                     key=lambda c: (c[0].i1, c[0].i2))
+    sides = (mine, theirs)
+    merged: List[str] = []
+    conflicts = 0
+    pos = k = 0
+    while k < len(changes):
+        lo, hi = changes[k][0].i1, changes[k][0].i2
+        group = ([], [])
+        while k < len(changes) and changes[k][0].i1 <= hi:  # sorted by i1: overlapping or adjacent
+            hunk, side = changes[k]
+            group[side].append(hunk)
+            hi = max(hi, hunk.i2)
+            k += 1
+        merged.extend(base[pos:lo])
+        versions = []
+        for side in (0, 1):
+            if group[side]:
+                start, end = _side_range(group[side], lo, hi)
+                versions.append(list(sides[side][start:end]))
+            else:
+                versions.append(None)
+        if versions[0] is None or versions[1] is None or versions[0] == versions[1]:
+            merged.extend(versions[0] if versions[0] is not None else versions[1])
+        else:
+            conflicts += 1
+            merged.append(f"<<<<<<< {labels[0]}")
+            merged.extend(versions[0])
+            merged.append("=======")
+            merged.extend(versions[1])
+            merged.append(f">>>>>>> {labels[1]}")
+        pos = hi
+    merged.extend(base[pos:])
+    return merged, conflicts
@@ -0,0 +1,221 @@
+# line_index.py
+"""line_index.py – compact line-start offset table for files on disk.
+
+``LineIndex`` records the byte offset at which every line of a file begins
+in an ``array('Q')`` (8 bytes per line, no per-line Python objects).  It can
+be filled synchronously for a prefix of the file – enough for the first
+screen – and then completed by a background thread while the editor is
+already interactive.  Once built it answers, in O(1) / O(log n):
+
+    • ``offset_of_line(i)``  – goto-line,
+    • ``line_of_offset(b)``  – jump to a byte offset,
+    • ``line_of_fraction(f)`` – jump to N% of the file.
+
+The index only ever grows: ``extend()`` picks up bytes appended to a growing
+file (logs), and any lazily loaded buffer can share one index instance.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per scan step (also the granularity of progress callbacks).
+INDEX_CHUNK_SIZE = 8 * 1024 * 1024
+
+_NEWLINE_RE = re.compile(rb"\n")
+
+
+class LineIndex:
+    """
+    Line-start byte offsets of a file, built incrementally.
+
+    ``starts[k]`` is the offset of line ``k``; ``starts[0]`` is always 0.  While
+    the scan is incomplete, only lines whose terminating newline has been seen
+    are reported by ``line_count``.
+    """
+
+    def __init__(self, path: str, chunk_size: int = INDEX_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._starts = array("Q", [0])
+        self.indexed_bytes = 0
+        self.size = os.path.getsize(path)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._on_progress: Optional[Callable[["LineIndex"], None]] = None
+        self._on_complete: Optional[Callable[["LineIndex"], None]] = None
+        if self.size == 0:
+            self._done.set()
+
+    # ───────────────────── State ─────────────────────
+    @property
+    def complete(self) -> bool:
+        """True once every byte up to ``size`` has been scanned."""
+        return self._done.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the file indexed so far (0.0–1.0)."""
+        return 1.0 if not self.size else min(1.0, self.indexed_bytes / self.size)
+
+    @property
+    def line_count(self) -> int:
+        """
+        Number of lines known so far.
+
+        Follows ``str.splitlines()`` semantics once complete: a trailing newline
+        opens no extra line and an empty file has one (empty) line.
+        """
+        starts_len = len(self._starts)
+        if not self.complete:
+            return max(1, starts_len - 1)
+        if starts_len > 1 and self._starts[-1] == self.size:
+            return starts_len - 1
+        return starts_len
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the offset table."""
+        return self._starts.buffer_info()[1] * self._starts.itemsize
+
+    # ───────────────────── Lookups ─────────────────────
+    def offset_of_line(self, index: int) -> int:
+        """Byte offset at which line ``index`` starts (O(1))."""
+        return self._starts[index]
+
+    def line_bounds(self, index: int) -> Tuple[int, int]:
+        """``(start, end)`` byte range of line ``index``, including its newline."""
+        start = self._starts[index]
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else self.size
+        return start, end
+
+    def line_of_offset(self, offset: int) -> int:
+        """Index of the line containing byte ``offset`` (O(log n))."""
+        offset = max(0, min(offset, self.size))
+        line = max(0, bisect_right(self._starts, offset) - 1)
+        return min(line, self.line_count - 1)
+
+    def line_of_fraction(self, fraction: float) -> int:
+        """Index of the line at ``fraction`` (0.0–1.0) of the file, measured in bytes."""
+        fraction = max(0.0, min(1.0, fraction))
+        return self.line_of_offset(int(self.size * fraction))
+
+    def covers_offset(self, offset: int) -> bool:
+        """True if ``offset`` lies in the already indexed part of the file."""
+        return self.complete or offset < self.indexed_bytes
+
+    # ───────────────────── Building ─────────────────────
+    def build(self, until_bytes: Optional[int] = None,
+              on_progress: Optional[Callable[["LineIndex"], None]] = None) -> None:
+        """
+        Scans the file synchronously up to ``until_bytes`` (default: the end).
+
+        Safe to call repeatedly; each call continues where the previous stopped.
+        The lock is held for one chunk at a time, so a call from the UI thread
+        shares the work with a running background scan and returns as soon as
+        the index reaches ``until_bytes``, not when the whole file is indexed.
+        """
+        if self.indexed_bytes >= (self.size if until_bytes is None else min(self.size, until_bytes)):
+            return
+        with open(self.path, "rb") as f:
+            while not self._cancel.is_set():
+                with self._lock:
+                    target = self.size if until_bytes is None else min(self.size, until_bytes)
+                    if self.indexed_bytes >= target:
+                        break
+                    base = self.indexed_bytes
+                    f.seek(base)
+                    chunk = f.read(min(self.chunk_size, target - base))
+                    if not chunk:
+                        # The file shrank underneath us; stop at what exists.
+                        self.size = base
+                        break
+                    # Build the new offsets locally and publish them with one extend(),
+                    # so readers on other threads never observe a half-written chunk.
+                    self._starts.extend(array("Q", (base + m.end() for m in _NEWLINE_RE.finditer(chunk))))
+                    self.indexed_bytes = base + len(chunk)
+                if on_progress:
+                    on_progress(self)
+        with self._lock:
+            if self.indexed_bytes >= self.size:
+                self._done.set()
+
+    def start_background(self, on_progress: Optional[Callable[["LineIndex"], None]] = None,
+                         on_complete: Optional[Callable[["LineIndex"], None]] = None) -> None:
+        """
+        Completes the index on a daemon thread, invoking the callbacks from that thread.
+
+        The callbacks are remembered so that ``extend()`` can restart the scan
+        without losing them.
+        """
+        if self.complete or (self._thread and self._thread.is_alive()):
+            return
+        self._on_progress = on_progress
+        self._on_complete = on_complete
+
+        def _runner() -> None:
+            try:
+                self.build(on_progress=on_progress)
+                logger.info("LineIndex: '%s' indexed, %d lines (%d KiB table).",
+                            self.path, self.line_count, self.memory_bytes() // 1024)
+                if on_complete and self.complete:
+                    on_complete(self)
+            except OSError as e:
+                logger.error("LineIndex: background indexing of '%s' failed: %s", self.path, e)
+
+        self._cancel.clear()
+        self._thread = threading.Thread(target=_runner, daemon=True, name="LineIndexThread")
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stops a running background scan (the partial index stays usable)."""
+        self._cancel.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def extend(self) -> Optional[int]:
+        """
+        Picks up data appended to the file since the last scan.
+
+        A running background scan is stopped and restarted over the new size
+        with its original callbacks; otherwise the appended tail is scanned
+        synchronously (appends to logs are usually small).
+
+        Returns:
+            Optional[int]: The number of newly known lines, or None if the scan
+            continues in the background and the count is not known yet. A file
+            that shrank cannot be extended; the index is rebuilt from scratch
+            in that case.
+        """
+        new_size = os.path.getsize(self.path)
+        if new_size == self.size:
+            return 0
+        was_running = bool(self._thread and self._thread.is_alive())
+        self.cancel()
+        before = self.line_count
+        with self._lock:
+            if new_size < self.size:
+                logger.info("LineIndex: '%s' shrank (%d -> %d bytes), rebuilding.", self.path, self.size, new_size)
+                self._starts = array("Q", [0])
+                self.indexed_bytes = 0
+                before = 0
+            self.size = new_size
+            if new_size == 0:
+                self._done.set()
+            else:
+                self._done.clear()
+        self._cancel.clear()
+        if was_running:
+            self.start_background(on_progress=self._on_progress, on_complete=self._on_complete)
+            return None
+        self.build()
+        return max(0, self.line_count - before)
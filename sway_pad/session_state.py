@@ -0,0 +1,138 @@
+# session_state.py
+"""session_state.py – the editor state remembered between launches.
+
+On exit the editor writes ``$XDG_STATE_HOME/sway-pad/session.json``
+(``~/.local/state/...`` by default):
+
+    {"sway_session": 1, "active": 0,
+     "files":  [{"path": ..., "cursor": [y, x], "scroll": [top, left], "encoding": "cp1251",
+                 "lexer": "python", "search": "TODO", "disk": [size, mtime_ns, inode]}, ...],
+     "recent": [...]}
+
+``files`` are the buffers that were open, in order; ``recent`` remembers files
+closed earlier (most recent first, at most ``MAX_RECENT``).  A relaunch can
+reopen the session, and every file opened again gets its caret, scroll
+position and search term back.  If the file is still the one that was read
+(``disk`` equals ``file_watcher.fingerprint``), its encoding and language are
+taken from the entry instead of being detected again – no charset detector
+run over a non-UTF-8 file, no ``guess_lexer`` over every Pygments analyser.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from file_saver import atomic_write
+from file_watcher import fingerprint
+
+logger = logging.getLogger(__name__)
+
+SESSION_VERSION = 1
+MAX_RECENT = 200
+
+
+def session_path() -> str:
+    """The session file (XDG state dir)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "sway-pad", "session.json")
+
+
+@dataclass
+class FileState:
+    """What is remembered about one file."""
+    path: str  # real path
+    cursor: Tuple[int, int] = (0, 0)
+    scroll: Tuple[int, int] = (0, 0)
+    encoding: Optional[str] = None
+    lexer: Optional[str] = None  # Pygments alias, for get_lexer_by_name()
+    search: str = ""
+    disk: Optional[Tuple[int, int, int]] = None  # fingerprint of the file when it was read or saved
+
+    def unchanged(self) -> bool:
+        """True if the file on disk is still the one the encoding and lexer were detected on."""
+        return self.disk is not None and fingerprint(self.path) == self.disk
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "FileState":
+        disk = data.get("disk")
+        cursor_y, cursor_x = data.get("cursor") or (0, 0)
+        scroll_top, scroll_left = data.get("scroll") or (0, 0)
+        return cls(
+            path=str(data["path"]),
+            cursor=(int(cursor_y), int(cursor_x)),
+            scroll=(int(scroll_top), int(scroll_left)),
+            encoding=data.get("encoding") or None,
+            lexer=data.get("lexer") or None,
+            search=str(data.get("search") or ""),
+            disk=tuple(int(v) for v in disk) if disk else None,
+        )
+
+
+@dataclass
+class Session:
+    """The open files (in buffer order), the shown one and the files closed earlier."""
+    files: List[FileState] = field(default_factory=list)
+    active: int = 0
+    recent: List[FileState] = field(default_factory=list)
+
+    def lookup(self, path: str) -> Optional[FileState]:
+        """The remembered state of ``path``, if any."""
+        real = os.path.realpath(path)
+        for state in self.files + self.recent:
+            if state.path == real:
+                return state
+        return None
+
+    def replace_files(self, files: List[FileState], active: int) -> None:
+        """
+        Makes ``files`` the open files; files that were open or remembered before
+        and are not among them move to (the front of) ``recent``.
+        """
+        paths = {state.path for state in files}
+        recent = [state for state in self.files + self.recent if state.path not in paths]
+        self.files, self.active, self.recent = files, active, recent[:MAX_RECENT]
+
+
+def load_session(path: Optional[str] = None) -> Optional[Session]:
+    """Reads the session file; None if there is none or it cannot be used."""
+    path = path or session_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read session file '%s': %s", path, e)
+        return None
+    if not isinstance(data, dict) or data.get("sway_session") != SESSION_VERSION:
+        logger.warning("Ignoring session file '%s' of an unknown format.", path)
+        return None
+    try:
+        return Session(
+            files=[FileState.from_json(entry) for entry in data.get("files", [])],
+            active=int(data.get("active", 0)),
+            recent=[FileState.from_json(entry) for entry in data.get("recent", [])],
+        )
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        logger.warning("Ignoring damaged session file '%s': %s", path, e)
+        return None
+
+
+def save_session(session: Session, path: Optional[str] = None) -> None:
+    """Writes the session file atomically (errors are logged, not raised)."""
+    path = path or session_path()
+    data = {
+        "sway_session": SESSION_VERSION,
+        "active": session.active,
+        "files": [asdict(state) for state in session.files],
+        "recent": [asdict(state) for state in session.recent],
+    }
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        atomic_write(path, [json.dumps(data, ensure_ascii=False)], errors="surrogatepass")
+    except OSError as e:
+        logger.error("Cannot write session file '%s': %s", path, e)
@@ -0,0 +1,332 @@
+# swap_journal.py
+"""swap_journal.py – append-only crash-recovery journal of buffer edits.
+
+Instead of periodically rewriting a full copy of the document, every change
+of a buffer is appended to a small per-buffer journal as one JSON line:
+
+    {"sway_journal": 1, "path": ..., "base": {"size": ..., "mtime_ns": ...}, ...}   header
+    [start, deleted, ["inserted", "lines"]]                                          edit record
+
+Replaying the records over the file the journal was started from (``base``)
+rebuilds the unsaved document.  Journals live in
+``$XDG_STATE_HOME/sway-pad/journal`` (``~/.local/state/...`` by default) and
+are named ``<key>.<pid>.swj`` – ``key`` is derived from the file path (or is
+``unnamed-<n>``, numbered per editor, for buffers without one), ``pid``
+identifies the editor that owns the journal.  A journal
+whose owner is no longer running is an orphan left by a crash and can be
+offered for recovery the next time the same path is opened.
+
+Consecutive rewrites of the same line (typing) are merged in memory, and the
+file is compacted – rewritten atomically from the merged records – once it
+grows past ``compact_after`` records.  After a successful save the journal is
+rebased on the new file and only the edits made during the save are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".swj"
+UNNAMED_KEY = "unnamed"
+
+# (start, deleted_count, inserted_lines)
+Record = List[Any]
+
+# Numbers the journals of unnamed buffers, which would otherwise share one file.
+_unnamed_serial = itertools.count(1)
+
+
+def journal_dir() -> str:
+    """Directory holding the journals (XDG state dir)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "sway-pad", "journal")
+
+
+def journal_key(path: Optional[str]) -> str:
+    """Stable file-name key for a document path; ``unnamed`` for unsaved buffers."""
+    if not path:
+        return UNNAMED_KEY
+    return hashlib.sha1(os.path.realpath(path).encode("utf-8", "surrogatepass")).hexdigest()[:20]
+
+
+def _is_unnamed_key(key: str) -> bool:
+    number = key[len(UNNAMED_KEY) + 1:]
+    return key == UNNAMED_KEY or (key.startswith(UNNAMED_KEY + "-") and number.isdigit())
+
+
+def base_fingerprint(path: Optional[str]) -> Optional[Dict[str, int]]:
+    """Size and mtime of the file a journal is based on (None for unnamed or missing files)."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        return False  # no cheap liveness check; a stale journal is only offered, never applied silently
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    except OSError:
+        return False
+    return True
+
+
+def find_orphans(path: Optional[str], directory: Optional[str] = None) -> List[str]:
+    """Journals of ``path`` (or of unnamed buffers) whose editor is no longer running, newest first."""
+    directory = directory or journal_dir()
+    wanted = journal_key(path) if path else None
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    found = []
+    for name in names:
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        key, _, pid_part = name[:-len(JOURNAL_SUFFIX)].rpartition(".")
+        if key != wanted and not (wanted is None and _is_unnamed_key(key)):
+            continue
+        if not pid_part.isdigit() or _pid_alive(int(pid_part)):
+            continue
+        full = os.path.join(directory, name)
+        try:
+            found.append((os.path.getmtime(full), full))
+        except OSError:
+            continue
+    return [full for _, full in sorted(found, reverse=True)]
+
+
+def read_journal(journal_path: str) -> Tuple[Dict[str, Any], List[Record]]:
+    """
+    Parses a journal file.
+
+    A torn last line (crash in the middle of a write) is ignored.
+
+    Raises:
+        ValueError: If the file is not a journal.
+        OSError: If it cannot be read.
+    """
+    with open(journal_path, "r", encoding="utf-8", errors="surrogatepass") as f:
+        raw = f.read().split("\n")
+    try:
+        header = json.loads(raw[0])
+    except (json.JSONDecodeError, IndexError) as e:
+        raise ValueError(f"Not a journal: {journal_path}") from e
+    if not isinstance(header, dict) or header.get("sway_journal") != JOURNAL_VERSION:
+        raise ValueError(f"Unsupported journal: {journal_path}")
+    records: List[Record] = []
+    for lineno, line in enumerate(raw[1:], start=2):
+        if not line:
+            continue
+        try:
+            start, deleted, lines = json.loads(line)
+        except (json.JSONDecodeError, ValueError, TypeError):
+            if lineno == len(raw) or all(not rest for rest in raw[lineno:]):
+                logger.warning("Ignoring torn last record of journal '%s'.", journal_path)
+                break
+            raise ValueError(f"Corrupt record {lineno} in journal {journal_path}")
+        records.append([int(start), int(deleted), list(lines)])
+    return header, records
+
+
+def replay(buffer, records: List[Record]) -> None:
+    """Applies journal records to a buffer (a TextBuffer or a list)."""
+    for start, deleted, lines in records:
+        if hasattr(buffer, "splice"):
+            buffer.splice(start, start + deleted, lines)
+        else:
+            buffer[start:start + deleted] = lines
+
+
+def remove_journal(journal_path: str) -> None:
+    try:
+        os.unlink(journal_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Cannot remove journal '%s': %s", journal_path, e)
+
+
+class SwapJournal:
+    """
+    The journal of one open buffer.
+
+    ``record`` is meant to be registered with ``TextBuffer.add_listener`` and
+    only queues the edit; ``flush`` – called from the editor's main loop –
+    appends the queued records to disk, ``fsync``-ing at most every
+    ``fsync_interval`` seconds.  The journal file is only created once there
+    is something to record.
+    """
+
+    def __init__(self, path: Optional[str], encoding: str = "utf-8", directory: Optional[str] = None,
+                 fsync_interval: float = 2.0, compact_after: int = 2000):
+        self.path = os.path.realpath(path) if path else None
+        self.encoding = encoding
+        self.directory = directory or journal_dir()
+        self._key = journal_key(path) if path else f"{UNNAMED_KEY}-{next(_unnamed_serial)}"
+        self.journal_path = self._journal_path()
+        self.fsync_interval = fsync_interval
+        self.compact_after = max(1, compact_after)
+        self.base = base_fingerprint(path)
+        self._records: List[Record] = []   # merged history since `base`
+        self._pending: List[Record] = []   # not yet written
+        self._merge_floor = 0              # records before this index are frozen (see mark())
+        self._file = None
+        self._file_records = 0
+        self._compact_at = self.compact_after
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ───────────────────── Recording ─────────────────────
+    def record(self, start: int, end: int, lines: List[str]) -> None:
+        """TextBuffer listener: lines [start, end) were replaced by ``lines``."""
+        rec = [start, end - start, list(lines)]
+        with self._lock:
+            self._pending.append(rec)
+            last = self._records[-1] if len(self._records) > self._merge_floor else None
+            if (last is not None and rec[1] == 1 and len(rec[2]) == 1
+                    and last[0] <= start < last[0] + len(last[2])):
+                # Rewrite of a line the previous record inserted: fold it in.
+                last[2][start - last[0]] = rec[2][0]
+            else:
+                self._records.append([rec[0], rec[1], list(rec[2])])
+
+    def on_edit(self, event) -> None:
+        """``EditEventBus`` subscriber: records an ``edit_events.EditEvent``."""
+        self.record(event.start[0], event.old_end[0], event.lines)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._records)
+
+    def mark(self) -> int:
+        """Position in the history, e.g. the moment a save snapshot was taken (see ``rebase``)."""
+        with self._lock:
+            self._merge_floor = len(self._records)
+            return self._merge_floor
+
+    # ───────────────────── Disk ─────────────────────
+    def _journal_path(self) -> str:
+        return os.path.join(self.directory, f"{self._key}.{os.getpid()}{JOURNAL_SUFFIX}")
+
+    def _header(self) -> str:
+        return json.dumps({"sway_journal": JOURNAL_VERSION, "path": self.path, "encoding": self.encoding,
+                           "base": self.base, "pid": os.getpid(), "created": time.time()})
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        self._file = os.fdopen(fd, "w", encoding="utf-8", errors="surrogatepass")
+        self._file.write(self._header() + "\n")
+        self._file_records = 0
+
+    def flush(self, force_sync: bool = False) -> None:
+        """Writes queued records; compacts the file when it has grown past ``compact_after`` records."""
+        with self._lock:
+            try:
+                if self._pending:
+                    if self._file is None:
+                        self._open()
+                    self._file.write("".join(json.dumps(rec) + "\n" for rec in self._pending))
+                    self._file.flush()
+                    self._file_records += len(self._pending)
+                    self._pending.clear()
+                    self._dirty = True
+                    if self._file_records > self._compact_at:
+                        self._rewrite()
+                now = time.monotonic()
+                if self._dirty and self._file is not None and (force_sync or now - self._last_fsync >= self.fsync_interval):
+                    os.fsync(self._file.fileno())
+                    self._last_fsync = now
+                    self._dirty = False
+            except OSError as e:
+                logger.error("Cannot write journal '%s': %s", self.journal_path, e)
+
+    def _rewrite(self) -> None:
+        """Atomically replaces the journal file with the merged records (lock held)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._pending.clear()  # everything queued is part of `_records`
+        self._dirty = False
+        if not self._records:
+            remove_journal(self.journal_path)
+            self._file_records = 0
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".journal.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", errors="surrogatepass") as f:
+                f.write(self._header() + "\n")
+                f.write("".join(json.dumps(rec) + "\n" for rec in self._records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_path)
+        except BaseException:
+            remove_journal(tmp)
+            raise
+        self._file = open(self.journal_path, "a", encoding="utf-8", errors="surrogatepass")
+        self._file_records = len(self._records)
+        self._compact_at = max(self.compact_after, 2 * self._file_records)
+        logger.debug("Journal '%s' compacted to %d records.", self.journal_path, self._file_records)
+
+    def rebase(self, path: Optional[str], keep_from: int) -> None:
+        """
+        The document as of ``mark()`` == ``keep_from`` has been saved to ``path``:
+        the journal now starts from that file and keeps only the later edits.
+        """
+        with self._lock:
+            self.path = os.path.realpath(path) if path else None
+            if path:
+                self._key = journal_key(path)
+            new_journal_path = self._journal_path()
+            if new_journal_path != self.journal_path:  # "save as": the journal follows the new name
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                remove_journal(self.journal_path)
+                self.journal_path = new_journal_path
+            self.base = base_fingerprint(path)
+            self._records = self._records[keep_from:]
+            self._merge_floor = 0
+            try:
+                self._rewrite()
+            except OSError as e:
+                logger.error("Cannot rebase journal '%s': %s", self.journal_path, e)
+
+    def close(self, discard: bool = True) -> None:
+        """Closes the journal; ``discard`` removes it (clean exit / nothing left to recover)."""
+        if not discard:
+            self.flush(force_sync=True)
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+            if discard or not self._records:
+                remove_journal(self.journal_path)
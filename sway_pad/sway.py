@@ -5,6 +5,7 @@
 # the Free Software Foundation, either version 3 of the License, or
 # (at your option) any later version.
 
+import argparse
 import curses
 import locale
 import toml
@@ -20,7 +21,6 @@ import time
 import pyperclip
 import logging
 import logging.handlers
-import chardet
 import unicodedata
 import traceback
 import subprocess
@@ -31,16 +31,37 @@ import signal
 import json
 import importlib.util
 import asyncio
+import io
+import weakref
 #import uuid 
 
 from ai_client import get_ai_client, BaseAiClient
-from ui_panels import CursesPanel
-from pygments.lexers import get_lexer_for_filename, guess_lexer, TextLexer
+from ui_panels import CursesPanel, ListPanel
+from text_buffer import BufferSnapshot, TextBuffer, create_buffer, DEFAULT_BUFFER_BACKEND
+from file_view import MmapFileView
+from hex_view import HexFileView, looks_binary
+from highlight_worker import DRAW_LEX_BUDGET, TokenizeWorker, make_job
+from incremental_lexer import IncrementalHighlighter
+from token_cache import TokenCache
+from token_colors import TokenColorTable, lexer_token_types, token_color_map
+from syntax_rules import RuleHighlighter
+from line_index import LineIndex
+from file_loader import BackgroundLoad, DecodedText, read_stream
+from file_saver import BackgroundSave
+from file_preload import FilePreloader, PreloadedFile, detect_lexer
+from file_watcher import MISSING, Fingerprint, create_watcher, fingerprint as file_fingerprint
+from line_diff import diff_hunks, map_line, merge3
+from compression import compression_for_name, detect_compression, open_decompressed
+from buffer_list import BufferList, BufferState
+from large_file import LargeFileProfile, evaluate as evaluate_large_file, settings_for as large_file_settings
+from edit_events import EditEvent, EditEventBus
+from swap_journal import SwapJournal, base_fingerprint, find_orphans, read_journal, remove_journal, replay
+from session_state import FileState, Session, load_session, save_session
+from pygments.lexers import TextLexer, get_lexer_by_name
 from pygments import lex
 #from pygments.lexers.special import TextLexer
-from pygments.token import Token
 from wcwidth import wcwidth, wcswidth
-from typing import Callable, Tuple, Optional, List, Dict, Any, Union
+from typing import BinaryIO, Callable, Tuple, Optional, List, Dict, Any, Sequence, Union
 
 HAS_DEVOPS_LINTERS = importlib.util.find_spec("lint_devops") is not None
 
@@ -563,7 +584,16 @@ def load_config() -> dict:
             "use_system_clipboard": True,
             "default_new_filename": "new_file.py",
             "tab_size": 4,
-            "use_spaces": True
+            "use_spaces": True,
+            "buffer_backend": "piece_table",
+            "view_mode_threshold_mb": 512,
+            "progressive_load_threshold_mb": 4,
+            "inactive_buffers_memory_mb": 256,
+            "preload_workers": 0,
+            "watch_files": "auto",
+            "watch_poll_interval": 2.0,
+            "background_highlighting": True,
+            "token_cache_mb": 16
         },
         "file_icons": {
             "python": "🐍",
@@ -760,6 +790,26 @@ def load_config() -> dict:
         "settings": {
             "auto_save_interval": 5,
             "show_git_info": True
+        },
+        "session": {
+            "enabled": True,
+            "restore_on_start": False
+        },
+        "journal": {
+            "enabled": True,
+            "fsync_interval": 2.0,
+            "compact_after_records": 2000
+        },
+        "large_file": {
+            "enabled": True,
+            "size_mb": 32,
+            "lines": 500000,
+            "line_length": 20000,
+            "highlighting": "lightweight",
+            "highlight_line_length": 2000,
+            "bracket_matching": "viewport",
+            "lint": "manual",
+            "auto_save": False
         }
     }
     config_path = "config.toml"
@@ -811,6 +861,15 @@ class KeyBinder:
     7. get_key_input
     
     """
+    # Editor methods that modify (or materialise) the whole document; they are
+    # refused while a read-only file view is open.
+    READ_ONLY_BLOCKED_ACTIONS = frozenset({
+        "cut", "paste", "undo", "redo", "search_and_replace", "select_all",
+        "handle_delete", "handle_backspace", "handle_enter", "handle_smart_tab",
+        "handle_smart_unindent", "toggle_comment_block", "save_file", "save_file_as",
+        "run_lint_async",
+    })
+
     def __init__(self, editor: "SwayEditor"):
         """
         Initializes the KeyBinder.
@@ -867,6 +926,8 @@ class KeyBinder:
             try:
                 # --- Attempt 1: Direct key lookup (handles integers and string keys like 'alt-h') ---
                 if key in self.action_map:
+                    if self._refuse_in_read_only(self.action_map[key]):
+                        return True
                     logging.debug(
                         f"handle_input: Key '{key}' (type: {type(key).__name__}) found directly in action_map. "
                         f"Calling method: {self.action_map[key].__name__}"
@@ -889,6 +950,8 @@ class KeyBinder:
                 if isinstance(key, str) and len(key) == 1:
                     key_code_for_action_map = ord(key)
                     if key_code_for_action_map in self.action_map:
+                        if self._refuse_in_read_only(self.action_map[key_code_for_action_map]):
+                            return True
                         logging.debug(
                             f"handle_input: Ordinal value {key_code_for_action_map} of string key '{key}' found in action_map. "
                             f"Calling method: {self.action_map[key_code_for_action_map].__name__}"
@@ -922,6 +985,11 @@ class KeyBinder:
                     f"handle_input: Key {repr(key)} (derived code for map: {key_code_for_action_map}) not handled by action_map yet.")
 
                 # --- Attempt 3: Handle as a printable character if not mapped and plausible ---
+                if self.editor.read_only and (is_potentially_printable_char_string or (
+                        isinstance(key, int) and 32 <= key < 1114112)):
+                    self.editor._set_status_message(self.editor.read_only_message())
+                    return True
+
                 if is_potentially_printable_char_string:  # key was str, len 1, not a control char, ord(key) not in map
                     if wcswidth(key) > 0:  # Check if it's displayable with a positive width
                         logging.debug(
@@ -979,6 +1047,19 @@ class KeyBinder:
                 self.editor._set_status_message(f"Input handler error (see log): {str(e_handler)[:50]}")
                 return True  # Assume redraw is needed to display the error status
 
+    def _refuse_in_read_only(self, method: Callable[..., Any]) -> bool:
+        """
+        Returns True (after setting a status message) if `method` must not run
+        because the current document is read-only (a file view, or still loading).
+        """
+        if not self.editor.read_only:
+            return False
+        if getattr(method, "__name__", "") not in self.READ_ONLY_BLOCKED_ACTIONS:
+            return False
+        logging.debug(f"handle_input: '{method.__name__}' refused, document is read-only.")
+        self.editor._set_status_message(self.editor.read_only_message())
+        return True
+
     def _load_keybindings(self) -> dict[str, list[Union[int, str]]]:
         """
         Loads and returns the keybindings configuration for the editor.
@@ -1081,6 +1162,11 @@ class KeyBinder:
             "extend_selection_left": ["shift+left", curses.KEY_SLEFT, "alt-h"],
             "extend_selection_right": ["shift+right", curses.KEY_SRIGHT, "alt-l"],
             "handle_backspace": ["backspace"] + get_backspace_code(),
+            "next_buffer": ["alt-n"],
+            "prev_buffer": ["alt-p"],
+            "list_buffers": ["f8", 272],
+            "close_buffer": ["alt-w"],
+            "toggle_hex_view": ["alt-x"],
         }
 
         user_keybindings_config = self.config.get("keybindings", {})
@@ -1341,10 +1427,13 @@ class KeyBinder:
             "handle_backspace": self.editor.handle_backspace,
             "handle_enter": self.editor.handle_enter,
             "request_ai_explanation": self.editor.select_ai_provider_and_ask,
+            "next_buffer": self.editor.next_buffer,
+            "prev_buffer": self.editor.prev_buffer,
+            "list_buffers": self.editor.list_buffers,
+            "close_buffer": self.editor.close_buffer,
+            "toggle_hex_view": self.editor.toggle_hex_view,
             
-            "debug_show_lexer": lambda: self.editor._set_status_message(
-                f"Current Lexer: {self.editor._lexer.name if self.editor._lexer else 'None'}"
-            )
+            "debug_show_lexer": self.editor.debug_show_lexer,
         }
 
         final_key_action_map: Dict[Union[int, str], Callable] = {}
@@ -1454,8 +1543,8 @@ class KeyBinder:
         # This is a standard way many terminals send Alt+<char>
         if seq.startswith('\x1b') and len(seq) == 2:
             letter = seq[1].lower()  # Get the second character after ESC
-            # Check if it's one of the expected HJKL letters
-            if letter in 'hjkl':
+            # HJKL extend the selection, N/P/W switch and close buffers
+            if letter in 'hjklnpw':
                 return f'alt-{letter}'  # Use a hyphen
         return ''
 
@@ -2877,6 +2966,38 @@ class History:
         self._undone_actions.clear()
         logging.debug("History: Undo/Redo stacks cleared.")
 
+    def _apply_line_changes(self, changes, text_key: str, log_prefix: str) -> bool:
+        """
+        Sets every `change["line_index"]` to `change[text_key]` (later changes win).
+
+        The affected rows are rewritten with one `_replace_lines()` call over
+        their span instead of one assignment per line.
+        Returns True if the text changed.
+        """
+        text = self.editor.text
+        targets: Dict[int, str] = {}
+        for change_item in changes:
+            idx = change_item["line_index"]
+            line_text = change_item.get(text_key)
+            if line_text is None:
+                logging.warning(f"{log_prefix}: Missing '{text_key}' for line {idx}. Skipping.")
+            elif not 0 <= idx < len(text):
+                logging.warning(f"{log_prefix}: Line index {idx} out of bounds for text len {len(text)}. Skipping.")
+            else:
+                targets[idx] = line_text
+        if not targets:
+            return False
+        first, last = min(targets), max(targets)
+        lines = text[first:last + 1]
+        changed = False
+        for idx, line_text in targets.items():
+            if lines[idx - first] != line_text:
+                lines[idx - first] = line_text
+                changed = True
+        if changed:
+            self.editor._replace_lines(first, last + 1, lines)
+        return changed
+
 
     def undo(self) -> bool:
         """
@@ -2899,7 +3020,7 @@ class History:
                 return self.editor.status_message != original_status  # Redraw if status changed
 
             # Store current state to compare against after undoing the action
-            pre_undo_text_tuple = tuple(self.editor.text)
+            pre_undo_text_state = self.editor._text_state()
             pre_undo_cursor_pos = (self.editor.cursor_y, self.editor.cursor_x)
             pre_undo_scroll_pos = (self.editor.scroll_top, self.editor.scroll_left)
             pre_undo_selection_state = (self.editor.is_selecting, self.editor.selection_start, self.editor.selection_end)
@@ -2945,9 +3066,9 @@ class History:
                         original_suffix_from_line_row = self.editor.text[end_row_affected_by_original_insert][
                                                         len(lines_inserted[-1]):]
 
-                        self.editor.text[row] = self.editor.text[row][:col] + original_suffix_from_line_row
-                        # Delete the lines that were created by the multi-line insert
-                        del self.editor.text[row + 1: end_row_affected_by_original_insert + 1]
+                        # Rejoin the split line and drop the lines created by the insert in one splice
+                        self.editor._replace_lines(row, end_row_affected_by_original_insert + 1,
+                                                   [self.editor.text[row][:col] + original_suffix_from_line_row])
 
                     self.editor.cursor_y, self.editor.cursor_x = row, col
                     content_or_selection_changed_by_this_undo = True
@@ -2970,8 +3091,7 @@ class History:
                             f"Undo delete_newline: Invalid position ({y},{x_at_split_point}) for split. Action: {last_action}")
 
                     line_to_be_split = self.editor.text[y]
-                    self.editor.text[y] = line_to_be_split[:x_at_split_point]
-                    self.editor.text.insert(y + 1, content_of_merged_line)
+                    self.editor._replace_lines(y, y + 1, [line_to_be_split[:x_at_split_point], content_of_merged_line])
                     self.editor.cursor_y, self.editor.cursor_x = y, x_at_split_point  # Cursor to the split point
                     content_or_selection_changed_by_this_undo = True
 
@@ -2995,19 +3115,8 @@ class History:
                     if not changes:
                         logging.warning(f"Undo ({action_type}): No 'changes' data in action. Action: {last_action}")
 
-                    for change_item in reversed(changes):  # Restore original_text in reverse order of application
-                        idx = change_item["line_index"]
-                        original_line_text = change_item.get("original_text")
-                        if original_line_text is None:
-                            logging.warning(f"Undo ({action_type}): Missing 'original_text' for line {idx}. Skipping.")
-                            continue
-                        if idx < len(self.editor.text):
-                            if self.editor.text[idx] != original_line_text:
-                                self.editor.text[idx] = original_line_text
-                                content_or_selection_changed_by_this_undo = True
-                        else:
-                            logging.warning(
-                                f"Undo ({action_type}): Line index {idx} out of bounds for text len {len(self.editor.text)}. Skipping.")
+                    if self._apply_line_changes(reversed(changes), "original_text", f"Undo ({action_type})"):
+                        content_or_selection_changed_by_this_undo = True
 
                     # Restore selection and cursor state as it was *before* the original operation
                     selection_state_before_op = last_action.get("selection_before")
@@ -3046,6 +3155,17 @@ class History:
                             (self.editor.cursor_y, self.editor.cursor_x) != (current_curs_y, current_curs_x)):
                         content_or_selection_changed_by_this_undo = True
 
+                elif action_type == "external_change":
+                    # Lines changed on disk (SwayEditor._apply_external_lines): put the old ones back,
+                    # bottom-up, so the positions of the hunks above stay valid.
+                    for _start, old_lines, new_start, new_lines in reversed(last_action.get("hunks", [])):
+                        self.editor._replace_lines(new_start, new_start + len(new_lines), list(old_lines))
+                    self.editor.cursor_y, self.editor.cursor_x = last_action.get(
+                        "cursor_before", (self.editor.cursor_y, self.editor.cursor_x))
+                    self.editor.is_selecting = False
+                    self.editor.selection_start = self.editor.selection_end = None
+                    content_or_selection_changed_by_this_undo = True
+
                 else:
                     logging.warning(f"Undo: Unknown action type '{action_type}'. Cannot undo. Action: {last_action}")
                     self._action_history.append(last_action)  # Put it back on history if not handled
@@ -3077,6 +3197,8 @@ class History:
                 self.editor.modified = True
                 logging.debug(
                     f"Undo: Action history not empty ({len(self._action_history)} items), file considered modified.")
+            if action_type == "external_change":
+                self.editor.modified = True  # the buffer no longer matches the file on disk
 
             # Ensure cursor and scroll are valid after any operation
             self.editor._ensure_cursor_in_bounds()
@@ -3085,7 +3207,7 @@ class History:
             # Determine if a redraw is needed based on actual state changes
             final_redraw_needed = False
             if (content_or_selection_changed_by_this_undo or
-                    tuple(self.editor.text) != pre_undo_text_tuple or
+                    self.editor._text_changed_since(pre_undo_text_state) or
                     (self.editor.cursor_y, self.editor.cursor_x) != pre_undo_cursor_pos or
                     scroll_changed_by_clamp or
                     (self.editor.is_selecting, self.editor.selection_start, self.editor.selection_end) != pre_undo_selection_state or
@@ -3123,7 +3245,7 @@ class History:
                 return self.editor.status_message != original_status  # Redraw if status message changed
 
             # Store current state to compare against after redoing the action
-            pre_redo_text_tuple = tuple(self.editor.text)
+            pre_redo_text_state = self.editor._text_state()
             pre_redo_cursor_pos = (self.editor.cursor_y, self.editor.cursor_x)
             pre_redo_scroll_pos = (self.editor.scroll_top, self.editor.scroll_left)
             pre_redo_selection_state = (self.editor.is_selecting, self.editor.selection_start, self.editor.selection_end)
@@ -3179,7 +3301,8 @@ class History:
                         raise IndexError(
                             f"Redo delete_newline: State mismatch for re-merging at line {y_target_line}. Action: {action_to_redo}")
 
-                    self.editor.text[y_target_line] += self.editor.text.pop(y_target_line + 1)
+                    self.editor._replace_lines(y_target_line, y_target_line + 2,
+                                               [self.editor.text[y_target_line] + action_to_redo["text"]])
                     self.editor.cursor_y, self.editor.cursor_x = y_target_line, x_cursor_after_merge
                     content_or_selection_changed_by_this_redo = True
 
@@ -3205,18 +3328,8 @@ class History:
                     if not changes:
                         logging.warning(f"Redo ({action_type}): No 'changes' data in action. Action: {action_to_redo}")
 
-                    for change_item in changes:  # Apply in the original order
-                        idx = change_item["line_index"]
-                        new_line_text = change_item.get("new_text")
-                        if new_line_text is None:
-                            logging.warning(f"Redo ({action_type}): Missing 'new_text' for line {idx}. Skipping.")
-                            continue
-                        if idx < len(self.editor.text):
-                            if self.editor.text[idx] != new_line_text:
-                                self.editor.text[idx] = new_line_text
-                                content_or_selection_changed_by_this_redo = True
-                        else:
-                            logging.warning(f"Redo ({action_type}): Line index {idx} out of bounds. Skipping.")
+                    if self._apply_line_changes(changes, "new_text", f"Redo ({action_type})"):  # original order
+                        content_or_selection_changed_by_this_redo = True
 
                     selection_state_after_op = action_to_redo.get("selection_after")
                     cursor_state_no_sel_after_op = action_to_redo.get("cursor_after_no_selection")
@@ -3249,6 +3362,15 @@ class History:
                     elif not content_or_selection_changed_by_this_redo and changes:  # Text didn't change but selection/cursor might have
                         content_or_selection_changed_by_this_redo = True
 
+                elif action_type == "external_change":
+                    for start, old_lines, _new_start, new_lines in reversed(action_to_redo.get("hunks", [])):
+                        self.editor._replace_lines(start, start + len(old_lines), list(new_lines))
+                    self.editor.cursor_y, self.editor.cursor_x = action_to_redo.get(
+                        "cursor_after", (self.editor.cursor_y, self.editor.cursor_x))
+                    self.editor.is_selecting = False
+                    self.editor.selection_start = self.editor.selection_end = None
+                    content_or_selection_changed_by_this_redo = True
+
                 else:
                     logging.warning(f"Redo: Unknown action type '{action_type}'. Cannot redo. Action: {action_to_redo}")
                     self._undone_actions.append(action_to_redo)  # Put it back on undone stack
@@ -3279,7 +3401,7 @@ class History:
 
             final_redraw_needed = False
             if (content_or_selection_changed_by_this_redo or
-                    tuple(self.editor.text) != pre_redo_text_tuple or
+                    self.editor._text_changed_since(pre_redo_text_state) or
                     (self.editor.cursor_y, self.editor.cursor_x) != pre_redo_cursor_pos or
                     scroll_changed_by_clamp or
                     (self.editor.is_selecting, self.editor.selection_start, self.editor.selection_end) != pre_redo_selection_state or
@@ -3314,6 +3436,8 @@ class LinterBridge:
         self.is_lsp_initialized = False
         self.lsp_seq_id = 0
         self.lsp_doc_versions: dict[str, int] = {}
+        # `_text_state()` last sent, per document URI
+        self._lsp_synced_states: dict[str, Tuple["weakref.ref[TextBuffer]", int]] = {}
 
 
     def run_linter(self, code: Optional[str] = None) -> bool:
@@ -3349,8 +3473,9 @@ class LinterBridge:
         # 1a. Check for and run external DevOps linters first.
         if HAS_DEVOPS_LINTERS and current_lang in lint_devops.DEVOPS_LINTERS:
             if code is None:
+                # The worker joins the snapshot, so the lock is held only to take it.
                 with self.editor._state_lock:
-                    code_to_lint = os.linesep.join(self.editor.text)
+                    code_to_lint = self.editor.text.snapshot()
             else:
                 code_to_lint = code
 
@@ -3375,12 +3500,12 @@ class LinterBridge:
             )
             return self.editor.status_message != original_status
 
-        # 2. Prepare Python code for linting via LSP.
+        # 2. Prepare Python code for linting via LSP (joined below, outside the lock).
+        text_state = None
         if code is None:
             with self.editor._state_lock:
-                code_to_lint = os.linesep.join(self.editor.text)
-        else:
-            code_to_lint = code
+                snapshot = self.editor.text.snapshot()
+                text_state = self.editor._text_state()
 
         # 3. Start or reuse the LSP server.
         self._start_lsp_server_if_needed()
@@ -3394,8 +3519,15 @@ class LinterBridge:
             )
             return self.editor.status_message != original_status
 
-        # 4. Send didOpen or didChange notification to the LSP server.
+        # 4. Send didOpen or didChange notification to the LSP server –
+        #    unless the server already has this exact buffer version.
         uri = self._get_lsp_uri()
+        if (text_state is not None and uri in self.lsp_doc_versions
+                and not self.editor._text_changed_since(self._lsp_synced_states.get(uri))):
+            self.editor._set_status_message("Ruff: No changes since the last analysis.", is_lint_status=True)
+            return self.editor.status_message != original_status
+        code_to_lint = os.linesep.join(snapshot) if code is None else code
+        self._lsp_synced_states[uri] = text_state
         if uri not in self.lsp_doc_versions:
             self._send_lsp_did_open(code_to_lint)
             op = "didOpen"
@@ -3415,12 +3547,14 @@ class LinterBridge:
         )
         return self.editor.status_message != original_status
 
-    def _run_devops_linter_thread(self, language: str, code: str):
+    def _run_devops_linter_thread(self, language: str, code: Union[str, BufferSnapshot]):
         """
         Worker-функция для потока, запускающая внешний линтер.
         Результат помещается в основную очередь сообщений редактора.
         """
         try:
+            if not isinstance(code, str):
+                code = os.linesep.join(code)
             # Используем синхронный вызов из lint_devops, т.к. мы уже в отдельном потоке
             result = lint_devops.run_devops_linter(language, code)
             # Помещаем результат в главную очередь сообщений, чтобы он отобразился в статус-баре
@@ -3769,6 +3903,13 @@ class LinterBridge:
         Returns:
             None
         """
+        # Diagnostics for a document version that has since been replaced are stale.
+        version = params.get("version")
+        current_version = self.lsp_doc_versions.get(params.get("uri"))
+        if version is not None and current_version is not None and version != current_version:
+            logging.debug(f"Dropping stale diagnostics for version {version} (current: {current_version}).")
+            return
+
         diagnostics: list[dict] = params.get("diagnostics", [])
 
         # Case 1: No issues found
@@ -4657,11 +4798,15 @@ class DrawScreen:
             fname = os.path.basename(self.editor.filename) if self.editor.filename else "No Name"
             lexer = self.editor._lexer.name if self.editor._lexer else "plain text"
             
-            left = (f" {icon} {fname}{'*' if self.editor.modified else ''}"
+            buffers = self.editor.buffers
+            position = f" [{buffers.active + 1}/{len(buffers)}]" if len(buffers) > 1 else ""
+            left = (f" {icon} {fname}{'*' if self.editor.modified else ''}{position}"
                     f" | {lexer} | {self.editor.encoding.upper()}"  # Using editor's encoding
+                    f"{'+' + self.editor.compression.upper() if self.editor.compression else ''}"
                     f" | Ln {self.editor.cursor_y + 1}/{len(self.editor.text)}, "
                     f"Col {self.editor.cursor_x + 1}"
-                    f" | {'INS' if self.editor.insert_mode else 'REP'} ")
+                    f" | {self.editor.edit_mode_label()}"
+                    f"{' | LARGE' if self.editor.large_file else ''} ")
 
             # Access the Git info tuple from the GitBridge component
             g_branch, _g_user, g_commits = self.editor.git.info
@@ -5181,6 +5326,98 @@ class SwayEditor:
             except Exception as e:
                 logging.error(f"Failed to add status message to queue: '{message_for_statusbar}': {e}", exc_info=True)
 
+    # ───────────────────── Document buffer ─────────────────────
+    @property
+    def text(self) -> TextBuffer:
+        """The document lines, stored in the configured `TextBuffer` backend."""
+        return self._text
+
+    @text.setter
+    def text(self, lines: Any) -> None:
+        """
+        Replaces the whole document.
+
+        Plain lists/tuples (as produced by file loading, revert, search & replace …)
+        are wrapped into the backend selected by `editor.buffer_backend`; an existing
+        `TextBuffer` is adopted as-is. The edit event bus follows the new buffer and
+        publishes the replacement as one edit.
+        """
+        previous = getattr(self, "_text", None)
+        self._text = self._new_text_buffer(lines)
+        if previous is not self._text:
+            self.edit_events.attach(self._text, replaced=previous)
+        if previous is not None and previous is not self._text:
+            previous.close()  # releases the mmap of a replaced file view
+
+    def _new_text_buffer(self, lines: Any) -> TextBuffer:
+        """Wraps `lines` into the configured `TextBuffer` backend (a `TextBuffer` is returned as-is)."""
+        if isinstance(lines, TextBuffer):
+            return lines
+        backend = getattr(self, "config", {}).get("editor", {}).get("buffer_backend", DEFAULT_BUFFER_BACKEND)
+        return create_buffer(lines, backend)
+
+    def _text_state(self) -> Tuple["weakref.ref[TextBuffer]", int]:
+        """
+        Cheap change-detection token for the document: a weak reference to the
+        buffer and its version.
+
+        Pass it to `_text_changed_since` instead of copying the document
+        (e.g. `tuple(self.text)`) before and after an operation.
+        """
+        return weakref.ref(self._text), self._text.version
+
+    def _text_changed_since(self, state: Optional[Tuple["weakref.ref[TextBuffer]", int]]) -> bool:
+        """True if the document was edited or replaced after `state` was taken (or `state` is None)."""
+        if state is None:
+            return True
+        buffer_ref, version = state
+        return buffer_ref() is not self._text or version != self._text.version
+
+    @property
+    def read_only(self) -> bool:
+        """
+        True while the document must not be edited: it is a read-only file view
+        (see `MmapFileView`) or is still being loaded in the background.
+        """
+        return self._text.read_only or getattr(self, "_load_job", None) is not None
+
+    def read_only_message(self) -> str:
+        """Status text explaining why an edit was refused (see `read_only`)."""
+        if self._load_job is not None:
+            if self._load_job.name == STDIN_NAME:
+                return "Standard input is still being read (Esc to stop)"
+            return "File is still loading (Esc to cancel)"
+        return "Read-only view: editing is disabled"
+
+    def _update_large_file_profile(self, size_bytes: Optional[int] = None, line_count: Optional[int] = None,
+                                   longest_line: Optional[int] = None) -> None:
+        """
+        Re-evaluates the `[large_file]` profile for the current document.
+
+        Called when a file is opened and, for background loads, as lines arrive;
+        measurements that are not known yet are passed as None. Once a document
+        has switched to the profile it keeps it until another one is opened.
+        """
+        profile = evaluate_large_file(large_file_settings(self.config, self.filename),
+                                      size_bytes, line_count, longest_line)
+        if profile is None or self.large_file is not None:
+            return
+        self.large_file = profile
+        logging.info(f"Large-file profile for '{self.filename or STDIN_NAME}' ({', '.join(profile.reasons)}): "
+                     f"highlighting={profile.highlighting}, brackets={profile.bracket_matching}, "
+                     f"lint={profile.lint}, auto_save={profile.auto_save}")
+        if profile.highlighting != "full":
+            self._lexer = None  # drop a content-based guess made before the switch
+            self.detect_language()
+
+    def edit_mode_label(self) -> str:
+        """Mode indicator for the status bar: LOAD, VIEW, INS or REP."""
+        if self._load_job is not None:
+            return "LOAD"
+        if self._text.read_only:
+            return "VIEW"
+        return "INS" if self.insert_mode else "REP"
+
     def __init__(self, stdscr: "curses.window") -> None:
         """
         Creates and fully initializes a `SwayEditor` instance.
@@ -5224,6 +5461,9 @@ class SwayEditor:
             RuntimeError: Re-raises critical exceptions that make the editor
                 unusable (e.g., failure to set up keybindings).
         """
+        self._started_at = time.monotonic()  # for the time to first paint (see `run`)
+        self.first_paint_seconds: Optional[float] = None
+
         # ───────────────────── Terminal low-level tweaks ─────────────────────
         if sys.platform != "win32":
             try:
@@ -5260,6 +5500,9 @@ class SwayEditor:
 
         self.user_colors = self.config.get("colors", {})
         self.colors: dict[str, int] = {}
+        # Resolved token colours by (lexer class, theme) (see `_token_color_table`)
+        self._token_color_tables: Dict[Tuple[type, frozenset], TokenColorTable] = {}
+        self._theme_key: frozenset = frozenset()  # the colours of `init_colors`
         self.init_colors()
 
         # ───────────────────── Clipboard support ─────────────────────────────
@@ -5309,16 +5552,36 @@ class SwayEditor:
         # ───────────────────── Language / Highlighting state ──────────────────
         self.current_language: Optional[str] = None
         self._lexer: Optional[TextLexer] = None
+        self._highlighter: Optional[IncrementalHighlighter] = None  # lexer states of the shown document
+        self._token_cache: Optional[TokenCache] = None  # its highlighted lines (see `_buffer_token_cache`)
+        # Lexes the lines around the viewport off the UI thread (see highlight_worker.py); None = in the draw
+        self._tokenizer: Optional[TokenizeWorker] = (
+            TokenizeWorker() if self.config.get("editor", {}).get("background_highlighting", True) else None)
+        self._tokenize_key: Optional[tuple] = None  # the viewport and document version of the last job
+        self._highlight_top = 0  # first line highlighted by the last draw, for the scroll direction
 
         # ───────────────────── Buffer & Caret position ───────────────────────
+        # Structured change notifications for every buffer mutation (see edit_events.py)
+        self.edit_events = EditEventBus()
         self.text = [""]
+        self._load_job: Optional[BackgroundLoad] = None  # progressive open in flight
+        self._load_restore_state: Optional[Dict[str, Any]] = None
         self.cursor_x = 0
         self.cursor_y = 0
         self.scroll_top = 0
         self.scroll_left = 0
         self.modified = False
         self.encoding = "UTF-8"
+        self.compression: Optional[str] = None  # codec of a compressed file ("gzip", "bz2", "xz")
+        self.large_file: Optional[LargeFileProfile] = None  # cheaper feature set for a huge file
         self.filename: Optional[str] = None
+        self._save_job: Optional[BackgroundSave] = None  # atomic save in flight
+        self._save_context: Dict[str, Any] = {}
+        self._saved_state: Optional[Tuple["weakref.ref[TextBuffer]", int]] = None  # `_text_state()` of the last save
+        self._journal: Optional[SwapJournal] = None  # crash-recovery journal of the buffer
+        # The file as last read or written: fingerprint (None = not watched) and text (merge base)
+        self._disk_state: Optional[Fingerprint] = None
+        self._disk_base: Optional[Sequence[str]] = None
 
         # Selection & Search state
         self.selection_start: Optional[tuple[int, int]] = None
@@ -5329,6 +5592,31 @@ class SwayEditor:
         self.current_match_idx = -1
         self.highlighted_matches: list[tuple[int, int, int]] = []
         self.custom_syntax_patterns = []
+        # `custom_syntax_patterns` compiled for the colour theme (see `detect_language`)
+        self._custom_rules: Optional[RuleHighlighter] = None
+        # Open documents; the attributes above belong to the one shown (see buffer_list.py)
+        self.buffers = BufferList()
+        # Files from the command line still being read by the preload pool, by path
+        self._preloader: Optional[FilePreloader] = None
+        self._preloads: Dict[str, BufferState] = {}
+        self._preload_failed: List[str] = []
+        # Notices when the shown file is changed by another program (see `_poll_disk_changes`)
+        editor_settings = self.config.get("editor", {})
+        try:
+            watch_interval = float(editor_settings.get("watch_poll_interval", 2.0))
+        except (TypeError, ValueError):
+            logging.warning("Invalid editor.watch_poll_interval – polling every 2 s.")
+            watch_interval = 2.0
+        self._file_watcher = create_watcher(editor_settings.get("watch_files", "auto"), watch_interval)
+        self._watched_path: Optional[str] = None
+        self._disk_check_pending = False
+        # Caret, encoding and language of files from earlier launches (see session_state.py)
+        self._session: Optional[Session] = None
+        if self.config.get("session", {}).get("enabled", True):
+            self._session = load_session() or Session()
+        # Synchronous: matches computed later in the same frame must not be shifted again.
+        self.edit_events.subscribe(self._shift_search_matches)
+        self.edit_events.subscribe(self._update_highlighter)
 
         # ───────────────── Drawing & Component Initialization ──────────────────
         self.visible_lines = 0
@@ -5366,6 +5654,9 @@ class SwayEditor:
         except locale.Error as exc:
             logging.error("Could not set system locale: %s", exc, exc_info=True)
 
+        # ───────────────────── Crash-recovery journal ────────────────────────
+        self._journal_attach(recover=False)
+
         logging.info("SwayEditor initialized successfully.")
 
 
@@ -5410,6 +5701,14 @@ class SwayEditor:
         logging.debug("Delegating linter/LSP shutdown to LinterBridge.")
         self.linter_bridge.shutdown()
 
+        # --- 3. Finish a running save, stop a background file load, release the buffer ---
+        self._wait_for_file_save()
+        if self._load_job is not None:
+            self._load_job.cancel()
+        # Unsaved changes stay recoverable from the journal.
+        self._journal_close(discard=not self.modified)
+        self.text.close()
+
         logging.info("SwayEditor components have been shut down.")
         
 
@@ -5772,12 +6071,10 @@ class SwayEditor:
         if start_row == end_row:
             self.text[start_row] = self.text[start_row][:start_col] + self.text[start_row][end_col:]
         else:
-            # Часть первой строки до start_col + часть последней строки после end_col
+            # Часть первой строки до start_col + часть последней строки после end_col,
+            # средние строки и последняя удаляются тем же сплайсом
             new_first = self.text[start_row][:start_col] + self.text[end_row][end_col:]
-            # Удаляем полностью средние строки и последнюю
-            del self.text[start_row + 1:end_row + 1]
-            # Обновляем первую строку
-            self.text[start_row] = new_first
+            self._replace_lines(start_row, end_row + 1, [new_first])
 
         self.modified = True  # Обновляем статус модификации
 
@@ -5794,24 +6091,17 @@ class SwayEditor:
             return self.unindent_current_line()  # This method now returns bool
 
 
-    @functools.lru_cache(maxsize=20000)
-    def _get_tokenized_line(self, line_content: str, lexer_id: int, custom_rules_exist: bool) -> List[Tuple[str, int]]:
+    def _get_tokenized_line(self, line_content: str, custom_rules_exist: bool) -> List[Tuple[str, int]]:
         """
-        Tokenizes a single line of text for syntax highlighting.
-
-        This method acts as a dispatcher:
-        1. If `custom_rules_exist` is True, it uses the editor's custom regex-based
-        highlighter (`apply_custom_highlighting`).
-        2. Otherwise, it falls back to using the currently set Pygments lexer.
+        Tokenizes a single line of text for syntax highlighting (see `_tokenize_line`).
 
-        The results are memoized using `@lru_cache` to significantly improve
-        performance by avoiding re-tokenization of identical lines. The `lexer_id`
-        and `custom_rules_exist` parameters are part of the cache key to ensure
-        that changes to the lexer or rules invalidate the cache correctly.
+        The results are kept in the buffer's token cache (`_buffer_token_cache`)
+        to avoid re-tokenizing identical lines. The lexer class, the colour theme
+        and `custom_rules_exist` are part of the cache key, so a change of language
+        needs no invalidation: entries of the old one simply age out.
 
         Args:
             line_content (str): The text content of the line to tokenize.
-            lexer_id (int): The ID of the current Pygments lexer object.
             custom_rules_exist (bool): A flag indicating if custom syntax rules
                                     should be used instead of Pygments.
 
@@ -5819,6 +6109,23 @@ class SwayEditor:
             A list of (substring, curses_attribute) tuples representing the
             colorized segments of the line.
         """
+        cache = self._buffer_token_cache()
+        cache_key = ("custom" if custom_rules_exist else "lines", type(self._lexer), self._theme_key)
+        cached = cache.get(line_content, cache_key, None)
+        if cached is not None:
+            return cached[0]
+        segments = self._tokenize_line(line_content, custom_rules_exist)
+        return cache.put(line_content, cache_key, None, segments, None)[0]
+
+    def _tokenize_line(self, line_content: str, custom_rules_exist: bool) -> List[Tuple[str, int]]:
+        """
+        Tokenizes a single line of text on its own, without caching.
+
+        This method acts as a dispatcher:
+        1. If `custom_rules_exist` is True, it uses the editor's custom regex-based
+        highlighter (`apply_custom_highlighting`).
+        2. Otherwise, it falls back to using the currently set Pygments lexer.
+        """
         # --- Dispatch to the correct highlighting method ---
         if custom_rules_exist:
             # Use custom regex-based highlighting if rules are defined for the language.
@@ -5828,102 +6135,38 @@ class SwayEditor:
         if self._lexer is None:
             return [(line_content, self.colors.get("default", curses.A_NORMAL))]
 
-        # This is a simplified color map. You can expand it or make it more dynamic.
-        # It maps Pygments token types to the semantic color names from your config.
-        token_color_map = {
-            Token.Keyword: self.colors.get("keyword"),
-            Token.Name.Function: self.colors.get("function"),
-            Token.Name.Class: self.colors.get("class", self.colors.get("type")),
-            Token.Name.Decorator: self.colors.get("decorator"),
-            Token.Literal.String: self.colors.get("string"),
-            Token.Literal.String.Doc: self.colors.get("comment"),
-            Token.Literal.Number: self.colors.get("number"),
-            Token.Comment: self.colors.get("comment"),
-            Token.Operator: self.colors.get("operator"),
-            Token.Punctuation: self.colors.get("default"),
-            Token.Name.Builtin: self.colors.get("builtin"),
-            Token.Name.Tag: self.colors.get("tag"),
-            Token.Name.Attribute: self.colors.get("attribute"),
-            Token.Error: self.colors.get("error"),
-            
-            Token.Keyword: curses.color_pair(2), Token.Keyword.Constant: curses.color_pair(2),
-            Token.Keyword.Declaration: curses.color_pair(2), Token.Keyword.Namespace: curses.color_pair(2),
-            Token.Keyword.Pseudo: curses.color_pair(2), Token.Keyword.Reserved: curses.color_pair(2),
-            Token.Keyword.Type: curses.color_pair(2), Token.Name.Builtin: curses.color_pair(7),
-            Token.Name.Function: curses.color_pair(3), Token.Name.Class: curses.color_pair(4),
-            Token.Name.Decorator: curses.color_pair(5), Token.Name.Exception: curses.color_pair(8) | curses.A_BOLD,
-            Token.Name.Variable: curses.color_pair(6), Token.Name.Attribute: curses.color_pair(6),
-            Token.Name.Tag: curses.color_pair(5), Token.Literal.String: curses.color_pair(3),
-            Token.Literal.String.Doc: curses.color_pair(1), Token.Literal.String.Interpol: curses.color_pair(3),
-            Token.Literal.String.Escape: curses.color_pair(5), Token.Literal.String.Backtick: curses.color_pair(3),
-            Token.Literal.String.Delimiter: curses.color_pair(3), Token.Literal.Number: curses.color_pair(4),
-            Token.Literal.Number.Float: curses.color_pair(4), Token.Literal.Number.Hex: curses.color_pair(4),
-            Token.Literal.Number.Integer: curses.color_pair(4), Token.Literal.Number.Oct: curses.color_pair(4),
-            Token.Comment: curses.color_pair(1), Token.Comment.Multiline: curses.color_pair(1),
-            Token.Comment.Preproc: curses.color_pair(1), Token.Comment.Special: curses.color_pair(1) | curses.A_BOLD,
-            Token.Operator: curses.color_pair(6), Token.Operator.Word: curses.color_pair(2),
-            Token.Punctuation: curses.color_pair(6), Token.Text: curses.color_pair(0),
-            Token.Text.Whitespace: curses.color_pair(0), Token.Error: curses.color_pair(8) | curses.A_BOLD,
-            Token.Generic.Heading: curses.color_pair(5) | curses.A_BOLD, Token.Generic.Subheading: curses.color_pair(5),
-            Token.Generic.Deleted: curses.color_pair(8), Token.Generic.Inserted: curses.color_pair(4),
-            Token.Generic.Emph: curses.color_pair(3) | curses.A_BOLD,
-            Token.Generic.Strong: curses.color_pair(2) | curses.A_BOLD,
-            Token.Generic.Prompt: curses.color_pair(7), Token.Generic.Output: curses.color_pair(0),
-        }
-        default_color = self.colors.get("default", curses.A_NORMAL)
-        
-        tokenized_segments = []
         try:
-            raw_tokens = list(lex(line_content, self._lexer))
-            if not raw_tokens and line_content:
-                return [(line_content, default_color)]
-            
-            for token_type, text_value in raw_tokens:
-                color_attr = default_color
-                # Traverse up the token tree to find a matching color.
-                # E.g., Token.Keyword.Constant will match Token.Keyword if not defined itself.
-                current_type = token_type
-                while current_type:
-                    if current_type in token_color_map:
-                        color_attr = token_color_map[current_type]
-                        break
-                    current_type = current_type.parent
-                tokenized_segments.append((text_value, color_attr or default_color))
-
+            raw_tokens = [(token_type, text_value) for token_type, text_value in lex(line_content, self._lexer)]
         except Exception as e:
             logging.error(f"Pygments tokenization error for line '{line_content[:70]}...': {e}")
-            return [(line_content, default_color)]
-
-        return tokenized_segments
-
-
-        # # A token-to-color mapping for various token types
-        # token_color_map = {
-        #     Token.Keyword: curses.color_pair(2), Token.Keyword.Constant: curses.color_pair(2),
-        #     Token.Keyword.Declaration: curses.color_pair(2), Token.Keyword.Namespace: curses.color_pair(2),
-        #     Token.Keyword.Pseudo: curses.color_pair(2), Token.Keyword.Reserved: curses.color_pair(2),
-        #     Token.Keyword.Type: curses.color_pair(2), Token.Name.Builtin: curses.color_pair(7),
-        #     Token.Name.Function: curses.color_pair(3), Token.Name.Class: curses.color_pair(4),
-        #     Token.Name.Decorator: curses.color_pair(5), Token.Name.Exception: curses.color_pair(8) | curses.A_BOLD,
-        #     Token.Name.Variable: curses.color_pair(6), Token.Name.Attribute: curses.color_pair(6),
-        #     Token.Name.Tag: curses.color_pair(5), Token.Literal.String: curses.color_pair(3),
-        #     Token.Literal.String.Doc: curses.color_pair(1), Token.Literal.String.Interpol: curses.color_pair(3),
-        #     Token.Literal.String.Escape: curses.color_pair(5), Token.Literal.String.Backtick: curses.color_pair(3),
-        #     Token.Literal.String.Delimiter: curses.color_pair(3), Token.Literal.Number: curses.color_pair(4),
-        #     Token.Literal.Number.Float: curses.color_pair(4), Token.Literal.Number.Hex: curses.color_pair(4),
-        #     Token.Literal.Number.Integer: curses.color_pair(4), Token.Literal.Number.Oct: curses.color_pair(4),
-        #     Token.Comment: curses.color_pair(1), Token.Comment.Multiline: curses.color_pair(1),
-        #     Token.Comment.Preproc: curses.color_pair(1), Token.Comment.Special: curses.color_pair(1) | curses.A_BOLD,
-        #     Token.Operator: curses.color_pair(6), Token.Operator.Word: curses.color_pair(2),
-        #     Token.Punctuation: curses.color_pair(6), Token.Text: curses.color_pair(0),
-        #     Token.Text.Whitespace: curses.color_pair(0), Token.Error: curses.color_pair(8) | curses.A_BOLD,
-        #     Token.Generic.Heading: curses.color_pair(5) | curses.A_BOLD, Token.Generic.Subheading: curses.color_pair(5),
-        #     Token.Generic.Deleted: curses.color_pair(8), Token.Generic.Inserted: curses.color_pair(4),
-        #     Token.Generic.Emph: curses.color_pair(3) | curses.A_BOLD,
-        #     Token.Generic.Strong: curses.color_pair(2) | curses.A_BOLD,
-        #     Token.Generic.Prompt: curses.color_pair(7), Token.Generic.Output: curses.color_pair(0),
-        # }
+            return [(line_content, self.colors.get("default", curses.A_NORMAL))]
+        if not raw_tokens and line_content:
+            return [(line_content, self.colors.get("default", curses.A_NORMAL))]
+        return self._colorize_tokens(raw_tokens)
+
+    def _colorize_tokens(self, raw_tokens: List[Tuple[Any, str]]) -> List[Tuple[str, int]]:
+        """
+        Turns Pygments `(token_type, text)` pairs into `(text, curses_attribute)` segments.
 
+        A token type without a colour of its own takes the colour of its closest
+        ancestor (`Token.Keyword.Constant` falls back to `Token.Keyword`); the
+        table of the current lexer has that resolved already (`_token_color_table`).
+        """
+        return self._token_color_table(self._lexer).colorize(raw_tokens)
+
+    def _token_color_table(self, lexer: Any) -> TokenColorTable:
+        """
+        The flattened token-type colours for `lexer` in the current colour theme,
+        built on first use (see token_colors.py).
+        """
+        key = (type(lexer), self._theme_key)
+        table = self._token_color_tables.get(key)
+        if table is None:
+            table = TokenColorTable(token_color_map(self.colors, curses.color_pair),
+                                    self.colors.get("default", curses.A_NORMAL), lexer_token_types(lexer))
+            self._token_color_tables[key] = table
+            logging.debug(f"Resolved {len(table.table)} token colours for {type(lexer).__name__}.")
+        return table
 
     # --- Syntax-highlighting helper ------------------------------
     def apply_syntax_highlighting_with_pygments(
@@ -5937,11 +6180,15 @@ class SwayEditor:
         This method dispatches to the appropriate tokenizer for each line,
         either the custom regex-based highlighter or the Pygments lexer,
         based on whether custom rules are defined for the current language.
+        Pygments lexing is incremental and carries the lexer state from line to
+        line (see `_line_highlighter`), so multi-line strings and YAML block
+        scalars are highlighted as such. With `editor.background_highlighting`
+        only cached lines (and a few more) are lexed here; the rest are drawn
+        plain and lexed by the tokenize worker (`_tokenize_ahead`).
 
         Args:
             lines: A list of raw string content for each line to be highlighted.
-            line_indices: The original buffer indices of the lines (unused here,
-                        but maintained for API consistency).
+            line_indices: The buffer indices of the lines (consecutive, as drawn).
 
         Returns:
             A list of lists, where each inner list contains (substring,
@@ -5952,23 +6199,119 @@ class SwayEditor:
             self.detect_language()
 
         highlighted: list[list[tuple[str, int]]] = []
-        lexer_id = id(self._lexer) if self._lexer else 0
+
+        # Large-file profile: draw everything plain, or only lines too long to lex cheaply.
+        plain_from_length = 0
+        if self.large_file is not None and self.large_file.highlighting != "full":
+            default_color = self.colors.get("default", curses.A_NORMAL)
+            if self.large_file.highlighting == "plain":
+                return [[(raw_line, default_color)] for raw_line in lines]
+            plain_from_length = self.large_file.highlight_line_length
         
         # Determine once if custom rules should be used for this language.
         has_custom_rules = bool(getattr(self, 'custom_syntax_patterns', []))
 
-        if has_custom_rules:
-            logging.debug("Applying custom syntax highlighting rules.")
-        else:
-            logging.debug(f"Applying Pygments highlighting with lexer: '{self._lexer.name if self._lexer else 'None'}'")
+        if not has_custom_rules and line_indices:
+            highlighter = self._line_highlighter()
+            highlighter.max_line_length = plain_from_length
+            if self._tokenizer is None:
+                return highlighter.highlight(self.text, line_indices[0], len(lines))
+            rows = highlighter.highlight(self.text, line_indices[0], len(lines), budget=DRAW_LEX_BUDGET)
+            self._tokenize_ahead(highlighter, line_indices[0], len(lines))
+            return rows
 
+        logging.debug("Applying custom syntax highlighting rules.")
         for raw_line in lines:
-            # Pass all three required arguments to the cached function.
-            segments = self._get_tokenized_line(raw_line, lexer_id, has_custom_rules)
+            if plain_from_length and len(raw_line) > plain_from_length:
+                highlighted.append([(raw_line, default_color)])
+                continue
+            segments = self._get_tokenized_line(raw_line, has_custom_rules)
             highlighted.append(segments)
 
         return highlighted
 
+    def _line_highlighter(self) -> IncrementalHighlighter:
+        """
+        The `IncrementalHighlighter` of the shown document, created for the current lexer.
+
+        Its lexer states follow the edits through `_update_highlighter`; if the
+        document was replaced or edited without it noticing, they are dropped.
+        """
+        highlighter = self._highlighter
+        colorize = self._token_color_table(self._lexer).colorize
+        if highlighter is None or highlighter.lexer is not self._lexer or highlighter.colorize != colorize:
+            highlighter = self._highlighter = IncrementalHighlighter(
+                self._lexer, colorize, cache=self._buffer_token_cache(),
+                lexer_key=(type(self._lexer), self._theme_key))
+        elif self._text_changed_since(highlighter.synced):
+            highlighter.reset()
+        highlighter.synced = self._text_state()
+        return highlighter
+
+    def _buffer_token_cache(self) -> TokenCache:
+        """
+        The token cache of the shown buffer, created on first use with a budget
+        of `editor.token_cache_mb`. Every buffer has its own; it moves with the
+        buffer on a switch and is dropped only when the buffer releases its text.
+        """
+        if self._token_cache is None:
+            try:
+                budget_mb = float(self.config.get("editor", {}).get("token_cache_mb", 16))
+            except (TypeError, ValueError):
+                logging.warning("Invalid editor.token_cache_mb – using 16 MB.")
+                budget_mb = 16.0
+            self._token_cache = TokenCache(max_bytes=int(max(budget_mb, 0.1) * 2 ** 20))
+        return self._token_cache
+
+    def _tokenize_ahead(self, highlighter: IncrementalHighlighter, first: int, count: int) -> None:
+        """
+        Submits the viewport and the lines around it to the tokenize worker
+        (lines drawn plain are repainted by `_poll_tokenizer`). A job for the
+        same viewport and document version is not submitted twice.
+        """
+        scrolled, self._highlight_top = first - self._highlight_top, first
+        key = (id(highlighter), id(self._text), self._text.version, first, count)
+        if key == self._tokenize_key:
+            return
+        self._tokenize_key = key
+        self._tokenizer.submit(make_job(highlighter, self.text, first, count, scrolled))
+
+    def _poll_tokenizer(self) -> bool:
+        """
+        Stores the lines lexed by the tokenize worker (main thread).
+
+        Returns:
+            bool: True if the shown document got highlighting it did not have.
+        """
+        if self._tokenizer is None:
+            return False
+        changed = False
+        for highlighter, results in self._tokenizer.poll():
+            shown = highlighter is self._highlighter and not self._text_changed_since(highlighter.synced)
+            if highlighter.apply(results, self.text if shown else None) and shown:
+                changed = True
+        return changed
+
+    def debug_show_lexer(self) -> bool:
+        """Shows the lexer of the shown buffer and the counters of its token cache (F12)."""
+        message = f"Current Lexer: {self._lexer.name if self._lexer else 'None'}"
+        if self._token_cache is not None:
+            message += f" | Token cache: {self._token_cache.summary()}"
+        logging.info(message)
+        self._set_status_message(message)
+        return True
+
+    def _update_highlighter(self, event: EditEvent) -> None:
+        """Edit-event subscriber that keeps the lexer states of `_line_highlighter` in step with the text."""
+        highlighter = self._highlighter
+        if highlighter is None or highlighter.synced is None:
+            return
+        buffer_ref, version = highlighter.synced
+        if buffer_ref() is not self._text or version + 1 != event.version:
+            return  # edits were missed (or the document replaced): `_line_highlighter` starts over
+        highlighter.on_edit(event.start[0], event.old_end[0], len(event.lines))
+        highlighter.synced = self._text_state()
+
     # --- Colour-initialisation helper -----------------------------
     def _detect_color_capabilities(self) -> tuple[bool, bool, int]:
         """
@@ -6015,6 +6358,7 @@ class SwayEditor:
                 # ... add other basic fallbacks as needed ...
                 "default": curses.A_NORMAL
             }
+            self._theme_key = frozenset(self.colors.items())
             return
 
         curses.start_color()
@@ -6082,9 +6426,11 @@ class SwayEditor:
         except Exception as e:
             logging.error(f"Failed to initialize search_highlight color: {e}")
             self.colors["search_highlight"] = curses.A_REVERSE # Fallback
+        # Keys the colour caches (token colour tables, highlighted lines) by theme.
+        self._theme_key = frozenset(self.colors.items())
 
 
-    def detect_language(self):
+    def detect_language(self, lexer: Any = None):
         """
         Detects the file's language, sets the Pygments lexer, and loads custom
         regex highlighting patterns from the configuration if they exist.
@@ -6095,46 +6441,28 @@ class SwayEditor:
         2.  If that fails (or no filename is present), it tries to guess the
             language from the file's content.
         3.  If both methods fail, it defaults to a plain `TextLexer`.
+        The steps are `file_preload.detect_lexer`; a `lexer` already chosen by
+        it (on a preload worker) is used as is.
         
         After determining the language, it checks the configuration for a
         `[syntax_highlighting.<language>]` section and loads any custom
         regex patterns defined there.
 
-        If the lexer or custom patterns change from the previous state, the
-        tokenization cache is cleared to ensure the UI updates correctly.
+        Highlighted lines are cached under the lexer (see `_get_tokenized_line`),
+        so a change of lexer or custom patterns needs no cache invalidation.
         """
         old_lexer_id = id(self._lexer) if self._lexer else None
         old_custom_patterns_tuple = tuple(getattr(self, 'custom_syntax_patterns', []))
         
-        new_lexer = None
-        try:
-            # Priority 1: Detect by filename. This is the most reliable method.
-            if self.filename and self.filename != "noname":
-                try:
-                    # Use get_lexer_for_filename, which correctly handles extensions.
-                    new_lexer = get_lexer_for_filename(self.filename, stripall=True)
-                    logging.debug(f"Pygments: Detected '{new_lexer.name}' using filename '{self.filename}'.")
-                except Exception:  # Pygments raises ClassNotFound, a subclass of Exception.
-                    logging.debug(f"Pygments: No lexer for filename '{self.filename}'. Falling back to content guess.")
-                    # Fallthrough to content guessing.
-
-            # Priority 2: Guess from content if filename detection failed or is not applicable.
-            if not new_lexer:
-                content_sample = "\n".join(self.text[:200])[:10000]
-                if content_sample.strip():
-                    try:
-                        new_lexer = guess_lexer(content_sample, stripall=True)
-                        logging.debug(f"Pygments: Guessed language by content: '{new_lexer.name}'.")
-                    except Exception:
-                        logging.debug("Pygments: Content guess failed. Using TextLexer as fallback.")
-                        new_lexer = TextLexer()
-                else:
-                    logging.debug("Pygments: No content to guess from. Using TextLexer.")
-                    new_lexer = TextLexer()
-
-        except Exception as e:
-            logging.error(f"An unexpected error occurred during language detection: {e}", exc_info=True)
-            new_lexer = TextLexer()
+        new_lexer = lexer
+        if new_lexer is None:
+            # guess_lexer() runs every lexer's analyser; the large-file profile skips it.
+            content_guess = self.large_file is None or self.large_file.highlighting == "full"
+            try:
+                new_lexer = detect_lexer(self.filename, self.text, content_guess)
+            except Exception as e:
+                logging.error(f"An unexpected error occurred during language detection: {e}", exc_info=True)
+                new_lexer = TextLexer()
 
         # Final fallback if something went wrong and new_lexer is still None.
         if new_lexer is None:
@@ -6166,61 +6494,31 @@ class SwayEditor:
                             logging.warning(f"Skipping invalid syntax rule for '{lang_key}': {rule}. Error: {e}")
                     # Stop after finding the first matching language key.
                     break 
-
-        # --- Clear Cache if Anything Changed ---
-        # Compare the new state (lexer ID and patterns) with the old state.
+        # Compile them for drawing once, here (see syntax_rules.py).
+        self._custom_rules = None
+        if self.custom_syntax_patterns:
+            self._custom_rules = RuleHighlighter(self.custom_syntax_patterns, self.colors,
+                                                 self.colors.get("default", curses.A_NORMAL))
+
+        # --- Log if Anything Changed ---
+        # Compare the new state (lexer ID and patterns) with the old state. Nothing has to be
+        # cleared: highlighted lines are cached per buffer and per lexer (see token_cache.py).
         new_lexer_id = id(self._lexer)
         new_custom_patterns_tuple = tuple(self.custom_syntax_patterns)
 
         if (new_lexer_id != old_lexer_id) or (new_custom_patterns_tuple != old_custom_patterns_tuple):
-            logging.info(
-                f"Pygments lexer or custom syntax rules changed to '{self._lexer.name}'. Clearing tokenization cache."
-            )
-            if hasattr(self, '_get_tokenized_line') and hasattr(self._get_tokenized_line, 'cache_clear'):
-                self._get_tokenized_line.cache_clear()
+            logging.info(f"Pygments lexer or custom syntax rules changed to '{self._lexer.name}'.")
             
-# new method:
     def apply_custom_highlighting(self, line: str) -> List[Tuple[str, int]]:
         """
         Applies syntax highlighting to a line using custom regex patterns from config.
+
+        Later rules recolour what earlier ones matched (see syntax_rules.py); the
+        rules are compiled by `detect_language` when it loads them.
         """
-        # Карта для преобразования имен цветов из конфига в атрибуты curses
-        color_map = self.colors
-
-        # Создаем "карту" цветов для каждого символа в строке
-        # Изначально все символы имеют цвет по умолчанию
-        line_len = len(line)
-        char_colors = [color_map.get("default", curses.A_NORMAL)] * line_len
-
-        # Применяем каждое правило
-        for pattern, color_name in self.custom_syntax_patterns:
-            color_attr = color_map.get(color_name, color_map["default"])
-            for match in pattern.finditer(line):
-                start, end = match.span()
-                # "Раскрашиваем" символы, попавшие в совпадение
-                for i in range(start, end):
-                    if i < line_len:
-                        char_colors[i] = color_attr
-
-        # Собираем строку обратно в сегменты с одинаковым цветом
-        if not line:
-            return [("", color_map["default"])]
-        
-        segments = []
-        current_segment_text = line[0]
-        current_segment_color = char_colors[0]
-        
-        for i in range(1, line_len):
-            if char_colors[i] == current_segment_color:
-                current_segment_text += line[i]
-            else:
-                segments.append((current_segment_text, current_segment_color))
-                current_segment_text = line[i]
-                current_segment_color = char_colors[i]
-        
-        segments.append((current_segment_text, current_segment_color))
-        
-        return segments
+        if self._custom_rules is None:
+            return [(line, self.colors.get("default", curses.A_NORMAL))]
+        return self._custom_rules.highlight(line)
 
 
     def delete_char_internal(self, row: int, col: int) -> str:
@@ -6769,18 +7067,30 @@ class SwayEditor:
     def goto_line(self) -> bool:
         """
         Moves the cursor to a specified line number. Supports absolute numbers,
-        relative numbers (+N, -N), and percentages (N%).
+        relative numbers (+N, -N), percentages (N%) and, for file views backed by a
+        `LineIndex`, byte offsets (@N or @0xHEX). In a file view, percentages are
+        measured in bytes so they work before the background index is complete.
         Returns True if the cursor, scroll position, or status message changed,
         False otherwise (e.g., invalid input but status didn't change from original).
         """
+        if isinstance(self.text, HexFileView):
+            return self._goto_offset()
         original_status = self.status_message
         original_cursor_pos = (self.cursor_y, self.cursor_x)
         original_scroll_top = self.scroll_top
 
+        line_index: Optional[LineIndex] = getattr(self.text, "line_index", None)
+        if isinstance(self.text, MmapFileView):
+            self.text.refresh()  # pick up lines appended to a growing file
+
         # The prompt itself will temporarily change the status bar.
         # We need to capture the status *after* the prompt to see if the prompt interaction
         # itself should be considered the "final" status change for this operation if parsing fails.
-        prompt_text = f"Go to line (1-{len(self.text)}, ±N, %): "
+        if line_index is not None:
+            known = f"{len(self.text)}{'' if line_index.complete else '+'}"
+            prompt_text = f"Go to line (1-{known}, ±N, %, @byte): "
+        else:
+            prompt_text = f"Go to line (1-{len(self.text)}, ±N, %): "
         raw_input_str = self.prompt(prompt_text)
 
         status_after_prompt = self.status_message  # Status might have been restored by prompt's finally block
@@ -6800,7 +7110,36 @@ class SwayEditor:
             return self.status_message != original_status
 
         try:
-            if raw_input_str.endswith('%'):
+            if raw_input_str.startswith('@'):
+                if line_index is None:
+                    self._set_status_message("Byte offsets are only available in file views")
+                    return True
+                byte_offset = int(raw_input_str[1:].strip(), 0)
+                if not (0 <= byte_offset <= line_index.size):
+                    self._set_status_message(f"Offset out of range (0-{line_index.size})")
+                    return True
+                if not line_index.covers_offset(byte_offset):
+                    self._set_status_message(
+                        f"Offset not indexed yet ({int(line_index.progress * 100)}% scanned)")
+                    return True
+                target_line_num_one_based = line_index.line_of_offset(byte_offset) + 1
+                logging.debug(f"Goto: Byte offset {byte_offset}, target line {target_line_num_one_based}")
+            elif raw_input_str.endswith('%') and line_index is not None:
+                percentage_str = raw_input_str.rstrip('%')
+                if not percentage_str:
+                    raise ValueError("Percentage value missing.")
+                percentage = float(percentage_str)
+                if not (0 <= percentage <= 100):
+                    self._set_status_message("Percentage out of range (0-100)")
+                    return True
+                byte_offset = int(line_index.size * percentage / 100.0)
+                if not line_index.covers_offset(byte_offset):
+                    self._set_status_message(
+                        f"{percentage:g}% not indexed yet ({int(line_index.progress * 100)}% scanned)")
+                    return True
+                target_line_num_one_based = line_index.line_of_fraction(percentage / 100.0) + 1
+                logging.debug(f"Goto: {percentage}% of bytes, target line {target_line_num_one_based}")
+            elif raw_input_str.endswith('%'):
                 percentage_str = raw_input_str.rstrip('%')
                 if not percentage_str:  # Just '%' was entered
                     raise ValueError("Percentage value missing.")
@@ -6832,7 +7171,11 @@ class SwayEditor:
             if target_line_num_one_based is None:  # Should not happen if parsing logic is complete
                 raise ValueError("Line number could not be determined.")
             if not (1 <= target_line_num_one_based <= total_lines):
-                self._set_status_message(f"Line number out of range (1–{total_lines})")
+                if line_index is not None and not line_index.complete and target_line_num_one_based > total_lines:
+                    self._set_status_message(
+                        f"Line {target_line_num_one_based} not indexed yet ({int(line_index.progress * 100)}% scanned)")
+                else:
+                    self._set_status_message(f"Line number out of range (1–{total_lines})")
                 return True  # Status changed
 
             # Convert 1-based target to 0-based for internal use
@@ -6883,6 +7226,44 @@ class SwayEditor:
             self._set_status_message(f"Goto error: {str(e)[:60]}...")
             return True  # Status changed due to error message
 
+    def _goto_offset(self) -> bool:
+        """
+        Go-to in a hex view: moves the caret to a byte offset – absolute (4096, 0x1000),
+        relative to the byte under the caret (+N, -N, +0x10) or a percentage of the file (N%).
+
+        Returns:
+            bool: Always True (the cursor or the status message changed).
+        """
+        view: HexFileView = self.text
+        raw = self.prompt(f"Go to offset (0-{max(view.size - 1, 0):#x}, ±N, %): ")
+        if not raw:
+            self._set_status_message("Goto cancelled")
+            return True
+        raw = raw.strip()
+        try:
+            if raw.endswith("%"):
+                percentage = float(raw[:-1])
+                if not 0 <= percentage <= 100:
+                    self._set_status_message("Percentage out of range (0-100)")
+                    return True
+                # 100% is the last byte, as goto-line treats it as the last line
+                offset = min(int(view.size * percentage / 100.0), max(view.size - 1, 0))
+            elif raw.startswith(("+", "-")):
+                offset = view.offset_at(self.cursor_y, self.cursor_x) + int(raw, 0)
+            else:
+                offset = int(raw, 0)
+        except ValueError:
+            self._set_status_message(f"Invalid offset: {raw[:30]}")
+            return True
+        if not 0 <= offset < max(view.size, 1):
+            self._set_status_message(f"Offset out of range (0-{max(view.size - 1, 0):#x})")
+            return True
+        self.cursor_y = view.row_of_offset(offset)
+        self.cursor_x = view.column_of_byte(offset - view.offset_of_row(self.cursor_y))
+        self._clamp_scroll()
+        self._set_status_message(f"Moved to offset {offset:#x} ({offset})")
+        return True
+
     # 10. вспомогательный для поиска
     def _goto_match(self, match_index: int) -> None:  # Added type hint and English docstring
         """
@@ -7431,15 +7812,45 @@ class SwayEditor:
             if left.rstrip().endswith("{"):
                 new_indent += extra_indent
 
-        # Insert the new line with the calculated indentation
-        self.text[self.cursor_y] = left
-        self.text.insert(self.cursor_y + 1, new_indent + right)
+        # Split the line and insert the new one with the calculated indentation
+        self._replace_lines(self.cursor_y, self.cursor_y + 1, [left, new_indent + right])
         self.cursor_y += 1
         self.cursor_x = len(new_indent)
         self.modified = True
         self._set_status_message("Inserted line with smart auto-indent")
         return True
 
+    # 5.1 Bulk splice --------------------------------------------------------------------
+    def _replace_lines(self, start: int, end: int, lines: List[str]) -> None:
+        """
+        Replaces the lines [start, end) with `lines` in a single splice.
+
+        Every multi-line edit goes through here instead of a loop of
+        `text.insert()` / `del text[i]`: one slice assignment costs one piece
+        table update (one list move for the list backend) and produces one
+        edit event and one journal record, however many lines change.
+        DOES NOT add to action history. Sets self.modified = True.
+        """
+        self.text[start:end] = lines
+        self.modified = True
+
+    def _splice_text(self, start_y: int, start_x: int, end_y: int, end_x: int, text: str) -> Tuple[int, int]:
+        """
+        Replaces the text between (start_y, start_x) and (end_y, end_x) with `text`.
+
+        The coordinates must be normalized and valid. The rows start_y..end_y
+        are rewritten with one `_replace_lines()` call. Returns the position
+        right after the inserted text.
+        """
+        new_lines = text.split('\n')
+        end_x_after = len(new_lines[-1])
+        if len(new_lines) == 1:
+            end_x_after += start_x
+        new_lines[0] = self.text[start_y][:start_x] + new_lines[0]
+        new_lines[-1] += self.text[end_y][end_x:]
+        self._replace_lines(start_y, end_y + 1, new_lines)
+        return start_y + len(new_lines) - 1, end_x_after
+
     # 6. Insert text at position -----------------------------------------------------------
     def insert_text_at_position(self, text: str, row: int, col: int) -> bool:  # Added return type bool
         """
@@ -7470,38 +7881,7 @@ class SwayEditor:
 
         logging.debug(f"insert_text_at_position: text={text!r} at row={row}, col={col}")
 
-        lines_to_insert = text.split('\n')
-
-        original_line_prefix = self.text[row][:col]
-        original_line_suffix = self.text[row][col:]  # "tail" of the original line
-
-        # 1. Replace the current line: prefix + first line of text to insert
-        self.text[row] = original_line_prefix + lines_to_insert[0]
-
-        # 2. Insert intermediate lines (if any)
-        # lines_to_insert[1:-1] - all lines between the first and the last
-        for offset, line_content in enumerate(lines_to_insert[1:-1], start=1):
-            self.text.insert(row + offset, line_content)
-
-        # 3. Add the last line of text to insert + the original line's suffix
-        if len(lines_to_insert) > 1:
-            # Insert as a new line: last inserted line + original tail
-            self.text.insert(row + len(lines_to_insert) - 1, lines_to_insert[-1] + original_line_suffix)
-        else:
-            # Single line insertion - just append the original tail
-            self.text[row] += original_line_suffix
-
-        # 4. Recalculate cursor position
-        if len(lines_to_insert) == 1:
-            # Stayed on the same logical line
-            self.cursor_y = row
-            self.cursor_x = col + len(lines_to_insert[0])  # Length of the inserted text (first/only line)
-        else:
-            # Moved to the last inserted logical line
-            self.cursor_y = row + len(lines_to_insert) - 1
-            self.cursor_x = len(lines_to_insert[-1])  # Length of the last inserted line segment
-
-        self.modified = True
+        self.cursor_y, self.cursor_x = self._splice_text(row, col, row, col, text)
         logging.debug(f"insert_text_at_position: cursor now at (y={self.cursor_y}, x={self.cursor_x})")
         return True  # Text was inserted
 
@@ -7652,8 +8032,7 @@ class SwayEditor:
 
             remaining_suffix_on_end_line = line_end_content[actual_end_x_on_last_line:]
 
-            self.text[start_y] = remaining_prefix_on_start_line + remaining_suffix_on_end_line
-            del self.text[start_y + 1: end_y + 1]
+            self._replace_lines(start_y, end_y + 1, [remaining_prefix_on_start_line + remaining_suffix_on_end_line])
 
         self.cursor_y = start_y
         self.cursor_x = start_x
@@ -8419,23 +8798,22 @@ class SwayEditor:
             undo_changes_list: List[Dict[str, Any]] = []
             indented_line_count = 0
 
-            for current_y in range(start_y_idx, end_y_idx + 1):
-                if current_y >= len(self.text):
-                    continue
-
-                original_line_content = self.text[current_y]
-                self.text[current_y] = indent_string + original_line_content
+            # The indented block is built first and written back with one splice
+            block_end = min(end_y_idx + 1, len(self.text))
+            new_block = self.text[start_y_idx:block_end]
+            for offset, original_line_content in enumerate(new_block):
+                new_block[offset] = indent_string + original_line_content
 
                 undo_changes_list.append({
-                    "line_index": current_y,
+                    "line_index": start_y_idx + offset,
                     "original_text": original_line_content,
-                    "new_text": self.text[current_y]
+                    "new_text": new_block[offset]
                 })
                 indented_line_count += 1
                 made_actual_text_change = True
 
             if made_actual_text_change:
-                self.modified = True
+                self._replace_lines(start_y_idx, block_end, new_block)
 
                 new_selection_start_x = start_x_in_line_sel + indent_char_length
                 new_selection_end_x = end_x_in_line_sel + indent_char_length
@@ -8513,12 +8891,12 @@ class SwayEditor:
             chars_removed_from_sel_start_line = 0
             chars_removed_from_sel_end_line = 0
 
-            for current_y in range(start_y_idx, end_y_idx + 1):
-                if current_y >= len(self.text):
-                    continue
-
-                original_line_content = self.text[current_y]
-                line_to_modify = self.text[current_y]
+            # The unindented block is built first and written back with one splice
+            block_end = min(end_y_idx + 1, len(self.text))
+            new_block = self.text[start_y_idx:block_end]
+            for offset, original_line_content in enumerate(new_block):
+                current_y = start_y_idx + offset
+                line_to_modify = original_line_content
                 prefix_that_was_removed = ""
 
                 if use_spaces:
@@ -8530,17 +8908,17 @@ class SwayEditor:
                             break
                     if actual_spaces_to_remove > 0:
                         prefix_that_was_removed = line_to_modify[:actual_spaces_to_remove]
-                        self.text[current_y] = line_to_modify[actual_spaces_to_remove:]
+                        new_block[offset] = line_to_modify[actual_spaces_to_remove:]
                 else:  # use_tabs
                     if line_to_modify.startswith('\t'):
                         prefix_that_was_removed = '\t'
-                        self.text[current_y] = line_to_modify[1:]
+                        new_block[offset] = line_to_modify[1:]
 
                 if prefix_that_was_removed:
                     undo_changes_list.append({
                         "line_index": current_y,
                         "original_text": original_line_content,
-                        "new_text": self.text[current_y]
+                        "new_text": new_block[offset]
                     })
                     unindented_line_count += 1
                     made_actual_text_change = True
@@ -8550,7 +8928,7 @@ class SwayEditor:
                         chars_removed_from_sel_end_line = len(prefix_that_was_removed)
 
             if made_actual_text_change:
-                self.modified = True
+                self._replace_lines(start_y_idx, block_end, new_block)
 
                 new_selection_start_x = max(0, start_x_in_line_sel - chars_removed_from_sel_start_line)
                 new_selection_end_x = max(0, end_x_in_line_sel - chars_removed_from_sel_end_line)
@@ -8995,8 +9373,16 @@ class SwayEditor:
         Safely open a file in the given mode.
         • In binary mode, ignore encoding and errors.
         • In text mode, use the given encoding (or self.encoding) and the given errors policy.
+        • For reading, a gzip/bzip2/xz file (detected by its magic bytes) is
+          decompressed transparently while it is read (see `compression`).
         """
         try:
+            codec = detect_compression(filename) if mode in ("r", "rb", "rt") else None
+            if codec:
+                stream = open_decompressed(filename, codec)
+                if "b" in mode:
+                    return stream
+                return io.TextIOWrapper(stream, encoding=encoding or self.encoding, errors=errors)
             if "b" in mode:
                 # Binary mode: no encoding or errors
                 return open(filename, mode)
@@ -9013,15 +9399,27 @@ class SwayEditor:
             raise
 
     # =============== Open file ============================
-    def open_file(self, filename_to_open: Optional[str] = None) -> bool:
+    def open_file(self, filename_to_open: Optional[str] = None, view_mode: Optional[bool] = None,
+                  new_buffer: bool = True, hex_view: Optional[bool] = None) -> bool:
         """
         Opens a specified file or prompts for one.
-        Handles unsaved changes in the current buffer before proceeding.
+        The file opens in a new buffer; the current document stays open in its own
+        (see `switch_buffer`), and a file that is already open is switched to.
         Detects file encoding, loads content, and updates editor state.
 
         Args:
             filename_to_open (Optional[str]): The path to the file to open.
                                              If None, the user will be prompted.
+            view_mode (Optional[bool]): True forces a read-only memory-mapped view,
+                                        False forces a normal editable load. None (default)
+                                        picks the view automatically for files larger than
+                                        `editor.view_mode_threshold_mb`.
+            new_buffer (bool): False replaces the document in the current buffer instead
+                               (used by `revert_changes`); unsaved changes are offered
+                               for saving first.
+            hex_view (Optional[bool]): True opens a read-only hex view (`HexFileView`),
+                                       False never does. None (default) picks it for
+                                       binary files (NUL bytes in the first block).
 
         Returns:
             bool: True if the editor's state changed significantly (new file loaded,
@@ -9033,21 +9431,22 @@ class SwayEditor:
         # Store initial states to determine if a redraw is ultimately needed
         original_status = self.status_message
         original_filename_for_revert = self.filename
-        original_text_tuple_for_revert = tuple(self.text)
+        original_buffer_for_revert = self.text
         original_modified_flag_for_revert = self.modified
 
         status_changed_by_interaction = False
+        buffer_added = False
 
         try:
-            # 1. Handle unsaved changes in the current buffer
-            if self.modified:
+            # 1. Handle unsaved changes in the current buffer if it is about to be replaced
+            if self.modified and not new_buffer:
                 status_before_save_prompt = self.status_message
                 ans = self.prompt("Current file has unsaved changes. Save now? (y/n): ")
                 if self.status_message != status_before_save_prompt:
                     status_changed_by_interaction = True
 
                 if ans and ans.lower().startswith("y"):
-                    self.save_file()
+                    self.save_file(wait=True)
                     if self.modified:
                         self._set_status_message("Open file cancelled: current file changes were not saved.")
                         logging.warning(
@@ -9081,11 +9480,20 @@ class SwayEditor:
                 # validate_filename sets its own status message
                 return True  # Status changed
 
+            if not os.path.exists(actual_filename_to_open) and new_buffer:
+                self._set_status_message(f"Error: File not found '{os.path.basename(actual_filename_to_open)}'")
+                logging.warning(f"Open file failed: file not found at '{actual_filename_to_open}'")
+                return True
+
             if not os.path.exists(actual_filename_to_open):
+                self._journal_close(discard=True)
                 self.text = [""]
                 self.filename = None
                 self.modified = False
                 self.encoding = "utf-8"
+                self.compression = None
+                self.large_file = None
+                self._disk_state = self._disk_base = None
                 self.history.clear() 
                 self.history.add_action({
                     "type": "open_file_missing",
@@ -9094,6 +9502,7 @@ class SwayEditor:
                     "encoding": "utf-8"
                 })
                 self.set_initial_cursor_position()
+                self._journal_attach(recover=False)
                 self._set_status_message(f"Error: File not found '{os.path.basename(actual_filename_to_open)}'")
                 logging.warning(f"Open file failed: file not found at '{actual_filename_to_open}'")
                 return True
@@ -9109,93 +9518,91 @@ class SwayEditor:
                 logging.warning(f"Open file failed: no read permissions for '{actual_filename_to_open}'.")
                 return True
 
-            # 4. Detect file encoding and read content
-            lines: Optional[List[str]] = None
-            final_encoding_used: str = "utf-8"  # Default if all else fails
+            # 3a. A file that is already open is shown, not read again; otherwise the
+            #     current document keeps its buffer and the file gets a new one.
+            if new_buffer:
+                if self._load_job is not None:
+                    self._set_status_message(self.read_only_message())
+                    return True
+                self._sync_active_buffer()
+                open_index = self.buffers.find(actual_filename_to_open)
+                if open_index == self.buffers.active and self.filename:
+                    self._set_status_message(f"'{os.path.basename(actual_filename_to_open)}' is already open")
+                    return True
+                if open_index is not None and open_index != self.buffers.active:
+                    return self.switch_buffer(open_index)
+                buffer_added = self._open_buffer_slot()
+
+            # 3b. Huge files (or an explicit request) open as a read-only memory-mapped view,
+            #     binary files as a hex view. Compressed files cannot be mapped; they are
+            #     always streamed.
+            compression = detect_compression(actual_filename_to_open)
+            if hex_view is None:
+                hex_view = not compression and looks_binary(actual_filename_to_open)
+            if hex_view and not compression:
+                result = self._open_hex_view(actual_filename_to_open)
+                if buffer_added and not isinstance(self.text, HexFileView):  # it could not be opened
+                    self._close_shown_buffer()
+                return result
+            if view_mode is None:
+                view_mode = not compression and self._should_open_as_view(actual_filename_to_open)
+            elif view_mode and compression:
+                logging.info(f"'{actual_filename_to_open}' is {compression}-compressed; loading instead of viewing.")
+                view_mode = False
+            if view_mode:
+                result = self._open_file_view(actual_filename_to_open)
+                if buffer_added and not self.text.read_only:  # the view could not be opened
+                    self._close_shown_buffer()
+                return result
+
+            # 3c. Large (and all compressed) files load progressively on a worker thread
+            if compression or self._should_load_in_background(actual_filename_to_open):
+                return self._start_background_load(
+                    actual_filename_to_open,
+                    restore_state={"buffer_added": True} if buffer_added else {
+                        "text": original_buffer_for_revert,
+                        "filename": original_filename_for_revert,
+                        "modified": original_modified_flag_for_revert,
+                        "encoding": self.encoding,
+                        "compression": self.compression,
+                        "large_file": self.large_file,
+                        "cursor": (self.cursor_y, self.cursor_x),
+                        "scroll": (self.scroll_top, self.scroll_left),
+                        "disk": (self._disk_state, self._disk_base),
+                    },
+                )
 
+            # 4. Read and decode the file in a single streaming pass
+            #    (fast UTF-8 path; incremental detector only if that fails).
+            remembered = self._remembered_state(actual_filename_to_open)
+            encoding_hint, lexer_hint = self._remembered_detection(remembered)
             try:
-                sample_size_for_chardet = 1024 * 20
-                raw_data_sample: bytes
+                disk_state = file_fingerprint(actual_filename_to_open)
                 with self.safe_open(actual_filename_to_open, mode="rb") as f_binary:
-                    raw_data_sample = f_binary.read(sample_size_for_chardet)
-
-                if not raw_data_sample:
-                    logging.info(f"File '{actual_filename_to_open}' is empty or could not be read for chardet.")
-                    lines = [""]
-                    final_encoding_used = self.encoding
-                else:
-                    chardet_result = chardet.detect(raw_data_sample)
-                    encoding_guess = chardet_result.get("encoding")
-                    confidence = chardet_result.get("confidence", 0.0)
-                    logging.debug(
-                        f"Chardet detected encoding '{encoding_guess}' with confidence {confidence:.2f} "
-                        f"for '{actual_filename_to_open}'."
-                    )
-
-                    encodings_to_try_ordered: List[Tuple[Optional[str], str]] = []
-                    if encoding_guess and confidence >= 0.75:
-                        encodings_to_try_ordered.append((encoding_guess, "strict"))
-
-                    # Add common fallbacks, ensuring UTF-8 is prominent
-                    common_fallbacks = [("utf-8", "strict"), ("latin-1", "strict")]
-                    if encoding_guess and (encoding_guess, "replace") not in encodings_to_try_ordered:
-                        # Try detected encoding with 'replace' if strict fails for it or if confidence was low
-                        if not (encoding_guess and confidence >= 0.75):
-                            encodings_to_try_ordered.append((encoding_guess, "replace"))
-
-                    for enc_fb, err_fb in common_fallbacks:
-                        if (enc_fb, err_fb) not in encodings_to_try_ordered:
-                            encodings_to_try_ordered.append((enc_fb, err_fb))
-
-                    # Final absolute fallback
-                    if ("utf-8", "replace") not in encodings_to_try_ordered:
-                        encodings_to_try_ordered.append(("utf-8", "replace"))
-
-                    seen_enc_err_pairs = set()
-                    unique_encodings_to_try = []
-                    for enc, err_handling in encodings_to_try_ordered:
-                        if enc and (enc, err_handling) not in seen_enc_err_pairs:  # Ensure enc is not None
-                            unique_encodings_to_try.append((enc, err_handling))
-                            seen_enc_err_pairs.add((enc, err_handling))
-                        elif not enc and ("utf-8",
-                                          err_handling) not in seen_enc_err_pairs:  # If chardet returns None for encoding
-                            unique_encodings_to_try.append(("utf-8", err_handling))  # Default to utf-8
-                            seen_enc_err_pairs.add(("utf-8", err_handling))
-
-                    for enc_attempt, error_policy in unique_encodings_to_try:
-                        try:
-                            logging.debug(
-                                f"Attempting to read '{actual_filename_to_open}' with encoding '{enc_attempt}' (errors='{error_policy}')")
-                            with self.safe_open(actual_filename_to_open, "r", encoding=enc_attempt,
-                                                errors=error_policy) as f_text:
-                                lines = f_text.read().splitlines()
-                            final_encoding_used = enc_attempt if enc_attempt else "utf-8"
-                            logging.info(
-                                f"Successfully read '{actual_filename_to_open}' using encoding '{final_encoding_used}' with errors='{error_policy}'.")
-                            break
-                        except (UnicodeDecodeError, OSError, LookupError) as e_read:
-                            logging.warning(
-                                f"Failed to read '{actual_filename_to_open}' with encoding '{enc_attempt}' (errors='{error_policy}'): {e_read}")
-
-                if lines is None:
-                    self._set_status_message(
-                        f"Error reading '{os.path.basename(actual_filename_to_open)}': Could not decode content.")
-                    logging.error(f"All attempts to read and decode '{actual_filename_to_open}' failed.")
-                    return True
-
+                    decoded = read_stream(f_binary, encoding=encoding_hint)
+            except (OSError, LookupError) as e_read:
+                self._set_status_message(
+                    f"Error reading '{os.path.basename(actual_filename_to_open)}': {e_read}")
+                logging.error(f"Failed to read and decode '{actual_filename_to_open}': {e_read}")
+                if buffer_added:
+                    self._close_shown_buffer()
+                return True
             except Exception as e_detect_read:
                 self._set_status_message(
                     f"Error during file processing for '{os.path.basename(actual_filename_to_open)}': {e_detect_read}")
                 logging.exception(f"Failed during encoding detection or initial read for '{actual_filename_to_open}'")
+                if buffer_added:
+                    self._close_shown_buffer()
                 return True
 
-            self.text = lines if lines is not None else [""]
-            self.filename = actual_filename_to_open
-            self.modified = False
-            self.encoding = final_encoding_used
+            logging.info(
+                f"Read '{actual_filename_to_open}' in one pass: {decoded.bytes_read} bytes, "
+                f"encoding '{decoded.encoding}' (errors='{decoded.errors}', detector used: {decoded.detector_used})."
+            )
 
-            self.set_initial_cursor_position()
-            self.history.clear() 
+            self._journal_close(discard=True)  # the old document's changes were saved or discarded above
+            self._load_decoded(actual_filename_to_open, decoded, lexer=lexer_hint, disk_state=disk_state)
+            self._restore_remembered_position(remembered)
 
             self._set_status_message(
                 f"Opened '{os.path.basename(self.filename)}' (enc: {self.encoding}, {len(self.text)} lines)"
@@ -9204,57 +9611,478 @@ class SwayEditor:
                 f"File opened successfully: '{self.filename}', Encoding: {self.encoding}, Lines: {len(self.text)}"
             )
 
-            self._lexer = None
-            self.detect_language()
             self.git.update_git_info()
+            self._journal_attach(recover=True)
 
             return True
 
         except Exception as e_outer:
             self._set_status_message(f"Error opening file: {str(e_outer)[:70]}...")
             logging.exception(f"Unexpected error during open_file process for: {filename_to_open}")
+            if buffer_added:
+                # The previous document is untouched in its own buffer.
+                self._close_shown_buffer()
+                return True
             # Attempt to restore some semblance of original state if open failed badly
             self.filename = original_filename_for_revert
-            self.text = list(original_text_tuple_for_revert)
+            # open_file never mutates the old buffer, it only replaces it; a replaced
+            # read-only view has already been unmapped and cannot be restored.
+            if self.text is not original_buffer_for_revert and not original_buffer_for_revert.read_only:
+                self.text = original_buffer_for_revert
             self.modified = original_modified_flag_for_revert
+            if self._journal is None:
+                self._journal_attach(recover=False)
             # Could also try to restore lexer, cursor, scroll but it gets complex.
             # A full redraw with the error message is the main goal.
             return True
 
-    # --- save file ------------------
-    def save_file(self) -> bool:
+    def _load_decoded(self, path: str, decoded: DecodedText, compression: Optional[str] = None,
+                      longest_line: Optional[int] = None, lexer: Any = None,
+                      disk_state: Optional[Fingerprint] = None) -> None:
         """
-        Saves the current document to its existing filename.
-        If the filename is not set (e.g., for a new, unsaved buffer),
-        this method invokes `save_file_as()` to prompt the user for a name.
-        Updates editor state (modified status, potentially Git info, language detection).
+        Makes the decoded file the shown document: text, encoding, large-file
+        profile, caret, history and language. Status, Git and journal are left
+        to the caller.
 
-        Returns:
-            bool: True if the operation resulted in a change to the editor's state
-                  (e.g., modified status changed, status message updated, or if
-                  `save_file_as` was called and made changes), False otherwise.
+        Args:
+            longest_line (Optional[int]): Measured by the caller (a preload worker); computed if None.
+            lexer (Any): Lexer already detected by a preload worker; detected here if None.
+            disk_state (Optional[Fingerprint]): File fingerprint taken before it was read.
         """
-        logging.debug("save_file called")
+        self.text = decoded.lines
+        self.filename = path
+        self.modified = False
+        self.encoding = decoded.encoding
+        self.compression = compression
+        self.large_file = None
+        if longest_line is None:
+            longest_line = max(map(len, self.text), default=0)
+        self._update_large_file_profile(decoded.bytes_read, len(self.text), longest_line)
 
-        # Store initial state for comparison
-        original_status = self.status_message
-        original_modified_flag = self.modified
-        # Filename should not change in a direct save, unless save_file_as is called
-        original_filename = self.filename
+        self.set_initial_cursor_position()
+        self.history.clear()
 
-        redraw_is_needed = False
+        self._lexer = None
+        self.detect_language(lexer)
+        self._remember_disk_version(disk_state)
 
-        # 1. If no filename is set, delegate to save_file_as()
-        if not self.filename or self.filename == "noname":
-            logging.debug("save_file: Filename not set, invoking save_file_as().")
-            # save_file_as() returns True if it made changes requiring a redraw
-            return self.save_file_as()
+    def _should_open_as_view(self, path: str) -> bool:
+        """
+        Returns True if `path` exceeds `editor.view_mode_threshold_mb` and should
+        therefore be opened as a read-only memory-mapped view instead of being loaded.
+        A threshold of 0 disables the automatic switch.
+        """
+        threshold_mb = self.config.get("editor", {}).get("view_mode_threshold_mb", 512)
+        try:
+            threshold_mb = float(threshold_mb)
+            if threshold_mb <= 0:
+                return False
+            return os.path.getsize(path) >= threshold_mb * 1024 * 1024
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Could not evaluate view-mode threshold for '{path}': {e}")
+            return False
 
-            # 2. Validate existing filename and permissions (precautionary)
-        # These checks are more critical for save_file_as, but good for robustness here too.
-        if not self.validate_filename(self.filename):
-            # validate_filename calls _set_status_message
-            return True  # Status changed by validate_filename
+    def _should_load_in_background(self, path: str) -> bool:
+        """
+        Returns True if `path` is at least `editor.progressive_load_threshold_mb` large
+        and should be opened progressively (see `_start_background_load`).
+        A threshold of 0 disables progressive loading.
+        """
+        threshold_mb = self.config.get("editor", {}).get("progressive_load_threshold_mb", 4)
+        try:
+            threshold_mb = float(threshold_mb)
+            if threshold_mb <= 0:
+                return False
+            return os.path.getsize(path) >= threshold_mb * 1024 * 1024
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Could not evaluate progressive-load threshold for '{path}': {e}")
+            return False
+
+    def _start_background_load(self, path: Optional[str], restore_state: Optional[Dict[str, Any]] = None,
+                               stream: Optional[BinaryIO] = None) -> bool:
+        """
+        Opens `path` progressively: a `BackgroundLoad` worker reads and decodes the
+        file while the main loop keeps running. `_drain_file_load` appends published
+        lines to the buffer every frame, so the first screen appears after the first
+        (small) chunk and navigation works on the loaded prefix. The buffer is
+        read-only until loading finishes; Esc cancels (see `_cancel_file_load`).
+
+        Args:
+            path (Optional[str]): File to open; None when reading `stream`.
+            restore_state (Optional[Dict[str, Any]]): Editor state to return to if the
+                load is cancelled or fails.
+            stream (Optional[BinaryIO]): Already open stream (piped standard input) to
+                read into a new unnamed buffer instead of `path`, see `open_stdin`.
+
+        Returns:
+            bool: Always True (the buffer and status message changed).
+        """
+        if self._load_job is not None:
+            self._load_job.cancel()  # an open_file() issued while another load runs
+
+        compression = detect_compression(path) if stream is None else None
+        try:
+            # The decompressed size of a compressed file is not known up front.
+            total_bytes = os.path.getsize(path) if stream is None and not compression else None
+        except OSError:
+            total_bytes = None
+
+        # A replaced read-only view is unmapped by the `text` setter and cannot come back.
+        if restore_state and restore_state.get("text") is not None and restore_state["text"].read_only:
+            restore_state = dict(restore_state, text=[""], filename=None, encoding="UTF-8", compression=None,
+                                 large_file=None)
+        self._load_restore_state = restore_state
+
+        self._journal_close(discard=True)  # attached again once the file is loaded
+        self.text = [""]
+        self.filename = path
+        self.modified = False
+        self.compression = compression
+        self.large_file = None
+        self._disk_state = self._disk_base = None  # recorded once the file is loaded
+        self._update_large_file_profile(total_bytes)  # by size now, by lines as they arrive
+        self.set_initial_cursor_position()
+        self._lexer = None
+        self.detect_language()
+
+        if stream is not None:
+            # Piped data cannot be read again: journal it as it arrives.
+            self._journal_attach(recover=False)
+            self._load_job = BackgroundLoad(lambda: stream, name=STDIN_NAME).start()
+            self._set_status_message("Reading standard input... (Esc to stop)")
+            logging.info("Started background load of standard input.")
+            return True
+
+        encoding_hint, _ = self._remembered_detection(self._remembered_state(path))
+        self._load_job = BackgroundLoad(
+            lambda: self.safe_open(path, mode="rb"), total_bytes=total_bytes, encoding=encoding_hint, name=path
+        ).start()
+        self._set_status_message(f"Loading '{os.path.basename(path)}'... (Esc to cancel)")
+        logging.info(f"Started background load of '{path}' ({total_bytes} bytes).")
+        return True
+
+    def open_stdin(self, stream: BinaryIO) -> bool:
+        """
+        Reads piped standard input (`some-command | sway-pad -`) into a new unnamed buffer.
+
+        The stream is loaded progressively like a large file: lines are shown as they
+        arrive, so a long-running producer does not have to finish first. Esc stops
+        reading and keeps what has arrived. Keys are read from the terminal, which
+        `detach_stdin_pipe` has put back on standard input.
+
+        Args:
+            stream (BinaryIO): The pipe, as returned by `detach_stdin_pipe`.
+
+        Returns:
+            bool: Always True (the buffer and status message changed).
+        """
+        with self._state_lock:
+            return self._start_background_load(None, stream=stream)
+
+    def _drain_file_load(self) -> bool:
+        """
+        Moves lines published by the background loader into the buffer (main thread).
+
+        Returns:
+            bool: True if the buffer or status changed and a redraw is needed.
+        """
+        job = self._load_job
+        if job is None:
+            return False
+
+        first_batch = job.lines_published == 0
+        lines, finished = job.drain()
+        if lines:
+            with self._state_lock:
+                if first_batch:
+                    self.text = lines
+                    self.detect_language()  # content-based guess now has something to look at
+                else:
+                    self.text.extend(lines)
+                self.encoding = job.encoding
+                self._update_large_file_profile(job.bytes_read, len(self.text), job.longest_line)
+
+        if finished:
+            self._finish_file_load(job)
+            return True
+
+        if lines:
+            if job.name == STDIN_NAME:
+                self._set_status_message(f"Reading standard input: {len(self.text)} lines (Esc to stop)")
+                return True
+            name = os.path.basename(job.name)
+            progress = job.progress
+            done = f"{int(progress * 100)}%, " if progress is not None else ""
+            self._set_status_message(f"Loading '{name}': {done}{len(self.text)} lines (Esc to cancel)")
+        return bool(lines)
+
+    def _finish_file_load(self, job: BackgroundLoad) -> None:
+        """Completes (or rolls back) a background load once its worker has stopped."""
+        self._load_job = None
+        restore_state, self._load_restore_state = self._load_restore_state, None
+        if job.name == STDIN_NAME:
+            self._finish_stdin_load(job)
+            return
+        name = os.path.basename(job.name)
+
+        if job.error is not None:
+            self._restore_after_load(restore_state)
+            self._set_status_message(f"Error reading '{name}': {job.error}")
+            return
+
+        if job.lines_published == 0:
+            self.text = [""]
+        self.encoding = job.encoding
+        self.modified = False
+        self.history.clear()
+        if job.result and job.result.warnings:
+            logging.warning(f"Loading '{job.name}': " + "; ".join(job.result.warnings))
+
+        codec = f", {self.compression}" if self.compression else ""
+        self._set_status_message(f"Opened '{name}' (enc: {self.encoding}{codec}, {len(self.text)} lines)")
+        logging.info(f"File loaded in background: '{job.name}', Encoding: {self.encoding}, "
+                     f"Compression: {self.compression}, Lines: {len(self.text)}")
+        self._remember_disk_version()
+        if (self.cursor_y, self.cursor_x, self.scroll_top) == (0, 0, 0):  # not moved while loading
+            self._restore_remembered_position(self._remembered_state(job.name))
+        self.git.update_git_info()
+        self._journal_attach(recover=True)
+
+    def _finish_stdin_load(self, job: BackgroundLoad) -> None:
+        """
+        Completes reading standard input: the buffer keeps every line that arrived,
+        also after an error or Esc. It has no file behind it, so it stays modified
+        (exit asks before discarding it) and its journal keeps running.
+        """
+        if job.lines_published == 0:
+            self.text = [""]
+        self.encoding = job.encoding
+        self.modified = job.lines_published > 0
+        self.history.clear()
+        lines = len(self.text) if job.lines_published else 0
+        if job.error is not None:
+            self._set_status_message(f"Error reading standard input after {lines} lines: {job.error}")
+        elif job.cancelled:
+            self._set_status_message(f"Stopped reading standard input: {lines} lines")
+        else:
+            self._set_status_message(f"Read standard input (enc: {self.encoding}, {lines} lines)")
+        logging.info(f"Standard input loaded: {job.bytes_read} bytes, {lines} lines, "
+                     f"cancelled={job.cancelled}, error={job.error}")
+
+    def _cancel_file_load(self) -> bool:
+        """
+        Cancels a running background load and returns to the previous document.
+        Reading standard input is stopped instead; the lines read so far are kept.
+
+        Returns:
+            bool: True if a load was cancelled.
+        """
+        job = self._load_job
+        if job is None:
+            return False
+        job.cancel()
+        if job.name == STDIN_NAME:
+            # The worker may be blocked in read() on a silent pipe: take what it has
+            # published and stop listening to it.
+            lines, _ = job.drain()
+            with self._state_lock:
+                if lines:
+                    if job.lines_published == len(lines):
+                        self.text = lines
+                    else:
+                        self.text.extend(lines)
+                self._load_job = None
+                self._load_restore_state = None
+                self._finish_stdin_load(job)
+            return True
+        self._load_job = None
+        restore_state, self._load_restore_state = self._load_restore_state, None
+        self._restore_after_load(restore_state)
+        self._set_status_message(f"Loading '{os.path.basename(job.name)}' cancelled")
+        logging.info(f"Background load of '{job.name}' cancelled after {job.bytes_read} bytes.")
+        return True
+
+    def _restore_after_load(self, state: Optional[Dict[str, Any]]) -> None:
+        """Puts back the document that was open before a cancelled/failed background load."""
+        if state and state.get("buffer_added"):
+            self._close_shown_buffer()  # the previous document kept its own buffer
+            return
+        if not state:
+            state = {"text": [""], "filename": None, "modified": False, "encoding": "UTF-8",
+                     "compression": None, "large_file": None, "cursor": (0, 0), "scroll": (0, 0)}
+        self.text = state["text"]
+        self.filename = state["filename"]
+        self.modified = state["modified"]
+        self.encoding = state["encoding"]
+        self.compression = state.get("compression")
+        self.large_file = state.get("large_file")
+        self.cursor_y, self.cursor_x = state["cursor"]
+        self.scroll_top, self.scroll_left = state["scroll"]
+        self._disk_state, self._disk_base = state.get("disk", (None, None))
+        self._ensure_cursor_in_bounds()
+        self._lexer = None
+        self.detect_language()
+        self._journal_attach(recover=False)
+
+    def _open_file_view(self, path: str) -> bool:
+        """
+        Opens `path` as a read-only `MmapFileView`.
+
+        Only the first screen is indexed up front; the rest of the line-offset table
+        is built by a background `LineIndex` scan that reports progress in the status
+        bar. Line text is decoded on demand for the visible viewport, and search runs
+        on the mapped bytes.
+
+        Returns:
+            bool: Always True (the buffer or the status message changed).
+        """
+        try:
+            view = MmapFileView(path, index_in_background=True)
+        except (OSError, ValueError) as e:
+            self._set_status_message(f"Error opening view for '{os.path.basename(path)}': {e}")
+            logging.exception(f"Failed to memory-map '{path}' for read-only view")
+            return True
+
+        self._journal_close(discard=True)  # a read-only view cannot be edited
+        self.text = view
+        self.filename = path
+        self.modified = False
+        self.encoding = view.encoding
+        self.compression = None
+        self.large_file = None
+        self._disk_state = self._disk_base = None  # a mapped file is not reloaded
+        self._update_large_file_profile(view.size, view.line_count())
+        self.set_initial_cursor_position()
+        self.history.clear()
+
+        self._set_status_message(
+            f"Opened '{os.path.basename(path)}' read-only view "
+            f"({view.line_count()} lines, {view.size / (1024 * 1024):.1f} MB)"
+        )
+        logging.info(f"File opened as read-only view: '{path}', Encoding: {view.encoding}, Lines: {len(view)}")
+
+        self._lexer = None
+        self.detect_language()
+        self.git.update_git_info()
+
+        name = os.path.basename(path)
+        last_reported = [-1]
+
+        def _on_index_progress(index: LineIndex) -> None:
+            percent = int(index.progress * 100)
+            if percent // 5 != last_reported[0] // 5:  # report in 5% steps
+                last_reported[0] = percent
+                self._set_status_message(f"Indexing '{name}': {percent}% ({index.line_count} lines)")
+
+        def _on_index_complete(index: LineIndex) -> None:
+            self._set_status_message(f"Indexed '{name}': {index.line_count} lines")
+
+        view.start_indexing(on_progress=_on_index_progress, on_complete=_on_index_complete)
+        return True
+
+    def _open_hex_view(self, path: str) -> bool:
+        """
+        Opens `path` as a read-only `HexFileView` (offset, hex and character columns).
+
+        The file is memory-mapped and rows are formatted only when drawn, so opening
+        takes the same time and memory for any file size. Search (Ctrl+F) accepts
+        hex bytes or text; Ctrl+G takes a byte offset.
+
+        Returns:
+            bool: Always True (the buffer or the status message changed).
+        """
+        try:
+            view = HexFileView(path)
+        except (OSError, ValueError) as e:
+            self._set_status_message(f"Error opening hex view for '{os.path.basename(path)}': {e}")
+            logging.exception(f"Failed to memory-map '{path}' for hex view")
+            return True
+
+        self._journal_close(discard=True)  # a read-only view cannot be edited
+        self.text = view
+        self.filename = path
+        self.modified = False
+        self.encoding = view.encoding
+        self.compression = None
+        self.large_file = None
+        self._disk_state = self._disk_base = None  # a mapped file is not reloaded
+        self.set_initial_cursor_position()
+        self.history.clear()
+
+        self._set_status_message(
+            f"Opened '{os.path.basename(path)}' as hex view ({view.size:,} bytes) – Alt+X for text"
+        )
+        logging.info(f"File opened as hex view: '{path}', Size: {view.size} bytes, Rows: {view.line_count()}")
+
+        self._lexer = None
+        self.detect_language(TextLexer())  # hex rows are not source code
+        self.git.update_git_info()
+        return True
+
+    def toggle_hex_view(self) -> bool:
+        """
+        Switches the current file between the hex view and text (Alt+X).
+
+        A file with unsaved changes stays as it is: the hex view shows the file on
+        disk, and reopening it would drop the edits.
+
+        Returns:
+            bool: True if the buffer or the status message changed.
+        """
+        if isinstance(self.text, HexFileView):
+            return self.open_file(self.filename, new_buffer=False, hex_view=False)
+        if not self.filename or self.filename == "noname":
+            self._set_status_message("Hex view needs a file on disk")
+            return True
+        if self.modified:
+            self._set_status_message("Save or discard the changes first: the hex view shows the file on disk")
+            return True
+        if self.compression:
+            self._set_status_message(f"Hex view is not available for {self.compression}-compressed files")
+            return True
+        return self._open_hex_view(self.filename)
+
+    # --- save file ------------------
+    def save_file(self, wait: bool = False) -> bool:
+        """
+        Saves the current document to its existing filename.
+        If the filename is not set (e.g., for a new, unsaved buffer),
+        this method invokes `save_file_as()` to prompt the user for a name.
+        Updates editor state (modified status, potentially Git info, language detection).
+
+        The file is written atomically by a background worker (see `_write_file`);
+        the buffer stays editable meanwhile and the status bar shows the progress.
+
+        Args:
+            wait (bool): Block until the file is on disk. Callers that inspect
+                         `self.modified` right afterwards (save-before-exit etc.) need this.
+
+        Returns:
+            bool: True if the operation resulted in a change to the editor's state
+                  (e.g., modified status changed, status message updated, or if
+                  `save_file_as` was called and made changes), False otherwise.
+        """
+        logging.debug("save_file called")
+
+        # Store initial state for comparison
+        original_status = self.status_message
+        original_modified_flag = self.modified
+        # Filename should not change in a direct save, unless save_file_as is called
+        original_filename = self.filename
+
+        redraw_is_needed = False
+
+        # 1. If no filename is set, delegate to save_file_as()
+        if not self.filename or self.filename == "noname":
+            logging.debug("save_file: Filename not set, invoking save_file_as().")
+            # save_file_as() returns True if it made changes requiring a redraw
+            return self.save_file_as(wait=wait)
+
+            # 2. Validate existing filename and permissions (precautionary)
+        # These checks are more critical for save_file_as, but good for robustness here too.
+        if not self.validate_filename(self.filename):
+            # validate_filename calls _set_status_message
+            return True  # Status changed by validate_filename
 
         if os.path.isdir(self.filename):
             self._set_status_message(f"Cannot save: '{os.path.basename(self.filename)}' is a directory.")
@@ -9278,16 +10106,11 @@ class SwayEditor:
 
         # 3. Attempt to write the file to the existing path
         try:
-            # _write_file is the low-level write operation.
-            # It updates self.modified to False and calls detect_language/update_git_info.
-            # It does not set a "Saved" status message itself.
-            self._write_file(self.filename)
-
-            # After successful _write_file:
-            # self.filename is unchanged (unless _write_file unexpectedly changes it, which it shouldn't for 'save')
-            # self.modified should be False
-
-            self._set_status_message(f"Saved to {os.path.basename(self.filename)}")
+            # _write_file starts the atomic background write; once it completes,
+            # self.modified is cleared, detect_language/update_git_info run and
+            # the "Saved to" message is shown.
+            self._write_file(self.filename, wait=wait,
+                             done_message=f"Saved to {os.path.basename(self.filename)}")
 
             # Determine if a redraw is needed based on actual state changes
             if (self.modified != original_modified_flag or  # Typically True -> False
@@ -9303,12 +10126,15 @@ class SwayEditor:
             # self.modified might remain True if save failed
             return True  # Status message changed due to error
 
-    def save_file_as(self) -> bool:
+    def save_file_as(self, wait: bool = False) -> bool:
         """
         Saves the current document content to a new file name specified by the user.
         Handles prompts for the new filename and overwrite confirmation if the file exists.
         Updates editor state (filename, modified status, language detection, Git info).
 
+        Args:
+            wait (bool): Block until the file is on disk (see `save_file`).
+
         Returns:
             bool: True if the operation resulted in a change to the editor's state
                   (e.g., filename changed, modified status changed, status message updated,
@@ -9390,21 +10216,16 @@ class SwayEditor:
 
         # 4. Attempt to write the file
         try:
-            # _write_file updates self.filename, self.modified, calls detect_language, update_git_info.
-            # It does not set a status message itself, allowing this method to do so.
-            self._write_file(new_filename_processed)
-
-            # After successful _write_file:
-            # self.filename is new_filename_processed
-            # self.modified is False
-            # self._lexer might have changed
+            # Once the background write completes, _write_file's completion step updates
+            # self.filename and self.modified, calls detect_language and update_git_info
+            # and shows the "Saved as" message.
+            self._write_file(new_filename_processed, wait=wait,
+                             done_message=f"Saved as {os.path.basename(new_filename_processed)}")
 
             # toggle_auto_save might be called here if it's relevant after a save_as
             # If so, it might change status and redraw_is_needed should be True.
             # self.toggle_auto_save()
 
-            self._set_status_message(f"Saved as {os.path.basename(new_filename_processed)}")
-
             # Check if any key state changed that would require a redraw beyond just status.
             # Filename change is significant. Modified flag change is also significant.
             if (self.filename != original_filename or
@@ -9418,53 +10239,137 @@ class SwayEditor:
             self._set_status_message(
                 f"Error saving file as '{os.path.basename(new_filename_processed)}': {str(e_write)[:60]}...")
             logging.error(f"Failed to write file during Save As '{new_filename_processed}': {e_write}", exc_info=True)
-            # Restore original filename and modified status if save_as failed mid-way
-            # (e.g., if _write_file partially updated them before failing)
-            # This is tricky, _write_file should ideally be atomic or handle its own partial failure state.
-            # For now, we assume if _write_file fails, self.filename might not have been updated yet.
-            if self.filename == new_filename_processed:  # If _write_file updated filename before error
-                self.filename = original_filename  # Try to revert
-                self.modified = original_modified_flag  # Revert modified status
+            # The write is atomic and self.filename only changes after it succeeded,
+            # so there is no partial state to roll back here.
             return True  # Status message changed due to error
 
     # Метод _write_file является низкоуровневой операцией, предназначенной для фактической записи
     # содержимого в файл и обновления связанного с этим состояния редактора.
-    def _write_file(self, target_filename: str) -> None:  # Changed return type to None
+    def _write_file(self, target_filename: str, wait: bool = False, done_message: Optional[str] = None,
+                    post_save_hooks: bool = True) -> None:
         """
         Low-level method to write the current buffer content to the specified target file.
-        This method updates the editor's internal state related to the file
-        (filename, modified status, language detection, Git info).
-        It does NOT set a user-facing status message like "File saved"; that's the
-        caller's responsibility (e.g., save_file, save_file_as).
+
+        A snapshot of the buffer is handed to a `BackgroundSave` worker, which streams
+        the encoded lines to a temporary file in the target's directory, fsyncs it and
+        atomically renames it over the target, keeping the original mode and owner.
+        The buffer stays editable while the worker runs; `_poll_file_save` (main loop)
+        reports progress and calls `_finish_file_save`, which updates the editor state
+        (filename, modified status, language detection, Git info, lint).
 
         Args:
             target_filename (str): The absolute or relative path to the file to write.
+            wait (bool): Block until the write has finished and apply its result before
+                         returning (exceptions are then propagated to the caller).
+            done_message (Optional[str]): Status message shown once the file is on disk.
+            post_save_hooks (bool): Run language detection, Git refresh and lint after
+                                    the save (auto-save skips them).
 
         Raises:
-            Exception: Propagates exceptions that occur during file writing (e.g., IOError, OSError).
+            Exception: With `wait=True`, exceptions raised by the write (e.g. OSError).
         """
         logging.debug(
             f"_write_file: Attempting to write to target: '{target_filename}' with encoding '{self.encoding}'")
-        try:
-            # Prepare content with OS-specific line endings
-            # os.linesep ensures consistency with how the OS expects newlines.
-            content_to_write = os.linesep.join(self.text)
-
-            # Use safe_open for writing
-            with self.safe_open(target_filename, "w", encoding=self.encoding, errors="replace") as f:
-                bytes_written = f.write(content_to_write)
-                # Optionally, check if bytes_written matches expected to ensure full write, though f.write should raise error if not.
-                logging.debug(
-                    f"_write_file: Successfully wrote {bytes_written} bytes (from {len(content_to_write)} chars) to '{target_filename}'")
+        # One save at a time, so an older worker can never rename over a newer file.
+        self._wait_for_file_save()
+
+        with self._state_lock:
+            snapshot = self.text.snapshot()  # O(1), copy-on-write
+            # The file keeps the codec it was read with; a new name picks it by suffix (.gz, .bz2, .xz).
+            same_file = self.filename and os.path.abspath(target_filename) == os.path.abspath(self.filename)
+            compression = self.compression if same_file else compression_for_name(target_filename)
+            job = BackgroundSave(target_filename, snapshot, encoding=self.encoding, errors="replace",
+                                 compression=compression)
+            self._save_job = job
+            self._save_context = {
+                "buffer": self.text,
+                "version": snapshot.version,
+                "message": done_message or f"Saved to {os.path.basename(target_filename)}",
+                "hooks": post_save_hooks,
+                "journal_mark": self._journal.mark() if self._journal is not None else None,
+                "snapshot": snapshot,
+            }
+            job.start()
+
+        if wait:
+            job.wait()
+            self._finish_file_save()
+            if job.error is not None:
+                raise job.error
+        else:
+            self._set_status_message(f"Saving '{os.path.basename(target_filename)}'...")
+
+    def _poll_file_save(self) -> bool:
+        """
+        Reports the progress of a background save and completes it once the worker is done.
+
+        Returns:
+            bool: True if the status bar changed and a redraw is needed.
+        """
+        job = self._save_job
+        if job is None:
+            return False
+        if job.done:
+            self._finish_file_save()
+            return True
+        percent = int(job.progress * 100)
+        if percent != self._save_context.get("percent"):
+            self._save_context["percent"] = percent
+            self._set_status_message(f"Saving '{os.path.basename(job.path)}': {percent}%")
+            return True
+        return False
+
+    def _wait_for_file_save(self) -> None:
+        """Blocks until a running background save has finished and applies its result."""
+        job = self._save_job
+        if job is not None:
+            job.wait()
+            self._finish_file_save()
+
+    def _finish_file_save(self) -> None:
+        """Applies the result of a finished `BackgroundSave` to the editor state (idempotent)."""
+        with self._state_lock:
+            job, context = self._save_job, self._save_context
+            if job is None or not job.done:
+                return
+            self._save_job, self._save_context = None, {}
+            target_filename = job.path
+            name = os.path.basename(target_filename)
+
+            if job.error is not None:
+                if not job.cancelled:
+                    self._set_status_message(f"Error saving file '{name}': {str(job.error)[:60]}...")
+                    logging.error(f"Failed to write file '{target_filename}': {job.error}")
+                return
+
+            logging.debug(f"_write_file: Successfully wrote {job.bytes_written} bytes to '{target_filename}'")
+            doc: Any = self
+            if self.text is not context["buffer"]:
+                # Another buffer is shown now: the saved one is updated in the buffer list.
+                index = self.buffers.index_of_text(context["buffer"])
+                if index is None or index == self.buffers.active:
+                    self._set_status_message(context["message"])  # the buffer was closed
+                    return
+                doc = self.buffers[index]
 
             # Update editor state after successful write
             # Only update filename if it actually changed (relevant for save_as calling this)
-            if self.filename != target_filename:
-                self.filename = target_filename
-                # GitBridge to last_filename_context
-                self.git.update_git_info()
+            if doc.filename != target_filename:
+                doc.filename = target_filename
+            doc.compression = job.compression
+            doc._saved_state = (weakref.ref(context["buffer"]), context["version"])
+            doc._disk_state, doc._disk_base = file_fingerprint(target_filename), context["snapshot"]
+            if context["buffer"].version == context["version"]:
+                doc.modified = False
+            else:
+                logging.debug("_write_file: Buffer was edited during the save; it stays modified.")
+            if doc._journal is not None and context.get("journal_mark") is not None:
+                # The journal now starts from the saved file and keeps only edits made during the save.
+                doc._journal.rebase(target_filename, context["journal_mark"])
+            self._set_status_message(context["message"])
 
-            self.modified = False
+            if not context["hooks"] or doc is not self:
+                return
             self.detect_language()
 
             # Update Git information as file state on disk has changed
@@ -9472,27 +10377,16 @@ class SwayEditor:
 
             # Asynchronously run linter if the file is a Python file
             # This check is based on the currently detected lexer.
-            if self._lexer and self._lexer.name.lower() in ["python", "python3", "py"]:
+            if self.large_file is not None and self.large_file.lint == "manual":
+                logging.debug(f"_write_file: Large-file profile, lint of '{target_filename}' left to the user")
+            elif self._lexer and self._lexer.name.lower() in ["python", "python3", "py"]:
                 logging.debug(f"_write_file: Python file saved, queueing async lint for '{target_filename}'")
-                # Pass the content that was just written to ensure linter sees the saved state
                 threading.Thread(
                     target=self.run_lint_async,
-                    args=(content_to_write,),  # Pass the actual saved content
                     daemon=True,
-                    name=f"LintThread-{os.path.basename(target_filename)}"
+                    name=f"LintThread-{name}"
                 ).start()
 
-            # Note: self.toggle_auto_save() was removed from here.
-            # The decision to toggle/restart auto-save should be made by the higher-level
-            # save_file or save_file_as methods, as _write_file is just the writing part.
-
-        except Exception as e:
-            # Log the error and re-raise to allow the caller to handle it (e.g., set status message)
-            logging.error(f"Failed to write file '{target_filename}': {e}", exc_info=True)
-            # Do not change self.modified or self.filename here if write failed,
-            # as the file on disk is not in the desired state.
-            raise  # Re-raise the exception to be caught by save_file or save_file_as
-
     def revert_changes(self) -> bool:
         """
         Reverts unsaved changes by reloading the content from the last(f"User confirmed. 
@@ -9536,7 +10430,7 @@ class SwayEditor:
         self.modified = False
 
         try:
-            reloaded_successfully = self.open_file(self.filename)
+            reloaded_successfully = self.open_file(self.filename, new_buffer=False)
 
             if reloaded_successfully:
                 if not self.modified:
@@ -9561,6 +10455,738 @@ class SwayEditor:
             self.modified = original_modified_flag_for_comparison
             return True
 
+    # -------------- Buffers ------------------------------
+    def _blank_buffer_state(self) -> BufferState:
+        """Document attributes of a new, empty, unnamed buffer."""
+        return BufferState(
+            filename=None, modified=False, encoding="UTF-8", compression=None, large_file=None,
+            cursor_x=0, cursor_y=0, scroll_top=0, scroll_left=0, history=History(self),
+            _lexer=None, _highlighter=None, _token_cache=None, current_language=None, custom_syntax_patterns=[], _saved_state=None,
+            _custom_rules=None, _journal=None,
+            _disk_state=None, _disk_base=None,
+            selection_start=None, selection_end=None, is_selecting=False,
+            search_term="", search_matches=[], current_match_idx=-1, highlighted_matches=[],
+        )
+
+    def _adopt_text(self, buffer: TextBuffer) -> None:
+        """
+        Shows `buffer` as the document without closing the previous one or
+        publishing an edit (the `text` setter does both): used when switching buffers.
+        """
+        self._text = buffer
+        self.edit_events.attach(buffer)
+
+    def _is_scratch_buffer(self) -> bool:
+        """True for an untouched unnamed buffer (e.g. the one at startup) that a new document may replace."""
+        return (self.filename is None and not self.modified and self._load_job is None
+                and len(self.text) == 1 and not self.text[0])
+
+    def _sync_active_buffer(self) -> None:
+        """Copies the shown document into its `BufferState` so the buffer list sees current values."""
+        self.buffers.active_state.capture(self)
+
+    def _stash_buffer(self) -> None:
+        """Moves the shown document into its `BufferState`; its journal stops following the editor."""
+        self.edit_events.flush()
+        if self._journal is not None:
+            self.edit_events.unsubscribe(self._journal.on_edit)
+        self._sync_active_buffer()
+
+    def _show_buffer(self, index: int) -> None:
+        """Makes buffer `index` the shown document (the counterpart of `_stash_buffer`)."""
+        state = self.buffers[index]
+        self.buffers.active = index
+        self.buffers.touch(index)
+        state.apply_to(self)
+        if state.unloaded and state.unloaded_from is None:
+            self._read_placeholder()
+        elif state.unloaded:
+            self._reload_buffer_text(state)
+        else:
+            self._adopt_text(state.text)
+            if self._journal is not None:
+                self.edit_events.subscribe(self._journal.on_edit)
+
+    def _reload_buffer_text(self, state: BufferState) -> None:
+        """Reads back the text of a buffer released by the memory cap (see `_trim_buffers`)."""
+        changed = state.changed_on_disk()
+        name = os.path.basename(self.filename)
+        try:
+            with self.safe_open(self.filename, mode="rb") as f_binary:
+                decoded = read_stream(f_binary)
+            lines, self.encoding = decoded.lines, decoded.encoding
+        except (OSError, LookupError) as e:
+            logging.error(f"Failed to reload released buffer '{self.filename}': {e}")
+            self._set_status_message(f"Error reading '{name}': {e}")
+            lines, changed = [""], True
+        self._adopt_text(self._new_text_buffer(lines))
+        state.unloaded_from = None
+        self._saved_state = self._text_state()
+        self._remember_disk_version()
+        if changed:
+            # Undo steps and positions refer to the text that was released.
+            self.history.clear()
+            self.search_matches, self.highlighted_matches, self.current_match_idx = [], [], -1
+            self.selection_start, self.selection_end, self.is_selecting = None, None, False
+            self._ensure_cursor_in_bounds()
+            self._set_status_message(f"'{name}' changed on disk while it was inactive: reloaded")
+        self._journal_attach(recover=False)
+        logging.info(f"Reloaded released buffer '{self.filename}' (changed on disk: {changed}).")
+
+    def _trim_buffers(self) -> None:
+        """Releases clean inactive buffers over `editor.inactive_buffers_memory_mb` (LRU first)."""
+        try:
+            cap_mb = float(self.config.get("editor", {}).get("inactive_buffers_memory_mb", 256))
+        except (TypeError, ValueError):
+            logging.warning("Invalid editor.inactive_buffers_memory_mb – no memory cap for inactive buffers.")
+            return
+        for state in self.buffers.trim(int(cap_mb * 1024 * 1024)):
+            logging.debug(f"Buffer '{state.filename}' released under the {cap_mb} MB cap.")
+
+    def _open_buffer_slot(self) -> bool:
+        """
+        Keeps the shown document in its buffer and shows a new, empty one for the
+        document about to be opened or created. An untouched scratch buffer is
+        reused instead.
+
+        Returns:
+            bool: True if a new buffer was added (close it with `_close_shown_buffer`
+                  if opening the document fails).
+        """
+        if self._is_scratch_buffer():
+            return False
+        with self._state_lock:
+            self._stash_buffer()
+            state = self._blank_buffer_state()
+            index = self.buffers.add(state)
+            self.buffers.active = index
+            self.buffers.touch(index)
+            state.apply_to(self)
+            self._adopt_text(self._new_text_buffer([""]))
+            self._trim_buffers()
+        return True
+
+    def _close_shown_buffer(self) -> None:
+        """Closes the shown buffer without asking and shows the one before it (or a blank one)."""
+        with self._state_lock:
+            self.edit_events.flush()
+            self._journal_close(discard=True)
+            closing = self.text
+            if len(self.buffers) == 1:
+                self._blank_buffer_state().apply_to(self)
+                self._adopt_text(self._new_text_buffer([""]))
+                self._journal_attach(recover=False)
+            else:
+                self.buffers.remove(self.buffers.active)
+                self._show_buffer(self.buffers.active)
+            closing.close()  # unmaps a file view
+        self.git.update_git_info()
+        self._force_full_redraw = True
+
+    def open_files(self, paths: List[str], view_mode: Optional[bool] = None) -> bool:
+        """
+        Opens every file in `paths` (e.g. the command line), each in its own buffer.
+
+        The other files get their buffers at once, in the given order, and a
+        `FilePreloader` reads, decodes and language-detects them concurrently;
+        `_poll_preloads` fills each buffer as its file completes. The first file
+        is opened by `open_file` meanwhile and shown as soon as it is ready.
+        Files that open as memory-mapped (or hex) views are mapped right away
+        (that is cheap); a buffer shown before its file arrived is read on the spot.
+
+        Args:
+            paths (List[str]): Files to open; duplicates are opened once.
+            view_mode (Optional[bool]): As for `open_file`, applied to every file.
+
+        Returns:
+            bool: True if anything was opened or a status message was set.
+        """
+        unique, seen = [], set()
+        for path in paths:
+            if os.path.realpath(path) not in seen:
+                seen.add(os.path.realpath(path))
+                unique.append(path)
+        if len(unique) < 2:
+            return self.open_file(unique[0], view_mode=view_mode) if unique else False
+
+        first, skipped, views, hex_views, placeholders = unique[0], [], [], [], []
+        with self._state_lock:
+            self._sync_active_buffer()
+            for path in unique[1:]:
+                if not (self.validate_filename(path) and os.path.isfile(path) and os.access(path, os.R_OK)):
+                    logging.warning(f"Not opening '{path}': invalid name, not a file or not readable.")
+                    skipped.append(os.path.basename(path))
+                    continue
+                if self.buffers.find(path) is not None:
+                    continue
+                state = self._blank_buffer_state()  # text None: filled (or read) later
+                state.filename = path
+                placeholders.append(state)
+                compressed = detect_compression(path) is not None
+                if not compressed and looks_binary(path):
+                    hex_views.append(state)
+                elif not compressed and (view_mode or (view_mode is None and self._should_open_as_view(path))):
+                    views.append(state)
+            # add() inserts after the shown buffer: reversed, they end up in command-line order
+            for state in reversed(placeholders):
+                self.buffers.add(state)
+
+            for state in views:
+                self._fill_buffer(state, lambda path=state.filename: self._open_file_view(path) and self.text.read_only)
+            for state in hex_views:
+                self._fill_buffer(state, lambda path=state.filename: (self._open_hex_view(path)
+                                                                      and isinstance(self.text, HexFileView)))
+            to_read = [state for state in placeholders if state not in views and state not in hex_views]
+            if to_read:
+                try:
+                    workers = int(self.config.get("editor", {}).get("preload_workers", 0))
+                except (TypeError, ValueError):
+                    logging.warning("Invalid editor.preload_workers – using the default pool size.")
+                    workers = 0
+                if self._preloader is None:
+                    self._preloader = FilePreloader(max_workers=max(0, workers))
+                    self._preload_failed = []
+                for state in to_read:
+                    self._preloads[state.filename] = state
+                    encoding_hint, lexer_hint = self._remembered_detection(self._remembered_state(state.filename))
+                    self._preloader.submit(state.filename, large_file_settings(self.config, state.filename),
+                                           encoding=encoding_hint, lexer=lexer_hint)
+                logging.info(f"Preloading {len(to_read)} files on a thread pool.")
+
+        self.open_file(first, view_mode=view_mode)
+        if skipped:
+            self._set_status_message(f"Could not open: {', '.join(skipped)}")
+        return True
+
+    def _fill_buffer(self, state: BufferState, load: Callable[[], bool]) -> bool:
+        """
+        Runs `load` – which opens a document into the shown buffer and returns
+        whether it did – for the inactive placeholder `state`, then shows the
+        previous buffer again. A placeholder that could not be filled is closed.
+
+        Returns:
+            bool: True if the buffer now holds its document.
+        """
+        with self._state_lock:
+            index = self.buffers.index_of(state)
+            if index is None or not state.unloaded:  # closed, or read when it was shown
+                return False
+            shown = self.buffers[self.buffers.active]
+            self._stash_buffer()
+            state.text = self._new_text_buffer([""])  # shown as is, not read
+            self._show_buffer(index)
+            filled = load()
+            self._stash_buffer()
+            self._show_buffer(self.buffers.index_of(shown))
+            if not filled:
+                self.buffers.remove(self.buffers.index_of(state))
+                state.text.close()
+        return filled
+
+    def _load_preloaded(self, result: PreloadedFile) -> bool:
+        """Puts a file read by a preload worker into the shown (placeholder) buffer."""
+        self._load_decoded(result.path, result.decoded, result.compression, result.longest_line, result.lexer,
+                           result.disk_state)
+        self._restore_remembered_position(self._remembered_state(result.path))
+        if result.warnings:
+            logging.warning(f"Loading '{result.path}': " + "; ".join(result.warnings))
+        self._saved_state = self._text_state()
+        self._journal_attach(recover=False)
+        return True
+
+    def _read_placeholder(self) -> None:
+        """
+        Reads the file of a buffer that is shown before its preload finished
+        (called by `_show_buffer`); a late worker result is then dropped.
+        """
+        path = self.filename
+        self._preloads.pop(path, None)
+        self._adopt_text(self._new_text_buffer([""]))
+        if not detect_compression(path) and looks_binary(path):
+            self._open_hex_view(path)
+            return
+        remembered = self._remembered_state(path)
+        encoding_hint, lexer_hint = self._remembered_detection(remembered)
+        try:
+            disk_state = file_fingerprint(path)
+            with self.safe_open(path, mode="rb") as f_binary:
+                decoded = read_stream(f_binary, encoding=encoding_hint)
+        except (OSError, LookupError) as e:
+            logging.error(f"Failed to read '{path}': {e}")
+            self._set_status_message(f"Error reading '{os.path.basename(path)}': {e}")
+            self.filename = None  # an empty buffer must not overwrite the file
+            self._journal_attach(recover=False)
+            return
+        self._load_decoded(path, decoded, detect_compression(path), lexer=lexer_hint, disk_state=disk_state)
+        self._restore_remembered_position(remembered)
+        self._saved_state = self._text_state()
+        self._journal_attach(recover=True)
+
+    def _poll_preloads(self) -> bool:
+        """
+        Fills the buffers of files the preload pool has finished (main thread).
+        Waits while a background load streams into the shown buffer.
+
+        Returns:
+            bool: True if a buffer or the status message changed.
+        """
+        preloader = self._preloader
+        if preloader is None or self._load_job is not None:
+            return False
+        finished = preloader.poll()
+        filled = False
+        for result in finished:
+            state = self._preloads.pop(result.path, None)
+            if state is None or self.buffers.index_of(state) is None or not state.unloaded:
+                continue  # closed, or read when it was shown
+            if result.error is not None:
+                self.buffers.remove(self.buffers.index_of(state))
+                self._preload_failed.append(os.path.basename(result.path))
+                continue
+            if find_orphans(result.path):
+                continue  # read when shown, so the crash-recovery journal can be offered then
+            filled |= self._fill_buffer(state, lambda result=result: self._load_preloaded(result))
+            logging.debug(f"Preloaded '{result.path}' in {result.seconds * 1000:.1f} ms.")
+        if filled:
+            with self._state_lock:
+                self._trim_buffers()
+
+        if preloader.pending == 0:
+            preloader.shutdown()
+            self._preloader = None
+            self._preloads.clear()
+            opened = preloader.submitted - len(self._preload_failed)
+            message = f"Opened {opened} more file{'s' if opened != 1 else ''}"
+            if self._preload_failed:
+                message += f"; could not read: {', '.join(self._preload_failed)}"
+            self._set_status_message(message)
+            return True
+        return bool(finished)
+
+    def switch_buffer(self, index: int) -> bool:
+        """
+        Shows buffer `index` (0-based). Nothing is re-read or re-detected: text, caret,
+        history, lexer, journal and search state come back as they were left.
+
+        Returns:
+            bool: True if the shown buffer or the status message changed.
+        """
+        if not 0 <= index < len(self.buffers) or index == self.buffers.active:
+            return False
+        if self._load_job is not None:
+            self._set_status_message(self.read_only_message())
+            return True
+        with self._state_lock:
+            self._stash_buffer()
+            self._show_buffer(index)
+            self._trim_buffers()
+        self.git.update_git_info()
+        self._force_full_redraw = True
+        self._set_status_message(f"Buffer {index + 1}/{len(self.buffers)}: {self.buffers[index].name}")
+        self._check_disk_change()  # not watched while it was inactive
+        return True
+
+    def next_buffer(self) -> bool:
+        """Shows the next buffer (wrapping around)."""
+        if len(self.buffers) < 2:
+            self._set_status_message("No other buffer is open")
+            return True
+        return self.switch_buffer((self.buffers.active + 1) % len(self.buffers))
+
+    def prev_buffer(self) -> bool:
+        """Shows the previous buffer (wrapping around)."""
+        if len(self.buffers) < 2:
+            self._set_status_message("No other buffer is open")
+            return True
+        return self.switch_buffer((self.buffers.active - 1) % len(self.buffers))
+
+    def describe_buffers(self) -> List[str]:
+        """One line per buffer for the buffer list: number, modified flag, name, size and directory."""
+        self._sync_active_buffer()
+        rows = []
+        for index, state in enumerate(self.buffers):
+            if not state.unloaded:
+                size = f"{len(state.text)} lines"
+            elif state.unloaded_from is not None:
+                size = "released"
+            else:
+                size = "loading" if self._preloads.get(state.filename) is state else "not read"
+            where = os.path.dirname(os.path.abspath(state.filename)) if state.filename else ""
+            rows.append(f"{index + 1:>2} {'*' if state.modified else ' '} {state.name:<28} {size:>14}  {where}")
+        return rows
+
+    def list_buffers(self) -> bool:
+        """Shows the buffer list in a panel; Enter (or 1-9) switches to the selected buffer."""
+        try:
+            panel = ListPanel(self.stdscr, "Buffers", self.describe_buffers(), self.colors,
+                              selected=self.buffers.active)
+            panel.show()
+        except Exception as e:
+            logging.error(f"Error displaying the buffer list: {e}", exc_info=True)
+            self._set_status_message(f"Panel display error: {e}")
+            return True
+        self._force_full_redraw = True
+        if panel.chosen is not None:
+            self.switch_buffer(panel.chosen)
+        return True
+
+    def close_buffer(self) -> bool:
+        """Closes the shown buffer, offering to save unsaved changes first."""
+        if self._load_job is not None:
+            self._set_status_message(self.read_only_message())
+            return True
+        self._wait_for_file_save()
+        name = os.path.basename(self.filename) if self.filename else "[No Name]"
+        if self.modified:
+            ans = self.prompt(f"Save changes to {name} before closing? (y/n): ")
+            if ans and ans.lower().startswith("y"):
+                self.save_file(wait=True)
+                if self.modified:
+                    self._set_status_message("Close cancelled: file not saved.")
+                    return True
+            elif not (ans and ans.lower().startswith("n")):
+                self._set_status_message("Close cancelled.")
+                return True
+        self._close_shown_buffer()
+        self._set_status_message(f"Closed {name}")
+        return True
+
+    # -------------- Session (state remembered between launches) ------------------------------
+    def _remembered_state(self, path: Optional[str]) -> Optional[FileState]:
+        """What the session file remembers about `path` (None if nothing, or sessions are off)."""
+        if self._session is None or not path:
+            return None
+        return self._session.lookup(path)
+
+    def _remembered_detection(self, remembered: Optional[FileState]) -> Tuple[Optional[str], Any]:
+        """
+        Encoding and lexer remembered for a file that has not changed since, so that
+        neither has to be detected again; (None, None) otherwise.
+        """
+        if remembered is None or not remembered.unchanged():
+            return None, None
+        lexer = None
+        if remembered.lexer:
+            try:
+                lexer = get_lexer_by_name(remembered.lexer, stripall=True)
+            except Exception:  # Pygments raises ClassNotFound (e.g. the plugin is gone)
+                logging.debug(f"Session: no lexer '{remembered.lexer}' any more; detecting the language.")
+        logging.debug(f"Session: '{remembered.path}' unchanged, encoding {remembered.encoding}, "
+                      f"lexer {remembered.lexer}.")
+        return remembered.encoding, lexer
+
+    def _restore_remembered_position(self, remembered: Optional[FileState]) -> None:
+        """Puts the caret, scroll position and search term back where the last session left them."""
+        if remembered is None:
+            return
+        self.cursor_y, self.cursor_x = remembered.cursor
+        self.scroll_top, self.scroll_left = remembered.scroll
+        self._ensure_cursor_in_bounds()
+        self._clamp_scroll()
+        self.search_term = remembered.search
+
+    def _save_session(self, active: Optional[int] = None) -> None:
+        """Writes the open files and their state to the session file (see session_state.py)."""
+        session = self._session
+        if session is None:
+            return
+        self._sync_active_buffer()
+        active = self.buffers.active if active is None else active
+        files: List[FileState] = []
+        shown = 0
+        for index, state in enumerate(self.buffers):
+            if not state.filename:
+                continue  # unnamed buffers and standard input
+            if index == active:
+                shown = len(files)
+            if state.unloaded and state.unloaded_from is None:
+                # Opened but never read (preloading was cut short): keep what was known.
+                files.append(session.lookup(state.filename) or FileState(os.path.realpath(state.filename)))
+                continue
+            disk = state._disk_state if state._disk_state not in (None, MISSING) else None
+            lexer = state._lexer.aliases[0] if state._lexer is not None and state._lexer.aliases else None
+            files.append(FileState(
+                path=os.path.realpath(state.filename),
+                cursor=(state.cursor_y, state.cursor_x),
+                scroll=(state.scroll_top, state.scroll_left),
+                encoding=state.encoding,
+                lexer=lexer,
+                search=state.search_term or "",
+                disk=disk,
+            ))
+        session.replace_files(files, shown)
+        save_session(session)
+        logging.debug(f"Session saved: {len(files)} file(s).")
+
+    def restore_session(self) -> bool:
+        """
+        Reopens the files of the last session (`session.restore_on_start`, used when no
+        file is given on the command line), each with its caret and scroll position.
+
+        Returns:
+            bool: True if any file was reopened.
+        """
+        session = self._session
+        if session is None or not session.files:
+            return False
+        paths = [state.path for state in session.files if os.path.isfile(state.path)]
+        if not paths:
+            return False
+        shown = session.files[session.active].path if 0 <= session.active < len(session.files) else None
+        self.open_files(paths)
+        index = self.buffers.find(shown) if shown else None
+        if index is not None and index != self.buffers.active:
+            self.switch_buffer(index)
+        self._set_status_message(f"Restored session: {len(paths)} file{'s' if len(paths) != 1 else ''}")
+        logging.info(f"Restored session of {len(paths)} file(s).")
+        return True
+
+    # -------------- Changes made on disk by other programs ------------------------------
+    def _remember_disk_version(self, disk_state: Optional[Fingerprint] = None) -> None:
+        """
+        Records the shown text as the version of its file on disk: the fingerprint that
+        `_check_disk_change` compares against and the base of a three-way merge.
+        `disk_state` is the fingerprint taken before the file was read, if known.
+        """
+        self._disk_state = disk_state or (file_fingerprint(self.filename) if self.filename else None)
+        self._disk_base = self.text.snapshot() if self._disk_state is not None else None
+
+    def _poll_disk_changes(self) -> bool:
+        """
+        Watches the shown file (main loop) and checks it when the watcher reports it.
+        Inactive buffers are checked when they are shown again (`switch_buffer`).
+
+        Returns:
+            bool: True if the buffer or the status message changed.
+        """
+        watcher = self._file_watcher
+        if watcher is None:
+            return False
+        path = os.path.abspath(self.filename) if self.filename and self._disk_state is not None else None
+        if path != self._watched_path:
+            if self._watched_path is not None:
+                watcher.unwatch(self._watched_path)
+            if path is not None:
+                watcher.watch(path)
+            self._watched_path = path
+            self._disk_check_pending = False
+        if path is None:
+            return False
+        if path in watcher.poll():
+            self._disk_check_pending = True
+        if not self._disk_check_pending or self._save_job is not None or self._load_job is not None:
+            return False  # our own save is confirmed by `_finish_file_save` first
+        self._disk_check_pending = False
+        return self._check_disk_change()
+
+    def _check_disk_change(self) -> bool:
+        """
+        Compares the shown file with the version last read or saved and applies a change.
+
+        A clean buffer takes the new text as line hunks (`_apply_external_lines`), so the
+        caret, scroll position, undo history and cached tokens outside them stay. For a
+        modified buffer the user picks: merge (three-way, from the last common version),
+        reload, or keep the buffer as it is (merge is not offered without that version).
+
+        Returns:
+            bool: True if the buffer or the status message changed.
+        """
+        if not self.filename or self._disk_state is None:
+            return False
+        current = file_fingerprint(self.filename)
+        if current == self._disk_state:
+            return False
+        name = os.path.basename(self.filename)
+        if current is None:
+            self._disk_state = MISSING
+            self._set_status_message(f"'{name}' was deleted on disk")
+            return True
+        try:
+            with self.safe_open(self.filename, mode="rb") as f_binary:
+                decoded = read_stream(f_binary)
+        except (OSError, LookupError) as e:
+            logging.error(f"Failed to read '{self.filename}' after it changed on disk: {e}")
+            self._set_status_message(f"'{name}' changed on disk but cannot be read: {e}")
+            self._disk_state = current  # reported once, not on every poll
+            return True
+        disk_lines = decoded.lines
+
+        if not self.modified:
+            hunks = self._apply_external_lines(disk_lines)
+            self.modified = False
+            self._disk_state, self._disk_base = current, self.text.snapshot()
+            self._saved_state = self._text_state()
+            self._rebase_journal()
+            self.git.update_git_info()
+            self._set_status_message(
+                f"'{name}' changed on disk: reloaded {hunks} changed range{'s' if hunks != 1 else ''}")
+            logging.info(f"External change of '{self.filename}' applied as {hunks} hunks.")
+            return True
+
+        # Without the version both sides started from, a merge would mark every line as a conflict
+        can_merge = self._disk_base is not None
+        answer = self.prompt(f"'{name}' changed on disk. {'(m)erge, ' if can_merge else ''}(r)eload, (k)eep yours: ")
+        choice = (answer or "").strip().lower()[:1]
+        if choice == "r":
+            self._apply_external_lines(disk_lines)
+            self.modified = False
+            self._saved_state = self._text_state()
+            self._rebase_journal()
+            message = f"Reloaded '{name}' from disk (undo restores your version)"
+        elif choice == "m" and can_merge:
+            merged, conflicts = merge3(self._disk_base.to_list(), self.text.to_list(), disk_lines)
+            self._apply_external_lines(merged)
+            self.modified = merged != disk_lines
+            self._rebase_journal(disk_lines)
+            message = (f"Merged changes of '{name}' from disk"
+                       + (f": {conflicts} conflict{'s' if conflicts != 1 else ''} marked with <<<<<<<"
+                          if conflicts else ""))
+        else:
+            self.modified = True
+            self._rebase_journal(disk_lines)
+            message = f"Kept your version of '{name}'; saving overwrites the file on disk"
+        self._disk_state, self._disk_base = current, self._new_text_buffer(disk_lines).snapshot()
+        self.git.update_git_info()
+        self._force_full_redraw = True
+        self._set_status_message(message)
+        return True
+
+    def _apply_external_lines(self, new_lines: List[str]) -> int:
+        """
+        Turns the buffer into `new_lines` by splicing in only the differing line ranges,
+        as one undoable step. Caret, scroll position and selection follow the lines they
+        were on.
+
+        Returns:
+            int: The number of replaced ranges.
+        """
+        with self._state_lock:
+            hunks = diff_hunks(self.text.to_list(), new_lines)
+            if not hunks:
+                return 0
+            cursor_before = (self.cursor_y, self.cursor_x)
+            changes = []
+            for hunk in reversed(hunks):  # bottom-up: the positions of the hunks above stay valid
+                changes.append((hunk.i1, list(self.text[hunk.i1:hunk.i2]), hunk.j1, new_lines[hunk.j1:hunk.j2]))
+                self.text[hunk.i1:hunk.i2] = new_lines[hunk.j1:hunk.j2]
+            changes.reverse()
+
+            self.cursor_y = map_line(hunks, self.cursor_y)
+            self.scroll_top = map_line(hunks, self.scroll_top)
+            if self.is_selecting and self.selection_start and self.selection_end:
+                self.selection_start = (map_line(hunks, self.selection_start[0]), self.selection_start[1])
+                self.selection_end = (map_line(hunks, self.selection_end[0]), self.selection_end[1])
+            self._ensure_cursor_in_bounds()
+            self._clamp_scroll()
+            self.search_matches, self.highlighted_matches, self.current_match_idx = [], [], -1
+            self.history.add_action({
+                "type": "external_change",
+                "hunks": changes,
+                "cursor_before": cursor_before,
+                "cursor_after": (self.cursor_y, self.cursor_x),
+            })
+        return len(hunks)
+
+    def _rebase_journal(self, disk_lines: Optional[List[str]] = None) -> None:
+        """
+        Restarts the crash-recovery journal from the file as it is on disk now. If the
+        buffer differs from it, `disk_lines` (the file's lines) are recorded as replaced
+        by the whole buffer.
+        """
+        journal = self._journal
+        if journal is None:
+            return
+        journal.rebase(self.filename, journal.mark())
+        if disk_lines is not None:
+            journal.record(0, len(disk_lines), self.text.to_list())
+
+    # -------------- Crash-recovery journal ------------------------------
+    def _journal_attach(self, recover: bool = True) -> None:
+        """
+        Starts a crash-recovery journal (`swap_journal.SwapJournal`) for the current buffer.
+
+        Every buffer edit is appended to the journal as a small record, so unsaved work
+        survives a crash without periodic full-buffer rewrites. With `recover=True`, a
+        journal left behind by a crashed editor for the same path (or for an unnamed
+        buffer) is offered for replay first. Read-only views get no journal.
+        """
+        self._journal_close(discard=True)
+        settings = self.config.get("journal", {})
+        if not settings.get("enabled", True) or self.text.read_only:
+            return
+        try:
+            journal = SwapJournal(
+                self.filename, encoding=self.encoding,
+                fsync_interval=float(settings.get("fsync_interval", 2.0)),
+                compact_after=int(settings.get("compact_after_records", 2000)),
+            )
+        except (TypeError, ValueError) as e:
+            logging.error(f"Invalid [journal] settings, crash-recovery journal disabled: {e}")
+            return
+        self._journal = journal
+        self.edit_events.subscribe(journal.on_edit)
+        logging.debug(f"Crash-recovery journal for '{self.filename}': {journal.journal_path}")
+        if recover:
+            self._offer_journal_recovery()
+
+    def _journal_close(self, discard: bool = True) -> None:
+        """Detaches the journal from the buffer; `discard=False` keeps it on disk for recovery."""
+        journal, self._journal = self._journal, None
+        if journal is None:
+            return
+        self.edit_events.unsubscribe(journal.on_edit)
+        journal.close(discard=discard)
+
+    def _offer_journal_recovery(self) -> bool:
+        """
+        Offers to replay the newest orphaned journal of the current path onto the buffer
+        (for an unnamed buffer: the newest one of any unnamed buffer, see `find_orphans`).
+
+        A journal is only replayed if the file still has the size and mtime it had when
+        the journal was started; otherwise it is kept on disk and reported.
+
+        Returns:
+            bool: True if changes were recovered.
+        """
+        orphans = find_orphans(self.filename)
+        if not orphans:
+            return False
+        journal_path = orphans[0]
+        name = os.path.basename(self.filename) if self.filename else "unnamed buffer"
+        try:
+            header, records = read_journal(journal_path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Unreadable crash-recovery journal '{journal_path}': {e}")
+            self._set_status_message(f"Recovery journal for {name} is unreadable: {journal_path}")
+            return False
+        if not records:
+            remove_journal(journal_path)
+            return False
+        if header.get("base") != base_fingerprint(self.filename):
+            logging.warning(f"Journal '{journal_path}' was started from a different version of '{self.filename}'.")
+            self._set_status_message(f"{name} changed on disk since the crash; journal kept: {journal_path}")
+            return False
+
+        ans = self.prompt(f"Recover unsaved changes to {name} ({len(records)} edits)? (y/n): ")
+        if not ans or not ans.lower().startswith("y"):
+            if ans and ans.lower().startswith("n"):
+                remove_journal(journal_path)
+            return False
+        try:
+            with self._state_lock:
+                replay(self.text, records)
+                self.modified = True
+                self.history.clear()
+        except Exception as e:
+            logging.exception(f"Replaying journal '{journal_path}' failed")
+            self._set_status_message(f"Recovery failed ({e}); journal kept: {journal_path}")
+            return False
+        self._ensure_cursor_in_bounds()
+        remove_journal(journal_path)
+        self._set_status_message(f"Recovered {len(records)} unsaved edits of {name}")
+        logging.info(f"Recovered {len(records)} journal records from '{journal_path}'.")
+        return True
+
     # -------------- Auto-save ------------------------------
     def toggle_auto_save(self) -> bool:
         """
@@ -9615,7 +11241,6 @@ class SwayEditor:
                 def auto_save_task_runner():
                     """The actual task performed by the auto-save thread."""
                     logging.info(f"Auto-save thread started. Interval: {self._auto_save_interval} min.")
-                    last_saved_text_hash = None  # Store hash of last saved content to detect changes
 
                     while not self._auto_save_stop_event.is_set():  # Loop until stop event is set
                         try:
@@ -9635,56 +11260,31 @@ class SwayEditor:
 
                             # Conditions for auto-saving:
                             # 1. Filename must be set (i.e., not a new, unsaved buffer)
-                            # 2. Document must be modified
+                            # 2. Document must be modified (and its version differ from the last save)
+                            # 3. No other save (manual or auto) is currently running
                             if not self.filename or self.filename == "noname":
                                 logging.debug("Auto-save: Skipped, no filename set.")
                                 continue
+                            if self.large_file is not None and not self.large_file.auto_save:
+                                logging.debug("Auto-save: Skipped, disabled by the large-file profile.")
+                                continue
 
-                            # Acquire lock to safely read self.text and self.modified
                             with self._state_lock:
-                                if not self.modified:
+                                if not self.modified or not self._text_changed_since(self._saved_state):
                                     logging.debug("Auto-save: Skipped, no modifications.")
                                     continue
-
-                                # Get current text and its hash
-                                current_text_content = os.linesep.join(self.text)
-                                current_text_hash = hash(current_text_content)
-
-                                # Only save if content has actually changed since last auto-save
-                                if current_text_hash == last_saved_text_hash:
-                                    logging.debug("Auto-save: Skipped, content unchanged since last auto-save.")
+                                if self._save_job is not None:
+                                    logging.debug("Auto-save: Skipped, a save is already in progress.")
                                     continue
+                                temp_filename = self.filename
 
-                                # File is named, modified, and content has changed
-                                temp_filename = self.filename  # Store before releasing lock for write
-                                temp_encoding = self.encoding
-                                temp_text_to_save = current_text_content
-                                _temp_modified_flag_before_save = self.modified
-
-                            # Perform file writing outside the main state lock if possible,
-                            # though _write_file might acquire it again internally if it modifies shared state
-                            # like self.modified. For simplicity here, direct write.
+                            # Same atomic pipeline as a manual save; this thread simply waits for
+                            # the writer. `modified` is only cleared if nothing was typed meanwhile.
                             try:
                                 logging.info(f"Auto-saving '{temp_filename}'...")
-                                # Use safe_open directly or call a simplified _write_file_content
-                                with self.safe_open(temp_filename, "w", encoding=temp_encoding, errors="replace") as f:
-                                    f.write(temp_text_to_save)
-
-                                # Update state after successful save
-                                with self._state_lock:
-                                    # Verify that the file saved is still the current one and text hasn't changed
-                                    # during the write operation (unlikely for this simple model).
-                                    if self.filename == temp_filename and hash(
-                                            os.linesep.join(self.text)) == current_text_hash:
-                                        self.modified = False  # Mark as no longer modified
-                                        last_saved_text_hash = current_text_hash  # Update hash of saved content
-                                        self._set_status_message(f"Auto-saved: {os.path.basename(temp_filename)}")
-                                        logging.info(f"Auto-saved '{temp_filename}' successfully.")
-                                    else:
-                                        logging.warning(
-                                            f"Auto-save: File context changed during write of '{temp_filename}'. Save may be stale.")
-                                        # Don't change modified flag or last_saved_text_hash if context changed.
-
+                                self._write_file(temp_filename, wait=True, post_save_hooks=False,
+                                                 done_message=f"Auto-saved: {os.path.basename(temp_filename)}")
+                                logging.info(f"Auto-saved '{temp_filename}' successfully.")
                             except Exception as e_write:
                                 self._set_status_message(f"Auto-save error for '{temp_filename}': {e_write}")
                                 logging.exception(f"Auto-save failed for '{temp_filename}'")
@@ -9731,72 +11331,38 @@ class SwayEditor:
 
     def new_file(self) -> bool:
         """
-        Creates a new, empty buffer (a new document).
-        If the current buffer has unsaved changes, it prompts the user to save them.
+        Creates a new, empty document in a new buffer.
+        The current document stays open in its own buffer (see `switch_buffer`).
         Resets various editor states like filename, lexer, Git info, encoding,
         history, cursor position, selection, and scroll.
 
         Returns:
             bool: True if the editor's state significantly changed (requiring a full redraw),
-                  or if a status message was updated. False only if the operation was
-                  cancelled very early without any state or status message change (unlikely).
+                  or if a status message was updated.
         """
         logging.debug("new_file called")
 
-        # Store initial states to determine if a redraw is ultimately needed
-        original_status = self.status_message
-        original_modified_flag = self.modified  # To see if 'n' in prompt changes it
-        # Other states like text, filename, cursor will definitely change if new_file proceeds.
-
-        redraw_is_needed = False  # Accumulator for redraw reasons
-
-        # 1. Handle unsaved changes in the current buffer
-        if self.modified:
-            status_before_prompt = self.status_message  # Status before this specific prompt
-            ans = self.prompt("Save changes before creating new file? (y/n): ")
-            if self.status_message != status_before_prompt:
-                redraw_is_needed = True  # Prompt interaction changed status
-
-            if ans and ans.lower().startswith("y"):
-                # User wants to save. save_file() returns True if it caused changes.
-                if self.save_file():
-                    redraw_is_needed = True
-
-                # Crucially, check if 'self.modified' is still True after save_file() attempt.
-                # If so, saving failed or was cancelled by the user during 'Save As'.
-                if self.modified:
-                    self._set_status_message("New file creation cancelled: unsaved changes were not saved.")
-                    # Even if redraw_is_needed was false, setting status makes it true.
-                    return True
-            elif ans and ans.lower().startswith("n"):
-                # User chose not to save. Discard current changes.
-                logging.debug("New file creation: User chose 'no' to save. Discarding current changes.")
-                self.modified = False
-                if self.modified != original_modified_flag:  # If modified flag actually changed
-                    redraw_is_needed = True
-            else:
-                # User cancelled the save prompt (Esc, Enter on empty, or invalid input)
-                # If status wasn't already changed by the prompt itself to something new
-                if not redraw_is_needed and self.status_message == original_status:
-                    self._set_status_message("New file creation cancelled.")
-                return True  # Status changed (either by prompt or by cancellation message)
+        # 1. Keep the current document (saved or not) in its own buffer
+        if self._load_job is not None:
+            self._set_status_message(self.read_only_message())
+            return True
+        self._open_buffer_slot()
 
-        # 2. If we reached here, changes (if any) were handled. Proceed to create the new file state.
+        # 2. Reset the (new or scratch) buffer to an empty document.
         # These actions below will definitely require a redraw.
 
         logging.debug("Proceeding to reset editor state for a new file.")
 
+        self._journal_close(discard=True)
         self.text = [""]  # Start with a single empty line
         self.filename = None
         self.encoding = "UTF-8"  # Default encoding for new files
-        # self.modified should be False at this point (either saved, discarded, or was already False)
-        # but explicitly set it to ensure consistency for a new file.
+        self.compression = None
+        self.large_file = None
         self.modified = False
 
         # Reset language-specific and version control information
         # _lexer will be re-detected by self.detect_language()
-        if self._lexer is not None:  # If there was a lexer, changing to None or new one is a change
-            redraw_is_needed = True  # Though detect_language will also imply this
         self._lexer = None
         self.git.reset_state() 
 
@@ -9816,11 +11382,11 @@ class SwayEditor:
             # Optionally set a status message about auto-save being off,
             # but "New file created" might be more prominent.
             logging.debug("Auto-save disabled for new untitled file.")
-            # redraw_is_needed = True (if this status change was important to show immediately)
 
         # Re-detect language for the new (empty) buffer.
-        # This will typically set TextLexer and clear the lru_cache for _get_tokenized_line.
+        # This will typically set TextLexer.
         self.detect_language()
+        self._journal_attach(recover=False)
         self._set_status_message("New file created")
         # Given the extensive state reset (text, cursor, scroll, filename, lexer, etc.),
         # a redraw is always necessary after successfully reaching this point.
@@ -9846,7 +11412,9 @@ class SwayEditor:
         original_status = self.status_message
         action_cancelled_a_specific_state = False
 
-        if self.lint_panel_active:
+        if self._load_job is not None:
+            action_cancelled_a_specific_state = self._cancel_file_load()
+        elif self.lint_panel_active:
             self.lint_panel_active = False
             self.lint_panel_message = ""  # Clear the message when panel is explicitly closed
             self._set_status_message("Lint panel closed")
@@ -9933,27 +11501,48 @@ class SwayEditor:
         """Attempts to gracefully exit the editor."""
         logging.debug("exit_editor: Attempting to exit editor.")
 
-        # 1. Prompt user to save changes if needed.
-        if self.modified:
-            ans = self.prompt("Save changes before exiting? (y/n): ")
+        # 1. Let a save that is still being written finish, then prompt for every
+        #    modified buffer (the shown one first).
+        self._wait_for_file_save()
+        shown_index = self.buffers.active  # remembered as the session's shown buffer
+        for index in [self.buffers.active] + list(range(len(self.buffers))):
+            self._sync_active_buffer()
+            if not self.buffers[index].modified:
+                continue
+            self.switch_buffer(index)
+            name = f" to {self.buffers[index].name}" if len(self.buffers) > 1 else ""
+            ans = self.prompt(f"Save changes{name} before exiting? (y/n): ")
             if ans and ans.lower().startswith("y"):
-                self.save_file()
+                self.save_file(wait=True)
                 if self.modified:
                     self._set_status_message("Exit aborted: file not saved.")
                     return
             elif ans and ans.lower().startswith("n"):
-                pass  # User chose not to save.
+                self.modified = False  # User chose not to save.
             else:
                 self._set_status_message("Exit cancelled.")
                 return
 
         logging.info("exit_editor: Proceeding with editor shutdown.")
+        # Changes were saved or deliberately discarded: nothing left to recover.
+        self._sync_active_buffer()
+        self._save_session(shown_index)
+        self._journal_close(discard=True)
+        for index, state in enumerate(self.buffers):
+            if index != self.buffers.active and state._journal is not None:
+                state._journal.close(discard=True)
 
         # 2. Stop background threads (e.g., auto-save).
         if hasattr(self, "_auto_save_stop_event"):
             self._auto_save_stop_event.set()
             if hasattr(self, "_auto_save_thread") and self._auto_save_thread and self._auto_save_thread.is_alive():
                 self._auto_save_thread.join(timeout=0.1)
+        if self._preloader is not None:
+            self._preloader.shutdown()
+        if self._tokenizer is not None:
+            self._tokenizer.shutdown()
+        if self._file_watcher is not None:
+            self._file_watcher.close()
         # to stop Async Engine:
         if hasattr(self, 'async_engine'):
             self.async_engine.stop()
@@ -10338,7 +11927,7 @@ class SwayEditor:
         # but here we are in the main thread of action.
 
         with self._state_lock:  # Access self.text safely
-            current_text_snapshot = list(self.text)  # Work on a snapshot
+            current_text_snapshot = self.text.snapshot()  # Work on an immutable snapshot (no copy)
 
         for line_idx, current_line in enumerate(current_text_snapshot):
             try:
@@ -10387,6 +11976,39 @@ class SwayEditor:
         # Fallback, should not be reached if logic is complete
         # return status_changed_by_prompts
 
+    def _shift_search_matches(self, event: EditEvent) -> None:
+        """
+        Edit-event subscriber that keeps search highlights on the text they mark.
+
+        Matches on rewritten lines are dropped (their columns may no longer be right),
+        matches below an edit move with their lines; `current_match_idx` follows the
+        match it pointed at (or the next surviving one).
+        """
+        if not self.search_matches and not self.highlighted_matches:
+            return
+
+        first, old_end, delta = event.start[0], event.old_end[0], event.line_delta
+
+        def shift(matches: List[Tuple[int, int, int]],
+                  current: int = -1) -> Tuple[List[Tuple[int, int, int]], int]:
+            kept: List[Tuple[int, int, int]] = []
+            new_current = -1
+            for i, (row, col_start, col_end) in enumerate(matches):
+                if i == current:
+                    new_current = len(kept)
+                if row < first:
+                    kept.append((row, col_start, col_end))
+                elif row >= old_end:
+                    kept.append((row + delta, col_start, col_end))
+            return kept, new_current
+
+        self.search_matches, current = shift(self.search_matches, self.current_match_idx)
+        self.highlighted_matches, _ = shift(self.highlighted_matches)
+        if not self.search_matches:
+            self.current_match_idx = -1
+        elif current >= 0:
+            self.current_match_idx = min(current, len(self.search_matches) - 1)
+
     def _collect_matches(self, term: str) -> List[Tuple[int, int, int]]:
         """
         Finds all occurrences of `term` (case-insensitive) in `self.text`.
@@ -10410,11 +12032,9 @@ class SwayEditor:
 
         # Use a lock only for accessing self.text to get a snapshot.
         # This minimizes the time the lock is held.
-        text_snapshot: List[str]
         with self._state_lock:
-            # Create a shallow copy of the list of lines.
-            # The strings themselves are immutable, so this is safe.
-            text_snapshot = list(self.text)
+            # O(1) copy-on-write snapshot: later edits never change what we iterate over.
+            text_snapshot = self.text.snapshot()
 
             # Perform the search on the snapshot without holding the lock for the entire loop.
         for row_index, line_content in enumerate(text_snapshot):
@@ -10496,6 +12116,11 @@ class SwayEditor:
         # 3. A search term was entered.
         self.search_term = term_to_search  # Store the new search term
 
+        # A read-only view is searched incrementally on the mapped bytes instead of
+        # collecting every match of a potentially multi-gigabyte file.
+        if isinstance(self.text, (MmapFileView, HexFileView)):
+            return self._find_in_view(skip_current=False)
+
         # 4. Collect all matches for the new term.
         # _collect_matches reads self.text, so no direct visual change from this call itself.
         self.search_matches = self._collect_matches(self.search_term)
@@ -10544,6 +12169,9 @@ class SwayEditor:
         original_scroll_pos = (self.scroll_top, self.scroll_left)
         changed_state = False
 
+        if self.search_term and isinstance(self.text, (MmapFileView, HexFileView)):
+            return self._find_in_view(skip_current=True)
+
         if not self.search_matches:
             # This means either no search was performed (self.search_term is empty)
             # or the last search yielded no results (self.search_term is set, but search_matches is empty).
@@ -10583,6 +12211,40 @@ class SwayEditor:
 
         return changed_state
 
+    def _find_in_view(self, skip_current: bool) -> bool:
+        """
+        Moves to the next occurrence of `self.search_term` in a read-only file view.
+
+        Unlike `_collect_matches`, only the single next match (searching forward from
+        the cursor and wrapping around) is located, so memory use stays constant.
+
+        Args:
+            skip_current (bool): Start one column after the cursor, so that repeated
+                                 calls advance past the match the cursor is on.
+
+        Returns:
+            bool: Always True (cursor, highlights or status message changed).
+        """
+        start_col = self.cursor_x + 1 if skip_current else self.cursor_x
+        match = self.text.find(self.search_term, self.cursor_y, start_col)
+        if match is None:
+            self.search_matches = []
+            self.highlighted_matches = []
+            self.current_match_idx = -1
+            self._set_status_message(f"'{self.search_term}' not found")
+            return True
+
+        self.search_matches = [match]
+        self.highlighted_matches = [match]
+        self.current_match_idx = 0
+        self._goto_match(0)
+        if isinstance(self.text, HexFileView):
+            where = f"offset {self.text.offset_at(match[0], match[1]):#x}"
+        else:
+            where = f"line {match[0] + 1}"
+        self._set_status_message(f"'{self.search_term}' at {where}. Press F3 for next.")
+        return True
+
     def validate_filename(self, filename: str) -> bool:
         """
         Validates the provided filename for basic correctness, length, and path restrictions.
@@ -10979,11 +12641,18 @@ class SwayEditor:
 
         target_match_char = brackets_map[char_at_cursor]
         level = 1  # Start at level 1, looking for the char that brings it to 0
+        # In a read-only view of a huge file, don't decode the whole file looking for a partner.
+        max_rows_scanned = 5000 if self.read_only else len(self.text)
+        first_row, last_row = 0, len(self.text) - 1
+        if self.large_file is not None and self.large_file.bracket_matching == "viewport":
+            # Only a partner on screen can be highlighted anyway.
+            first_row = max(0, min(self.scroll_top, initial_char_y))
+            last_row = min(last_row, max(self.scroll_top + self.visible_lines - 1, initial_char_y))
 
         if char_at_cursor in open_brackets:
             # Search forward for the closing bracket
             current_y, current_x = initial_char_y, initial_char_x + 1
-            while current_y < len(self.text):
+            while current_y <= last_row and current_y - initial_char_y <= max_rows_scanned:
                 line = self.text[current_y]
                 while current_x < len(line):
                     char = line[current_x]
@@ -10998,7 +12667,7 @@ class SwayEditor:
                 current_x = 0  # Reset column for the new line
         else:  # char_at_cursor is a closing bracket, search backward for the opening one
             current_y, current_x = initial_char_y, initial_char_x - 1
-            while current_y >= 0:
+            while current_y >= first_row and initial_char_y - current_y <= max_rows_scanned:
                 line = self.text[current_y]
                 while current_x >= 0:
                     char = line[current_x]
@@ -11010,7 +12679,7 @@ class SwayEditor:
                             return (current_y, current_x)
                     current_x -= 1
                 current_y -= 1
-                if current_y >= 0:
+                if current_y >= first_row:
                     current_x = len(self.text[current_y]) - 1
 
         return None  # No match found
@@ -11045,6 +12714,9 @@ class SwayEditor:
         Returns:
             None
         """
+        if self.large_file is not None and self.large_file.bracket_matching == "off":
+            return
+
         # 1. Get terminal dimensions and ensure basic conditions are met.
         term_height, term_width = self.stdscr.getmaxyx()
         # Bounds check for cursor position
@@ -11220,7 +12892,9 @@ class SwayEditor:
             "goto_line": "Ctrl+G", "find": "Ctrl+F", "find_next": "F3",
             "search_and_replace": "F6", "lint": "F4", "git_menu": "F9",
             "help": "F1", "cancel_operation": "Esc", "tab": "Tab",
-            "shift_tab": "Shift+Tab", "toggle_comment_block": "Ctrl+\\"
+            "shift_tab": "Shift+Tab", "toggle_comment_block": "Ctrl+\\",
+            "next_buffer": "Alt+N", "prev_buffer": "Alt+P", "list_buffers": "F8",
+            "close_buffer": "Alt+W", "toggle_hex_view": "Alt+X",
         }
         return [
             "                 ──  Sway-Pad Help  ──  ", "",
@@ -11230,6 +12904,12 @@ class SwayEditor:
             f"    {_kb('save_file', defaults['save_file']):<22}: Save",
             f"    {_kb('save_as', defaults['save_as']):<22}: Save as…",
             f"    {_kb('quit', defaults['quit']):<22}: Quit editor",
+            "", "  Buffers:",
+            f"    {_kb('next_buffer', defaults['next_buffer']):<22}: Next buffer",
+            f"    {_kb('prev_buffer', defaults['prev_buffer']):<22}: Previous buffer",
+            f"    {_kb('list_buffers', defaults['list_buffers']):<22}: Buffer list",
+            f"    {_kb('close_buffer', defaults['close_buffer']):<22}: Close buffer",
+            f"    {_kb('toggle_hex_view', defaults['toggle_hex_view']):<22}: Hex view / text (Ctrl+G: offset)",
             "", "  Editing:",
             f"    {_kb('copy', defaults['copy']):<22}: Copy",
             f"    {_kb('cut', defaults['cut']):<22}: Cut",
@@ -11615,7 +13295,34 @@ class SwayEditor:
         except queue.Empty:
             pass
 
-        # --- 6. Lint panel auto-hide logic ---
+        # --- 6. Lines published by a background file load ---
+        if self._drain_file_load():
+            any_state_changed_by_queues = True
+
+        # --- 6a. Files opened together, finished by the preload pool ---
+        if self._poll_preloads():
+            any_state_changed_by_queues = True
+
+        # --- 7. Progress / completion of a background save ---
+        if self._poll_file_save():
+            any_state_changed_by_queues = True
+
+        # --- 7a. The shown file changed on disk ---
+        if self._poll_disk_changes():
+            any_state_changed_by_queues = True
+
+        # --- 7b. Lines highlighted by the tokenize worker ---
+        if self._poll_tokenizer():
+            any_state_changed_by_queues = True
+
+        # --- 8. Hand this frame's edits to batched edit-event subscribers ---
+        self.edit_events.flush()
+
+        # --- 9. Append queued edits to the crash-recovery journal (no redraw needed) ---
+        if self._journal is not None:
+            self._journal.flush()
+
+        # --- 10. Lint panel auto-hide logic ---
         if self.lint_panel_active and self.lint_panel_message:
             if hasattr(self, "drawer") and hasattr(self.drawer, "_keep_lint_panel_alive"):
                 self.drawer._keep_lint_panel_alive()
@@ -11686,6 +13393,10 @@ class SwayEditor:
                     
                     # The drawer component handles all drawing logic.
                     self.drawer.draw()
+                    if self.first_paint_seconds is None:
+                        self.first_paint_seconds = time.monotonic() - self._started_at
+                        logging.info(f"First paint {self.first_paint_seconds * 1000:.1f} ms after start "
+                                     f"({len(self.buffers)} buffer(s), '{self.filename}').")
 
                     last_draw_time = current_time
                     needs_redraw = False  # Reset the flag after a successful draw.
@@ -11723,7 +13434,58 @@ class SwayEditor:
                 # return
 
 
-def main_curses_function(stdscr):
+# Name of the background load that reads piped standard input.
+STDIN_NAME = "<stdin>"
+
+
+def detach_stdin_pipe() -> Optional[BinaryIO]:
+    """
+    Moves piped standard input out of the terminal's way (before curses starts).
+
+    curses reads keys from file descriptor 0, so the pipe is duplicated to a new
+    descriptor and the controlling terminal (/dev/tty) is opened in its place.
+
+    Returns:
+        Optional[BinaryIO]: The pipe as an unbuffered binary stream, whose reads
+        return whatever data has arrived, or None if there is no terminal to read
+        keys from.
+    """
+    try:
+        tty_fd = os.open("/dev/tty", os.O_RDWR)
+    except OSError as e:
+        logger.error(f"Cannot read piped standard input: no terminal for key input ({e}).")
+        return None
+    pipe_fd = os.dup(0)
+    os.dup2(tty_fd, 0)
+    os.close(tty_fd)
+    logger.info("Standard input is a pipe; keys are read from /dev/tty.")
+    return os.fdopen(pipe_fd, "rb", buffering=0)
+
+
+def parse_cli_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the editor's command-line arguments.
+
+    Args:
+        argv (Optional[List[str]]): Arguments without the program name; defaults to `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: `files` (List[str], `["-"]` for standard input) and `view` (bool).
+    """
+    parser = argparse.ArgumentParser(prog="sway-pad", description="Sway-Pad terminal text editor.")
+    parser.add_argument("files", nargs="*", metavar="file",
+                        help="files to open (read in parallel, one buffer each), or - to read standard input")
+    parser.add_argument(
+        "-R", "--view", action="store_true",
+        help="open the files as read-only memory-mapped views (no full load, suited to huge logs)",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if "-" in args.files and len(args.files) > 1:
+        parser.error("- (standard input) cannot be combined with file names")
+    return args
+
+
+def main_curses_function(stdscr, cli_args: Optional[argparse.Namespace] = None):
     """
     Initializes and runs the SwayPad editor inside the curses wrapper context.
 
@@ -11738,8 +13500,8 @@ def main_curses_function(stdscr):
     Locale is set to the system default to support correct character width calculations
     and other locale-dependent behaviors.
 
-    If a filename is provided via the command line, it is loaded into the editor;
-    otherwise, an empty buffer is used.
+    Files given on the command line are opened in buffers of their own (see
+    `SwayEditor.open_files`); otherwise, an empty buffer is used.
 
     Any unhandled exceptions during editor execution are logged in detail to
     multiple places (log files, stderr, and a dedicated critical error log file),
@@ -11747,6 +13509,8 @@ def main_curses_function(stdscr):
 
     Args:
         stdscr (curses.window): The curses standard screen object provided by curses.wrapper().
+        cli_args (Optional[argparse.Namespace]): Parsed command line (see `parse_cli_args`);
+            parsed from `sys.argv` if not given.
 
     Raises:
         Exception: Any unhandled exception encountered during the editor's lifetime is re-raised
@@ -11780,16 +13544,28 @@ def main_curses_function(stdscr):
         editor = SwayEditor(stdscr)  # Pass the curses screen object
 
         # Handle command-line arguments (e.g., open a file specified at startup)
-        if len(sys.argv) > 1:
-            filename_arg = sys.argv[1]
-            logger.info(f"Attempting to open file from command line argument: '{filename_arg}'")
-            # open_file handles its own error reporting and status messages.
-            # It also returns a bool indicating if a redraw is needed, but main_curses_function
-            # doesn't directly use it; editor.run() handles the redraw loop.
-            editor.open_file(filename_arg)
+        if cli_args is None:
+            cli_args = parse_cli_args()
+        stdin_stream = getattr(cli_args, "stdin", None)
+        if stdin_stream is not None:
+            logger.info("Reading piped standard input into an unnamed buffer.")
+            editor.open_stdin(stdin_stream)
+        elif cli_args.files == ["-"]:
+            # `-` without a detached pipe (no terminal, or stdin is the terminal itself).
+            editor._set_status_message("Standard input is not available for reading")
+        elif cli_args.files:
+            logger.info(f"Attempting to open {len(cli_args.files)} file(s) from the command line: {cli_args.files}")
+            # open_files/open_file handle their own error reporting and status messages.
+            # The files after the first are read concurrently while editor.run() already draws.
+            # Without --view, a file still switches to a view above the size threshold.
+            editor.open_files(cli_args.files, view_mode=True if cli_args.view else None)
+        elif editor.config.get("session", {}).get("restore_on_start", False) and editor.restore_session():
+            logger.info("No file specified on command line. Reopened the files of the last session.")
         else:
             logger.info("No file specified on command line. Starting with a new, empty buffer.")
-            # The editor is initialized with an empty buffer by default in SwayEditor.__init__.
+            # The editor is initialized with an empty buffer by default in SwayEditor.__init__;
+            # offer the unsaved text of an unnamed buffer from a crashed session.
+            editor._offer_journal_recovery()
 
         # Start the main editor loop
         logger.debug("Starting editor's main run() loop.")
@@ -11834,6 +13610,14 @@ def main_curses_function(stdscr):
 if __name__ == "__main__":
     # 1. Perform initial setup that doesn't depend on curses (like signal handling, config loading, logging setup)
 
+    # Parse arguments before curses takes over the terminal, so usage errors stay readable.
+    cli_args = parse_cli_args()
+    # `-`, or no file with piped input: hand the pipe to the editor and give curses the terminal.
+    cli_args.stdin = None
+    if cli_args.files == ["-"] or (not cli_args.files and not sys.stdin.isatty()):
+        if not sys.stdin.isatty():
+            cli_args.stdin = detach_stdin_pipe()
+
     # Attempt to ignore SIGTSTP (Ctrl+Z, suspend) if on a platform that supports it.
     # This is often done to prevent the editor from being suspended accidentally.
     if hasattr(signal, 'SIGTSTP'):
@@ -11870,7 +13654,7 @@ if __name__ == "__main__":
     # curses.wrapper handles curses initialization, calls main_curses_function,
     # and ensures curses is properly shut down (terminal restored) on exit or error.
     try:
-        curses.wrapper(main_curses_function)
+        curses.wrapper(main_curses_function, cli_args)
         logger.info("Sway-Pad editor shut down gracefully.")
     except Exception as e_wrapper:  # Catch any unhandled exceptions that escape curses.wrapper
         # This is a last-ditch effort to log critical failures.
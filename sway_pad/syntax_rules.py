@@ -0,0 +1,134 @@
+# syntax_rules.py
+"""syntax_rules.py – highlighting a line with the regex rules of ``[syntax_highlighting.<lang>]``.
+
+The rules of a language are applied in order, each to the whole line, and a
+later rule recolours what an earlier one matched: in ``x = "#1"`` the Python
+rules colour ``"#1"`` as a string, then ``#1"`` as a comment.  The editor used
+to do that with a colour per character – a Python loop over every matched
+character – and built the segments back one character at a time.
+
+``RuleHighlighter`` keeps the matching in the regex engine (one ``finditer``
+per rule) and paints the matches with slice assignments; a segment can only
+begin where a match begins or ends, so only those positions are visited.  The
+output is the same, segment for segment.  Most of the time left is the regex
+scans themselves, so a rule is not run on a line that lacks a literal every
+match of it contains (``required_literals``: ``'0x'`` or ``'0X'``, ``'#'``,
+``"'''"``).
+
+A single alternation of all rules would scan the line once, but it cannot
+give the same result – it never looks inside a match (the comment in the
+string above), and the rules' group numbers and back-references (``\\2``)
+change when they are combined – and with ``re`` it is no faster: every
+alternative is still tried at every position.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import FrozenSet, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - the parser is private; without it no rule is skipped
+    sre_parse = None
+
+Segment = Tuple[str, int]
+
+# A rule is skipped on a line without one of these literals; more than this many are not worth checking.
+_MAX_LITERALS = 8
+
+
+def _best(candidates: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    """The most selective set: the longest shortest literal, then the fewest literals."""
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: (min(map(len, literals)), -len(literals)))
+
+
+def _sequence_literals(items) -> Optional[FrozenSet[str]]:
+    candidates: List[FrozenSet[str]] = []
+    run = {""}
+
+    def close_run():
+        nonlocal run
+        if run != {""}:
+            candidates.append(frozenset(run))
+        run = {""}
+
+    for op, av in items:
+        op = str(op)
+        if op == "LITERAL":
+            run = {prefix + chr(av) for prefix in run}
+        elif op == "IN" and all(str(item_op) == "LITERAL" for item_op, _c in av) \
+                and len(run) * len(av) <= _MAX_LITERALS:
+            run = {prefix + chr(c) for prefix in run for _op, c in av}
+        elif op == "AT":
+            continue  # zero-width: the literals on both sides are adjacent
+        else:
+            close_run()
+            inner = None
+            if op == "SUBPATTERN" and not av[1] & re.IGNORECASE:
+                inner = _sequence_literals(av[3])
+            elif op == "BRANCH":
+                branches = [_sequence_literals(branch) for branch in av[1]]
+                if all(branches):
+                    inner = frozenset().union(*branches)
+            elif op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and av[0] >= 1:
+                inner = _sequence_literals(av[2])
+            if inner and len(inner) <= _MAX_LITERALS:
+                candidates.append(inner)
+    close_run()
+    return _best(candidates)
+
+
+def required_literals(pattern: Pattern[str]) -> Optional[FrozenSet[str]]:
+    """
+    Strings of which every match of ``pattern`` contains one (``'0x'`` or
+    ``'0X'`` for ``\\b0[xX][0-9a-f]+``), or None if there are none worth checking.
+    """
+    if sre_parse is None or pattern.flags & re.IGNORECASE or not isinstance(pattern.pattern, str):
+        return None
+    try:
+        return _sequence_literals(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+
+
+class RuleHighlighter:
+    """The compiled rules of one language in one colour theme."""
+
+    def __init__(self, rules: Sequence[Tuple[Pattern[str], str]], colors: Mapping[str, int], default: int):
+        self.default = default
+        self.rules = [(pattern, colors.get(color_name, colors["default"]), required_literals(pattern))
+                      for pattern, color_name in rules]
+
+    def highlight(self, line: str) -> List[Segment]:
+        """``(text, curses_attribute)`` segments of ``line``; adjacent segments differ in colour."""
+        if not line:
+            return [("", self.default)]
+        line_len = len(line)
+        char_colors = None
+        edges = set()
+        for pattern, color_attr, literals in self.rules:
+            if literals is not None and not any(literal in line for literal in literals):
+                continue
+            for match in pattern.finditer(line):
+                start, end = match.span()
+                if start == end:
+                    continue
+                if char_colors is None:
+                    char_colors = [self.default] * line_len
+                char_colors[start:end] = [color_attr] * (end - start)
+                edges.add(start)
+                edges.add(end)
+        if char_colors is None:
+            return [(line, self.default)]
+
+        segments = []
+        segment_start, segment_color = 0, char_colors[0]
+        for edge in sorted(edges):
+            if 0 < edge < line_len and char_colors[edge] != segment_color:
+                segments.append((line[segment_start:edge], segment_color))
+                segment_start, segment_color = edge, char_colors[edge]
+        segments.append((line[segment_start:], segment_color))
+        return segments
@@ -0,0 +1,741 @@
+# text_buffer.py
+"""text_buffer.py – pluggable line storage for the editor document.
+
+The editor historically kept its document in a plain ``list[str]``.  This
+module puts a small buffer API in front of that storage so the backing data
+structure can be swapped without touching every edit path:
+
+    • ``line_count()`` / ``get_line(i)`` – random access to a line.
+    • ``splice(start, end, lines)``     – replace a line range in one step.
+    • ``iter_range(start, end)``        – cheap sequential iteration.
+
+Every backend also implements the ``MutableSequence`` protocol, so existing
+code that indexes, slices, ``insert``s or ``del``s on ``editor.text`` keeps
+working unchanged.
+
+Three backends are provided:
+
+    • ``ListBuffer`` – the reference implementation, a thin wrapper around a
+      Python list (identical behaviour and cost profile to the old storage).
+    • ``PieceTableBuffer`` – a line-granular piece table.  The original file
+      content is never copied or shifted; edits only append to an add-buffer
+      and rewrite a short list of pieces, so a multi-line paste near the top
+      of a 500k-line file costs O(pieces + pasted lines) instead of O(lines).
+    • ``CompactLineBuffer`` – the same piece table over a ``ByteLineStore``:
+      unedited lines stay UTF-8 encoded in one ``bytearray`` with an
+      ``array('Q')`` of offsets and are decoded only when read.  A ``str``
+      costs ~50 bytes of header per line, so for large ASCII logs this keeps
+      the resident size close to the file size.
+
+``snapshot()`` returns an immutable, versioned ``BufferSnapshot`` of the
+document.  It shares storage with the buffer instead of copying it; the
+buffer copies whatever it would otherwise change in place on its next edit
+(the piece list, or the whole list for ``ListBuffer``).  Background workers
+take a snapshot while holding the editor lock – O(1) for the piece tables –
+and then read it without the lock.
+"""
+
+from __future__ import annotations
+
+import abc
+import logging
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableSequence, Sequence
+from itertools import accumulate, islice, repeat
+from operator import add
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Piece = (source_id, start_in_source, length_in_lines)
+_Piece = Tuple[int, int, int]
+
+# Change listener: (start, end, lines) – lines [start, end) (pre-edit numbering) were replaced by `lines`.
+SpliceListener = Callable[[int, int, List[str]], None]
+
+_ORIGINAL = 0
+_ADD = 1
+
+# Lines encoded per step when filling a ByteLineStore (bounds the transient copies).
+_STORE_BATCH_LINES = 65536
+
+# Lines yielded per uninterruptible step of iter_range() (see PieceTableBuffer.iter_range).
+_ITER_BATCH_LINES = 1024
+
+
+class ReadOnlyBufferError(RuntimeError):
+    """Raised when an edit is attempted on a read-only buffer (e.g. a file view)."""
+
+
+class TextBuffer(MutableSequence):
+    """
+    Abstract line buffer.
+
+    Subclasses implement the four primitives below; the sequence protocol
+    (indexing, slicing, ``insert``, ``del`` …) is derived from them.
+    """
+
+    backend_name = "abstract"
+
+    # ───────────────────── Buffer API (to be implemented) ─────────────────────
+    @abc.abstractmethod
+    def line_count(self) -> int:
+        """Number of lines in the buffer."""
+
+    @abc.abstractmethod
+    def get_line(self, index: int) -> str:
+        """Line ``index`` (non-negative)."""
+
+    @abc.abstractmethod
+    def splice(self, start: int, end: int, lines: Iterable[str]) -> None:
+        """Replaces lines ``[start, end)`` with ``lines`` in a single operation."""
+
+    @abc.abstractmethod
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """Lines ``[start, end)``; ``end`` defaults to the end of the buffer."""
+
+    # ───────────────────── Versions & snapshots ─────────────────────
+    _version = 0
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every change of the buffer."""
+        return self._version
+
+    def line_version(self, index: int) -> int:
+        """
+        ``version`` at which line ``index`` was last written (0: unchanged since
+        the buffer was created).  Lines shifted by an insert or delete keep their
+        version.  Backends that do not track lines return ``version``.
+        """
+        return self._version
+
+    def snapshot(self) -> "BufferSnapshot":
+        """Immutable view of the current document (generic fallback: a full copy)."""
+        return _ListSnapshot(self.to_list(), self._version)
+
+    # ───────────────────── Change listeners ─────────────────────
+    _listeners: Tuple[SpliceListener, ...] = ()
+
+    def add_listener(self, callback: SpliceListener) -> None:
+        """Calls ``callback(start, end, lines)`` after every change of the buffer."""
+        self._listeners = self._listeners + (callback,)
+
+    def remove_listener(self, callback: SpliceListener) -> None:
+        # `!=`, not `is not`: every access to a bound method creates a new object.
+        self._listeners = tuple(cb for cb in self._listeners if cb != callback)
+
+    def _notify(self, start: int, end: int, lines: List[str]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(start, end, lines)
+            except Exception:  # a broken listener must not break editing
+                logger.exception("TextBuffer listener %r failed.", callback)
+
+    # ───────────────────── Helpers ─────────────────────
+    read_only = False
+
+    def close(self) -> None:
+        """Releases any external resources held by the buffer (no-op for in-memory backends)."""
+
+    def to_list(self) -> List[str]:
+        """Returns a plain list copy of the whole buffer."""
+        return list(self.iter_range(0, self.line_count()))
+
+    def _normalize_index(self, index: int) -> int:
+        n = self.line_count()
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"line index {index} out of range (buffer has {n} lines)")
+        return index
+
+    # ───────────────────── MutableSequence protocol ─────────────────────
+    def __len__(self) -> int:
+        return self.line_count()
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(0, self.line_count())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.line_count())
+            if step == 1:
+                return list(self.iter_range(start, max(start, stop)))
+            return [self.get_line(i) for i in range(start, stop, step)]
+        return self.get_line(self._normalize_index(index))
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.line_count())
+            if step != 1:
+                raise ValueError("extended slice assignment is not supported by TextBuffer")
+            self.splice(start, max(start, stop), list(value))
+            return
+        i = self._normalize_index(index)
+        self.splice(i, i + 1, (value,))
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.line_count())
+            if step != 1:
+                raise ValueError("extended slice deletion is not supported by TextBuffer")
+            if stop > start:
+                self.splice(start, stop, ())
+            return
+        i = self._normalize_index(index)
+        self.splice(i, i + 1, ())
+
+    def insert(self, index: int, value: str) -> None:
+        n = self.line_count()
+        if index < 0:
+            index = max(0, index + n)
+        index = min(index, n)
+        self.splice(index, index, (value,))
+
+    def extend(self, values: Iterable[str]) -> None:
+        n = self.line_count()
+        self.splice(n, n, list(values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TextBuffer, list, tuple)):
+            if len(self) != len(other):
+                return False
+            return all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # mutable container
+
+    def __repr__(self) -> str:
+        preview = self[:3]
+        return f"<{type(self).__name__} lines={len(self)} head={preview!r}>"
+
+
+class ListBuffer(TextBuffer):
+    """Reference backend: a plain Python list of lines."""
+
+    backend_name = "list"
+
+    def __init__(self, lines: Optional[Iterable[str]] = None):
+        self._lines: List[str] = list(lines) if lines is not None else [""]
+        self._line_versions: List[int] = [0] * len(self._lines)
+        self._shared = False  # `_lines` is referenced by a snapshot
+
+    def snapshot(self) -> "BufferSnapshot":
+        """Shares the list; the first edit after it copies the list (O(lines) once)."""
+        self._shared = True
+        return _ListSnapshot(self._lines, self._version)
+
+    def _before_edit(self) -> None:
+        if self._shared:
+            self._lines = list(self._lines)
+            self._shared = False
+        self._version += 1
+
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def get_line(self, index: int) -> str:
+        return self._lines[index]
+
+    def splice(self, start: int, end: int, lines: Iterable[str]) -> None:
+        self._before_edit()
+        new_lines = lines if isinstance(lines, list) else list(lines)
+        if self._listeners:
+            n = len(self._lines)
+            start = max(0, min(start, n))
+            end = max(start, min(end, n))
+        self._lines[start:end] = new_lines
+        self._line_versions[start:end] = [self._version] * len(new_lines)
+        if self._listeners:
+            self._notify(start, end, new_lines)
+
+    def line_version(self, index: int) -> int:
+        return self._line_versions[index]
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        if end is None:
+            end = len(self._lines)
+        if start == 0 and end >= len(self._lines):
+            return iter(self._lines)
+        return iter(self._lines[start:end])
+
+    # Fast paths that avoid the generic splice round-trip
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        return self._lines[index]
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if self._listeners:
+            super().__setitem__(index, value)  # through splice(), so listeners see the change
+        else:
+            self._before_edit()
+            if isinstance(index, slice):
+                value = list(value)
+                self._line_versions[index] = [self._version] * len(value)
+            else:
+                self._line_versions[index] = self._version
+            self._lines[index] = value
+
+    def to_list(self) -> List[str]:
+        return list(self._lines)
+
+
+class PieceTableBuffer(TextBuffer):
+    """
+    Line-granular piece table.
+
+    The document is described by an ordered list of pieces, each referring to
+    a contiguous run of lines in one of two sources:
+
+        • the *original* source – the sequence the buffer was created with
+          (never modified);
+        • the *add* source – an append-only list that receives every line
+          written by an edit.
+
+    ``_starts[k]`` holds the document line number at which piece ``k`` begins,
+    so random access is a ``bisect`` over the piece list.  A splice only
+    rewrites the pieces touching the edited range and recomputes the start
+    offsets after it, i.e. O(pieces) work independent of the document length.
+    """
+
+    backend_name = "piece_table"
+
+    def __init__(self, lines: Optional[Iterable[str]] = None):
+        original: Sequence[str]
+        if lines is None:
+            original = [""]
+        elif isinstance(lines, (list, tuple)):
+            original = lines
+        else:
+            original = list(lines)
+        self._reset(original)
+
+    def _reset(self, original: Sequence[str]) -> None:
+        """Makes ``original`` the whole document, described by a single piece."""
+        self._sources: Tuple[Sequence[str], List[str]] = (original, [])
+        self._pieces: List[_Piece] = [(_ORIGINAL, 0, len(original))] if len(original) else []
+        self._starts: List[int] = [0] if self._pieces else []
+        self._length = len(original)
+        self._shared = False   # `_pieces` / `_starts` are referenced by a snapshot
+        self._frozen_add = 0   # add-buffer slots below this may be read by a snapshot
+        # Per-line versions: one entry per add-buffer slot, and runs of original
+        # slots (run k starts at `_original_runs[k]`, see CompactLineBuffer appends).
+        self._add_versions = array("Q")
+        self._original_runs: List[int] = [0]
+        self._original_run_versions: List[int] = [self._version]  # compact(): every line counts as rewritten
+
+    def snapshot(self) -> "BufferSnapshot":
+        """O(1): the snapshot shares the piece list and the (append-only) sources."""
+        self._shared = True
+        self._frozen_add = len(self._sources[_ADD])
+        return _PieceSnapshot(self)
+
+    def _own_pieces(self) -> None:
+        """Copy-on-write: gives the buffer private piece/start lists before they are mutated."""
+        if self._shared:
+            self._pieces = list(self._pieces)
+            self._starts = list(self._starts)
+            self._shared = False
+
+    # ───────────────────── Buffer API ─────────────────────
+    def line_count(self) -> int:
+        return self._length
+
+    def get_line(self, index: int) -> str:
+        k = bisect_right(self._starts, index) - 1
+        src, start, _length = self._pieces[k]
+        return self._sources[src][start + index - self._starts[k]]
+
+    def line_version(self, index: int) -> int:
+        index = self._normalize_index(index)
+        k = bisect_right(self._starts, index) - 1
+        src, start, _length = self._pieces[k]
+        slot = start + index - self._starts[k]
+        if src == _ADD:
+            return self._add_versions[slot]
+        return self._original_run_versions[bisect_right(self._original_runs, slot) - 1]
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        if end is None or end > self._length:
+            end = self._length
+        if start >= end:
+            return
+        k = bisect_right(self._starts, start) - 1
+        pos = start
+        while pos < end and k < len(self._pieces):
+            src, p_start, p_len = self._pieces[k]
+            offset = pos - self._starts[k]
+            take = min(p_len - offset, end - pos)
+            getter = self._sources[src].__getitem__
+            # Batched: a `yield from` never lets another thread take the GIL while it runs.
+            for first in range(p_start + offset, p_start + offset + take, _ITER_BATCH_LINES):
+                yield from map(getter, range(first, min(first + _ITER_BATCH_LINES, p_start + offset + take)))
+            pos += take
+            k += 1
+
+    def splice(self, start: int, end: int, lines: Iterable[str]) -> None:
+        n = self._length
+        start = max(0, min(start, n))
+        end = max(start, min(end, n))
+        new_lines = lines if isinstance(lines, (list, tuple)) else list(lines)
+        self._version += 1
+        self._splice(start, end, new_lines)
+        if self._listeners:
+            self._notify(start, end, list(new_lines))
+
+    def _splice(self, start: int, end: int, new_lines: List[str]) -> None:
+        """`splice` with ``start``/``end`` already clamped to the document."""
+        n = self._length
+
+        # Fast path: overwrite a single line that already lives at the tail
+        # of the add buffer (typing repeatedly on the same line).
+        if end - start == 1 and len(new_lines) == 1 and self._rewrite_tail_line(start, new_lines[0]):
+            return
+        self._own_pieces()
+
+        inserted: List[_Piece] = []
+        if new_lines:
+            add = self._sources[_ADD]
+            add_start = len(add)
+            add.extend(new_lines)
+            self._add_versions.extend(repeat(self._version, len(new_lines)))
+            inserted.append((_ADD, add_start, len(new_lines)))
+
+        pieces = self._pieces
+        if not pieces:
+            self._pieces = inserted
+            self._recompute_starts(0)
+            self._length = len(new_lines)
+            return
+
+        # Locate the piece containing `start` (k1) and the piece containing `end` (k2).
+        k1 = bisect_right(self._starts, start) - 1 if start < n else len(pieces)
+        k2 = bisect_right(self._starts, end) - 1 if end < n else len(pieces)
+
+        replacement: List[_Piece] = []
+        if k1 < len(pieces):
+            src, p_start, _p_len = pieces[k1]
+            head_len = start - self._starts[k1]
+            if head_len > 0:
+                replacement.append((src, p_start, head_len))
+        replacement.extend(inserted)
+        if k2 < len(pieces):
+            src, p_start, p_len = pieces[k2]
+            tail_offset = end - self._starts[k2]
+            if tail_offset < p_len:
+                replacement.append((src, p_start + tail_offset, p_len - tail_offset))
+
+        left = pieces[:k1]
+        right = pieces[k2 + 1:] if k2 < len(pieces) else []
+        merged = self._coalesce(left, replacement, right)
+        self._pieces = merged
+        self._length = n - (end - start) + len(new_lines)
+        self._recompute_starts(max(0, k1 - 1))
+
+    # ───────────────────── Internals ─────────────────────
+    def _rewrite_tail_line(self, index: int, value: str) -> bool:
+        """Overwrites ``index`` in place when it is the last line of the add buffer."""
+        if index >= self._length:
+            return False
+        k = bisect_right(self._starts, index) - 1
+        src, p_start, _p_len = self._pieces[k]
+        add = self._sources[_ADD]
+        slot = p_start + index - self._starts[k]
+        if src != _ADD or slot != len(add) - 1 or slot < self._frozen_add:
+            return False
+        add[slot] = value
+        self._add_versions[slot] = self._version
+        return True
+
+    @staticmethod
+    def _coalesce(left: List[_Piece], middle: List[_Piece], right: List[_Piece]) -> List[_Piece]:
+        """Joins the three piece lists, merging neighbours that are contiguous in the same source."""
+        result = left
+        for piece in middle + right[:1]:
+            if piece[2] <= 0:
+                continue
+            if result:
+                src, p_start, p_len = result[-1]
+                if src == piece[0] and p_start + p_len == piece[1]:
+                    result[-1] = (src, p_start, p_len + piece[2])
+                    continue
+            result.append(piece)
+        result.extend(right[1:])
+        return result
+
+    def _recompute_starts(self, from_piece: int) -> None:
+        starts = self._starts
+        del starts[from_piece:]
+        pos = 0
+        if from_piece > 0:
+            prev_src, prev_start, prev_len = self._pieces[from_piece - 1]
+            pos = starts[from_piece - 1] + prev_len
+        for src, p_start, p_len in self._pieces[from_piece:]:
+            starts.append(pos)
+            pos += p_len
+
+    @property
+    def piece_count(self) -> int:
+        """Number of pieces currently describing the document (diagnostics)."""
+        return len(self._pieces)
+
+    def compact(self) -> None:
+        """
+        Rebuilds the buffer as a single original piece.
+
+        Useful after a long editing session has fragmented the piece list or
+        grown the add buffer with superseded lines.
+        """
+        self._reset(self.to_list())
+        logger.debug("PieceTableBuffer compacted to %d lines.", self._length)
+
+
+class ByteLineStore(Sequence):
+    """
+    Append-only sequence of lines packed into a single UTF-8 ``bytearray``.
+
+    ``_offsets[i]`` is the byte offset at which line ``i`` starts and
+    ``_offsets[-1]`` the end of the data; each line is stored followed by a
+    ``\\n``.  A line costs its encoded length plus 8 bytes of offset and is
+    decoded to ``str`` on every access.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()):
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        it = iter(lines)
+        while True:
+            batch = list(islice(it, _STORE_BATCH_LINES))
+            if not batch:
+                break
+            self.append_lines(batch)
+
+    def append_lines(self, lines: Sequence[str]) -> None:
+        """
+        Appends ``lines`` to the store.
+
+        Raises:
+            ValueError: If a line contains ``"\\n"`` (the store is left unchanged).
+        """
+        if not lines:
+            return
+        joined = "\n".join(lines)
+        if joined.count("\n") != len(lines) - 1:
+            raise ValueError("ByteLineStore lines must not contain line breaks")
+        blob = joined.encode("utf-8", "surrogatepass")
+        # Encoded lengths equal str lengths for ASCII text; otherwise measure the encoded parts.
+        lengths = map(len, lines if joined.isascii() else blob.split(b"\n"))
+        base = self._offsets[-1]
+        self._data += blob
+        self._data += b"\n"
+        # offset of line k+1 = base + sum(len(encoded line) + 1) – computed without a Python loop
+        ends = accumulate(map(add, lengths, repeat(1)))
+        self._offsets.extend(map(add, ends, repeat(base)))
+
+    def memory_bytes(self) -> int:
+        """Bytes allocated for the encoded text and the offset table."""
+        return self._data.__alloc__() + self._offsets.buffer_info()[1] * self._offsets.itemsize
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError("ByteLineStore index out of range")
+        offsets = self._offsets
+        return self._data[offsets[index]:offsets[index + 1] - 1].decode("utf-8", "surrogatepass")
+
+
+class CompactLineBuffer(PieceTableBuffer):
+    """
+    Piece table whose original source is a ``ByteLineStore``.
+
+    Lines that were never edited stay encoded in the store and are decoded
+    only when rendered, searched or copied.  An edit writes its lines to the
+    add buffer as ordinary ``str`` objects, so the add buffer acts as the
+    overlay of promoted lines.  Appends at the very end of the document (the
+    batches of a background file load) are packed into the store instead,
+    so loading never holds one ``str`` per line.
+    """
+
+    backend_name = "compact"
+
+    def __init__(self, lines: Optional[Iterable[str]] = None):
+        if lines is None:
+            lines = [""]
+        elif not isinstance(lines, (list, tuple)):
+            lines = list(lines)
+        try:
+            original: Sequence[str] = ByteLineStore(lines)
+        except ValueError:
+            logger.warning("CompactLineBuffer: lines contain line breaks, keeping them as str.")
+            original = lines
+        self._reset(original)
+
+    def _splice(self, start: int, end: int, new_lines: List[str]) -> None:
+        if start == self._length and self._append_to_store(new_lines):
+            return
+        super()._splice(start, end, new_lines)
+
+    def _append_to_store(self, lines: Sequence[str]) -> bool:
+        """Packs lines appended at the end into the store when the last piece already ends there."""
+        store = self._sources[_ORIGINAL]
+        if not lines or not isinstance(store, ByteLineStore):
+            return False
+        first = len(store)
+        if self._pieces:
+            src, p_start, p_len = self._pieces[-1]
+            if src != _ORIGINAL or p_start + p_len != first:
+                return False
+        try:
+            store.append_lines(lines)  # append-only: lines a snapshot can see stay untouched
+        except ValueError:
+            return False
+        self._own_pieces()
+        if self._version != self._original_run_versions[-1]:
+            self._original_runs.append(first)
+            self._original_run_versions.append(self._version)
+        if self._pieces:
+            self._pieces[-1] = (_ORIGINAL, p_start, p_len + len(lines))
+        else:
+            self._pieces.append((_ORIGINAL, first, len(lines)))
+            self._starts.append(0)
+        self._length += len(lines)
+        return True
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the byte store (the add buffer of edited lines is not counted)."""
+        store = self._sources[_ORIGINAL]
+        return store.memory_bytes() if isinstance(store, ByteLineStore) else 0
+
+    def compact(self) -> None:
+        """Re-packs every line, edited ones included, into a fresh byte store."""
+        try:
+            self._reset(ByteLineStore(self.iter_range()))
+        except ValueError:
+            super().compact()
+            return
+        logger.debug("CompactLineBuffer compacted to %d lines (%d bytes).", self._length, self.memory_bytes())
+
+
+class BufferSnapshot(Sequence):
+    """
+    Read-only view of a buffer as of ``version``.
+
+    A snapshot never changes, whatever happens to its buffer later, so it can
+    be read from any thread without the editor lock.
+    """
+
+    read_only = True
+
+    def __init__(self, version: int):
+        self.version = version
+
+    @abc.abstractmethod
+    def line_count(self) -> int:
+        """Number of lines in the snapshot."""
+
+    @abc.abstractmethod
+    def get_line(self, index: int) -> str:
+        """Line ``index`` (non-negative)."""
+
+    @abc.abstractmethod
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """Lines ``[start, end)``; ``end`` defaults to the end of the snapshot."""
+
+    def to_list(self) -> List[str]:
+        return list(self.iter_range(0, self.line_count()))
+
+    def __len__(self) -> int:
+        return self.line_count()
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(0, self.line_count())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        n = self.line_count()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(n)
+            if step == 1:
+                return list(self.iter_range(start, max(start, stop)))
+            return [self.get_line(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"line index {index} out of range (snapshot has {n} lines)")
+        return self.get_line(index)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} version={self.version} lines={len(self)}>"
+
+
+class _ListSnapshot(BufferSnapshot):
+    """Snapshot over a list that nobody mutates any more."""
+
+    def __init__(self, lines: List[str], version: int):
+        super().__init__(version)
+        self._lines = lines
+
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def get_line(self, index: int) -> str:
+        return self._lines[index]
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        return islice(self._lines, start, len(self._lines) if end is None else end)
+
+    def to_list(self) -> List[str]:
+        return list(self._lines)
+
+
+class _PieceSnapshot(BufferSnapshot):
+    """Snapshot of a piece table: its piece list, start offsets and sources as of one version."""
+
+    def __init__(self, buffer: PieceTableBuffer):
+        super().__init__(buffer.version)
+        self._sources = buffer._sources
+        self._pieces = buffer._pieces
+        self._starts = buffer._starts
+        self._length = buffer._length
+
+    def line_count(self) -> int:
+        return self._length
+
+    # The read paths only touch the four fields above.
+    get_line = PieceTableBuffer.get_line
+    iter_range = PieceTableBuffer.iter_range
+
+
+BUFFER_BACKENDS = {
+    ListBuffer.backend_name: ListBuffer,
+    PieceTableBuffer.backend_name: PieceTableBuffer,
+    CompactLineBuffer.backend_name: CompactLineBuffer,
+}
+
+DEFAULT_BUFFER_BACKEND = PieceTableBuffer.backend_name
+
+
+def create_buffer(lines: Optional[Iterable[str]] = None, backend: str = DEFAULT_BUFFER_BACKEND) -> TextBuffer:
+    """
+    Creates a text buffer of the requested backend type.
+
+    Args:
+        lines: Initial document lines. ``None`` creates a buffer with a single
+            empty line, matching a fresh editor document.
+        backend: One of the names in ``BUFFER_BACKENDS``. Unknown names fall
+            back to the default backend with a warning.
+
+    Returns:
+        TextBuffer: The new buffer.
+    """
+    buffer_cls = BUFFER_BACKENDS.get(backend)
+    if buffer_cls is None:
+        logger.warning("Unknown buffer backend %r – using %r.", backend, DEFAULT_BUFFER_BACKEND)
+        buffer_cls = BUFFER_BACKENDS[DEFAULT_BUFFER_BACKEND]
+    return buffer_cls(lines)
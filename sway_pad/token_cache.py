@@ -0,0 +1,127 @@
+# token_cache.py
+"""token_cache.py – the highlighted lines of one buffer, bounded by size.
+
+Highlighting used to be memoized with ``functools.lru_cache`` on an editor
+method: one cache for every buffer (and editor), 20 000 entries whatever
+their size – long minified lines made that hundreds of MB – keyed on the
+full line text, and cleared as a whole whenever any buffer changed lexer.
+
+Each buffer now owns a ``TokenCache``. An entry is the highlighting of a
+line lexed from a lexer state: its ``(text, curses_attribute)`` segments –
+or None where only the state after the line was needed – and that state.
+It is keyed by ``(hash(line), len(line), lexer_key, state)``; the line
+text itself is not kept a second time. ``lexer_key`` tells lexers (and
+sets of custom rules) apart, so a buffer that changes language keeps its
+old entries until they age out, and no other buffer is affected.
+
+The cache is LRU within ``max_bytes``, an estimate of the memory held by
+the entries. ``hits``, ``misses`` and ``evictions`` count lookups for
+diagnostics (``summary``).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Estimated bytes of one entry (key and value tuples, dict node) and of one
+# segment (tuple, list slot, str header); a segment's text adds its length.
+_ENTRY_BYTES = 240
+_SEGMENT_BYTES = 113
+
+Segment = Tuple[str, int]
+Entry = Tuple[Optional[List[Segment]], Hashable]
+
+
+def entry_bytes(segments: Optional[List[Segment]]) -> int:
+    """Estimated memory held by a cache entry with these segments."""
+    if not segments:
+        return _ENTRY_BYTES
+    return _ENTRY_BYTES + sum(_SEGMENT_BYTES + len(text) for text, _attr in segments)
+
+
+class TokenCache:
+    """
+    Size-bounded LRU map of ``(line, lexer_key, state)`` to ``(segments, end_state)``.
+
+    ``get`` counts and refreshes the entry; ``peek`` does neither and is the
+    lookup for other threads (the tokenize worker), which must not reorder
+    the map while the editor uses it.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[int, int, Any, Hashable], Tuple[Entry, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(line: str, lexer_key: Any, state: Hashable) -> Tuple[int, int, Any, Hashable]:
+        return hash(line), len(line), lexer_key, state
+
+    def peek(self, line: str, lexer_key: Any, state: Hashable, need_segments: bool = True) -> Optional[Entry]:
+        """The entry, or None if there is none (or it lacks the segments that are needed)."""
+        stored = self._entries.get(self._key(line, lexer_key, state))
+        if stored is None or (need_segments and stored[0][0] is None):
+            return None
+        return stored[0]
+
+    def get(self, line: str, lexer_key: Any, state: Hashable, need_segments: bool = True) -> Optional[Entry]:
+        """``peek``, counted as a hit or a miss; a hit becomes the most recently used entry."""
+        key = self._key(line, lexer_key, state)
+        stored = self._entries.get(key)
+        if stored is None or (need_segments and stored[0][0] is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return stored[0]
+
+    def put(self, line: str, lexer_key: Any, state: Hashable, segments: Optional[List[Segment]],
+            end_state: Hashable) -> Entry:
+        """
+        Stores an entry (an entry with segments is not replaced by one without)
+        and evicts the least recently used ones beyond ``max_bytes``. Returns
+        the entry now cached for the key.
+        """
+        key = self._key(line, lexer_key, state)
+        stored = self._entries.get(key)
+        if stored is not None:
+            if segments is None or stored[0][0] is not None:
+                self._entries.move_to_end(key)
+                return stored[0]
+            self.bytes -= stored[1]
+        entry = (segments, end_state)
+        size = entry_bytes(segments)
+        if size > self.max_bytes:
+            self._entries.pop(key, None)
+            return entry  # larger than the whole budget: not kept
+        self._entries[key] = (entry, size)
+        self._entries.move_to_end(key)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _key, (_entry, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def summary(self) -> str:
+        """One line for diagnostics: size, hit rate and evictions."""
+        lookups = self.hits + self.misses
+        hit_rate = f"{100.0 * self.hits / lookups:.1f}%" if lookups else "-"
+        return (f"{len(self._entries):,} lines, {self.bytes / 2 ** 20:.1f}/{self.max_bytes / 2 ** 20:.0f} MB, "
+                f"hits {hit_rate} of {lookups:,}, {self.evictions:,} evicted")
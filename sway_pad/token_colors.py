@@ -0,0 +1,157 @@
+# token_colors.py
+"""token_colors.py – Pygments token types to curses attributes, resolved once.
+
+A token type without a colour of its own takes the colour of its closest
+ancestor (``Token.Keyword.Constant`` falls back to ``Token.Keyword``).
+Highlighting used to rebuild the ~60-entry map of ``token_color_map`` –
+calling ``curses.color_pair`` for each entry – for every line it lexed, and
+to walk the ``parent`` chain of every token.
+
+``TokenColorTable`` resolves the map once into a flat table holding every
+token type the lexer can emit (``lexer_token_types``) and all of their
+subtypes, so colouring a token is a single dict lookup. A type the table
+does not know yet – one emitted by a lexer that another one delegates to –
+is resolved on first sight and added. The editor keeps one table per lexer
+class and colour theme.
+"""
+
+from __future__ import annotations
+
+import curses
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from pygments.token import Error, Text, Token, Whitespace, _TokenType
+
+# Nesting of closures and group tuples searched for token types (``bygroups(..., using(...))``).
+_ACTION_DEPTH = 4
+
+
+def token_color_map(colors: Mapping[str, int], color_pair: Callable[[int], int]) -> Dict[Any, Optional[int]]:
+    """
+    The colour of each token type that has one of its own, for the theme ``colors``.
+
+    ``color_pair`` is ``curses.color_pair`` (the entries that follow the
+    semantic colours take precedence over them, as they always have).
+    """
+    # This is a simplified color map. You can expand it or make it more dynamic.
+    # It maps Pygments token types to the semantic color names from your config.
+    return {
+        Token.Keyword: colors.get("keyword"),
+        Token.Name.Function: colors.get("function"),
+        Token.Name.Class: colors.get("class", colors.get("type")),
+        Token.Name.Decorator: colors.get("decorator"),
+        Token.Literal.String: colors.get("string"),
+        Token.Literal.String.Doc: colors.get("comment"),
+        Token.Literal.Number: colors.get("number"),
+        Token.Comment: colors.get("comment"),
+        Token.Operator: colors.get("operator"),
+        Token.Punctuation: colors.get("default"),
+        Token.Name.Builtin: colors.get("builtin"),
+        Token.Name.Tag: colors.get("tag"),
+        Token.Name.Attribute: colors.get("attribute"),
+        Token.Error: colors.get("error"),
+
+        Token.Keyword: color_pair(2), Token.Keyword.Constant: color_pair(2),
+        Token.Keyword.Declaration: color_pair(2), Token.Keyword.Namespace: color_pair(2),
+        Token.Keyword.Pseudo: color_pair(2), Token.Keyword.Reserved: color_pair(2),
+        Token.Keyword.Type: color_pair(2), Token.Name.Builtin: color_pair(7),
+        Token.Name.Function: color_pair(3), Token.Name.Class: color_pair(4),
+        Token.Name.Decorator: color_pair(5), Token.Name.Exception: color_pair(8) | curses.A_BOLD,
+        Token.Name.Variable: color_pair(6), Token.Name.Attribute: color_pair(6),
+        Token.Name.Tag: color_pair(5), Token.Literal.String: color_pair(3),
+        Token.Literal.String.Doc: color_pair(1), Token.Literal.String.Interpol: color_pair(3),
+        Token.Literal.String.Escape: color_pair(5), Token.Literal.String.Backtick: color_pair(3),
+        Token.Literal.String.Delimiter: color_pair(3), Token.Literal.Number: color_pair(4),
+        Token.Literal.Number.Float: color_pair(4), Token.Literal.Number.Hex: color_pair(4),
+        Token.Literal.Number.Integer: color_pair(4), Token.Literal.Number.Oct: color_pair(4),
+        Token.Comment: color_pair(1), Token.Comment.Multiline: color_pair(1),
+        Token.Comment.Preproc: color_pair(1), Token.Comment.Special: color_pair(1) | curses.A_BOLD,
+        Token.Operator: color_pair(6), Token.Operator.Word: color_pair(2),
+        Token.Punctuation: color_pair(6), Token.Text: color_pair(0),
+        Token.Text.Whitespace: color_pair(0), Token.Error: color_pair(8) | curses.A_BOLD,
+        Token.Generic.Heading: color_pair(5) | curses.A_BOLD, Token.Generic.Subheading: color_pair(5),
+        Token.Generic.Deleted: color_pair(8), Token.Generic.Inserted: color_pair(4),
+        Token.Generic.Emph: color_pair(3) | curses.A_BOLD,
+        Token.Generic.Strong: color_pair(2) | curses.A_BOLD,
+        Token.Generic.Prompt: color_pair(7), Token.Generic.Output: color_pair(0),
+    }
+
+
+def _collect(action: Any, found: Set[_TokenType], depth: int = 0) -> None:
+    if isinstance(action, _TokenType):
+        found.add(action)
+    elif depth >= _ACTION_DEPTH:
+        return
+    elif isinstance(action, (tuple, list)):
+        for item in action:
+            _collect(item, found, depth + 1)
+    elif callable(action):
+        # Callbacks (bygroups, using, YAML's indentation helpers) capture their token types.
+        for cell in getattr(action, "__closure__", None) or ():
+            try:
+                _collect(cell.cell_contents, found, depth + 1)
+            except ValueError:  # empty cell
+                pass
+
+
+def _with_subtypes(token_types: Iterable[_TokenType]) -> Set[_TokenType]:
+    found: Set[_TokenType] = set()
+    pending = list(token_types)
+    while pending:
+        token_type = pending.pop()
+        if token_type not in found:
+            found.add(token_type)
+            pending.extend(token_type.subtypes)
+    return found
+
+
+def lexer_token_types(lexer: Any) -> Set[_TokenType]:
+    """
+    Every token type ``lexer`` can emit, found in its rules (``RegexLexer``),
+    with all their subtypes. For a lexer without rules (e.g. JSON), every
+    token type defined so far.
+    """
+    found: Set[_TokenType] = set()
+    for rules in getattr(lexer, "_tokens", {}).values():
+        for _rexmatch, action, _new_state in rules:
+            _collect(action, found)
+    if not found:
+        return _with_subtypes([Token])
+    return _with_subtypes(found | {Text, Whitespace, Error})
+
+
+class TokenColorTable:
+    """Flat ``token type -> curses attribute`` table; ``colorize`` turns raw tokens into segments."""
+
+    def __init__(self, color_map: Mapping[Any, Optional[int]], default: int,
+                 token_types: Iterable[_TokenType] = ()):
+        self._color_map = dict(color_map)
+        self.default = default
+        self.table: Dict[_TokenType, int] = {}
+        for token_type in token_types:
+            self.resolve(token_type)
+
+    def resolve(self, token_type: _TokenType) -> int:
+        """The attribute of ``token_type`` from its closest coloured ancestor; added to the table."""
+        color_attr = self.default
+        # E.g., Token.Keyword.Constant will match Token.Keyword if not defined itself.
+        current_type = token_type
+        while current_type:
+            if current_type in self._color_map:
+                color_attr = self._color_map[current_type]
+                break
+            current_type = current_type.parent
+        color_attr = color_attr or self.default
+        self.table[token_type] = color_attr
+        return color_attr
+
+    def colorize(self, raw_tokens: List[Tuple[_TokenType, str]]) -> List[Tuple[str, int]]:
+        """``(token_type, text)`` pairs to ``(text, curses_attribute)`` segments."""
+        table = self.table
+        try:
+            return [(text_value, table[token_type]) for token_type, text_value in raw_tokens]
+        except KeyError:
+            for token_type, _text_value in raw_tokens:
+                if token_type not in table:
+                    self.resolve(token_type)
+            return [(text_value, table[token_type]) for token_type, text_value in raw_tokens]
@@ -97,4 +97,55 @@ class CursesPanel:
             self.scroll_top = min(max_scroll, self.scroll_top + 1)
         elif key == curses.KEY_RESIZE:
             # Просто выходим из цикла, основной цикл редактора перерисует все
-            pass
\ No newline at end of file
+            pass
+
+class ListPanel(CursesPanel):
+    """
+    Panel with one selectable row per item (Up/Down or 1-9, Enter picks, Esc closes).
+    After ``show()`` returns, ``chosen`` is the index of the picked item or None.
+    """
+    def __init__(self, stdscr, title: str, items: list, colors: dict, selected: int = 0):
+        super().__init__(stdscr, title, "\n".join(items), colors)
+        self.selected = selected
+        self.chosen = None
+
+    def draw(self):
+        term_h, term_w = self.stdscr.getmaxyx()
+        panel_h = min(term_h - 2, len(self.content_lines) + 2)
+        panel_w = min(term_w - 4, max(40, max(map(len, self.content_lines)) + 4))
+        y = (term_h - panel_h) // 2
+        x = (term_w - panel_w) // 2
+        bg_attr = self.colors.get("status", curses.A_NORMAL)
+        border_attr = self.colors.get("keyword", curses.A_BOLD)
+        content_h = panel_h - 2
+
+        # Keep the selected row visible
+        if self.selected < self.scroll_top:
+            self.scroll_top = self.selected
+        elif self.selected >= self.scroll_top + content_h:
+            self.scroll_top = self.selected - content_h + 1
+
+        self.stdscr.addstr(y, x, " " * panel_w, border_attr)
+        self.stdscr.addstr(y + panel_h - 1, x, " " * panel_w, border_attr)
+        title_str = f" {self.title} "
+        self.stdscr.addstr(y, x + max(0, (panel_w - len(title_str)) // 2), title_str[:panel_w], border_attr)
+        for i in range(content_h):
+            idx = self.scroll_top + i
+            line = self.content_lines[idx] if idx < len(self.content_lines) else ""
+            attr = bg_attr | curses.A_REVERSE if idx == self.selected else bg_attr
+            self.stdscr.addstr(y + 1 + i, x, f" {line}"[:panel_w].ljust(panel_w), attr)
+        self.stdscr.refresh()
+
+    def handle_input(self, key):
+        if key in (ord('q'), ord('Q'), 27):
+            self.is_active = False
+        elif key in (curses.KEY_UP, ord('k')):
+            self.selected = max(0, self.selected - 1)
+        elif key in (curses.KEY_DOWN, ord('j')):
+            self.selected = min(len(self.content_lines) - 1, self.selected + 1)
+        elif key in (curses.KEY_ENTER, 10, 13):
+            self.chosen = self.selected
+            self.is_active = False
+        elif ord('1') <= key <= ord('9') and key - ord('1') < len(self.content_lines):
+            self.chosen = key - ord('1')
+            self.is_active = False
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from sway_pad.buffer_list import BUFFER_FIELDS, BufferList, BufferState, estimate_text_bytes
+from sway_pad.text_buffer import create_buffer
+
+
+def _document(path=None, lines=("",), modified=False):
+    fields = dict.fromkeys(BUFFER_FIELDS)
+    fields.update(text=create_buffer(list(lines), "list"), filename=path, modified=modified,
+                  cursor_x=0, cursor_y=0)
+    return BufferState(**fields)
+
+
+class TestBufferList(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _file(self, name, lines):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        return path
+
+    def test_capture_and_apply_round_trip(self):
+        editor = SimpleNamespace(**{name: None for name in BUFFER_FIELDS})
+        editor.text, editor.filename, editor.cursor_y, editor.search_term = ["a"], "a.py", 7, "foo"
+        state = BufferState()
+        state.capture(editor)
+        other = SimpleNamespace(**{name: None for name in BUFFER_FIELDS})
+        state.apply_to(other)
+        self.assertEqual((other.filename, other.cursor_y, other.search_term), ("a.py", 7, "foo"))
+        self.assertIsNone(other.text)  # the editor adopts the text itself
+
+    def test_find_add_remove(self):
+        buffers = BufferList()
+        a = self._file("a.yaml", ["a: 1"])
+        buffers.active_state.filename = a
+        index = buffers.add(_document(self._file("b.yaml", ["b: 2"])))
+        self.assertEqual(index, 1)
+        self.assertEqual(buffers.find(os.path.join(self.dir.name, ".", "a.yaml")), 0)
+        self.assertIsNone(buffers.find(os.path.join(self.dir.name, "c.yaml")))
+        buffers.active = 1
+        buffers.remove(1)
+        self.assertEqual((len(buffers), buffers.active), (1, 0))
+        with self.assertRaises(ValueError):
+            buffers.remove(0)
+
+    def test_trim_releases_least_recently_used_clean_buffers(self):
+        buffers = BufferList()
+        lines = [f"line {i} " + "x" * 40 for i in range(2000)]
+        old = _document(self._file("old.log", lines), lines)
+        dirty = _document(self._file("dirty.log", lines), lines, modified=True)
+        recent = _document(self._file("recent.log", lines), lines)
+        for state in (recent, dirty, old):
+            buffers.add(state)  # each goes right after the active buffer: old, dirty, recent
+        for index in (1, 2, 3, 0):  # used in that order, then the active buffer
+            buffers.touch(index)
+        one = estimate_text_bytes(old.text)
+        self.assertGreater(one, 2000 * 40)
+
+        unloaded = buffers.trim(2 * one)
+        self.assertEqual(unloaded, [old])  # oldest clean one; the dirty buffer is never released
+        self.assertTrue(old.unloaded and not recent.unloaded and not dirty.unloaded)
+        self.assertFalse(old.changed_on_disk())
+        with open(old.filename, "a", encoding="utf-8") as f:
+            f.write("\nmore")
+        self.assertTrue(old.changed_on_disk())
+        self.assertEqual(buffers.trim(0), [])
+
+    def test_atomic_replace_is_a_change_on_disk(self):
+        path = self._file("same.txt", ["abc"])
+        state = _document(path, ["abc"])
+        self.assertTrue(state.unload())
+        replacement = self._file("same.txt.tmp", ["xyz"])  # same size …
+        st = os.stat(path)
+        os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))  # … and mtime, another inode
+        os.replace(replacement, path)
+        self.assertTrue(state.changed_on_disk())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+from sway_pad.compression import (compression_for_name, detect_compression, open_decompressed,
+                                  strip_compression_suffix)
+from sway_pad.file_loader import read_stream
+from sway_pad.file_saver import atomic_write
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.lines = [f"2024-05-01 12:00:00 INFO request {i} ü" for i in range(20000)]
+        self.data = "\n".join(self.lines).encode("utf-8")
+
+    def _path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_detects_codec_by_magic_bytes(self):
+        for codec, compress in (("gzip", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)):
+            path = self._path(f"rotated.{codec}.1")  # no telling suffix
+            with open(path, "wb") as f:
+                f.write(compress(self.data))
+            self.assertEqual(detect_compression(path), codec)
+            with open_decompressed(path, codec) as stream:
+                decoded = read_stream(stream, chunk_size=4096)
+            self.assertEqual(decoded.lines, self.lines)
+        plain = self._path("BZh.txt")
+        with open(plain, "wb") as f:
+            f.write(b"BZhello\n")
+        self.assertIsNone(detect_compression(plain))
+        self.assertIsNone(detect_compression(self._path("missing")))
+
+    def test_save_recompresses_with_codec(self):
+        for codec in ("gzip", "bz2", "xz"):
+            path = self._path(f"doc.log.{codec}")
+            atomic_write(path, self.lines, newline="\n", compression=codec)
+            self.assertEqual(detect_compression(path), codec)
+            with open_decompressed(path, codec) as stream:
+                self.assertEqual(stream.read(), self.data)
+            self.assertLess(os.path.getsize(path), len(self.data) // 4)
+
+    def test_names(self):
+        self.assertEqual(compression_for_name("a/app.log.GZ"), "gzip")
+        self.assertIsNone(compression_for_name("app.log"))
+        self.assertEqual(strip_compression_suffix("config.yaml.xz"), "config.yaml")
+        self.assertEqual(strip_compression_suffix("config.yaml"), "config.yaml")
+
+
+if __name__ == "__main__":
+    unittest.main()
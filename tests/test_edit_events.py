@@ -0,0 +1,54 @@
+import unittest
+from sway_pad.edit_events import EditEvent, EditEventBus
+from sway_pad.text_buffer import ListBuffer, PieceTableBuffer
+
+
+class TestEditEvents(unittest.TestCase):
+
+    def test_every_mutation_is_published(self):
+        for buffer_cls in (ListBuffer, PieceTableBuffer):
+            buf = buffer_cls(["one", "two", "three"])
+            bus = EditEventBus()
+            events = []
+            bus.subscribe(events.append)
+            bus.attach(buf)
+            buf[1] = "TWO"
+            buf.insert(0, "zero")
+            del buf[1:3]
+            self.assertEqual([(e.start, e.old_end, e.new_end, e.inserted_text) for e in events], [
+                ((1, 0), (2, 0), (2, 0), "TWO\n"),
+                ((0, 0), (0, 0), (1, 0), "zero\n"),
+                ((1, 0), (3, 0), (1, 0), ""),
+            ], buffer_cls.__name__)
+            self.assertEqual(events[-1].version, buf.version)
+            self.assertEqual(events[-1].line_delta, -2)
+
+    def test_replacement_and_batching(self):
+        old, new = PieceTableBuffer(["a", "b"]), PieceTableBuffer(["x"])
+        bus = EditEventBus()
+        batches = []
+        bus.subscribe(batches.append, batched=True)
+        bus.attach(old)
+        old.append("c")
+        bus.attach(new, replaced=old)
+        old.append("ignored")  # no longer followed
+        self.assertEqual(batches, [])
+        self.assertTrue(bus.flush())
+        self.assertFalse(bus.flush())
+        (first, replaced), = batches
+        self.assertEqual(first, EditEvent.from_splice(2, 2, ["c"], old.version - 1))
+        self.assertEqual((replaced.start, replaced.old_end, list(replaced.lines)), ((0, 0), (3, 0), ["x"]))
+
+    def test_unsubscribe(self):
+        buf = ListBuffer(["a"])
+        bus = EditEventBus()
+        events = []
+        bus.subscribe(events.append)
+        bus.attach(buf)
+        bus.unsubscribe(events.append)
+        buf.append("b")
+        self.assertEqual(events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import queue
+import threading
+import unittest
+from unittest.mock import MagicMock
+from sway_pad.edit_events import EditEventBus
+from sway_pad.sway import History, SwayEditor
+from sway_pad.text_buffer import PieceTableBuffer
+
+
+def make_editor(lines):
+    """A `SwayEditor` without a screen: only the state the editing commands use."""
+    editor = SwayEditor.__new__(SwayEditor)
+    editor.stdscr = MagicMock()
+    editor.stdscr.getmaxyx.return_value = (24, 80)
+    editor.config = {"editor": {"tab_size": 4, "use_spaces": True}}
+    editor._state_lock = threading.RLock()
+    editor._msg_q = queue.Queue()
+    editor.edit_events = EditEventBus()
+    editor.text = PieceTableBuffer(lines)
+    editor.cursor_y = editor.cursor_x = 0
+    editor.scroll_top = editor.scroll_left = 0
+    editor.visible_lines = 20
+    editor.modified = False
+    editor.status_message = ""
+    editor.is_selecting = False
+    editor.selection_start = editor.selection_end = None
+    editor.internal_clipboard = ""
+    editor.use_system_clipboard = False
+    editor.pyclip_available = False
+    editor.history = History(editor)
+    return editor
+
+
+def select(editor, start, end):
+    editor.is_selecting = True
+    editor.selection_start, editor.selection_end = start, end
+    editor.cursor_y, editor.cursor_x = end
+
+
+class TestEditorSplice(unittest.TestCase):
+
+    def test_multi_line_paste(self):
+        editor = make_editor(["alpha", "omega"])
+        editor.cursor_y, editor.cursor_x = 0, 2
+        editor.internal_clipboard = "one\ntwo\nthree"
+        self.assertTrue(editor.paste())
+        self.assertEqual(editor.text.to_list(), ["alone", "two", "threepha", "omega"])
+        self.assertEqual((editor.cursor_y, editor.cursor_x), (2, 5))
+        self.assertTrue(editor.modified)
+
+    def test_paste_replaces_selection(self):
+        editor = make_editor(["abc", "def", "ghi"])
+        select(editor, (0, 1), (2, 1))
+        editor.internal_clipboard = "X\nY"
+        self.assertTrue(editor.paste())
+        self.assertEqual(editor.text.to_list(), ["aX", "Yhi"])
+
+    def test_delete_selection_across_lines(self):
+        editor = make_editor(["first line", "middle", "last line"])
+        deleted = editor.delete_selected_text_internal(0, 5, 2, 4)
+        self.assertEqual(deleted, [" line", "middle", "last"])
+        self.assertEqual(editor.text.to_list(), ["first line"])
+        self.assertEqual((editor.cursor_y, editor.cursor_x), (0, 5))
+
+    def test_block_indent_and_unindent(self):
+        editor = make_editor(["a", "    b", "c", "d"])
+        select(editor, (0, 0), (2, 1))
+        self.assertTrue(editor.handle_block_indent())
+        self.assertEqual(editor.text.to_list(), ["    a", "        b", "    c", "d"])
+        self.assertEqual(editor.selection_end, (2, 5))
+        self.assertTrue(editor.handle_block_unindent())
+        self.assertEqual(editor.text.to_list(), ["a", "    b", "c", "d"])
+
+    def test_undo_redo_round_trip(self):
+        editor = make_editor(["alpha", "omega"])
+        editor.cursor_y, editor.cursor_x = 0, 2
+        editor.internal_clipboard = "one\ntwo"
+        editor.paste()
+        after = (editor.text.to_list(), (editor.cursor_y, editor.cursor_x))
+
+        self.assertTrue(editor.undo())
+        self.assertEqual(editor.text.to_list(), ["alpha", "omega"])
+        self.assertEqual((editor.cursor_y, editor.cursor_x), (0, 2))
+
+        self.assertTrue(editor.redo())
+        self.assertEqual((editor.text.to_list(), (editor.cursor_y, editor.cursor_x)), after)
+
+    def test_undo_redo_block_indent(self):
+        editor = make_editor(["a", "b", "c"])
+        select(editor, (0, 0), (1, 1))
+        editor.handle_block_indent()
+        indented = editor.text.to_list()
+        self.assertTrue(editor.undo())
+        self.assertEqual(editor.text.to_list(), ["a", "b", "c"])
+        self.assertTrue(editor.redo())
+        self.assertEqual(editor.text.to_list(), indented)
+
+
+if __name__ == "__main__":
+    unittest.main()
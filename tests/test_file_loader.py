@@ -0,0 +1,83 @@
+import codecs
+import io
+import itertools
+import unittest
+from sway_pad.file_loader import BackgroundLoad, StreamingTextDecoder, read_stream
+
+
+class TestFileLoader(unittest.TestCase):
+
+    def _read(self, data: bytes, chunk_size: int):
+        return read_stream(io.BytesIO(data), chunk_size=chunk_size)
+
+    def test_utf8_fast_path_matches_splitlines(self):
+        text = "héllo wörld\r\nascii line\n\nпривет\rend x\x0cy"
+        for chunk_size in (1, 2, 3, 7, 4096):
+            result = self._read(text.encode("utf-8"), chunk_size)
+            self.assertEqual(result.lines, text.splitlines())
+            self.assertEqual(result.encoding, "utf-8")
+            self.assertFalse(result.detector_used)
+
+    def test_crlf_split_across_chunks(self):
+        for data in (b"a\r\nb", b"a\r\n\r\nb\r", b"\r\n\r\n"):
+            for chunk_size in (1, 2, 3):
+                self.assertEqual(self._read(data, chunk_size).lines, data.decode().splitlines())
+
+    def test_line_break_runs_match_splitlines(self):
+        for count in range(1, 5):
+            for parts in itertools.product((b"\r", b"\n", b"\r\n", b"x"), repeat=count):
+                data = b"".join(parts)
+                for chunk_size in (1, 2, 3):
+                    with self.subTest(data=data, chunk_size=chunk_size):
+                        self.assertEqual(self._read(data, chunk_size).lines, data.decode().splitlines())
+
+    def test_empty_input(self):
+        self.assertEqual(self._read(b"", 16).lines, [""])
+
+    def test_bom_selects_codec(self):
+        result = self._read(codecs.BOM_UTF16_LE + "hi\nthere".encode("utf-16-le"), 3)
+        self.assertEqual(result.lines, ["hi", "there"])
+        self.assertEqual(result.encoding, "utf-16")
+
+    def test_non_utf8_falls_back_to_detector(self):
+        text = "ascii first\n" * 50 + "Привет мир, это тест кодировки windows-1251.\n" * 40
+        result = self._read(text.encode("cp1251"), 64)
+        self.assertTrue(result.detector_used)
+        self.assertEqual(result.encoding, "cp1251")
+        self.assertEqual(result.lines, text.splitlines())
+
+    def test_invalid_bytes_after_utf8_are_replaced(self):
+        decoder = StreamingTextDecoder()
+        lines = decoder.feed("é\n".encode("utf-8"))
+        lines += decoder.feed(b"bad \xff byte\n")
+        lines += decoder.finish()
+        self.assertEqual(lines, ["é", "bad � byte"])
+        self.assertEqual(decoder.errors, "replace")
+
+    def _drain_all(self, job):
+        lines, finished = [], False
+        while not finished:
+            batch, finished = job.drain()
+            lines += batch
+        return lines
+
+    def test_background_load_publishes_all_lines(self):
+        data = b"".join(b"line %d\n" % i for i in range(5000))
+        job = BackgroundLoad(lambda: io.BytesIO(data), total_bytes=len(data),
+                             chunk_size=1000, first_chunk_size=64).start()
+        self.assertEqual(self._drain_all(job), data.decode().splitlines())
+        self.assertIsNone(job.error)
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(job.result.encoding, "utf-8")
+
+    def test_background_load_cancel(self):
+        job = BackgroundLoad(lambda: io.BytesIO(b"x\n" * 100000), chunk_size=16)
+        job.cancel()
+        job.start()
+        self._drain_all(job)
+        self.assertTrue(job.cancelled)
+        self.assertIsNone(job.result)
+
+
+if __name__ == "__main__":
+    unittest.main()
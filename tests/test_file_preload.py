@@ -0,0 +1,56 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from sway_pad.file_preload import FilePreloader, detect_lexer, preload_file
+
+
+class TestFilePreload(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_detect_lexer(self):
+        self.assertEqual(detect_lexer("chart/values.yaml.gz", []).name, "YAML")
+        script = ["#!/usr/bin/env python3", "import os", "print(os.getcwd())"]
+        self.assertEqual(detect_lexer(None, script).name, "Python")
+        self.assertEqual(detect_lexer("Jenkinsfile.unknown", script, content_guess=False).name, "Text only")
+        self.assertEqual(detect_lexer(None, [""]).name, "Text only")
+
+    def test_preload_file(self):
+        path = self._path("values.yaml.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write("replicaCount: 1\nimage: nginx\n")
+        result = preload_file(path)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.decoded.lines, ["replicaCount: 1", "image: nginx"])
+        self.assertEqual((result.compression, result.longest_line, result.lexer.name), ("gzip", 15, "YAML"))
+        self.assertIsInstance(preload_file(self._path("missing.yaml")).error, OSError)
+
+    def test_pool_returns_every_file(self):
+        paths = []
+        for n in range(20):
+            paths.append(self._path(f"t{n}.yaml"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(f"name: service-{n}\n")
+        paths.append(self._path("missing.yaml"))
+        preloader = FilePreloader(max_workers=4)
+        self.addCleanup(preloader.shutdown)
+        for path in paths:
+            preloader.submit(path)
+        results, deadline = [], time.monotonic() + 10
+        while preloader.pending and time.monotonic() < deadline:
+            results += preloader.poll()
+            time.sleep(0.005)
+        self.assertEqual(preloader.submitted, 21)
+        self.assertEqual(sorted(r.path for r in results), sorted(paths))
+        self.assertEqual([r.path for r in results if r.error is not None], [paths[-1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+import unittest
+from sway_pad.file_saver import BackgroundSave, SaveCancelled, atomic_write
+
+
+class TestFileSaver(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "doc.txt")
+        with open(self.path, "w") as f:
+            f.write("old\n")
+        os.chmod(self.path, 0o640)
+
+    def _leftovers(self):
+        return [n for n in os.listdir(self.dir.name) if n.endswith(".tmp")]
+
+    def test_atomic_write_replaces_content_and_keeps_mode(self):
+        lines = [f"line {i} é" for i in range(50000)]
+        written = atomic_write(self.path, lines, encoding="utf-8", newline="\n")
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(data, "\n".join(lines).encode("utf-8"))
+        self.assertEqual(written, len(data))
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_symlink_is_kept(self):
+        link = os.path.join(self.dir.name, "link.txt")
+        os.symlink(self.path, link)
+        atomic_write(link, ["new"], newline="\n")
+        self.assertTrue(os.path.islink(link))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+
+    def test_cancel_leaves_target_untouched(self):
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SaveCancelled):
+            atomic_write(self.path, ["new"], cancel=cancel)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old\n")
+        self.assertEqual(self._leftovers(), [])
+
+    def test_background_save(self):
+        job = BackgroundSave(self.path, ["a", "b"], encoding="utf-16", newline="\n").start()
+        self.assertTrue(job.wait(5))
+        self.assertIsNone(job.error)
+        self.assertEqual(job.progress, 1.0)
+        with open(self.path, encoding="utf-16") as f:
+            self.assertEqual(f.read(), "a\nb")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from sway_pad.file_view import MmapFileView, ReadOnlyBufferError  # the class file_view raises
+
+
+class TestMmapFileView(unittest.TestCase):
+
+    def _make_file(self, data: bytes) -> str:
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def test_lines_match_splitlines(self):
+        data = b"hello\r\nWorld foo\n\nlast line foo"
+        view = MmapFileView(self._make_file(data))
+        self.addCleanup(view.close)
+        self.assertEqual(view.to_list(), data.decode().splitlines())
+        self.assertEqual(view[1:3], ["World foo", ""])
+
+    def test_trailing_newline_and_empty_file(self):
+        view = MmapFileView(self._make_file(b"a\nb\n"))
+        self.addCleanup(view.close)
+        self.assertEqual(view.to_list(), ["a", "b"])
+        empty = MmapFileView(self._make_file(b""))
+        self.addCleanup(empty.close)
+        self.assertEqual(empty.to_list(), [""])
+
+    def test_find_wraps_and_reports_columns(self):
+        view = MmapFileView(self._make_file(b"hello\nWorld foo\n\nlast line foo"))
+        self.addCleanup(view.close)
+        self.assertEqual(view.find("FOO"), (1, 6, 9))
+        self.assertEqual(view.find("foo", 1, 7), (3, 10, 13))
+        self.assertEqual(view.find("hello", 2, 0), (0, 0, 5))
+        self.assertIsNone(view.find("missing"))
+
+    def test_view_is_read_only(self):
+        view = MmapFileView(self._make_file(b"a\n"))
+        self.addCleanup(view.close)
+        with self.assertRaises(ReadOnlyBufferError):
+            view.insert(0, "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+from sway_pad.file_watcher import InotifyWatcher, StatWatcher, create_watcher, fingerprint
+
+
+class TestFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "main.tf")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('resource "null_resource" "a" {}\n')
+
+    def _replace(self, text):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+    def _poll_until(self, watcher, expected):
+        changed, deadline = set(), time.monotonic() + 5
+        while expected - changed and time.monotonic() < deadline:
+            changed |= watcher.poll()
+            time.sleep(0.01)
+        return changed
+
+    def test_stat_watcher(self):
+        watcher = StatWatcher(interval=0)
+        watcher.watch(self.path)
+        self.assertEqual(watcher.poll(), set())
+        self._replace("changed\n")
+        self.assertEqual(watcher.poll(), {self.path})
+        os.remove(self.path)
+        self.assertEqual(watcher.poll(), {self.path})
+        self.assertIsNone(fingerprint(self.path))
+
+    @unittest.skipUnless(InotifyWatcher.available(), "inotify not available")
+    def test_inotify_watcher(self):
+        watcher = InotifyWatcher()
+        self.addCleanup(watcher.close)
+        other = os.path.join(self.dir.name, "other.tf")
+        watcher.watch(self.path)
+        with open(other, "w", encoding="utf-8") as f:
+            f.write("x\n")
+        self.assertEqual(watcher.poll(), set())  # not a watched file
+        self._replace("formatted\n")  # atomic save, as `terraform fmt` does
+        self.assertEqual(self._poll_until(watcher, {self.path}), {self.path})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("appended\n")
+        self.assertEqual(self._poll_until(watcher, {self.path}), {self.path})
+        watcher.unwatch(self.path)
+        self._replace("again\n")
+        time.sleep(0.05)
+        self.assertEqual(watcher.poll(), set())
+
+    def test_create_watcher(self):
+        self.assertIsNone(create_watcher("off"))
+        self.assertIsInstance(create_watcher("poll", 1.0), StatWatcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
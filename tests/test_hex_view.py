@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sway_pad.hex_view import HexFileView, looks_binary, parse_byte_pattern, ReadOnlyBufferError  # the class hex_view raises
+
+
+class TestHexFileView(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _view(self, data, name="data.bin"):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        view = HexFileView(path)
+        self.addCleanup(view.close)
+        return view
+
+    def test_rows(self):
+        view = self._view(b"SQLite format 3\x00" + b"\x01\x02\xff")
+        self.assertEqual(view.line_count(), 2)
+        self.assertEqual(view[0], "00000000  53 51 4c 69 74 65 20 66  6f 72 6d 61 74 20 33 00  |SQLite format 3.|")
+        self.assertEqual(view[1], "00000010  01 02 ff" + " " * 40 + "  |...|")
+        self.assertEqual(list(view.iter_range(1)), [view[1]])
+        with self.assertRaises(ReadOnlyBufferError):
+            view[0:1] = ["x"]
+
+    def test_empty_file(self):
+        view = self._view(b"")
+        self.assertEqual(view.line_count(), 1)
+        self.assertEqual(view[0], "00000000  " + " " * 48 + "  ||")
+        self.assertIsNone(view.find("00"))
+
+    def test_columns_and_offsets(self):
+        view = self._view(bytes(range(256)) * 4)
+        for index in range(16):
+            col = view.column_of_byte(index)
+            self.assertEqual(view[3][col:col + 2], f"{48 + index:02x}")
+            self.assertEqual(view.offset_at(3, col), 48 + index)
+            self.assertEqual(view.offset_at(3, col + 1), 48 + index)
+        ascii_start = view[0].index("|") + 1
+        self.assertEqual(view.offset_at(2, ascii_start + 5), 37)
+        self.assertEqual(view.offset_at(1000, 0), view.size - 1)
+
+    def test_looks_binary(self):
+        for name, data, expected in (("a.bin", b"\x7fELF\x00\x01", True),
+                                     ("a.txt", "plain text\n".encode(), False),
+                                     ("a16.txt", "text".encode("utf-16"), False)):
+            path = os.path.join(self.dir.name, name)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(looks_binary(path), expected, name)
+        self.assertFalse(looks_binary(os.path.join(self.dir.name, "missing")))
+
+    def test_parse_byte_pattern(self):
+        self.assertEqual(parse_byte_pattern("de ad be ef"), b"\xde\xad\xbe\xef")
+        self.assertEqual(parse_byte_pattern("0xDEADbeef"), b"\xde\xad\xbe\xef")
+        self.assertEqual(parse_byte_pattern("dead"), b"dead")
+        with self.assertRaises(ValueError):
+            parse_byte_pattern("0xabc")
+
+    def test_find_across_chunks(self):
+        data = bytearray(1000)
+        data[510:514] = b"\xde\xad\xbe\xef"
+        data[900:904] = b"TAIL"
+        view = self._view(bytes(data))
+        with mock.patch("sway_pad.hex_view.SEARCH_CHUNK", 64):
+            self.assertEqual(view.find_bytes(b"\xde\xad\xbe\xef"), 510)
+            self.assertEqual(view.find_bytes(b"\xde\xad\xbe\xef", 511), 510)  # wraps around
+            self.assertEqual(view.find_bytes(b"tail", 0, ignore_case=True), 900)
+            self.assertIsNone(view.find_bytes(b"tail"))
+            row, col_start, col_end = view.find("de ad be ef")
+        self.assertEqual(row, 510 // 16)
+        self.assertEqual(view[row][col_start:col_end], "de ad")  # the rest is on the next row
+        self.assertEqual(view.find("de ad", row, col_start + 1), (row, col_start, col_start + 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import time
+import unittest
+from pygments.lexers import PythonLexer
+from pygments.token import String, Text
+from sway_pad.highlight_worker import TokenizeWorker, ahead_range, make_job
+from sway_pad.incremental_lexer import IncrementalHighlighter
+
+
+def colorize(tokens):
+    return [(text, token_type) for token_type, text in tokens]
+
+
+class TestAheadRange(unittest.TestCase):
+
+    def test_margins(self):
+        self.assertEqual(ahead_range(100, 40, 1000, 0), (60, 180))
+        self.assertEqual(ahead_range(100, 40, 1000, 40), (60, 300))  # paging down
+        self.assertEqual(ahead_range(100, 40, 1000, -40), (0, 180))
+        self.assertEqual(ahead_range(100, 40, 150, 3), (60, 150))
+
+
+class TestTokenizeWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = ["def f%d(x):" % i if i % 2 == 0 else "    return x + %d" % i for i in range(400)]
+        self.highlighter = IncrementalHighlighter(PythonLexer(), colorize)
+        self.worker = TokenizeWorker()
+        self.addCleanup(self.worker.shutdown)
+
+    def run_job(self, first, count, scrolled=0):
+        self.worker.submit(make_job(self.highlighter, self.lines, first, count, scrolled))
+        deadline = time.monotonic() + 10
+        while self.worker.busy and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return [self.highlighter.apply(results, self.lines) for _h, results in self.worker.poll()]
+
+    def test_draw_is_plain_until_the_worker_delivers(self):
+        rows = self.highlighter.highlight(self.lines, 100, 40, budget=0)
+        self.assertEqual(self.highlighter.missing, 40)
+        self.assertEqual(rows[0], [(self.lines[100], Text)])
+        self.assertTrue(any(self.run_job(100, 40)))
+        rows = self.highlighter.highlight(self.lines, 100, 40, budget=0)
+        self.assertEqual(self.highlighter.missing, 0)
+        self.assertEqual(rows, self.highlighter.highlight(self.lines, 100, 40))
+        # The lines below the viewport were lexed ahead.
+        self.highlighter.highlight(self.lines, 140, 40, budget=0)
+        self.assertEqual(self.highlighter.missing, 0)
+        self.assertEqual(self.highlighter.lines_lexed, 0)
+
+    def test_stale_results_do_not_corrupt_states(self):
+        self.worker.submit(make_job(self.highlighter, self.lines, 0, 40))
+        while self.worker.busy:
+            time.sleep(0.005)
+        self.lines[5:5] = ['"""']  # edited before the results are applied
+        self.highlighter.on_edit(5, 5, 1)
+        for _h, results in self.worker.poll():
+            self.highlighter.apply(results, self.lines)
+        rows = self.highlighter.highlight(self.lines, 0, 40)
+        self.assertTrue(all(token_type in String for _text, token_type in rows[20]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from pygments.lexers import JsonLexer, PythonLexer, YamlLexer
+from pygments.token import Keyword, Name, String
+from sway_pad import incremental_lexer
+from sway_pad.incremental_lexer import IncrementalHighlighter, initial_state, is_resumable, lex_line
+
+
+def colorize(tokens):
+    return [(text, token_type) for token_type, text in tokens]
+
+
+def token_types(segments):
+    return [token_type for _text, token_type in segments]
+
+
+class TestLexLine(unittest.TestCase):
+
+    def test_state_carries_over(self):
+        lexer = PythonLexer()
+        tokens, state = lex_line(lexer, 'x = """start', initial_state(lexer))
+        self.assertEqual("".join(text for _type, text in tokens), 'x = """start')
+        self.assertNotEqual(state, initial_state(lexer))
+        tokens, state = lex_line(lexer, "    def not_code():", state)
+        self.assertTrue(all(token_type in String for token_type, _text in tokens))
+        _tokens, state = lex_line(lexer, '"""', state)
+        self.assertEqual(state, initial_state(lexer))
+
+    def test_yaml_block_scalar(self):
+        lines = ["script: |", "  key: not a key", "  - not a list", "next: 1"]
+        highlighter = IncrementalHighlighter(YamlLexer(), colorize)
+        rows = highlighter.highlight(lines, 0, len(lines))
+        self.assertNotIn(Name.Tag, token_types(rows[1]))
+        self.assertEqual(rows[3][0], ("next", Name.Tag))
+
+    def test_not_resumable(self):
+        self.assertTrue(is_resumable(PythonLexer()))
+        self.assertFalse(is_resumable(JsonLexer()))
+        highlighter = IncrementalHighlighter(JsonLexer(), colorize)
+        rows = highlighter.highlight(['{"a": 1,', ' "b": [2]}'], 0, 2)
+        self.assertEqual("".join(text for text, _type in rows[1]), ' "b": [2]}')
+
+
+class TestIncrementalHighlighter(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = ["def f%d():\n    return %d" % (i, i) for i in range(500)]
+        self.lines = "\n".join(self.lines).split("\n")
+        self.highlighter = IncrementalHighlighter(PythonLexer(), colorize)
+        self.highlighter.highlight(self.lines, 0, len(self.lines))
+
+    def edit(self, start, end, new_lines):
+        self.lines[start:end] = new_lines
+        self.highlighter.on_edit(start, end, len(new_lines))
+
+    def test_local_edit_converges(self):
+        lexed = self.highlighter.lines_lexed
+        self.edit(10, 11, ["    return -1"])
+        rows = self.highlighter.highlight(self.lines, 900, 50)
+        self.assertEqual(self.highlighter.lines_lexed - lexed, 1)
+        self.assertEqual(rows[0][0], ("def", Keyword))
+
+    def test_open_and_close_string(self):
+        self.edit(10, 10, ['"""'])  # everything below is now inside a string
+        rows = self.highlighter.highlight(self.lines, 0, 40)
+        self.assertTrue(all(token_type in String for token_type in token_types(rows[20])))
+        self.assertEqual(self.highlighter.valid, 40)
+
+        lexed = self.highlighter.lines_lexed
+        self.edit(30, 30, ['"""'])
+        rows = self.highlighter.highlight(self.lines, 0, 40)
+        self.assertEqual(rows[32][0], ("def", Keyword))
+        self.assertEqual(self.highlighter.lines_lexed - lexed, 1)  # line 30 itself; 31.. are cached
+
+        self.edit(10, 11, [])
+        self.edit(29, 30, [])
+        rows = self.highlighter.highlight(self.lines, 0, len(self.lines))
+        self.assertEqual(rows[20][0], ("def", Keyword))
+        self.assertEqual(self.highlighter.states, [initial_state(PythonLexer())] * (len(self.lines) + 1))
+
+    def test_far_viewport_is_approximated(self):
+        highlighter = IncrementalHighlighter(PythonLexer(), colorize)
+        lines = ["x = 1"] * (incremental_lexer.MAX_CATCHUP_LINES + 1000)
+        rows = highlighter.highlight(lines, len(lines) - 10, 10)
+        self.assertEqual(len(rows), 10)
+        self.assertLess(highlighter.valid, len(lines) - 10)
+        self.assertLessEqual(highlighter.lines_lexed, 2)  # identical lines come from the cache
+
+    def test_far_job_keeps_states_bounded(self):
+        highlighter = IncrementalHighlighter(PythonLexer(), colorize)
+        lines = ["x = 1"] * 1_000_000
+        first = len(lines) - 50
+        start, state = highlighter.job_start(first)
+        results = []
+        for i in range(start, first + 50):
+            segments, end_state = highlighter.lex_detached(lines[i], state, keep=i >= first)
+            results.append((i, lines[i], state, segments, end_state))
+            state = end_state
+        self.assertTrue(highlighter.apply(results, lines))
+        self.assertLessEqual(len(highlighter.states), incremental_lexer.MAX_CATCHUP_LINES + 2)
+        self.assertLessEqual(len(highlighter.far), incremental_lexer.MAX_FAR_STATES)
+        rows = highlighter.highlight(lines, first, 50, budget=0)
+        self.assertEqual(highlighter.missing, 0)
+        self.assertEqual(rows[0][0], ("x", Name))
+
+        lines[first:first] = ["y = 2"]
+        highlighter.on_edit(first, first, 1)  # the guesses behind the new line move down with it
+        self.assertEqual(highlighter.far[first + 1], initial_state(PythonLexer()))
+        self.assertEqual(highlighter.far[first + 50], initial_state(PythonLexer()))
+
+
+if __name__ == "__main__":
+    unittest.main()
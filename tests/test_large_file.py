@@ -0,0 +1,40 @@
+import unittest
+from sway_pad.large_file import evaluate, settings_for
+
+
+class TestLargeFileProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {"large_file": {"size_mb": 1, "lines": 1000, "line_length": 500}}
+
+    def test_thresholds(self):
+        settings = settings_for(self.config, "/tmp/app.log")
+        self.assertIsNone(evaluate(settings, 1024, 10, 80))
+        self.assertIsNone(evaluate(settings))  # nothing measured yet
+        profile = evaluate(settings, 2 * 1024 * 1024, 5000, None)
+        self.assertEqual(profile.reasons, ("2.0 MB", "5000 lines"))
+        self.assertEqual((profile.highlighting, profile.bracket_matching, profile.lint, profile.auto_save),
+                         ("lightweight", "viewport", "manual", False))
+        self.assertIsNotNone(evaluate(settings, longest_line=500))
+
+    def test_overrides_by_glob(self):
+        self.config["large_file"]["overrides"] = {
+            "*.min.js": {"line_length": 0},
+            "/var/log/*": {"highlighting": "plain", "lint": "auto"},
+        }
+        self.assertIsNone(evaluate(settings_for(self.config, "dist/app.min.js"), longest_line=100000))
+        self.assertIsNotNone(evaluate(settings_for(self.config, "dist/app.js"), longest_line=100000))
+        profile = evaluate(settings_for(self.config, "/var/log/syslog"), line_count=10 ** 6)
+        self.assertEqual((profile.highlighting, profile.lint), ("plain", "auto"))
+
+    def test_disabled_and_invalid_values(self):
+        self.config["large_file"].update(highlighting="fancy", lines="many")
+        profile = evaluate(settings_for(self.config, None), line_count=10 ** 9, longest_line=10 ** 6)
+        self.assertEqual(profile.highlighting, "lightweight")
+        self.assertEqual(profile.reasons, ("1000000000 lines", "a 1000000-character line"))
+        self.config["large_file"]["enabled"] = False
+        self.assertIsNone(evaluate(settings_for(self.config, None), 10 ** 12, 10 ** 9, 10 ** 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from sway_pad.line_diff import Hunk, diff_hunks, map_line, merge3
+
+
+def apply(a, b, hunks):
+    result = list(a)
+    for h in reversed(hunks):
+        result[h.i1:h.i2] = b[h.j1:h.j2]
+    return result
+
+
+class TestLineDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.base = [f"line{i}" for i in range(20)]
+
+    def test_diff_hunks(self):
+        new = ["# header"] + self.base[:10] + ["changed"] + self.base[11:] + ["tail"]
+        hunks = diff_hunks(self.base, new)
+        self.assertEqual(hunks, [Hunk(0, 0, 0, 1), Hunk(10, 11, 11, 12), Hunk(20, 20, 21, 22)])
+        self.assertEqual(apply(self.base, new, hunks), new)
+        self.assertEqual(diff_hunks(self.base, list(self.base)), [])
+        self.assertEqual(apply(self.base, [], diff_hunks(self.base, [])), [])
+
+    def test_map_line(self):
+        new = ["a", "b"] + self.base[:5] + self.base[8:]
+        hunks = diff_hunks(self.base, new)
+        self.assertEqual(map_line(hunks, 0), 2)
+        self.assertEqual(map_line(hunks, 6), 7)  # deleted line: start of the gap
+        self.assertEqual(map_line(hunks, 19), 18)
+
+    def test_merge3_clean(self):
+        mine = list(self.base)
+        mine[2] = "mine"
+        theirs = self.base[:15] + ["theirs"] + self.base[15:]
+        merged, conflicts = merge3(self.base, mine, theirs)
+        self.assertEqual(conflicts, 0)
+        self.assertEqual(merged, self.base[:2] + ["mine"] + self.base[3:15] + ["theirs"] + self.base[15:])
+        same = self.base[:5] + self.base[6:]
+        self.assertEqual(merge3(self.base, same, same), (same, 0))
+
+    def test_merge3_conflict(self):
+        mine, theirs = list(self.base), list(self.base)
+        mine[7], theirs[7] = "mine", "theirs"
+        merged, conflicts = merge3(self.base, mine, theirs)
+        self.assertEqual(conflicts, 1)
+        self.assertEqual(merged[7:12], ["<<<<<<< buffer", "mine", "=======", "theirs", ">>>>>>> disk"])
+        self.assertEqual(merged[:7] + merged[12:], self.base[:7] + self.base[8:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from sway_pad.line_index import LineIndex
+
+
+class TestLineIndex(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(b"line %d\n" % i for i in range(1000)))
+        self.addCleanup(os.unlink, self.path)
+
+    def test_full_build(self):
+        index = LineIndex(self.path, chunk_size=97)
+        index.build()
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 1000)
+        self.assertEqual(index.offset_of_line(10), len(b"".join(b"line %d\n" % i for i in range(10))))
+        self.assertEqual(index.line_of_offset(index.offset_of_line(500) + 3), 500)
+        self.assertEqual(index.line_of_fraction(1.0), 999)
+
+    def test_partial_build_then_background(self):
+        index = LineIndex(self.path, chunk_size=64)
+        index.build(until_bytes=100)
+        self.assertFalse(index.complete)
+        self.assertFalse(index.covers_offset(5000))
+        partial = index.line_count
+        self.assertLess(partial, 1000)
+        index.start_background()
+        index._thread.join()
+        self.assertTrue(index.complete)
+        self.assertEqual(index.line_count, 1000)
+
+    def test_build_until_does_not_wait_for_the_background_scan(self):
+        index = LineIndex(self.path, chunk_size=64)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        index.start_background(on_progress=lambda _index: release.wait(10))  # stalls after a chunk
+        index.build(until_bytes=2000)
+        self.assertTrue(index.covers_offset(1999))
+        self.assertFalse(index.complete)
+        release.set()
+        index._thread.join()
+        self.assertEqual(index.line_count, 1000)
+
+    def test_extend_after_append(self):
+        index = LineIndex(self.path)
+        index.build()
+        with open(self.path, "ab") as f:
+            f.write(b"tail 1\ntail 2")
+        self.assertEqual(index.extend(), 2)
+        self.assertEqual(index.line_count, 1002)
+        start, end = index.line_bounds(1001)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            self.assertEqual(f.read(end - start), b"tail 2")
+
+    def test_extend_during_background_build_keeps_callbacks(self):
+        index = LineIndex(self.path, chunk_size=64)
+        completed = threading.Event()
+        index.start_background(on_progress=lambda _index: time.sleep(0.01),  # keeps the scan running
+                               on_complete=lambda _index: completed.set())
+        with open(self.path, "ab") as f:
+            f.write(b"tail 1\ntail 2\n")
+        self.assertIsNone(index.extend())
+        self.assertTrue(completed.wait(10))
+        self.assertEqual(index.line_count, 1002)
+
+
+if __name__ == "__main__":
+    unittest.main()
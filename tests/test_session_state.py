@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from sway_pad.file_watcher import fingerprint
+from sway_pad.session_state import MAX_RECENT, FileState, Session, load_session, save_session
+
+
+class TestSessionState(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.session_file = os.path.join(self.dir.name, "state", "session.json")
+        self.path = os.path.realpath(os.path.join(self.dir.name, "legacy.txt"))
+        with open(self.path, "wb") as f:
+            f.write("Привет\n".encode("cp1251"))
+
+    def test_round_trip(self):
+        state = FileState(self.path, cursor=(3, 4), scroll=(1, 0), encoding="cp1251", lexer="text",
+                          search="мир", disk=fingerprint(self.path))
+        save_session(Session(files=[state], active=0), self.session_file)
+        loaded = load_session(self.session_file)
+        self.assertEqual(loaded.files, [state])
+        self.assertIs(loaded.lookup(os.path.join(self.dir.name, ".", "legacy.txt")), loaded.files[0])
+        self.assertTrue(loaded.files[0].unchanged())
+        with open(self.path, "ab") as f:
+            f.write(b"more\n")
+        self.assertFalse(loaded.files[0].unchanged())
+
+    def test_missing_or_damaged_file(self):
+        self.assertIsNone(load_session(self.session_file))
+        os.makedirs(os.path.dirname(self.session_file))
+        with open(self.session_file, "w", encoding="utf-8") as f:
+            f.write('{"sway_session": 1, "files": [{"cursor": [0, 0]}]}')
+        self.assertIsNone(load_session(self.session_file))
+        with open(self.session_file, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertIsNone(load_session(self.session_file))
+
+    def test_closed_files_move_to_recent(self):
+        session = Session(files=[FileState("/a"), FileState("/b")])
+        session.replace_files([FileState("/b", cursor=(9, 0)), FileState("/c")], active=1)
+        self.assertEqual([s.path for s in session.files], ["/b", "/c"])
+        self.assertEqual([s.path for s in session.recent], ["/a"])
+        session.replace_files([FileState(f"/f{n}") for n in range(MAX_RECENT + 10)], active=0)
+        session.replace_files([], active=0)
+        self.assertEqual(len(session.recent), MAX_RECENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
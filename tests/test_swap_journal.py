@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from sway_pad.swap_journal import SwapJournal, base_fingerprint, find_orphans, read_journal, replay
+from sway_pad.text_buffer import ListBuffer, PieceTableBuffer
+
+
+class TestSwapJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.journal_dir = os.path.join(self.dir.name, "journal")
+        self.path = os.path.join(self.dir.name, "doc.txt")
+        with open(self.path, "w") as f:
+            f.write("one\ntwo\nthree")
+
+    def _journal(self, buf, **kwargs):
+        journal = SwapJournal(self.path, directory=self.journal_dir, **kwargs)
+        buf.add_listener(journal.record)
+        return journal
+
+    def test_replay_rebuilds_document(self):
+        for buffer_cls in (ListBuffer, PieceTableBuffer):
+            buf = buffer_cls(["one", "two", "three"])
+            journal = self._journal(buf)
+            buf[1] = "TWO"
+            buf.insert(0, "zero")
+            del buf[2:4]
+            buf.extend(["tail", "é"])
+            journal.flush()
+            header, records = read_journal(journal.journal_path)
+            self.assertEqual(header["base"], base_fingerprint(self.path))
+            restored = ListBuffer(["one", "two", "three"])
+            replay(restored, records)
+            self.assertEqual(restored.to_list(), buf.to_list())
+            journal.close(discard=True)
+            self.assertFalse(os.path.exists(journal.journal_path))
+
+    def test_typing_is_merged_and_compacted(self):
+        buf = PieceTableBuffer(["one", "two", "three"])
+        journal = self._journal(buf, compact_after=10)
+        for ch in "hello world":
+            buf[1] += ch
+            journal.flush()
+        _, records = read_journal(journal.journal_path)
+        self.assertEqual(records, [[1, 1, ["twohello world"]]])
+
+    def test_torn_last_record_is_ignored(self):
+        buf = ListBuffer(["one", "two", "three"])
+        journal = self._journal(buf)
+        buf.append("four")
+        journal.flush()
+        with open(journal.journal_path, "a") as f:
+            f.write('[3, 0, ["fi')
+        _, records = read_journal(journal.journal_path)
+        self.assertEqual(records, [[3, 0, ["four"]]])
+
+    def test_rebase_keeps_edits_after_mark(self):
+        buf = ListBuffer(["one", "two", "three"])
+        journal = self._journal(buf)
+        buf[0] = "saved"
+        mark = journal.mark()
+        buf[0] = "after save"
+        with open(self.path, "w") as f:
+            f.write("saved\ntwo\nthree")
+        journal.rebase(self.path, mark)
+        header, records = read_journal(journal.journal_path)
+        self.assertEqual(header["base"], base_fingerprint(self.path))
+        self.assertEqual(records, [[0, 1, ["after save"]]])
+
+        journal.rebase(self.path, journal.mark())  # nothing left after the mark
+        journal.flush()
+        self.assertFalse(os.path.exists(journal.journal_path))
+
+    def test_removed_listener_records_nothing(self):
+        buf = ListBuffer(["one"])
+        journal = self._journal(buf)
+        buf.remove_listener(journal.record)  # a new bound-method object, equal to the added one
+        buf.append("two")
+        self.assertFalse(journal.has_changes)
+
+    def test_only_orphans_are_found(self):
+        buf = ListBuffer(["one"])
+        journal = self._journal(buf)
+        buf.append("two")
+        journal.flush()
+        self.assertEqual(find_orphans(self.path, self.journal_dir), [])  # our own, still running
+        orphan = os.path.join(self.journal_dir, os.path.basename(journal.journal_path).rsplit(".", 2)[0]
+                              + ".999999999.swj")
+        os.rename(journal.journal_path, orphan)
+        self.assertEqual(find_orphans(self.path, self.journal_dir), [orphan])
+
+    def test_unnamed_buffers_have_their_own_journals(self):
+        journals = []
+        for text in ("a", "b"):
+            buf = ListBuffer([text])
+            journal = SwapJournal(None, directory=self.journal_dir)
+            buf.add_listener(journal.record)
+            buf.append(text + "2")
+            journal.flush()
+            journals.append(journal)
+        a, b = journals
+        self.assertNotEqual(a.journal_path, b.journal_path)
+        self.assertEqual(read_journal(a.journal_path)[1], [[1, 0, ["a2"]]])
+        b.close(discard=True)
+        self.assertTrue(os.path.exists(a.journal_path))
+        orphan = a.journal_path.rsplit(".", 2)[0] + ".999999999.swj"
+        os.rename(a.journal_path, orphan)
+        self.assertEqual(find_orphans(None, self.journal_dir), [orphan])
+        self.assertEqual(find_orphans(self.path, self.journal_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
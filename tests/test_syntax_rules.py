@@ -0,0 +1,69 @@
+import os
+import random
+import re
+import unittest
+import toml
+from sway_pad.syntax_rules import RuleHighlighter, required_literals
+
+CONFIG = os.path.join(os.path.dirname(__file__), "..", "sway_pad", "config.toml")
+COLORS = {"default": 0, "keyword": 1, "string": 2, "comment": 3, "literal": 4, "decorator": 5, "type": 6}
+
+SAMPLES = [
+    "", "plain words", 'x = "#1" + 2  # note', "@app.route('/x')  def f(a=None): return r'\\d+'",
+    "var s = `a ${b} c`; // done /* x */", "a { color: red !important; } /* c */", '<a href="x">t</a> <!-- c -->',
+    '{"key": "value", "n": [1, 2.5, true]}', "  - name: 'x'  # yes", "[[tool.x]]\nk = [1, 2]", "**bold** `code` [t](u)",
+    "#include <stdio.h>\n#define X 1", 'echo "$HOME ${A}" \'q\'', "'''doc''' \"\"\"doc\"\"\" 0x1F 0b10 1e5j",
+]
+
+
+def reference(rules, colors, line):
+    """The per-character painting `RuleHighlighter` replaces."""
+    char_colors = [colors.get("default")] * len(line)
+    for pattern, color_name in rules:
+        color_attr = colors.get(color_name, colors["default"])
+        for match in pattern.finditer(line):
+            for i in range(*match.span()):
+                char_colors[i] = color_attr
+    if not line:
+        return [("", colors["default"])]
+    segments = [[line[0], char_colors[0]]]
+    for char, color_attr in zip(line[1:], char_colors[1:]):
+        if color_attr == segments[-1][1]:
+            segments[-1][0] += char
+        else:
+            segments.append([char, color_attr])
+    return [tuple(segment) for segment in segments]
+
+
+class TestRuleHighlighter(unittest.TestCase):
+
+    def test_shipped_rules_match_the_reference(self):
+        with open(CONFIG, encoding="utf-8") as f:
+            languages = toml.load(f)["syntax_highlighting"]
+        alphabet = "ab1_ #\"'`/*{}[]:;=$@<>-!\\\n(). "
+        randomized = ["".join(random.Random(n).choice(alphabet) for _ in range(n % 97)) for n in range(200)]
+        for language, section in languages.items():
+            rules = [(re.compile(rule["pattern"]), rule["color"]) for rule in section.get("patterns", [])]
+            highlighter = RuleHighlighter(rules, COLORS, COLORS["default"])
+            for line in SAMPLES + randomized:
+                with self.subTest(language=language, line=line):
+                    self.assertEqual(highlighter.highlight(line), reference(rules, COLORS, line))
+
+    def test_later_rules_recolour_earlier_matches(self):
+        rules = [(re.compile(r'"[^"]*"'), "string"), (re.compile(r"#.*"), "comment"), (re.compile(r"x*"), "keyword")]
+        highlighter = RuleHighlighter(rules, COLORS, 0)
+        self.assertEqual(highlighter.highlight('a "#b" c'), [("a ", 0), ('"', 2), ('#b" c', 3)])
+        self.assertEqual(highlighter.highlight("plain"), [("plain", 0)])  # empty matches colour nothing
+
+    def test_required_literals(self):
+        self.assertEqual(required_literals(re.compile(r"\b0[xX][0-9a-f]+")), {"0x", "0X"})
+        self.assertEqual(required_literals(re.compile(r"(f|r)?(<<.*?>>|\[\[.*?\]\])")), {"<<", "[["})
+        self.assertEqual(required_literals(re.compile(r"\bimport\s+\w+")), {"import"})
+        self.assertIsNone(required_literals(re.compile(r"\b(?:\d+|x)?y*")))
+        self.assertIsNone(required_literals(re.compile(r"abc", re.IGNORECASE)))
+        rules = [(re.compile(r"\b0[xX]\w+"), "literal")]
+        self.assertEqual(RuleHighlighter(rules, COLORS, 0).highlight("a = 0xFF"), [("a = ", 0), ("0xFF", 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import random
+import unittest
+from sway_pad.text_buffer import ByteLineStore, CompactLineBuffer, ListBuffer, PieceTableBuffer, create_buffer
+
+
+class TestTextBuffer(unittest.TestCase):
+
+    def test_create_buffer_backends(self):
+        self.assertIsInstance(create_buffer(["a"], "list"), ListBuffer)
+        self.assertIsInstance(create_buffer(["a"], "piece_table"), PieceTableBuffer)
+        self.assertIsInstance(create_buffer(["a"], "compact"), CompactLineBuffer)
+        self.assertIsInstance(create_buffer(["a"], "unknown"), PieceTableBuffer)
+        self.assertEqual(create_buffer().to_list(), [""])
+
+    def test_splice_and_access(self):
+        buf = PieceTableBuffer(["one", "two", "three"])
+        buf.splice(1, 2, ["a", "b", "c"])
+        self.assertEqual(buf.to_list(), ["one", "a", "b", "c", "three"])
+        self.assertEqual(buf.line_count(), 5)
+        self.assertEqual(buf.get_line(3), "c")
+        self.assertEqual(list(buf.iter_range(1, 3)), ["a", "b"])
+        self.assertEqual(buf[-1], "three")
+
+    def test_piece_table_matches_list_reference(self):
+        self._check_against_reference(PieceTableBuffer)
+
+    def test_compact_buffer_matches_list_reference(self):
+        self._check_against_reference(CompactLineBuffer)
+
+    def _check_against_reference(self, buffer_cls):
+        rnd = random.Random(1234)
+        ref = ListBuffer([f"line {i}" for i in range(50)])
+        buf = buffer_cls([f"line {i}" for i in range(50)])
+        for step in range(2000):
+            n = len(ref)
+            op = rnd.randrange(5)
+            if op == 0:
+                start = rnd.randint(0, n)
+                end = rnd.randint(start, n)
+                lines = [f"new {step} {j}" for j in range(rnd.randint(0, 3))]
+                ref.splice(start, end, lines)
+                buf.splice(start, end, lines)
+            elif op == 1 and n:
+                i = rnd.randrange(n)
+                ref[i] += "x"
+                buf[i] += "x"
+            elif op == 2:
+                i = rnd.randint(0, n)
+                ref.insert(i, "ins")
+                buf.insert(i, "ins")
+            elif op == 3 and n:
+                i = rnd.randrange(n)
+                del ref[i]
+                del buf[i]
+            else:
+                ref.append("tail")
+                buf.append("tail")
+            self.assertEqual(buf, ref)
+
+    def test_slice_assignment(self):
+        buf = PieceTableBuffer(["a", "b", "c", "d"])
+        buf[1:3] = ["x"]
+        self.assertEqual(buf.to_list(), ["a", "x", "d"])
+        del buf[0:2]
+        self.assertEqual(buf.to_list(), ["d"])
+
+    def test_byte_line_store(self):
+        store = ByteLineStore(["ascii", "", "grüße", "привет"])
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store[2], "grüße")
+        self.assertEqual(store[-1], "привет")
+        with self.assertRaises(ValueError):
+            store.append_lines(["bad\nline"])
+        self.assertEqual(list(store), ["ascii", "", "grüße", "привет"])
+
+    def test_compact_buffer_appends_into_store(self):
+        buf = CompactLineBuffer(["héad"])
+        buf.extend(["a", "b"])
+        buf.extend(["ü"])
+        self.assertEqual(buf.piece_count, 1)
+        self.assertEqual(buf.to_list(), ["héad", "a", "b", "ü"])
+        buf[1] = "edited"
+        buf.compact()
+        self.assertEqual(buf.piece_count, 1)
+        self.assertEqual(buf.to_list(), ["héad", "edited", "b", "ü"])
+
+    def test_versions(self):
+        for buffer_cls in (ListBuffer, PieceTableBuffer, CompactLineBuffer):
+            buf = buffer_cls(["a", "b", "c"])
+            self.assertEqual(buf.version, 0)
+            buf[1] = "B"
+            v1 = buf.version
+            buf[1] = "BB"  # same-line rewrite
+            v2 = buf.version
+            buf.insert(0, "top")
+            buf.extend(["end"])
+            name = buffer_cls.__name__
+            self.assertTrue(0 < v1 < v2 < buf.version, name)
+            self.assertEqual([buf.line_version(i) for i in range(len(buf))],
+                             [v2 + 1, 0, v2, 0, buf.version], name)
+
+    def test_snapshot_is_isolated_from_later_edits(self):
+        for buffer_cls in (ListBuffer, PieceTableBuffer, CompactLineBuffer):
+            buf = buffer_cls(["one", "two", "three"])
+            buf[1] = "tw"
+            buf[1] = "two!"  # the tail line of the add buffer (in-place fast path)
+            snap = buf.snapshot()
+            expected = buf.to_list()
+            buf[1] += "?"
+            buf.insert(0, "zero")
+            buf.extend(["tail"])
+            del buf[2]
+            self.assertEqual(snap.to_list(), expected, buffer_cls.__name__)
+            self.assertEqual(snap[1], "two!")
+            self.assertEqual(snap[-1], "three")
+            self.assertGreater(buf.version, snap.version)
+            self.assertEqual(buf.to_list(), ["zero", "one", "three", "tail"])
+            if isinstance(buf, PieceTableBuffer):
+                buf.compact()
+                self.assertEqual(snap.to_list(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from sway_pad.token_cache import TokenCache, entry_bytes
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = TokenCache()
+        self.assertIsNone(cache.get("x = 1", "python", ("root",)))
+        cache.put("x = 1", "python", ("root",), [("x = 1", 0)], ("root",))
+        self.assertEqual(cache.get("x = 1", "python", ("root",)), ([("x = 1", 0)], ("root",)))
+        self.assertIsNone(cache.get("x = 1", "yaml", ("root",)))  # another lexer
+        self.assertIsNone(cache.get("x = 1", "python", ("string",)))  # another state
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertIsNotNone(cache.peek("x = 1", "python", ("root",)))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))  # peek is not counted
+
+    def test_state_only_entries(self):
+        cache = TokenCache()
+        cache.put("a", "python", None, None, ("string",))
+        self.assertIsNone(cache.get("a", "python", None))  # the segments are needed
+        self.assertEqual(cache.get("a", "python", None, need_segments=False), (None, ("string",)))
+        cache.put("a", "python", None, [("a", 3)], ("string",))
+        cache.put("a", "python", None, None, ("string",))  # does not drop the segments
+        self.assertEqual(cache.get("a", "python", None), ([("a", 3)], ("string",)))
+        self.assertEqual(cache.bytes, entry_bytes([("a", 3)]))
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        size = entry_bytes([("line 0", 0)])
+        cache = TokenCache(max_bytes=3 * size)
+        for n in range(3):
+            cache.put(f"line {n}", "lx", None, [(f"line {n}", 0)], None)
+        cache.get("line 0", "lx", None)
+        cache.put("line 3", "lx", None, [("line 3", 0)], None)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.peek("line 1", "lx", None))
+        self.assertIsNotNone(cache.peek("line 0", "lx", None))
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+        huge = "x" * (4 * size)
+        self.assertEqual(cache.put(huge, "lx", None, [(huge, 0)], None), ([(huge, 0)], None))
+        self.assertIsNone(cache.peek(huge, "lx", None))  # larger than the budget: not kept
+        self.assertEqual(len(cache), 3)
+        self.assertIn("3 lines", cache.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from pygments.lexers import JsonLexer, PythonLexer, YamlLexer
+from pygments.token import Token
+from sway_pad.token_colors import TokenColorTable, lexer_token_types, token_color_map
+
+
+def color_pair(n):
+    return n << 8
+
+
+COLORS = {"default": 1, "keyword": 2, "string": 3}
+
+
+def walk(color_map, token_type, default):
+    """The parent walk the table replaces."""
+    while token_type:
+        if token_type in color_map:
+            return color_map[token_type] or default
+        token_type = token_type.parent
+    return default
+
+
+class TestTokenColorTable(unittest.TestCase):
+
+    def test_table_agrees_with_the_parent_walk(self):
+        color_map = token_color_map(COLORS, color_pair)
+        samples = {PythonLexer: "def f(x):\n    return 'a' + x  # done\n", YamlLexer: "a: [1, 'b']\n"}
+        for lexer_class, code in samples.items():
+            lexer = lexer_class()
+            token_types = lexer_token_types(lexer)
+            table = TokenColorTable(color_map, 1, token_types)
+            self.assertGreaterEqual(set(table.table), token_types)
+            for token_type, attr in table.table.items():
+                self.assertEqual(attr, walk(color_map, token_type, 1))
+            raw = list(lexer.get_tokens(code))
+            self.assertTrue(all(token_type in table.table for token_type, _text in raw))  # resolved up front
+            self.assertEqual(table.colorize(raw), [(text, walk(color_map, tt, 1)) for tt, text in raw])
+
+    def test_unknown_types_are_resolved_on_first_sight(self):
+        table = TokenColorTable(token_color_map(COLORS, color_pair), 1)
+        self.assertEqual(table.table, {})
+        segments = table.colorize([(Token.Keyword.Nonexistent, "kw"), (Token.Comment.Odd, "#")])
+        self.assertEqual(segments, [("kw", color_pair(2)), ("#", color_pair(1))])
+        self.assertIn(Token.Keyword.Nonexistent, table.table)
+
+    def test_lexer_without_rules_gets_every_type(self):
+        token_types = lexer_token_types(JsonLexer())
+        self.assertIn(Token.Name.Tag, token_types)
+        self.assertIn(Token.Literal.Number.Float, token_types)
+
+
+if __name__ == "__main__":
+    unittest.main()